@@ -13,3 +13,13 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api.settings")
 
 application = get_asgi_application()
+
+# Warm the cache in the background; readiness_check waits for it
+from core.cache.warmup import start_warmup  # noqa: E402
+
+start_warmup()
+
+# Build the in-memory catalog indexes (autocomplete, ...) in the background
+from products.local_index import start_local_indexes  # noqa: E402
+
+start_local_indexes()
@@ -13,6 +13,13 @@ __all__ = [
     "API_PREFIX",
     "DEFAULT_PAGE_SIZE",
     "MAX_PAGE_SIZE",
+    "COUNT_EXACT",
+    "COUNT_CACHED",
+    "COUNT_ESTIMATED",
+    "COUNT_STRATEGIES",
+    "COUNT_CACHE_TIMEOUT",
+    "ESTIMATED_COUNT_THRESHOLD",
+    "EXPORT_CHUNK_SIZE",
     "CACHE_KEY_PREFIX",
     "CACHE_TIMEOUT_SHORT",
     "CACHE_TIMEOUT_MEDIUM",
@@ -12,6 +12,15 @@ API_PREFIX = f"/api/{API_VERSION}"
 DEFAULT_PAGE_SIZE = 20
 MAX_PAGE_SIZE = 100
 
+# How paginated totals are counted (see api.pagination.CountingPaginator)
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_ESTIMATED = "estimated"
+COUNT_STRATEGIES = (COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATED)
+COUNT_CACHE_TIMEOUT = 60  # seconds a memoized count is reused
+ESTIMATED_COUNT_THRESHOLD = 10000  # exact count below this planner estimate
+EXPORT_CHUNK_SIZE = 2000  # rows fetched per round trip by streaming exports
+
 # Cache Configuration
 CACHE_KEY_PREFIX = "ecommerce_api"
 CACHE_TIMEOUT_SHORT = 300  # 5 minutes
@@ -5,16 +5,31 @@ permissions, caching, pagination, and database optimizations.
 """
 
 import functools
+import importlib
 import logging
 import time
 from collections.abc import Callable
+from typing import Any
 
 from django.core.cache import cache
 from django.db import models
 from django.db.models import Q, QuerySet
-from django.http import HttpRequest
-
-from .config.constants import CACHE_TIMEOUT_MEDIUM, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from django.http import HttpRequest, HttpResponseNotModified
+from django.http.response import HttpResponseBase
+
+from core.cache.conditional import ConditionalValidators, list_versions
+from core.cache.fingerprint import fingerprint, request_cache_key
+from core.cache.metrics import measure_get, measure_set
+from core.cache.responses import EndpointSchema, RenderedResponse, get_endpoint_schema
+from core.cache.settings import CACHE_STAMPEDE
+from core.cache.stampede import get_or_compute, release_lock, store, track_prefix
+
+from .config.constants import (
+    CACHE_TIMEOUT_MEDIUM,
+    COUNT_EXACT,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+)
 from .exceptions import (
     AuthenticationError,
     BaseAPIException,
@@ -26,15 +41,20 @@ from .permissions import (
     IsAdminUser,
     can_modify_object,
 )
-from .utils import get_client_ip, paginate_queryset
+from .utils import cursor_paginate_queryset, get_client_ip, paginate_queryset
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Constants for response status codes
 HTTP_OK = 200
+HTTP_MULTIPLE_CHOICES = 300
 TUPLE_RESPONSE_LENGTH = 2
 
+# Endpoints cached with stale_while_revalidate, by endpoint name, so the
+# background refresh task can find the undecorated function again
+_refreshable_endpoints: dict[str, tuple[Callable, int]] = {}
+
 
 def handle_exceptions(func: Callable) -> Callable:
     """Comprehensive exception handler decorator.
@@ -307,57 +327,326 @@ def cached_response(
     key_prefix: str = "api",
     vary_on_user: bool = False,
     vary_on_params: list[str] | None = None,
+    cache_params: list[str] | None = None,
+    single_flight: bool = True,
+    stale_while_revalidate: bool = False,
+    dependencies: list[type[models.Model]] | None = None,
+    index_versions: list[Callable[[], str]] | None = None,
 ) -> Callable:
     """Cache decorator for API responses.
 
+    Keys are canonical request fingerprints (see core.cache.fingerprint):
+    path and query parameters, audience (anon/customer/staff), response
+    schema version, the list tag versions of ``dependencies`` and the
+    ``index_versions``.
+
     Args:
         timeout: Cache timeout in seconds
         key_prefix: Prefix for cache key
         vary_on_user: Whether to include user in cache key
-        vary_on_params: List of parameters to include in cache key
+        vary_on_params: Path parameters to include in cache key (default: all)
+        cache_params: Query parameters the endpoint reads; others are ignored
+            in the cache key (default: all)
+        single_flight: Whether only one worker recomputes an expired entry
+            while the others serve the stale value (see core.cache.stampede)
+        stale_while_revalidate: Whether an expired entry is served immediately
+            and refreshed by a Celery task instead of inline
+        dependencies: Models the response is built from. A write to one of
+            them moves the response to a new key, so the body cached for a
+            request always matches the ETag ``conditional_get`` sends
+        index_versions: Return the versions of in-process state the response
+            is built from, e.g. a local index. A worker whose copy lags
+            behind caches under its old version instead of the current one
     """
 
     def decorator(func: Callable) -> Callable:
+        if single_flight or stale_while_revalidate:
+            track_prefix(key_prefix)
+
+        endpoint = _endpoint_name(func)
+        if stale_while_revalidate:
+            _refreshable_endpoints[endpoint] = (func, timeout)
+        namespace = f"{key_prefix}:{func.__name__}"
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Build cache key
-            cache_key_parts = [key_prefix, func.__name__]
-
-            if vary_on_user:
-                request = None
-                for arg in args:
-                    if hasattr(arg, "user"):
-                        request = arg
-                        break
-                    if hasattr(arg, "request"):
-                        request = arg.request
-                        break
-
-                if request and request.user.is_authenticated:
-                    cache_key_parts.append(f"user_{request.user.id}")
-                else:
-                    cache_key_parts.append("anonymous")
-
-            if vary_on_params:
-                cache_key_parts.extend(
-                    [
-                        f"{param}_{kwargs[param]}"
-                        for param in vary_on_params
-                        if param in kwargs
-                    ]
+            request = _find_request(args, kwargs)
+            schema = get_endpoint_schema(args[0] if args else None, func)
+            if request is None:
+                schema = None
+                cache_key = _legacy_cache_key(
+                    f"{key_prefix}:{func.__name__}", kwargs, vary_on_params
+                )
+            else:
+                # Controller endpoints are cached as rendered JSON, keyed by a
+                # canonical request fingerprint including the schema version
+                path_params = {
+                    name: value
+                    for name, value in kwargs.items()
+                    if name != "request"
+                    and (vary_on_params is None or name in vary_on_params)
+                }
+                cache_key = request_cache_key(
+                    f"{key_prefix}:{func.__name__}",
+                    request,
+                    path_params=path_params,
+                    allowed_params=cache_params,
+                    schema_version=schema.version if schema else "",
+                    user_scoped=vary_on_user,
+                    versions=[
+                        *list_versions(dependencies or []),
+                        *(version() for version in index_versions or []),
+                    ],
                 )
 
-            cache_key = ":".join(str(part) for part in cache_key_parts)
+            def compute():
+                return _render_result(schema, request, func(*args, **kwargs))
+
+            if stale_while_revalidate:
+                refresh = _background_refresh(endpoint, cache_key, args, kwargs)
+                result = get_or_compute(
+                    cache_key,
+                    compute,
+                    timeout,
+                    prefix=key_prefix,
+                    cacheable=_is_cacheable_result,
+                    stale_ttl=CACHE_STAMPEDE["SWR_STALE_TTL"],
+                    refresh=refresh,
+                    namespace=namespace,
+                )
+            elif single_flight:
+                result = get_or_compute(
+                    cache_key,
+                    compute,
+                    timeout,
+                    prefix=key_prefix,
+                    cacheable=_is_cacheable_result,
+                    namespace=namespace,
+                )
+            else:
+                # Try to get from cache
+                with measure_get(namespace) as hit:
+                    result = cache.get(cache_key)
+                    hit[0] = result is not None
+                if result is None:
+                    # Execute function and cache result
+                    result = compute()
+                    if _is_cacheable_result(result):
+                        with measure_set(namespace):
+                            cache.set(cache_key, result, timeout)
+
+            if isinstance(result, RenderedResponse):
+                return result.to_http_response()
+            return result
 
-            # Try to get from cache
-            cached_result = cache.get(cache_key)
-            if cached_result is not None:
-                return cached_result
+        return wrapper
+
+    return decorator
+
+
+def _legacy_cache_key(
+    prefix: str, kwargs: dict, vary_on_params: list[str] | None
+) -> str:
+    """Cache key for calls made without a request (e.g. from other code)."""
+    params = {
+        name: value
+        for name, value in kwargs.items()
+        if vary_on_params is None or name in vary_on_params
+    }
+    return f"{prefix}:{fingerprint(sorted((k, str(v)) for k, v in params.items()))}"
+
+
+def _find_request(args: tuple, kwargs: dict) -> HttpRequest | None:
+    request = kwargs.get("request")
+    if isinstance(request, HttpRequest):
+        return request
+    return next((arg for arg in args if isinstance(arg, HttpRequest)), None)
+
+
+def _render_result(
+    schema: EndpointSchema | None, request: HttpRequest | None, result: Any
+) -> Any:
+    """Render ``result`` to JSON bytes, or return it unchanged if impossible."""
+    if schema is None or request is None or isinstance(result, HttpResponseBase):
+        return result
+    try:
+        return schema.render(request, result)
+    except Exception:
+        # Leave it to ninja, which reports the validation error as usual
+        logger.warning("Could not render response for caching", exc_info=True)
+        return result
+
+
+def _is_cacheable_result(result: Any) -> bool:
+    if isinstance(result, RenderedResponse):
+        return HTTP_OK <= result.status < HTTP_MULTIPLE_CHOICES
+    return result is not None and not isinstance(result, HttpResponseBase)
+
+
+def _endpoint_name(func: Callable) -> str:
+    return f"{func.__module__}:{func.__qualname__}"
+
+
+def _jsonable(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
 
-            # Execute function and cache result
-            result = func(*args, **kwargs)
-            cache.set(cache_key, result, timeout)
 
+def _describe_call(args: tuple, kwargs: dict) -> dict | None:
+    """JSON-serializable description of an endpoint call, or None if unsupported.
+
+    Only the (controller, request, **path_params) shape used by controllers
+    can be replayed from a Celery task.
+    """
+    if not args:
+        return None
+
+    controller, *positional = args
+    call_kwargs = dict(kwargs)
+    request_in_kwargs = "request" in call_kwargs
+    if request_in_kwargs and not positional:
+        request = call_kwargs.pop("request")
+    elif not request_in_kwargs and len(positional) == 1:
+        request = positional[0]
+    else:
+        return None
+
+    if not isinstance(request, HttpRequest):
+        return None
+
+    user = getattr(request, "user", None)
+    return {
+        "controller": _endpoint_name(type(controller)) if controller else None,
+        "request_in_kwargs": request_in_kwargs,
+        "path": request.get_full_path(),
+        "user_id": _jsonable(user.pk) if user and user.is_authenticated else None,
+        "kwargs": {key: _jsonable(value) for key, value in call_kwargs.items()},
+    }
+
+
+def _background_refresh(
+    endpoint: str, cache_key: str, args: tuple, kwargs: dict
+) -> Callable[[str], None] | None:
+    """Build the callback that queues a refresh of ``cache_key``."""
+    call = _describe_call(args, kwargs)
+    if call is None:
+        return None
+
+    def refresh(lock_token: str) -> None:
+        from core.tasks import refresh_cached_response
+
+        refresh_cached_response.delay(endpoint, cache_key, call, lock_token)
+
+    return refresh
+
+
+def refresh_cached_response(
+    endpoint: str, cache_key: str, call: dict, lock_token: str | None = None
+) -> bool:
+    """Recompute a stale_while_revalidate entry outside the request cycle.
+
+    Replays the call described by ``_describe_call`` against a synthetic GET
+    request and stores the result under ``cache_key``.
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.models import AnonymousUser
+    from django.test import RequestFactory
+
+    try:
+        module_name, _ = endpoint.split(":", 1)
+        # Importing the controller module registers its endpoints
+        importlib.import_module(module_name)
+        if endpoint not in _refreshable_endpoints:
+            logger.warning("Unknown stale_while_revalidate endpoint %s", endpoint)
+            return False
+        func, timeout = _refreshable_endpoints[endpoint]
+
+        request = RequestFactory().get(call["path"])
+        user = None
+        if call["user_id"] is not None:
+            user = get_user_model().objects.filter(pk=call["user_id"]).first()
+        request.user = user or AnonymousUser()
+
+        controller = None
+        if call["controller"]:
+            module_name, class_name = call["controller"].split(":", 1)
+            controller_class = getattr(
+                importlib.import_module(module_name), class_name, None
+            )
+            try:
+                controller = controller_class() if controller_class else None
+            except Exception:
+                controller = None
+
+        args: list = [controller]
+        kwargs = dict(call["kwargs"])
+        if call["request_in_kwargs"]:
+            kwargs["request"] = request
+        else:
+            args.append(request)
+
+        started = time.time()
+        schema = get_endpoint_schema(controller, func)
+        result = _render_result(schema, request, func(*args, **kwargs))
+        if not _is_cacheable_result(result):
+            return False
+        store(
+            cache_key,
+            result,
+            timeout,
+            delta=time.time() - started,
+            stale_ttl=CACHE_STAMPEDE["SWR_STALE_TTL"],
+        )
+        return True
+    finally:
+        if lock_token:
+            release_lock(cache_key, lock_token)
+
+
+def conditional_get(
+    *dependencies: type[models.Model],
+    index_versions: list[Callable[[], str]] | None = None,
+) -> Callable:
+    """HTTP conditional GET support (ETag / Last-Modified / 304).
+
+    Validators come from the cache versions and ``updated_at`` maxima of
+    ``dependencies`` (see core.cache.conditional), so a matching
+    ``If-None-Match`` returns 304 without running the query or the serializer.
+
+    Args:
+        *dependencies: Models whose changes affect the response
+        index_versions: Return the versions of in-process state the response
+            is built from (see ``cached_response``)
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            request = _find_request(args, kwargs)
+            if request is None or request.method not in ("GET", "HEAD"):
+                return func(*args, **kwargs)
+
+            validators = ConditionalValidators.for_request(
+                request,
+                list(dependencies),
+                [version() for version in index_versions or []],
+            )
+            if validators.not_modified(request):
+                return HttpResponseNotModified(headers=validators.headers())
+
+            result = func(*args, **kwargs)
+            if isinstance(result, HttpResponseBase):
+                response = result
+            else:
+                # ninja copies headers of the controller's temporal response
+                context = getattr(args[0], "context", None) if args else None
+                response = getattr(context, "response", None)
+
+            status = getattr(response, "status_code", HTTP_OK)
+            if response is not None and status == HTTP_OK:
+                for name, value in validators.headers().items():
+                    response[name] = value
             return result
 
         return wrapper
@@ -366,13 +655,20 @@ def cached_response(
 
 
 def paginate_response(
-    page_size: int = DEFAULT_PAGE_SIZE, max_page_size: int = MAX_PAGE_SIZE
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_page_size: int = MAX_PAGE_SIZE,
+    count_strategy: str = COUNT_EXACT,
+    cursor_ordering: tuple[str, ...] | None = None,
 ) -> Callable:
     """Pagination decorator for list endpoints.
 
     Args:
         page_size: Default page size
         max_page_size: Maximum allowed page size
+        count_strategy: How the total is counted: exact, cached or estimated
+            (see api.pagination.CountingPaginator)
+        cursor_ordering: Keyset ordering used instead of page numbers when
+            the request has a ``cursor`` parameter (None = page numbers only)
     """
 
     def decorator(func: Callable) -> Callable:
@@ -402,7 +698,17 @@ def paginate_response(
                         )
                         actual_page_size = min(requested_page_size, max_page_size)
 
-                        paginated_data = paginate_queryset(data, page, actual_page_size)
+                        if cursor_ordering and "cursor" in request.GET:
+                            return status_code, cursor_paginate_queryset(
+                                data,
+                                request.GET["cursor"] or None,
+                                actual_page_size,
+                                cursor_ordering,
+                            )
+
+                        paginated_data = paginate_queryset(
+                            data, page, actual_page_size, count_strategy
+                        )
                         return status_code, paginated_data
 
             return result
@@ -520,8 +826,14 @@ def api_endpoint(
     require_auth: bool = True,
     require_admin: bool = False,
     cache_timeout: int | None = None,
+    cache_params: list[str] | None = None,
+    stale_while_revalidate: bool = False,
+    etag_models: list[type[models.Model]] | None = None,
+    index_versions: list[Callable[[], str]] | None = None,
     log_calls: bool = True,
     enable_pagination: bool = False,
+    count_strategy: str = COUNT_EXACT,
+    cursor_ordering: tuple[str, ...] | None = None,
     **optimization_params,
 ) -> Callable:
     """Composed decorator for common API endpoint patterns.
@@ -530,8 +842,19 @@ def api_endpoint(
         require_auth: Whether to require authentication
         require_admin: Whether to require admin permissions
         cache_timeout: Cache timeout (None = no caching)
+        cache_params: Query parameters that vary the cached response
+            (None = all of them)
+        stale_while_revalidate: Serve expired cache entries immediately and
+            refresh them in the background
+        etag_models: Models whose changes affect the response; enables
+            ETag / Last-Modified / 304 handling
+        index_versions: Return the versions of in-process state (local
+            indexes) the response is built from; vary the cache key and ETag
         log_calls: Whether to log API calls
         enable_pagination: Whether to apply pagination
+        count_strategy: How paginated totals are counted (exact, cached,
+            estimated)
+        cursor_ordering: Keyset ordering for ``?cursor=`` pagination
         **optimization_params: Database optimization parameters
     """
 
@@ -543,10 +866,23 @@ def api_endpoint(
             decorated_func = optimize_queryset(**optimization_params)(decorated_func)
 
         if enable_pagination:
-            decorated_func = paginate_response()(decorated_func)
+            decorated_func = paginate_response(
+                count_strategy=count_strategy, cursor_ordering=cursor_ordering
+            )(decorated_func)
 
         if cache_timeout:
-            decorated_func = cached_response(timeout=cache_timeout)(decorated_func)
+            decorated_func = cached_response(
+                timeout=cache_timeout,
+                cache_params=cache_params,
+                stale_while_revalidate=stale_while_revalidate,
+                dependencies=etag_models,
+                index_versions=index_versions,
+            )(decorated_func)
+
+        if etag_models:
+            decorated_func = conditional_get(
+                *etag_models, index_versions=index_versions
+            )(decorated_func)
 
         if require_admin:
             decorated_func = require_permissions(IsAdminUser)(decorated_func)
@@ -0,0 +1,247 @@
+"""Streaming NDJSON / CSV exports of large querysets.
+
+Exports are filtered with the same search schemas and ``AdvancedSearchEngine``
+as the search endpoints (``OrderSearchFilter``, ``ProductSearchFilter``,
+``CustomerSearchFilter``), except that ``limit`` and ``offset`` are ignored:
+an export always covers every matching row.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)``, which uses a
+server-side cursor on PostgreSQL and never instantiates models, and are
+encoded one at a time into a ``StreamingHttpResponse`` (or a file, see the
+``export_data`` management command). Memory use therefore stays constant
+however many rows are exported.
+"""
+
+import csv
+import logging
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import orjson
+from django.apps import apps
+from django.core.exceptions import FieldError
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .config.constants import EXPORT_CHUNK_SIZE
+from .exceptions import ValidationError
+from .search_filters import (
+    AdvancedSearchEngine,
+    BaseSearchFilter,
+    CustomerSearchFilter,
+    OrderSearchFilter,
+    ProductSearchFilter,
+    get_customer_search_engine,
+    get_order_search_engine,
+    get_product_search_engine,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+CONTENT_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv",
+}
+
+
+class Echo:
+    """File-like object returning what is written, for ``csv.writer``."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+class ModelExport:
+    """Columns and filters of one exportable model.
+
+    Usage:
+        export = EXPORTS["orders"]
+        rows = export.rows(OrderSearchFilter(status="pending"))
+    """
+
+    def __init__(
+        self,
+        model_label: str,
+        filter_class: type[BaseSearchFilter],
+        search_engine: Callable[[], AdvancedSearchEngine],
+        columns: dict[str, str],
+    ):
+        """Initialize export.
+
+        Args:
+            model_label: Model to export, e.g. "orders.Order"
+            filter_class: Search schema the export accepts as filters
+            search_engine: Factory of the search engine applying the filters
+            columns: Column name -> field lookup (may span relations)
+        """
+        self.model_label = model_label
+        self.filter_class = filter_class
+        self.search_engine = search_engine
+        self.columns = columns
+
+    def get_queryset(self, filters: BaseSearchFilter | None = None) -> QuerySet:
+        """Filtered rows as tuples of the column values, ordered by pk.
+
+        Raises:
+            ValidationError: If a filter refers to an unknown field
+        """
+        model = apps.get_model(self.model_label)
+        queryset = model.objects.all()
+        if filters is not None:
+            try:
+                queryset = self.search_engine().apply_search(queryset, filters)
+            except FieldError as e:
+                raise ValidationError(
+                    "Unsupported export filter", details={"filters": str(e)}
+                ) from e
+        if not queryset.query.order_by:
+            queryset = queryset.order_by("pk")
+        return queryset.values_list(*self.columns.values())
+
+    def rows(
+        self,
+        filters: BaseSearchFilter | None = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> Iterator[tuple]:
+        """Iterate over the filtered rows, ``chunk_size`` rows per fetch."""
+        return self.get_queryset(filters).iterator(chunk_size=chunk_size)
+
+
+EXPORTS: dict[str, ModelExport] = {
+    "orders": ModelExport(
+        "orders.Order",
+        OrderSearchFilter,
+        get_order_search_engine,
+        {
+            "id": "id",
+            "order_number": "order_number",
+            "status": "status",
+            "payment_status": "payment_status",
+            "customer_id": "customer_id",
+            "email": "email",
+            "currency": "currency",
+            "subtotal": "subtotal",
+            "shipping_amount": "shipping_amount",
+            "discount_amount": "discount_amount",
+            "tax_amount": "tax_amount",
+            "total": "total",
+            "shipping_country": "shipping_address__country",
+            "created_at": "created_at",
+        },
+    ),
+    "products": ModelExport(
+        "products.Product",
+        ProductSearchFilter,
+        get_product_search_engine,
+        {
+            "id": "id",
+            "name": "name",
+            "slug": "slug",
+            "category": "category__slug",
+            "type": "type",
+            "status": "status",
+            "is_active": "is_active",
+            "featured": "featured",
+            "price": "price",
+            "compare_at_price": "compare_at_price",
+            "quantity": "quantity",
+            "created_at": "created_at",
+            "updated_at": "updated_at",
+        },
+    ),
+    "customers": ModelExport(
+        "core.Customer",
+        CustomerSearchFilter,
+        get_customer_search_engine,
+        {
+            "id": "id",
+            "username": "user__username",
+            "email": "user__email",
+            "first_name": "user__first_name",
+            "last_name": "user__last_name",
+            "phone": "phone",
+            "is_active": "is_active",
+            "created_at": "created_at",
+        },
+    ),
+}
+
+
+def _json_default(value: Any) -> str:
+    # Decimals, lazy strings and anything else orjson does not encode natively
+    return str(value)
+
+
+def iter_ndjson(columns: list[str], rows: Iterator[tuple]) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON objects."""
+    for row in rows:
+        yield orjson.dumps(
+            dict(zip(columns, row, strict=True)),
+            default=_json_default,
+            option=orjson.OPT_APPEND_NEWLINE,
+        )
+
+
+def iter_csv(columns: list[str], rows: Iterator[tuple]) -> Iterator[str]:
+    """Encode rows as CSV lines, starting with a header line."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_export(
+    name: str,
+    filters: BaseSearchFilter | None = None,
+    export_format: str = FORMAT_NDJSON,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes | str]:
+    """Encoded lines of an export.
+
+    The queryset is built (and filters validated) before the first line is
+    yielded, so errors surface before a response starts streaming.
+
+    Raises:
+        ValidationError: If the export, format or a filter is unknown
+    """
+    if name not in EXPORTS:
+        raise ValidationError(f"Unknown export: {name}")
+    if export_format not in CONTENT_TYPES:
+        raise ValidationError(f"Unsupported export format: {export_format}")
+
+    export = EXPORTS[name]
+    columns = list(export.columns)
+    rows = export.rows(filters, chunk_size)
+    if export_format == FORMAT_CSV:
+        return iter_csv(columns, rows)
+    return iter_ndjson(columns, rows)
+
+
+def streaming_export_response(
+    name: str,
+    filters: BaseSearchFilter | None = None,
+    export_format: str = FORMAT_NDJSON,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> StreamingHttpResponse:
+    """Stream an export as an attachment.
+
+    Args:
+        name: Export name (a key of ``EXPORTS``)
+        filters: Search filters of the export's filter schema
+        export_format: "ndjson" or "csv"
+        chunk_size: Rows fetched from the database at a time
+
+    Returns:
+        StreamingHttpResponse emitting one row per line
+    """
+    lines = iter_export(name, filters, export_format, chunk_size)
+    timestamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+    response = StreamingHttpResponse(lines, content_type=CONTENT_TYPES[export_format])
+    response["Content-Disposition"] = (
+        f'attachment; filename="{name}-{timestamp}.{export_format}"'
+    )
+    logger.info(f"Streaming {export_format} export of {name}")
+    return response
@@ -13,6 +13,10 @@ from django.core.cache import cache
 from django.db import connection
 from django.http import JsonResponse
 
+from core.cache.metrics import get_cache_metrics
+from core.cache.stampede import get_stampede_stats
+from core.cache.warmup import get_warmup_status, is_warm
+
 from .config.constants import HEALTH_CHECK_SERVICES
 
 
@@ -201,13 +205,28 @@ def readiness_check(request):
             all_ready = False
             break
 
-    if all_ready:
+    if not all_ready:
+        return JsonResponse(
+            {
+                "status": "not_ready",
+                "message": "Service is not ready to receive traffic",
+            },
+            status=503,
+        )
+
+    # Keep cold workers out of rotation until the cache warmup is done
+    if not is_warm():
         return JsonResponse(
-            {"status": "ready", "message": "Service is ready to receive traffic"}
+            {
+                "status": "not_ready",
+                "message": "Cache warmup in progress",
+                "warmup": get_warmup_status(),
+            },
+            status=503,
         )
+
     return JsonResponse(
-        {"status": "not_ready", "message": "Service is not ready to receive traffic"},
-        status=503,
+        {"status": "ready", "message": "Service is ready to receive traffic"}
     )
 
 
@@ -267,6 +286,11 @@ def monitoring_info(request):
             "health": checker.check_all(),
             "system": get_system_info(),
             "database": get_database_info(),
+            "cache": {
+                "stampede": get_stampede_stats(),
+                "namespaces": get_cache_metrics(),
+                "warmup": get_warmup_status(),
+            },
             "settings": {
                 "debug": settings.DEBUG,
                 "allowed_hosts": settings.ALLOWED_HOSTS,
@@ -1,14 +1,50 @@
 """Advanced pagination utilities for Django Ninja APIs."""
 
+import json
+import logging
 from typing import Any, Generic, TypeVar
 
+from django.core import signing
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.paginator import Paginator
-from django.db.models import QuerySet
+from django.db import connections
+from django.db.models import F, Lookup, Q, QuerySet
+from django.utils.functional import cached_property
 from ninja import Schema
+from ninja.pagination import PaginationBase
 from pydantic import Field
 
+from core.cache.fingerprint import fingerprint
+from core.cache.invalidation import list_tag
+from core.cache.versioning import VersionedCache
+
+from .config.constants import (
+    COUNT_CACHE_TIMEOUT,
+    COUNT_CACHED,
+    COUNT_ESTIMATED,
+    COUNT_EXACT,
+    COUNT_STRATEGIES,
+    ESTIMATED_COUNT_THRESHOLD,
+)
+from .exceptions import ValidationError
+
+try:
+    # Row-value comparisons live in a private Django module; without them
+    # cursors use the equivalent Q chain
+    from django.db.models.fields.tuple_lookups import (
+        Tuple,
+        TupleGreaterThan,
+        TupleLessThan,
+    )
+except ImportError:
+    Tuple = TupleGreaterThan = TupleLessThan = None
+
+logger = logging.getLogger(__name__)
+
 T = TypeVar("T")
 
+CURSOR_SIGNING_SALT = "api.pagination.cursor"
+
 
 class PaginationMeta(Schema):
     """Pagination metadata schema."""
@@ -23,6 +59,9 @@ class PaginationMeta(Schema):
     previous_page: int | None = Field(None, description="Previous page number")
     start_index: int = Field(..., description="Index of first item on current page")
     end_index: int = Field(..., description="Index of last item on current page")
+    total_is_approximate: bool = Field(
+        False, description="Whether total_items and total_pages are estimates"
+    )
 
 
 class PaginatedResponse(Schema, Generic[T]):
@@ -64,6 +103,87 @@ class CursorPaginatedResponse(Schema, Generic[T]):
     meta: CursorPaginationMeta = Field(..., description="Cursor pagination metadata")
 
 
+def planner_row_estimate(queryset: QuerySet) -> int | None:
+    """Row count the Postgres planner expects ``queryset`` to return.
+
+    For an unfiltered table this is ``pg_class.reltuples`` scaled to the
+    current table size; with filters and joins it is the planner's
+    selectivity estimate. Returns None on other databases.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    queryset = queryset.order_by().select_related(None)
+    sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CountingPaginator(Paginator):
+    """Paginator whose total count comes from a configurable strategy.
+
+    - ``exact``: ``COUNT(*)``, as Django's paginator does;
+    - ``cached``: the exact count memoized per query fingerprint for
+      ``COUNT_CACHE_TIMEOUT`` seconds, under the model's list tag so writes
+      to the model invalidate it;
+    - ``estimated``: the Postgres planner row estimate, falling back to an
+      exact count below ``ESTIMATED_COUNT_THRESHOLD`` rows or on other
+      databases. ``count_is_approximate`` tells whether it was used.
+    Usage:
+        paginator = CountingPaginator(orders, 20, count_strategy="estimated")
+        page = paginator.get_page(3)
+        paginator.count_is_approximate
+    """
+
+    def __init__(self, *args, count_strategy: str = COUNT_EXACT, **kwargs):
+        if count_strategy not in COUNT_STRATEGIES:
+            raise ValueError(f"Unknown count strategy: {count_strategy}")
+        super().__init__(*args, **kwargs)
+        self.count_strategy = count_strategy
+        self.count_is_approximate = False
+
+    @cached_property
+    def count(self) -> int:
+        """Total number of objects, according to the count strategy."""
+        if isinstance(self.object_list, QuerySet):
+            if self.count_strategy == COUNT_CACHED:
+                return self._cached_count()
+            if self.count_strategy == COUNT_ESTIMATED:
+                return self._estimated_count()
+        return self._exact_count()
+
+    def _exact_count(self) -> int:
+        return Paginator.count.func(self)
+
+    def _cached_count(self) -> int:
+        queryset = self.object_list
+        sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+        versioned_cache = VersionedCache(list_tag(queryset.model))
+        key = f"count:{fingerprint(queryset.db, sql, [str(p) for p in params])}"
+
+        count = versioned_cache.get(key)
+        if count is None:
+            count = self._exact_count()
+            versioned_cache.set(key, count, COUNT_CACHE_TIMEOUT)
+        return count
+
+    def _estimated_count(self) -> int:
+        try:
+            estimate = planner_row_estimate(self.object_list)
+        except Exception as e:
+            logger.warning(f"Planner row estimate failed, counting exactly: {e}")
+            estimate = None
+        if estimate is None or estimate < ESTIMATED_COUNT_THRESHOLD:
+            return self._exact_count()
+        self.count_is_approximate = True
+        return estimate
+
+
 class AdvancedPaginator:
     """Advanced paginator with enhanced functionality."""
 
@@ -73,6 +193,7 @@ class AdvancedPaginator:
         per_page: int = 20,
         max_per_page: int = 100,
         orphans: int = 0,
+        count_strategy: str = COUNT_EXACT,
     ):
         """Initialize paginator.
 
@@ -81,19 +202,25 @@ class AdvancedPaginator:
             per_page: Items per page
             max_per_page: Maximum allowed items per page
             orphans: Minimum items on last page (merge with previous if less)
+            count_strategy: How the total is counted: exact, cached or
+                estimated (see CountingPaginator)
         """
         self.queryset = queryset
         self.per_page = min(per_page, max_per_page)
         self.max_per_page = max_per_page
         self.orphans = orphans
+        self.count_strategy = count_strategy
         self._paginator = None
 
     @property
-    def paginator(self) -> Paginator:
+    def paginator(self) -> CountingPaginator:
         """Get Django paginator instance."""
         if self._paginator is None:
-            self._paginator = Paginator(
-                self.queryset, self.per_page, orphans=self.orphans
+            self._paginator = CountingPaginator(
+                self.queryset,
+                self.per_page,
+                orphans=self.orphans,
+                count_strategy=self.count_strategy,
             )
         return self._paginator
 
@@ -119,6 +246,7 @@ class AdvancedPaginator:
             previous_page=page.previous_page_number() if page.has_previous() else None,
             start_index=page.start_index(),
             end_index=page.end_index(),
+            total_is_approximate=self.paginator.count_is_approximate,
         )
 
         return {"items": list(page.object_list), "meta": meta}
@@ -141,7 +269,25 @@ class AdvancedPaginator:
 
 
 class CursorPaginator:
-    """Cursor-based paginator for high-performance pagination."""
+    """Keyset (cursor) paginator for high-performance pagination.
+
+    Pages are selected with a ``WHERE`` on the ordering columns instead of an
+    ``OFFSET``, so every page costs the same however deep it is. The
+    ordering may have several columns in either direction, e.g.
+    ``("-created_at", "-id")``; the primary key is appended when missing so
+    rows with equal sort keys are neither skipped nor repeated. When all
+    columns sort the same way the filter is a single row-value comparison
+    (``(created_at, id) < (%s, %s)``) that can walk a composite index.
+    Ordering columns must be non-null.
+
+    Cursors are compact, HMAC-signed tokens (``django.core.signing``) holding
+    the sort key of the row they point at, so clients cannot forge or edit
+    them.
+    Usage:
+        paginator = CursorPaginator(orders, ordering=("-created_at", "-id"))
+        page = paginator.get_page(request.GET.get("cursor"))
+        page["meta"].next_cursor
+    """
 
     def __init__(
         self,
@@ -149,6 +295,7 @@ class CursorPaginator:
         ordering_field: str = "id",
         limit: int = 20,
         max_limit: int = 100,
+        ordering: tuple[str, ...] | list[str] | None = None,
     ):
         """Initialize cursor paginator.
 
@@ -157,12 +304,55 @@ class CursorPaginator:
             ordering_field: Field to use for cursor ordering
             limit: Items per page
             max_limit: Maximum allowed items per page
+            ordering: Fields to order by, ``-`` prefixed for descending;
+                overrides ordering_field
         """
         self.queryset = queryset
         self.ordering_field = ordering_field
+        self.ordering = self._with_tiebreaker(tuple(ordering or (ordering_field,)))
         self.limit = min(limit, max_limit)
         self.max_limit = max_limit
 
+    def _with_tiebreaker(self, ordering: tuple[str, ...]) -> tuple[str, ...]:
+        pk_names = {"pk", self.queryset.model._meta.pk.name}
+        if ordering[-1].lstrip("-") in pk_names:
+            return ordering
+        descending = ordering[-1].startswith("-")
+        return (*ordering, "-pk" if descending else "pk")
+
+    @staticmethod
+    def _reverse_ordering(ordering: tuple[str, ...]) -> tuple[str, ...]:
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}" for field in ordering
+        )
+
+    def _field(self, name: str):
+        if name == "pk":
+            return self.queryset.model._meta.pk
+        return self.queryset.model._meta.get_field(name)
+
+    def _position(self, item: Any) -> list[Any]:
+        return [getattr(item, field.lstrip("-")) for field in self.ordering]
+
+    def _after(self, ordering: tuple[str, ...], position: list[Any]) -> Q | Lookup:
+        """Filter selecting the rows after ``position`` in ``ordering``."""
+        names = [field.lstrip("-") for field in ordering]
+        descending = [field.startswith("-") for field in ordering]
+
+        if len(set(descending)) == 1 and Tuple is not None:
+            lookup = TupleLessThan if descending[0] else TupleGreaterThan
+            return lookup(Tuple(*(F(name) for name in names)), position)
+
+        # Mixed directions (or no row values): (a > x) OR (a = x AND b < y) OR ...
+        condition = Q()
+        for index, name in enumerate(names):
+            operator = "lt" if descending[index] else "gt"
+            step = Q(**{f"{name}__{operator}": position[index]})
+            for previous in range(index):
+                step &= Q(**{names[previous]: position[previous]})
+            condition |= step
+        return condition
+
     def get_page(
         self, cursor: str | None = None, reverse: bool = False
     ) -> dict[str, Any]:
@@ -174,28 +364,21 @@ class CursorPaginator:
 
         Returns:
             Dictionary with items and cursor pagination metadata
-        """
-        queryset = self.queryset
 
-        # Apply cursor filtering
+        Raises:
+            ValidationError: If the cursor is invalid or was issued for
+                another ordering
+        """
+        ordering = self._reverse_ordering(self.ordering) if reverse else self.ordering
+        position, backwards = None, False
         if cursor:
-            try:
-                cursor_value = self._decode_cursor(cursor)
-                if reverse:
-                    queryset = queryset.filter(
-                        **{f"{self.ordering_field}__lt": cursor_value}
-                    )
-                else:
-                    queryset = queryset.filter(
-                        **{f"{self.ordering_field}__gt": cursor_value}
-                    )
-            except (ValueError, TypeError):
-                # Invalid cursor, ignore
-                pass
+            position, backwards = self._decode_cursor(cursor, ordering)
 
-        # Apply ordering
-        order_by = f"-{self.ordering_field}" if reverse else self.ordering_field
-        queryset = queryset.order_by(order_by)
+        # Walking backwards reads the rows before the cursor in reverse order
+        query_ordering = self._reverse_ordering(ordering) if backwards else ordering
+        queryset = self.queryset.order_by(*query_ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(query_ordering, position))
 
         # Get one extra item to check if there are more
         items = list(queryset[: self.limit + 1])
@@ -203,24 +386,27 @@ class CursorPaginator:
         has_more = len(items) > self.limit
         if has_more:
             items = items[: self.limit]
+        if backwards:
+            items.reverse()
+
+        has_next = position is not None if backwards else has_more
+        has_previous = has_more if backwards else position is not None
 
         # Generate cursors
         next_cursor = None
         previous_cursor = None
 
         if items:
-            if not reverse and has_more:
-                next_cursor = self._encode_cursor(
-                    getattr(items[-1], self.ordering_field)
-                )
-            if reverse or cursor:
+            if has_next:
+                next_cursor = self._encode_cursor(items[-1], ordering)
+            if has_previous:
                 previous_cursor = self._encode_cursor(
-                    getattr(items[0], self.ordering_field)
+                    items[0], ordering, backwards=True
                 )
 
         meta = CursorPaginationMeta(
-            has_next=has_more if not reverse else bool(cursor),
-            has_previous=bool(cursor) if not reverse else has_more,
+            has_next=has_next,
+            has_previous=has_previous,
             next_cursor=next_cursor,
             previous_cursor=previous_cursor,
             count=len(items),
@@ -228,31 +414,104 @@ class CursorPaginator:
 
         return {"items": items, "meta": meta}
 
-    def _encode_cursor(self, value: Any) -> str:
-        """Encode cursor value to string."""
-        import base64
-        import json
-
-        cursor_data = {"value": str(value), "field": self.ordering_field}
-        cursor_json = json.dumps(cursor_data)
-        return base64.b64encode(cursor_json.encode()).decode()
-
-    def _decode_cursor(self, cursor: str) -> Any:
-        """Decode cursor string to value."""
-        import base64
-        import json
+    def _encode_cursor(
+        self, item: Any, ordering: tuple[str, ...], backwards: bool = False
+    ) -> str:
+        """Encode the position of ``item`` to a signed cursor."""
+        position = [
+            value if isinstance(value, int | str) else str(value)
+            for value in self._position(item)
+        ]
+        cursor_data = {"p": position, "o": ",".join(ordering)}
+        if backwards:
+            cursor_data["b"] = 1
+        return signing.dumps(cursor_data, salt=CURSOR_SIGNING_SALT, compress=True)
+
+    def _decode_cursor(
+        self, cursor: str, ordering: tuple[str, ...]
+    ) -> tuple[list[Any], bool]:
+        """Decode a signed cursor to a position and a direction."""
+        try:
+            cursor_data = signing.loads(cursor, salt=CURSOR_SIGNING_SALT)
+            if cursor_data["o"] != ",".join(ordering):
+                raise ValueError("Cursor was issued for another ordering")
+            # Convert back to appropriate types
+            position = [
+                self._field(field.lstrip("-")).to_python(value)
+                for field, value in zip(ordering, cursor_data["p"], strict=True)
+            ]
+        except (
+            signing.BadSignature,
+            DjangoValidationError,
+            KeyError,
+            TypeError,
+            ValueError,
+        ) as e:
+            raise ValidationError(
+                "Invalid cursor", details={"cursor": str(e) or "Bad signature"}
+            ) from e
+        return position, bool(cursor_data.get("b"))
+
+
+class KeysetPagination(PaginationBase):
+    """django-ninja pagination switching to keyset cursors on ``?cursor=``.
+
+    Without a ``cursor`` query parameter it pages with ``limit``/``offset``
+    like ninja's default pagination; with one (an empty value starts at the
+    first page) it uses ``CursorPaginator`` and returns the next and previous
+    cursors instead of a total count.
+    Usage:
+        @paginate(KeysetPagination, ordering=("-created_at", "-id"))
+        def list_history(self, request, product_id: UUID):
+            ...
+    """
 
-        cursor_json = base64.b64decode(cursor.encode()).decode()
-        cursor_data = json.loads(cursor_json)
+    class Input(Schema):
+        limit: int = Field(20, description="Maximum items to return", ge=1, le=100)
+        offset: int = Field(0, description="Items to skip (without cursor)", ge=0)
+        cursor: str | None = Field(None, description="Cursor for pagination")
+
+    class Output(Schema):
+        items: list[Any]
+        count: int | None = Field(None, description="Total items (without cursor)")
+        next_cursor: str | None = Field(None, description="Cursor for next page")
+        previous_cursor: str | None = Field(
+            None, description="Cursor for previous page"
+        )
 
-        # Convert back to appropriate type
-        field = self.queryset.model._meta.get_field(cursor_data["field"])
-        value = cursor_data["value"]
+    def __init__(
+        self,
+        ordering: tuple[str, ...] = ("-created_at", "-id"),
+        max_limit: int = 100,
+        **kwargs,
+    ):
+        self.ordering = ordering
+        self.max_limit = max_limit
+        super().__init__(**kwargs)
 
-        # Handle different field types
-        if hasattr(field, "to_python"):
-            return field.to_python(value)
-        return value
+    def paginate_queryset(
+        self, queryset: QuerySet, pagination: Input, request, **params
+    ) -> dict[str, Any]:
+        # Views in this project return (status, queryset) tuples
+        if isinstance(queryset, tuple):
+            _, queryset = queryset
+        limit = min(pagination.limit, self.max_limit)
+
+        if pagination.cursor is None:
+            offset = pagination.offset
+            return {
+                "items": queryset[offset : offset + limit],
+                "count": self._items_count(queryset),
+            }
+
+        page = CursorPaginator(
+            queryset, limit=limit, max_limit=self.max_limit, ordering=self.ordering
+        ).get_page(pagination.cursor)
+        return {
+            "items": page["items"],
+            "next_cursor": page["meta"].next_cursor,
+            "previous_cursor": page["meta"].previous_cursor,
+        }
 
 
 def paginate_queryset(
@@ -261,6 +520,7 @@ def paginate_queryset(
     per_page: int = 20,
     max_per_page: int = 100,
     applied_filters: dict[str, Any] | None = None,
+    count_strategy: str = COUNT_EXACT,
 ) -> dict[str, Any]:
     """Convenience function to paginate a queryset.
 
@@ -270,11 +530,14 @@ def paginate_queryset(
         per_page: Items per page
         max_per_page: Maximum items per page
         applied_filters: Applied filter information
+        count_strategy: How the total is counted (exact, cached, estimated)
 
     Returns:
         Paginated response dictionary
     """
-    paginator = AdvancedPaginator(queryset, per_page, max_per_page)
+    paginator = AdvancedPaginator(
+        queryset, per_page, max_per_page, count_strategy=count_strategy
+    )
     return paginator.get_page_with_filters(page, applied_filters)
 
 
@@ -285,6 +548,7 @@ def cursor_paginate_queryset(
     ordering_field: str = "id",
     max_limit: int = 100,
     reverse: bool = False,
+    ordering: tuple[str, ...] | None = None,
 ) -> dict[str, Any]:
     """Convenience function for cursor-based pagination.
 
@@ -295,11 +559,14 @@ def cursor_paginate_queryset(
         ordering_field: Field to order by
         max_limit: Maximum items per page
         reverse: Reverse pagination direction
+        ordering: Fields to order by (overrides ordering_field)
 
     Returns:
         Cursor-paginated response dictionary
     """
-    paginator = CursorPaginator(queryset, ordering_field, limit, max_limit)
+    paginator = CursorPaginator(
+        queryset, ordering_field, limit, max_limit, ordering=ordering
+    )
     return paginator.get_page(cursor, reverse)
 
 
@@ -348,7 +615,10 @@ def paginated_response(
 
 
 def cursor_paginated_response(
-    limit: int = 20, max_limit: int = 100, ordering_field: str = "id"
+    limit: int = 20,
+    max_limit: int = 100,
+    ordering_field: str = "id",
+    ordering: tuple[str, ...] | None = None,
 ):
     """Decorator for cursor-based pagination."""
 
@@ -376,13 +646,25 @@ def cursor_paginated_response(
             # Apply cursor pagination if result is a QuerySet
             if isinstance(result, QuerySet):
                 return cursor_paginate_queryset(
-                    result, cursor, actual_limit, ordering_field, max_limit, reverse
+                    result,
+                    cursor,
+                    actual_limit,
+                    ordering_field,
+                    max_limit,
+                    reverse,
+                    ordering,
                 )
             if isinstance(result, tuple) and len(result) == 2:
                 status_code, data = result
                 if isinstance(data, QuerySet):
                     paginated = cursor_paginate_queryset(
-                        data, cursor, actual_limit, ordering_field, max_limit, reverse
+                        data,
+                        cursor,
+                        actual_limit,
+                        ordering_field,
+                        max_limit,
+                        reverse,
+                        ordering,
                     )
                     return status_code, paginated
 
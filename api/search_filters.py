@@ -3,7 +3,15 @@
 from datetime import date, datetime
 from decimal import Decimal
 
-from django.db.models import Q, QuerySet
+from django.conf import settings
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import connections, router
+from django.db.models import F, Q, QuerySet
 from django.db.models.fields import (
     BooleanField,
     DateField,
@@ -11,10 +19,21 @@ from django.db.models.fields import (
     DecimalField,
     IntegerField,
 )
+from django.db.models.functions import Greatest, Upper
 from ninja import Schema
 from ninja_extra.schemas import FilterSchema
 from pydantic import Field
 
+SEARCH_MODE_CONTAINS = "contains"
+SEARCH_MODE_TRIGRAM = "trigram"
+
+LOOKUP_SEARCH = {
+    # "contains" (icontains) or "trigram" (icontains or pg_trgm word
+    # similarity, ranked by similarity) for SKU, order number and email lookups
+    "MODE": SEARCH_MODE_CONTAINS,
+    **getattr(settings, "LOOKUP_SEARCH", {}),
+}
+
 
 class BaseSearchFilter(FilterSchema):
     """Base search filter with common search functionality."""
@@ -121,17 +140,41 @@ class CustomerSearchFilter(BaseSearchFilter):
 
 
 class AdvancedSearchEngine:
-    """Advanced search engine with intelligent filtering and search capabilities."""
-
-    def __init__(self, model_class, search_fields: list[str] = None):
+    """Advanced search engine with intelligent filtering and search capabilities.
+
+    In trigram mode (PostgreSQL only), text lookups on ``trigram_fields`` also
+    match values whose pg_trgm word similarity to the term reaches
+    ``pg_trgm.word_similarity_threshold`` (0.6 by default), so partial terms
+    with typos still match, and the matches are ranked by that similarity
+    (the ``search_similarity`` annotation). Both the ``icontains`` and the
+    similarity conditions are answered by the ``gin_trgm_ops`` indexes on
+    ``UPPER(field)`` rather than by a sequential scan.
+    """
+
+    def __init__(
+        self,
+        model_class,
+        search_fields: list[str] = None,
+        search_mode: str = SEARCH_MODE_CONTAINS,
+        trigram_fields: list[str] | None = None,
+    ):
         """Initialize search engine for a model.
 
         Args:
             model_class: Django model class to search
             search_fields: List of fields to include in text search
+            search_mode: "contains" or "trigram"
+            trigram_fields: Text fields with a trigram index, matched fuzzily
+                in trigram mode
         """
         self.model_class = model_class
         self.search_fields = search_fields or []
+        self.trigram_fields = trigram_fields or []
+        self.use_trigram = (
+            search_mode == SEARCH_MODE_TRIGRAM
+            and bool(self.trigram_fields)
+            and connections[router.db_for_read(model_class)].vendor == "postgresql"
+        )
 
     def apply_search(self, queryset: QuerySet, filters: BaseSearchFilter) -> QuerySet:
         """Apply search and filtering to queryset."""
@@ -148,6 +191,36 @@ class AdvancedSearchEngine:
 
         return queryset
 
+    def is_trigram_field(self, field: str) -> bool:
+        """Whether lookups on ``field`` are fuzzy trigram matches."""
+        return self.use_trigram and field in self.trigram_fields
+
+    def text_match(self, field: str, value: str) -> Q:
+        """Condition matching ``value`` anywhere in a text field, or fuzzily."""
+        condition = Q(**{f"{field}__icontains": value})
+        if self.is_trigram_field(field):
+            condition |= Q(TrigramWordSimilar(Upper(field), value))
+        return condition
+
+    def rank_by_similarity(
+        self, queryset: QuerySet, value: str, fields: list[str]
+    ) -> QuerySet:
+        """Order by the best word similarity of ``value`` to ``fields``."""
+        similarities = [TrigramWordSimilarity(value, Upper(field)) for field in fields]
+        similarity = (
+            similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+        )
+        return queryset.annotate(search_similarity=similarity).order_by(
+            "-search_similarity", "pk"
+        )
+
+    def filter_text(self, queryset: QuerySet, field: str, value: str) -> QuerySet:
+        """Filter on a text field, closest matches first in trigram mode."""
+        queryset = queryset.filter(self.text_match(field, value))
+        if self.is_trigram_field(field):
+            queryset = self.rank_by_similarity(queryset, value, [field])
+        return queryset
+
     def _apply_text_search(self, queryset: QuerySet, search_term: str) -> QuerySet:
         """Apply intelligent text search across multiple fields."""
         if not search_term.strip():
@@ -165,7 +238,7 @@ class AdvancedSearchEngine:
             for field in self.search_fields:
                 # Handle related field searches (e.g., 'user__username')
                 if "__" in field:
-                    word_query |= Q(**{f"{field}__icontains": word})
+                    word_query |= self.text_match(field, word)
                 else:
                     # Try different search patterns
                     field_obj = self.model_class._meta.get_field(field.split("__")[0])
@@ -198,12 +271,16 @@ class AdvancedSearchEngine:
                             pass
                     else:
                         # Default text search with various patterns
-                        word_query |= Q(**{f"{field}__icontains": word})
+                        word_query |= self.text_match(field, word)
                         word_query |= Q(**{f"{field}__istartswith": word})
 
             search_query &= word_query
 
-        return queryset.filter(search_query)
+        queryset = queryset.filter(search_query)
+        ranked_fields = [f for f in self.search_fields if self.is_trigram_field(f)]
+        if ranked_fields:
+            queryset = self.rank_by_similarity(queryset, search_term, ranked_fields)
+        return queryset
 
     def _apply_specific_filters(
         self, queryset: QuerySet, filters: BaseSearchFilter
@@ -281,14 +358,33 @@ class AdvancedSearchEngine:
             queryset = queryset.filter(average_rating__gte=filters.rating_min)
 
         if filters.tags:
-            for tag in filters.tags:
-                queryset = queryset.filter(tags__name__icontains=tag)
+            queryset = self._filter_tags(queryset, filters.tags)
 
         if filters.sku:
-            queryset = queryset.filter(sku__icontains=filters.sku)
+            queryset = queryset.filter(
+                self.text_match("variants__sku", filters.sku)
+            ).distinct()
 
         return queryset
 
+    def _filter_tags(self, queryset: QuerySet, tags: list[str]) -> QuerySet:
+        """Products with a tag containing each term.
+
+        Resolved on the in-memory facet bitmaps when enabled and the match
+        is narrow enough to send as a list of ids; otherwise one tag join
+        per term.
+        """
+        from products.facets import FACET_TAG, PRODUCT_FACETS, get_facet_index
+
+        if PRODUCT_FACETS["ENABLED"]:
+            index = get_facet_index()
+            tagged = index.select_containing(FACET_TAG, tags)
+            if len(tagged) <= PRODUCT_FACETS["MAX_FILTER_IDS"]:
+                return queryset.filter(pk__in=index.product_ids(tagged))
+        for tag in tags:
+            queryset = queryset.filter(tags__name__icontains=tag)
+        return queryset
+
     def _apply_order_filters(
         self, queryset: QuerySet, filters: OrderSearchFilter
     ) -> QuerySet:
@@ -303,8 +399,8 @@ class AdvancedSearchEngine:
             queryset = queryset.filter(customer__id=filters.customer_id)
 
         if filters.customer_email:
-            queryset = queryset.filter(
-                customer__user__email__icontains=filters.customer_email
+            queryset = self.filter_text(
+                queryset, "customer__user__email", filters.customer_email
             )
 
         if filters.total_min is not None:
@@ -381,36 +477,121 @@ class AdvancedSearchEngine:
         return queryset
 
 
-def create_search_engine(model_class, search_fields: list[str]) -> AdvancedSearchEngine:
-    """Factory function to create a search engine for a model."""
-    return AdvancedSearchEngine(model_class, search_fields)
+class FullTextSearchEngine(AdvancedSearchEngine):
+    """Search engine matching a PostgreSQL ``tsvector`` column.
+
+    The search term is parsed as a web search (``"exact phrase"``, ``-word``,
+    ``or``) and matched against ``vector_field``, which a GIN index makes an
+    index scan instead of a sequential ``icontains`` scan, without joins or
+    duplicate rows. Results are ordered by ``SearchRank`` (exposed as the
+    ``search_rank`` annotation) unless an explicit ordering is requested.
+    """
+
+    def __init__(
+        self,
+        model_class,
+        vector_field: str = "search_vector",
+        config: str = "english",
+        search_mode: str = SEARCH_MODE_CONTAINS,
+        trigram_fields: list[str] | None = None,
+    ):
+        """Initialize full-text search engine for a model.
+
+        Args:
+            model_class: Django model class to search
+            vector_field: SearchVectorField holding the document vectors
+            config: PostgreSQL text search configuration of the vectors
+            search_mode: "contains" or "trigram", for the lookup filters
+            trigram_fields: Text fields with a trigram index
+        """
+        super().__init__(model_class, [vector_field], search_mode, trigram_fields)
+        self.vector_field = vector_field
+        self.config = config
+
+    def _apply_text_search(self, queryset: QuerySet, search_term: str) -> QuerySet:
+        """Filter on the search vector and rank the matches."""
+        if not search_term.strip():
+            return queryset
+
+        query = SearchQuery(search_term, search_type="websearch", config=self.config)
+        return (
+            queryset.filter(**{self.vector_field: query})
+            .annotate(search_rank=SearchRank(F(self.vector_field), query))
+            .order_by("-search_rank", "pk")
+        )
+
+
+def create_search_engine(
+    model_class,
+    search_fields: list[str],
+    search_mode: str | None = None,
+    trigram_fields: list[str] | None = None,
+) -> AdvancedSearchEngine:
+    """Factory function to create a search engine for a model.
+
+    ``search_mode`` defaults to LOOKUP_SEARCH["MODE"].
+    """
+    return AdvancedSearchEngine(
+        model_class,
+        search_fields,
+        search_mode or LOOKUP_SEARCH["MODE"],
+        trigram_fields,
+    )
 
 
 # Pre-configured search engines for common models
-def get_user_search_engine():
+def get_user_search_engine(search_mode: str | None = None):
     """Get search engine for User model."""
     search_fields = ["username", "email", "first_name", "last_name"]
     from core.models import User
 
-    return create_search_engine(User, search_fields)
+    return create_search_engine(User, search_fields, search_mode, ["email"])
+
+
+def get_product_search_engine(
+    full_text: bool | None = None, search_mode: str | None = None
+):
+    """Get search engine for Product model.
 
+    Args:
+        full_text: Use the full-text engine; defaults to whether
+            PRODUCT_SEARCH["BACKEND"] is "fulltext" and the database is
+            PostgreSQL
+        search_mode: Mode of the SKU lookups; defaults to LOOKUP_SEARCH["MODE"]
+    """
+    from products.models import Product
+    from products.search import (
+        PRODUCT_SEARCH,
+        SEARCH_BACKEND_FULL_TEXT,
+        is_full_text_available,
+    )
+
+    if full_text is None:
+        full_text = (
+            PRODUCT_SEARCH["BACKEND"] == SEARCH_BACKEND_FULL_TEXT
+            and is_full_text_available()
+        )
+    trigram_fields = ["variants__sku"]
+    if full_text:
+        return FullTextSearchEngine(
+            Product,
+            config=PRODUCT_SEARCH["CONFIG"],
+            search_mode=search_mode or LOOKUP_SEARCH["MODE"],
+            trigram_fields=trigram_fields,
+        )
 
-def get_product_search_engine():
-    """Get search engine for Product model."""
     search_fields = [
         "name",
         "description",
-        "sku",
+        "variants__sku",
         "brand__name",
         "category__name",
         "tags__name",
     ]
-    from products.models import Product
+    return create_search_engine(Product, search_fields, search_mode, trigram_fields)
 
-    return create_search_engine(Product, search_fields)
 
-
-def get_order_search_engine():
+def get_order_search_engine(search_mode: str | None = None):
     """Get search engine for Order model."""
     search_fields = [
         "order_number",
@@ -422,10 +603,15 @@ def get_order_search_engine():
     ]
     from orders.models import Order
 
-    return create_search_engine(Order, search_fields)
+    return create_search_engine(
+        Order,
+        search_fields,
+        search_mode,
+        ["order_number", "email", "customer__user__email"],
+    )
 
 
-def get_customer_search_engine():
+def get_customer_search_engine(search_mode: str | None = None):
     """Get search engine for Customer model."""
     search_fields = [
         "user__username",
@@ -438,4 +624,4 @@ def get_customer_search_engine():
     ]
     from core.models import Customer
 
-    return create_search_engine(Customer, search_fields)
+    return create_search_engine(Customer, search_fields, search_mode, ["user__email"])
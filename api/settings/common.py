@@ -28,6 +28,7 @@ env = environ.Env(
     DB_PORT=(str, ""),
     DB_URL=(str, ""),
     REDIS_URL=(str, "redis://redis:6379/0"),
+    REDIS_CACHE_URLS=(list, []),
     CELERY_BROKER_URL=(str, "redis://redis:6379/0"),
     CELERY_RESULT_BACKEND=(str, "redis://redis:6379/0"),
 )
@@ -216,7 +217,8 @@ CACHES = {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
             "SOCKET_CONNECT_TIMEOUT": 5,
             "SOCKET_TIMEOUT": 5,
-            "COMPRESSOR": "django_redis.compressors.zlib.ZlibCompressor",
+            "SERIALIZER": "core.cache.codecs.CodecSerializer",
+            "COMPRESSOR": "core.cache.codecs.AdaptiveCompressor",
             "IGNORE_EXCEPTIONS": True,
             "CONNECTION_POOL_KWARGS": {"max_connections": 100},
             "RETRY_ON_TIMEOUT": True,
@@ -227,9 +229,133 @@ CACHES = {
     }
 }
 
+# Shard the cache over several Redis nodes with consistent hashing
+# (see core.cache.sharding). Namespace version keys are replicated to every
+# node; sessions use the cache too, Celery keeps using REDIS_URL.
+REDIS_CACHE_URLS = env("REDIS_CACHE_URLS")
+if len(REDIS_CACHE_URLS) > 1:
+    CACHES["default"]["LOCATION"] = REDIS_CACHE_URLS
+    CACHES["default"]["OPTIONS"]["CLIENT_CLASS"] = (
+        "core.cache.sharding.ShardedRedisClient"
+    )
+
 # Cache time to live in seconds
 CACHE_TTL = 60 * 15  # 15 minutes
 
+# Prefix for versioned cache namespaces (see core.cache.versioning)
+CACHE_KEY_PREFIX = "ecommerce_api"
+
+# In-process (L1) cache kept by each worker in front of Redis.
+# Entries are dropped through a Redis pub/sub channel whenever a namespace
+# version is bumped, and TTL bounds staleness if a message is missed.
+CACHE_L1 = {
+    "ENABLED": env.bool("CACHE_L1_ENABLED", default=True),
+    "MAX_ENTRIES": env.int("CACHE_L1_MAX_ENTRIES", default=2048),
+    "TTL": env.int("CACHE_L1_TTL", default=30),  # seconds
+    "CHANNEL": "ecommerce:cache:invalidate",
+}
+
+# Single-flight recomputation of expired cached responses. One worker takes
+# a short lock and recomputes; the others serve the stale value for up to
+# STALE_TTL seconds or wait up to WAIT_TIMEOUT seconds when nothing is cached.
+# XFETCH_BETA > 0 enables probabilistic early recomputation (1.0 is typical).
+# Endpoints using stale_while_revalidate keep entries for SWR_STALE_TTL
+# seconds past expiry and refresh them from a Celery task on the core queue.
+CACHE_STAMPEDE = {
+    "LOCK_TIMEOUT": env.int("CACHE_STAMPEDE_LOCK_TIMEOUT", default=10),
+    "WAIT_TIMEOUT": env.float("CACHE_STAMPEDE_WAIT_TIMEOUT", default=2.0),
+    "STALE_TTL": env.int("CACHE_STAMPEDE_STALE_TTL", default=60),
+    "SWR_STALE_TTL": env.int("CACHE_STAMPEDE_SWR_STALE_TTL", default=3600),
+    "XFETCH_BETA": env.float("CACHE_STAMPEDE_XFETCH_BETA", default=1.0),
+}
+
+# Serialization of cached values. Each entry records its serializer and
+# compressor, so these can be changed without flushing Redis. Namespaces
+# holding plain JSON-like data may use msgpack or orjson; anything they
+# cannot encode falls back to pickle. Only values of at least
+# COMPRESS_MIN_LENGTH bytes are compressed (zstd uses the zstandard
+# dependency; lz4 needs the optional lz4 package).
+CACHE_SERIALIZATION = {
+    "DEFAULT": "pickle",
+    "NAMESPACES": {},
+    "COMPRESSOR": env.str("CACHE_COMPRESSOR", default="zlib"),
+    "COMPRESS_MIN_LENGTH": env.int("CACHE_COMPRESS_MIN_LENGTH", default=1024),
+}
+
+# Batched deletes for tag invalidation and SCAN-based pattern clears.
+# THROTTLE sleeps between batches so large purges do not starve other
+# Redis clients.
+CACHE_PURGE = {
+    "BATCH_SIZE": env.int("CACHE_PURGE_BATCH_SIZE", default=500),
+    "THROTTLE": env.float("CACHE_PURGE_THROTTLE", default=0.0),
+}
+
+# Per-namespace cache hit/miss/latency metrics, buffered in each process
+# and added to Redis every FLUSH_INTERVAL seconds. Reported by
+# `manage.py cache_ops stats` and GET /api/cache/stats (staff only).
+CACHE_METRICS = {
+    "ENABLED": env.bool("CACHE_METRICS_ENABLED", default=True),
+    "FLUSH_INTERVAL": env.int("CACHE_METRICS_FLUSH_INTERVAL", default=10),
+}
+
+# Cache warmup on web worker boot. The readiness probe reports not-ready
+# until the warmup finishes or TIMEOUT seconds pass. HOT_KEYS are built-in
+# steps (top_products, category_tree, featured_products) or dotted paths
+# to callables.
+CACHE_WARMUP = {
+    "ENABLED": env.bool("CACHE_WARMUP_ENABLED", default=True),
+    "TIMEOUT": env.int("CACHE_WARMUP_TIMEOUT", default=120),
+    "HOT_KEYS": env.list(
+        "CACHE_WARMUP_HOT_KEYS",
+        default=["top_products", "category_tree", "featured_products"],
+    ),
+    "TOP_PRODUCTS": env.int("CACHE_WARMUP_TOP_PRODUCTS", default=200),
+}
+
+# Write-through: after a committed product or variant change a Celery task
+# repopulates the product row and detail response cache entries.
+CACHE_WRITE_THROUGH = {
+    "ENABLED": env.bool("CACHE_WRITE_THROUGH_ENABLED", default=False),
+    "AUDIENCES": env.list("CACHE_WRITE_THROUGH_AUDIENCES", default=["customer"]),
+    "COUNTDOWN": env.int("CACHE_WRITE_THROUGH_COUNTDOWN", default=0),
+}
+
+# Product search. "fulltext" matches the GIN-indexed Product.search_vector
+# (PostgreSQL only); run `manage.py update_search_vectors` once before
+# enabling it so existing products have vectors.
+PRODUCT_SEARCH = {
+    "BACKEND": env("PRODUCT_SEARCH_BACKEND", default="basic"),
+    "CONFIG": env("PRODUCT_SEARCH_CONFIG", default="english"),
+}
+
+# In-memory typeahead index behind /products/autocomplete, built and refreshed
+# by a background thread in each web worker.
+PRODUCT_AUTOCOMPLETE = {
+    "ENABLED": env.bool("PRODUCT_AUTOCOMPLETE_ENABLED", default=True),
+    "LIMIT": env.int("PRODUCT_AUTOCOMPLETE_LIMIT", default=10),
+    "REFRESH_INTERVAL": env.int("PRODUCT_AUTOCOMPLETE_REFRESH_INTERVAL", default=600),
+}
+
+# In-memory bitmap index behind /products/facets, /products/browse and the
+# product tag filter, built and refreshed like the autocomplete index.
+PRODUCT_FACETS = {
+    "ENABLED": env.bool("PRODUCT_FACETS_ENABLED", default=True),
+    "REFRESH_INTERVAL": env.int("PRODUCT_FACETS_REFRESH_INTERVAL", default=600),
+}
+
+# In-memory NumPy snapshot of the active catalog that resolves numeric filters
+# and orderings of the product list, refreshed like the autocomplete index.
+PRODUCT_SNAPSHOT = {
+    "ENABLED": env.bool("PRODUCT_SNAPSHOT_ENABLED", default=True),
+    "REFRESH_INTERVAL": env.int("PRODUCT_SNAPSHOT_REFRESH_INTERVAL", default=600),
+}
+
+# SKU, order number and email lookups. "trigram" also matches misspelt terms
+# by pg_trgm word similarity, using the gin_trgm_ops indexes (PostgreSQL only).
+LOOKUP_SEARCH = {
+    "MODE": env("LOOKUP_SEARCH_MODE", default="contains"),
+}
+
 # Session backend
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
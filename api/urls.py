@@ -8,7 +8,12 @@ from ninja_extra import NinjaExtraAPI
 from ninja_jwt.controller import NinjaJWTDefaultController
 
 from cart.controllers import CartController, CartItemController
-from core.controllers import AuthController, CustomerController, UserController
+from core.controllers import (
+    AuthController,
+    CacheController,
+    CustomerController,
+    UserController,
+)
 from orders.controllers import OrderController
 from products.controllers import (
     AttributeController,
@@ -66,6 +71,7 @@ api.register_controllers(
     CartController,
     CartItemController,
     OrderController,
+    CacheController,
 )
 
 # Health check patterns
@@ -22,7 +22,7 @@ from .math_utils import (
     calculate_tax_amount,
     safe_divide,
 )
-from .pagination import paginate_queryset
+from .pagination import cursor_paginate_queryset, paginate_queryset
 from .text_processing import chunks, deep_merge_dicts
 from .validation import convert_to_bool, validate_phone_number
 
@@ -54,6 +54,7 @@ __all__ = [
     "calculate_tax_amount",
     "safe_divide",
     # Pagination utilities
+    "cursor_paginate_queryset",
     "paginate_queryset",
     # Text processing utilities
     "chunks",
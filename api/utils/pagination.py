@@ -2,16 +2,17 @@
 
 from typing import Any
 
-from django.core.paginator import Paginator
 from django.db.models import QuerySet
 
-from ..config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..config import COUNT_EXACT, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from ..pagination import CountingPaginator, CursorPaginator
 
 
 def paginate_queryset(
     queryset: QuerySet,
     page: int = 1,
     page_size: int | None = None,
+    count_strategy: str = COUNT_EXACT,
 ) -> dict[str, Any]:
     """Paginate a queryset and return pagination info.
 
@@ -19,9 +20,12 @@ def paginate_queryset(
         queryset: Django queryset to paginate
         page: Page number to retrieve (default: 1)
         page_size: Number of items per page (default from constants)
+        count_strategy: How the total is counted: exact, cached or estimated
 
     Returns:
-        Dictionary containing paginated results and pagination metadata
+        Dictionary containing paginated results and pagination metadata.
+        ``pagination`` has the same keys as in cursor mode (see
+        ``cursor_paginate_queryset``), with null cursors
     """
     if page_size is None:
         page_size = DEFAULT_PAGE_SIZE
@@ -29,7 +33,7 @@ def paginate_queryset(
     # Ensure page_size doesn't exceed maximum
     page_size = min(page_size, MAX_PAGE_SIZE)
 
-    paginator = Paginator(queryset, page_size)
+    paginator = CountingPaginator(queryset, page_size, count_strategy=count_strategy)
     page_obj = paginator.get_page(page)
 
     return {
@@ -39,12 +43,64 @@ def paginate_queryset(
             "page_size": page_size,
             "total_pages": paginator.num_pages,
             "total_count": paginator.count,
+            "total_is_approximate": paginator.count_is_approximate,
             "has_next": page_obj.has_next(),
             "has_previous": page_obj.has_previous(),
             "next_page": page_obj.next_page_number() if page_obj.has_next() else None,
             "previous_page": page_obj.previous_page_number()
             if page_obj.has_previous()
             else None,
+            "next_cursor": None,
+            "previous_cursor": None,
+        },
+    }
+
+
+def cursor_paginate_queryset(
+    queryset: QuerySet,
+    cursor: str | None = None,
+    page_size: int | None = None,
+    ordering: tuple[str, ...] = ("-created_at", "-id"),
+) -> dict[str, Any]:
+    """Paginate a queryset with keyset cursors and return pagination info.
+
+    Args:
+        queryset: Django queryset to paginate
+        cursor: Signed cursor from a previous page (None for the first page)
+        page_size: Number of items per page (default from constants)
+        ordering: Fields to order by, ``-`` prefixed for descending
+
+    Returns:
+        Dictionary containing paginated results and cursor metadata.
+        ``pagination`` has the same keys as in page mode, so clients can
+        read either; the page number and total fields are null because
+        keyset pages are not numbered or counted
+    """
+    if page_size is None:
+        page_size = DEFAULT_PAGE_SIZE
+
+    page_size = min(page_size, MAX_PAGE_SIZE)
+
+    paginator = CursorPaginator(
+        queryset, limit=page_size, max_limit=MAX_PAGE_SIZE, ordering=ordering
+    )
+    page = paginator.get_page(cursor)
+    meta = page["meta"]
+
+    return {
+        "results": page["items"],
+        "pagination": {
+            "page": None,
+            "page_size": page_size,
+            "total_pages": None,
+            "total_count": None,
+            "total_is_approximate": False,
+            "has_next": meta.has_next,
+            "has_previous": meta.has_previous,
+            "next_page": None,
+            "previous_page": None,
+            "next_cursor": meta.next_cursor,
+            "previous_cursor": meta.previous_cursor,
         },
     }
 
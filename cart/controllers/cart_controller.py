@@ -8,6 +8,7 @@ from django.db import transaction
 from django.shortcuts import get_object_or_404
 from ninja_extra import api_controller, http_delete, http_get, http_post, http_put
 
+from api.config import COUNT_ESTIMATED
 from api.decorators import (
     create_endpoint,
     delete_endpoint,
@@ -48,6 +49,7 @@ class CartController:
             "customer_id": "exact",
         },
         ordering_fields=["created_at", "updated_at", "total_price"],
+        count_strategy=COUNT_ESTIMATED,
     )
     @search_and_filter(
         search_fields=["session_key", "customer__user__username"],
@@ -0,0 +1,129 @@
+"""Micro-benchmarks for cache storage formats.
+
+Used by ``manage.py cache_ops benchmark`` to compare what a cache hit costs
+and how much Redis memory an entry takes for different storage strategies,
+and what each serializer / compressor pair costs to encode and decode.
+"""
+
+import pickle
+import time
+from collections.abc import Callable
+from typing import Any
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+from django.test import RequestFactory
+
+from . import codecs
+from .responses import EndpointSchema
+from .settings import cache_key_prefix, is_redis_cache
+
+
+def entry_size(key: str, value: Any) -> int:
+    """Bytes used by a cache entry: Redis MEMORY USAGE, else the pickle size."""
+    if is_redis_cache():
+        from django_redis import get_redis_connection
+
+        connection = get_redis_connection("default")
+        usage = connection.memory_usage(cache.client.make_key(key))
+        if usage is not None:
+            return usage
+    return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+def time_hits(read: Callable[[], Any], iterations: int) -> dict[str, float]:
+    """Run ``read`` repeatedly and return latency percentiles in milliseconds."""
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        read()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "avg_ms": sum(timings) / len(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p99_ms": timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+    }
+
+
+def benchmark_response_cache(
+    queryset: QuerySet, response_schema: Any, iterations: int = 200
+) -> dict[str, dict[str, float]]:
+    """Compare caching a list endpoint as ORM objects versus rendered JSON.
+
+    "objects" is the old ``cached_response`` behaviour: the view result is
+    pickled and every hit unpickles model instances and re-renders them
+    through Pydantic. "rendered" stores the final JSON bytes.
+    """
+    request = RequestFactory().get("/benchmark")
+    schema = EndpointSchema({200: response_schema})
+    result = (200, list(queryset))
+    results = {}
+
+    objects_key = cache_key_prefix("benchmark:response:objects")
+    cache.set(objects_key, result, 300)
+
+    def read_objects():
+        return schema.render(request, cache.get(objects_key))
+
+    results["objects"] = {
+        **time_hits(read_objects, iterations),
+        "bytes": entry_size(objects_key, result),
+    }
+
+    rendered = schema.render(request, result)
+    rendered_key = cache_key_prefix("benchmark:response:rendered")
+    cache.set(rendered_key, rendered, 300)
+
+    def read_rendered():
+        return cache.get(rendered_key).to_http_response()
+
+    results["rendered"] = {
+        **time_hits(read_rendered, iterations),
+        "bytes": entry_size(rendered_key, rendered),
+    }
+
+    cache.delete_many([objects_key, rendered_key])
+    return results
+
+
+def benchmark_codecs(
+    payloads: dict[str, Any], iterations: int = 200
+) -> dict[str, dict[str, dict[str, float]]]:
+    """Encode/decode time and stored size per payload and codec pair.
+
+    Every available serializer is combined with no compression and every
+    available compressor, using the configured ``COMPRESS_MIN_LENGTH``.
+    Codecs whose optional package is not installed are skipped.
+    """
+    min_length = codecs.CACHE_SERIALIZATION["COMPRESS_MIN_LENGTH"]
+    serializers = [name for name in codecs.SERIALIZERS if codecs.is_available(name)]
+    compressors = [None] + [
+        name for name in codecs.COMPRESSORS if codecs.is_available(name)
+    ]
+
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for payload_name, payload in payloads.items():
+        results[payload_name] = {}
+        for serializer in serializers:
+            for compressor in compressors:
+
+                def encode(
+                    payload=payload, serializer=serializer, compressor=compressor
+                ):
+                    data = codecs.serialize(payload, serializer)
+                    return codecs.compress(data, compressor, min_length)
+
+                encoded = encode()
+
+                def decode(encoded=encoded):
+                    return codecs.deserialize(codecs.decompress(encoded))
+
+                encode_timing = time_hits(encode, iterations)
+                decode_timing = time_hits(decode, iterations)
+                results[payload_name][f"{serializer}+{compressor or 'none'}"] = {
+                    "encode_us": encode_timing["avg_ms"] * 1000,
+                    "decode_us": decode_timing["avg_ms"] * 1000,
+                    "bytes": len(encoded),
+                }
+    return results
@@ -0,0 +1,266 @@
+"""Pluggable cache value serialization and size-adaptive compression.
+
+Values are stored self-describing, so serializers and compressors can be
+changed per namespace (or globally) without flushing the cache:
+
+    [compression tag][serializer tag][payload]
+
+``CodecSerializer`` and ``AdaptiveCompressor`` plug into django-redis as
+``SERIALIZER`` and ``COMPRESSOR``. ``VersionedCache`` picks the serializer
+configured for its namespace in ``CACHE_SERIALIZATION`` by wrapping values
+in ``Encoded``; everything else is pickled. Values that the chosen
+serializer cannot represent (model instances, Decimals for orjson, ...)
+fall back to pickle. msgpack and orjson return lists for tuples and orjson
+returns datetimes as strings, so only namespaces holding plain JSON-like
+data should opt in.
+
+zstd uses the zstandard package the project depends on; lz4 and msgpack
+are optional and fail with ImproperlyConfigured when configured but not
+installed.
+
+Entries written before these codecs were enabled (plain zlib-compressed
+pickles) are still readable.
+"""
+
+import logging
+import pickle
+import zlib
+from collections.abc import Callable
+from typing import Any
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+from .metrics import note_stored_size
+from .settings import CACHE_SERIALIZATION
+
+logger = logging.getLogger(__name__)
+
+# Serializer tags. Pickle streams start with 0x80, so these never collide
+# with legacy untagged pickles.
+PICKLE = b"\x01"
+MSGPACK = b"\x02"
+ORJSON = b"\x03"
+
+# Compression tags. zlib streams start with 0x78, so these never collide
+# with legacy untagged zlib payloads.
+UNCOMPRESSED = b"\x00"
+ZLIB = b"\x10"
+LZ4 = b"\x11"
+ZSTD = b"\x12"
+
+
+class Encoded:
+    """Marks a value to be serialized with a specific serializer."""
+
+    __slots__ = ("serializer", "value")
+
+    def __init__(self, value: Any, serializer: str):
+        self.value = value
+        self.serializer = serializer
+
+
+def _pickle_codec() -> tuple[Callable, Callable]:
+    return (
+        lambda value: pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+        pickle.loads,
+    )
+
+
+def _msgpack_codec() -> tuple[Callable, Callable]:
+    import msgpack
+
+    return (
+        lambda value: msgpack.packb(value, use_bin_type=True),
+        lambda data: msgpack.unpackb(data, raw=False),
+    )
+
+
+def _orjson_codec() -> tuple[Callable, Callable]:
+    import orjson
+
+    return orjson.dumps, orjson.loads
+
+
+def _zlib_codec() -> tuple[Callable, Callable]:
+    return (lambda data: zlib.compress(data, 6)), zlib.decompress
+
+
+def _lz4_codec() -> tuple[Callable, Callable]:
+    import lz4.frame
+
+    return lz4.frame.compress, lz4.frame.decompress
+
+
+def _zstd_codec() -> tuple[Callable, Callable]:
+    import zstandard
+
+    return (
+        zstandard.ZstdCompressor(level=3).compress,
+        zstandard.ZstdDecompressor().decompress,
+    )
+
+
+SERIALIZERS = {
+    "pickle": (PICKLE, _pickle_codec),
+    "msgpack": (MSGPACK, _msgpack_codec),
+    "orjson": (ORJSON, _orjson_codec),
+}
+
+COMPRESSORS = {
+    "zlib": (ZLIB, _zlib_codec),
+    "lz4": (LZ4, _lz4_codec),
+    "zstd": (ZSTD, _zstd_codec),
+}
+
+_loaded: dict[str, tuple[Callable, Callable]] = {}
+
+
+def _load(registry: dict, name: str) -> tuple[bytes, Callable, Callable]:
+    """Resolve a codec by name, importing its optional dependency lazily."""
+    if name not in registry:
+        raise ImproperlyConfigured(f"Unknown cache codec: {name}")
+    tag, factory = registry[name]
+    if name not in _loaded:
+        try:
+            _loaded[name] = factory()
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                f"Cache codec {name!r} requires a package that is not installed: {e}"
+            ) from e
+    return (tag, *_loaded[name])
+
+
+def is_available(name: str) -> bool:
+    """Whether the serializer or compressor ``name`` can be used here."""
+    registry = SERIALIZERS if name in SERIALIZERS else COMPRESSORS
+    try:
+        _load(registry, name)
+    except ImproperlyConfigured:
+        return False
+    return True
+
+
+def serialize(value: Any, serializer: str = "pickle") -> bytes:
+    """Serialize ``value`` with a tag byte, falling back to pickle."""
+    if serializer != "pickle":
+        tag, dumps, _ = _load(SERIALIZERS, serializer)
+        try:
+            return tag + dumps(value)
+        except (TypeError, ValueError, OverflowError) as e:
+            logger.debug(f"Falling back to pickle, {serializer} cannot encode: {e}")
+    tag, dumps, _ = _load(SERIALIZERS, "pickle")
+    return tag + dumps(value)
+
+
+def deserialize(data: bytes) -> Any:
+    """Inverse of ``serialize``; untagged data is a legacy pickle."""
+    tag = data[:1]
+    for name, (serializer_tag, _) in SERIALIZERS.items():
+        if tag == serializer_tag:
+            _, _, loads = _load(SERIALIZERS, name)
+            return loads(data[1:])
+    return pickle.loads(data)
+
+
+def compress(data: bytes, compressor: str | None, min_length: int) -> bytes:
+    """Compress ``data`` with a tag byte when it is at least ``min_length`` long."""
+    if compressor and len(data) >= min_length:
+        tag, compress_func, _ = _load(COMPRESSORS, compressor)
+        compressed = compress_func(data)
+        # Incompressible payloads are stored as they are
+        if len(compressed) < len(data):
+            return tag + compressed
+    return UNCOMPRESSED + data
+
+
+def decompress(data: bytes) -> bytes:
+    """Inverse of ``compress``; untagged data is legacy zlib or raw."""
+    tag = data[:1]
+    if tag == UNCOMPRESSED:
+        return data[1:]
+    for name, (compressor_tag, _) in COMPRESSORS.items():
+        if tag == compressor_tag:
+            _, _, decompress_func = _load(COMPRESSORS, name)
+            return decompress_func(data[1:])
+    try:
+        return zlib.decompress(data)
+    except zlib.error:
+        return data
+
+
+def serializer_for(namespace: str) -> str:
+    """Serializer configured for a cache namespace (longest prefix wins).
+
+    ``"product"`` in ``CACHE_SERIALIZATION["NAMESPACES"]`` matches the
+    namespaces ``product`` and ``product:<id>``.
+    """
+    namespaces = CACHE_SERIALIZATION["NAMESPACES"]
+    match = ""
+    for prefix in namespaces:
+        if (namespace == prefix or namespace.startswith(f"{prefix}:")) and len(
+            prefix
+        ) > len(match):
+            match = prefix
+    return namespaces[match] if match else CACHE_SERIALIZATION["DEFAULT"]
+
+
+def encode_for(namespace: str, value: Any) -> Any:
+    """Wrap ``value`` for the serializer of ``namespace`` before ``cache.set``.
+
+    Values are returned unchanged unless the default cache uses
+    ``CodecSerializer`` and the namespace overrides the default serializer.
+    """
+    serializer = serializer_for(namespace)
+    if serializer == CACHE_SERIALIZATION["DEFAULT"]:
+        return value
+    if not isinstance(getattr(cache.client, "_serializer", None), CodecSerializer):
+        return value
+    return Encoded(value, serializer)
+
+
+class CodecSerializer:
+    """django-redis serializer honouring ``Encoded`` per-value serializers.
+
+    Usage:
+        CACHES["default"]["OPTIONS"]["SERIALIZER"] = (
+            "core.cache.codecs.CodecSerializer"
+        )
+    """
+
+    def __init__(self, options: dict[str, Any]) -> None:
+        self._options = options
+
+    def dumps(self, value: Any) -> bytes:
+        if isinstance(value, Encoded):
+            return serialize(value.value, value.serializer)
+        return serialize(value, CACHE_SERIALIZATION["DEFAULT"])
+
+    def loads(self, value: bytes) -> Any:
+        return deserialize(value)
+
+
+class AdaptiveCompressor:
+    """django-redis compressor that only compresses values above a threshold.
+
+    Usage:
+        CACHES["default"]["OPTIONS"]["COMPRESSOR"] = (
+            "core.cache.codecs.AdaptiveCompressor"
+        )
+    """
+
+    def __init__(self, options: dict[str, Any]) -> None:
+        self._options = options
+        self.compressor = CACHE_SERIALIZATION["COMPRESSOR"]
+        self.min_length = CACHE_SERIALIZATION["COMPRESS_MIN_LENGTH"]
+        if self.compressor:
+            # Fail at startup rather than on the first large value
+            _load(COMPRESSORS, self.compressor)
+
+    def compress(self, value: bytes) -> bytes:
+        compressed = compress(value, self.compressor, self.min_length)
+        note_stored_size(len(compressed))
+        return compressed
+
+    def decompress(self, value: bytes) -> bytes:
+        return decompress(value)
@@ -0,0 +1,101 @@
+"""Validators for HTTP conditional GET (ETag / Last-Modified).
+
+Validators are derived without touching the queried data:
+
+- the ETag hashes the request fingerprint together with the current
+  ``CacheVersion`` of every list tag the response depends on. Any write to
+  one of those models bumps its tag (see core.cache.invalidation), which
+  changes the ETag. Responses built from in-process state (a local index)
+  add the version that state is at;
+- Last-Modified is the newest ``updated_at`` of those models. The maximum is
+  computed once per tag version and cached under that version, so it is
+  recomputed only after a write.
+"""
+
+from collections.abc import Iterable
+from datetime import datetime
+
+from django.db.models import Max, Model
+from django.http import HttpRequest
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .fingerprint import fingerprint, request_cache_key
+from .invalidation import list_tag
+from .versioning import CacheVersion, VersionedCache
+
+LAST_MODIFIED_KEY = "last_modified"
+
+
+class ConditionalValidators:
+    """ETag and Last-Modified of a response, computed before the view runs.
+
+    Usage:
+        validators = ConditionalValidators.for_request(request, [Product])
+        if validators.not_modified(request):
+            return HttpResponseNotModified()
+    """
+
+    def __init__(self, etag: str, last_modified: datetime | None):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @classmethod
+    def for_request(
+        cls,
+        request: HttpRequest,
+        models: list[type[Model]],
+        versions: Iterable[str] = (),
+    ) -> "ConditionalValidators":
+        etag = "W/" + quote_etag(
+            fingerprint(
+                request_cache_key("etag", request), *list_versions(models), *versions
+            )
+        )
+
+        timestamps = [
+            stamp for model in models if (stamp := last_modified(model)) is not None
+        ]
+        return cls(etag, max(timestamps) if timestamps else None)
+
+    def not_modified(self, request: HttpRequest) -> bool:
+        """Evaluate If-None-Match, then If-Modified-Since (RFC 9110 13.2.2)."""
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = {_opaque_tag(tag) for tag in if_none_match.split(",")}
+            return "*" in tags or _opaque_tag(self.etag) in tags
+
+        if_modified_since = request.headers.get("If-Modified-Since")
+        if if_modified_since and self.last_modified is not None:
+            since = parse_http_date_safe(if_modified_since)
+            return since is not None and int(self.last_modified.timestamp()) <= since
+        return False
+
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = http_date(self.last_modified.timestamp())
+        return headers
+
+
+def _opaque_tag(etag: str) -> str:
+    # Weak comparison: W/"x" matches "x"
+    return etag.strip().removeprefix("W/")
+
+
+def list_versions(models: Iterable[type[Model]]) -> list[str]:
+    """Current list tag versions of ``models``, bumped by every write to them."""
+    return [CacheVersion(list_tag(model)).get() for model in models]
+
+
+def last_modified(model: type[Model]) -> datetime | None:
+    """Newest ``updated_at`` of ``model``, cached until its list tag is bumped."""
+    if not any(field.name == "updated_at" for field in model._meta.concrete_fields):
+        return None
+
+    versioned_cache = VersionedCache(list_tag(model))
+    stamp = versioned_cache.get(LAST_MODIFIED_KEY)
+    if stamp is None:
+        stamp = model._base_manager.aggregate(latest=Max("updated_at"))["latest"]
+        if stamp is not None:
+            versioned_cache.set(LAST_MODIFIED_KEY, stamp)
+    return stamp
@@ -1,30 +1,58 @@
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from functools import wraps
 from typing import Any
 
 from django.core.cache import cache
+from django.http import HttpRequest
 from ninja.responses import Response
 
-from .settings import CACHE_TTL, cache_key_prefix
+from .fingerprint import request_cache_key
+from .metrics import measure_get, measure_set
+from .settings import CACHE_STAMPEDE, CACHE_TTL, cache_key_prefix
+from .stampede import get_or_compute, track_prefix
+from .tags import tag_keys
 
 
-def cached_view(timeout: int | None = CACHE_TTL, key_prefix: str = "view"):
+def _is_cacheable_response(response: Any) -> bool:
+    # Only cache Response objects
+    return isinstance(response, (Response, dict, list))
+
+
+def cached_view(
+    timeout: int | None = CACHE_TTL,
+    key_prefix: str = "view",
+    single_flight: bool = True,
+    tags: Iterable[str] = (),
+):
     """Cache decorator for API views.
+
+    With ``single_flight`` an expired entry is recomputed by one worker while
+    the others serve the stale value (see core.cache.stampede). Entries are
+    registered under ``tags`` so ``invalidate_tags`` can drop them (see
+    core.cache.tags).
     Usage:
         @http_get('')
-        @cached_view(timeout=300, key_prefix='products')
+        @cached_view(timeout=300, key_prefix='products', tags=['catalog'])
         def list_products(self):
             ...
     """
+    tags = list(tags)
+    # Single-flight entries outlive their timeout while served stale
+    tag_timeout = timeout
+    if single_flight and timeout is not None:
+        tag_timeout = timeout + CACHE_STAMPEDE["STALE_TTL"]
 
     def decorator(view_func: Callable) -> Callable:
+        if single_flight:
+            track_prefix(key_prefix)
+
         @wraps(view_func)
         def _wrapped_view(
             controller_self: Any, request: Any = None, *args: Any, **kwargs: Any
         ) -> Any:
-            # Generate cache key based on the full URL path and query parameters
-            if request and hasattr(request, "get_full_path"):
-                cache_key = f"{key_prefix}:{request.get_full_path()}"
+            # Generate cache key from a canonical fingerprint of the request
+            if isinstance(request, HttpRequest):
+                cache_key = request_cache_key(key_prefix, request)
             else:
                 # If no request object, use args and kwargs for key
                 cache_key = f"{key_prefix}:{':'.join(map(str, args))}"
@@ -33,16 +61,33 @@ def cached_view(timeout: int | None = CACHE_TTL, key_prefix: str = "view"):
                         f":{':'.join(f'{k}={v}' for k, v in sorted(kwargs.items()))}"
                     )
 
+            def compute():
+                response = view_func(controller_self, *args, **kwargs)
+                if tags and _is_cacheable_response(response):
+                    tag_keys([cache_key_prefix(cache_key)], tags, tag_timeout)
+                return response
+
+            if single_flight:
+                return get_or_compute(
+                    cache_key_prefix(cache_key),
+                    compute,
+                    timeout,
+                    prefix=key_prefix,
+                    cacheable=_is_cacheable_response,
+                )
+
             # Try to get from cache
-            response = cache.get(cache_key_prefix(cache_key))
+            with measure_get(key_prefix) as hit:
+                response = cache.get(cache_key_prefix(cache_key))
+                hit[0] = response is not None
 
             if response is None:
                 # Generate response
-                response = view_func(controller_self, *args, **kwargs)
+                response = compute()
 
-                # Only cache Response objects
-                if isinstance(response, (Response, dict, list)):
-                    cache.set(cache_key_prefix(cache_key), response, timeout)
+                if _is_cacheable_response(response):
+                    with measure_set(key_prefix):
+                        cache.set(cache_key_prefix(cache_key), response, timeout)
 
             return response
 
@@ -53,6 +98,7 @@ def cached_view(timeout: int | None = CACHE_TTL, key_prefix: str = "view"):
 
 def cached_method(timeout: int | None = CACHE_TTL, key_prefix: str = "method"):
     """Cache decorator for class methods.
+
     Usage:
         @cached_method(timeout=300, key_prefix='user')
         def get_user_data(self, user_id):
@@ -69,12 +115,15 @@ def cached_method(timeout: int | None = CACHE_TTL, key_prefix: str = "method"):
                     f":{':'.join(f'{k}={v}' for k, v in sorted(kwargs.items()))}"
                 )
 
-            result = cache.get(cache_key_prefix(cache_key))
+            with measure_get(key_prefix) as hit:
+                result = cache.get(cache_key_prefix(cache_key))
+                hit[0] = result is not None
 
             if result is None:
                 result = method(self, *args, **kwargs)
                 if result is not None:  # Don't cache None values
-                    cache.set(cache_key_prefix(cache_key), result, timeout)
+                    with measure_set(key_prefix):
+                        cache.set(cache_key_prefix(cache_key), result, timeout)
 
             return result
 
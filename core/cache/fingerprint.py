@@ -0,0 +1,127 @@
+"""Canonical request fingerprints for response cache keys.
+
+Two requests that must produce the same response get the same key, however
+their query strings are spelled:
+
+- query parameters are sorted by name, and empty parameters, parameters at
+  their default value (``page=1``) and tracking parameters (``utm_*``,
+  ``fbclid``, ...) are dropped. Values themselves are kept verbatim and in
+  order, since views read them with ``GET.get()`` (the last value wins);
+- when an endpoint declares the parameters it reads, everything else is
+  ignored;
+- the audience (anon / customer / staff) is always part of the key, so
+  role-dependent responses never leak between audiences;
+- the response schema hash keeps entries rendered by an older deploy apart.
+
+The canonical form is hashed to a fixed length so long query strings never
+produce oversized keys.
+"""
+
+import hashlib
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from django.http import HttpRequest
+
+from .settings import CACHE_FINGERPRINT
+
+AUDIENCE_ANONYMOUS = "anon"
+AUDIENCE_CUSTOMER = "customer"
+AUDIENCE_STAFF = "staff"
+
+
+def request_audience(request: HttpRequest | None) -> str:
+    """Coarse role of the requesting user."""
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return AUDIENCE_ANONYMOUS
+    if user.is_staff:
+        return AUDIENCE_STAFF
+    return AUDIENCE_CUSTOMER
+
+
+def _is_ignored(name: str) -> bool:
+    return name in CACHE_FINGERPRINT["IGNORED_PARAMS"] or any(
+        name.startswith(prefix) for prefix in CACHE_FINGERPRINT["IGNORED_PREFIXES"]
+    )
+
+
+def canonical_query(
+    query: Any, allowed_params: Iterable[str] | None = None
+) -> list[tuple[str, tuple[str, ...]]]:
+    """Normalize a ``QueryDict`` (or mapping) into sorted ``(name, values)`` pairs.
+
+    Args:
+        query: ``request.GET`` or a plain mapping of parameters
+        allowed_params: Parameters the endpoint reads; others are ignored
+    """
+    allowed = set(allowed_params) if allowed_params is not None else None
+    defaults = CACHE_FINGERPRINT["DEFAULT_VALUES"]
+
+    if hasattr(query, "lists"):
+        items = query.lists()
+    else:
+        items = (
+            (name, value if isinstance(value, (list, tuple)) else [value])
+            for name, value in query.items()
+        )
+
+    pairs = []
+    for name, raw_values in items:
+        if not name or _is_ignored(name):
+            continue
+        if allowed is not None and name not in allowed:
+            continue
+        values = tuple(str(value) for value in raw_values)
+        if values in ((), ("",)) or values == (defaults.get(name),):
+            continue
+        pairs.append((name, values))
+    return sorted(pairs)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Hash the given key parts to a fixed-length hex digest."""
+    canonical = "\x1f".join(str(part) for part in parts)
+    digest = hashlib.sha256(canonical.encode()).hexdigest()
+    return digest[: CACHE_FINGERPRINT["LENGTH"]]
+
+
+def request_cache_key(
+    prefix: str,
+    request: HttpRequest,
+    *,
+    path_params: Mapping[str, Any] | None = None,
+    allowed_params: Iterable[str] | None = None,
+    schema_version: str = "",
+    user_scoped: bool = False,
+    versions: Iterable[str] = (),
+) -> str:
+    """Build the cache key of a response to ``request``.
+
+    Args:
+        prefix: Readable key prefix, e.g. ``"api:list_products"``
+        request: The incoming request
+        path_params: URL parameters of the endpoint (e.g. ``category_id``)
+        allowed_params: Query parameters the endpoint reads, if known
+        schema_version: Hash of the endpoint's response schema
+        user_scoped: Whether the response depends on the individual user
+        versions: Cache versions of the data the response is built from, so
+            a write to it moves the response to a new key
+    """
+    audience = request_audience(request)
+    if user_scoped:
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            audience = f"user:{user.pk}"
+
+    path = sorted((name, str(value)) for name, value in (path_params or {}).items())
+    digest = fingerprint(
+        request.method,
+        request.path,
+        path,
+        canonical_query(request.GET, allowed_params),
+        audience,
+        schema_version,
+        list(versions),
+    )
+    return f"{prefix}:{digest}"
@@ -0,0 +1,410 @@
+"""Dependency-graph based cache invalidation.
+
+The planner is built once at startup from model metadata plus the explicit
+declarations in ``CACHE_DEPENDENCIES``. For every write it works out exactly
+which cache entries depend on the changed row instead of throwing away whole
+namespaces.
+
+Two kinds of targets are produced:
+
+- keys: ``(namespace, key)`` pairs stored through ``VersionedCache``, e.g.
+  ``("product", "product:<id>")``. These are deleted.
+- tags: namespaces that group list-style entries, e.g. ``product:list`` or
+  ``productcategory:tree``. A tag is invalidated by bumping its version, so
+  list caches should be stored with ``VersionedCache(tag)``.
+
+Invalidation is transaction-aware: plans produced inside ``atomic()`` are
+merged and flushed once via ``transaction.on_commit`` as a single Redis
+pipeline, and ``batch_invalidation()`` does the same for bulk code running
+outside a transaction.
+
+Plans can also carry refresh targets, ``(model label, pk)`` pairs declared
+under ``"refresh"``. With ``CACHE_WRITE_THROUGH["ENABLED"]`` they are handed
+to a Celery task once the plan is executed, which repopulates the entries
+just invalidated (see core.cache.writethrough).
+"""
+
+import logging
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import partial
+from typing import Any
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Model
+
+from .local import drop_local_entries, publish_invalidations
+from .settings import CACHE_WRITE_THROUGH, is_redis_cache, is_sharded_cache
+from .versioning import CacheVersion, VersionedCache
+
+logger = logging.getLogger(__name__)
+
+# Audit foreign keys from AbstractBaseModel never affect what is cached
+AUDIT_FIELDS = {"created_by", "updated_by", "deleted_by"}
+
+# Explicit dependencies that cannot be derived from model metadata.
+# Templates are formatted with the changed instance's attributes; a template
+# referencing an attribute that is None is skipped. "refresh" lists the
+# (model label, pk template) rows whose entries write-through repopulates.
+CACHE_DEPENDENCIES: dict[str, dict[str, list]] = {
+    "products.Product": {
+        "refresh": [("products.Product", "{id}")],
+    },
+    "products.ProductVariant": {
+        "tags": ["product:list"],
+        "refresh": [("products.Product", "{product_id}")],
+    },
+    "products.ProductImage": {
+        "tags": ["product:list"],
+    },
+    "products.ProductCategory": {
+        "tags": ["productcategory:tree"],
+    },
+    "orders.OrderLineItem": {
+        "tags": ["order:list"],
+    },
+    "cart.CartItem": {
+        "tags": ["cart:list"],
+    },
+}
+
+
+class _SkipTemplate(Exception):
+    """Raised when a template references an attribute that is None."""
+
+
+class _InstanceAttributes(dict):
+    """Mapping used with ``str.format_map`` to read instance attributes."""
+
+    def __init__(self, instance: Model):
+        super().__init__()
+        self.instance = instance
+
+    def __missing__(self, name: str) -> Any:
+        value = getattr(self.instance, name)
+        if value is None:
+            raise _SkipTemplate(name)
+        return value
+
+
+def _render(template: str, instance: Model) -> str | None:
+    try:
+        return template.format_map(_InstanceAttributes(instance))
+    except _SkipTemplate:
+        return None
+
+
+def row_key(model: type[Model], pk: Any) -> tuple[str, str]:
+    """Cache key of a single row, matching the format used by CacheWarmer."""
+    namespace = model._meta.model_name
+    return namespace, f"{namespace}:{pk}"
+
+
+def list_tag(model: type[Model]) -> str:
+    """Tag that groups every list-style cache entry for a model."""
+    return f"{model._meta.model_name}:list"
+
+
+class InvalidationPlan:
+    """Keys and tags that depend on one or more changed rows."""
+
+    def __init__(self):
+        self.keys: set[tuple[str, str]] = set()
+        self.tags: set[str] = set()
+        self.refresh: set[tuple[str, str]] = set()
+
+    def add_key(self, namespace: str, key: str) -> None:
+        self.keys.add((namespace, key))
+
+    def add_tag(self, tag: str) -> None:
+        self.tags.add(tag)
+
+    def add_refresh(self, model_label: str, pk: str) -> None:
+        self.refresh.add((model_label, pk))
+
+    def update(self, other: "InvalidationPlan") -> None:
+        """Merge another plan into this one."""
+        self.keys |= other.keys
+        self.tags |= other.tags
+        self.refresh |= other.refresh
+
+    def __len__(self) -> int:
+        return len(self.keys) + len(self.tags)
+
+    def __bool__(self) -> bool:
+        return bool(self.keys or self.tags)
+
+
+class ModelDependencies:
+    """Compiled invalidation rules for a single model."""
+
+    def __init__(self, model: type[Model], declaration: dict[str, list] | None = None):
+        declaration = declaration or {}
+        self.model = model
+        self.list_tag = list_tag(model)
+        # (attname, related model) for every forward FK / one-to-one
+        self.parents: list[tuple[str, type[Model]]] = [
+            (field.attname, field.related_model)
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and (field.many_to_one or field.one_to_one)
+            and field.name not in AUDIT_FIELDS
+        ]
+        self.key_templates: list[tuple[str, str]] = list(declaration.get("keys", []))
+        self.tag_templates: list[str] = list(declaration.get("tags", []))
+        self.refresh_templates: list[tuple[str, str]] = list(
+            declaration.get("refresh", [])
+        )
+
+    def plan(self, instance: Model) -> InvalidationPlan:
+        """Build the plan for a saved or deleted instance."""
+        plan = InvalidationPlan()
+        plan.add_key(*row_key(self.model, instance.pk))
+        plan.add_tag(self.list_tag)
+
+        # Parent rows embed this row in their cached representation
+        for attname, related_model in self.parents:
+            parent_pk = getattr(instance, attname, None)
+            if parent_pk is not None:
+                plan.add_key(*row_key(related_model, parent_pk))
+
+        for namespace, template in self.key_templates:
+            if (key := _render(template, instance)) is not None:
+                plan.add_key(namespace, key)
+
+        for template in self.tag_templates:
+            if (tag := _render(template, instance)) is not None:
+                plan.add_tag(tag)
+
+        for model_label, template in self.refresh_templates:
+            if (pk := _render(template, instance)) is not None:
+                plan.add_refresh(model_label, pk)
+
+        return plan
+
+
+class InvalidationPlanner:
+    """Maps a changed row to the cache entries that depend on it.
+
+    Usage:
+        planner = InvalidationPlanner.build(models)
+        plan = planner.plan(Product, product)
+        schedule_invalidation(plan)
+    """
+
+    def __init__(self):
+        self._dependencies: dict[type[Model], ModelDependencies] = {}
+
+    @classmethod
+    def build(
+        cls,
+        models: list[type[Model]],
+        declarations: dict[str, dict[str, list]] | None = None,
+    ) -> "InvalidationPlanner":
+        """Compile rules for ``models`` from metadata and declarations."""
+        declarations = CACHE_DEPENDENCIES if declarations is None else declarations
+        planner = cls()
+        for model in models:
+            planner._dependencies[model] = ModelDependencies(
+                model, declarations.get(model._meta.label)
+            )
+        return planner
+
+    @property
+    def models(self) -> list[type[Model]]:
+        return list(self._dependencies)
+
+    def plan(self, model: type[Model], instance: Model) -> InvalidationPlan:
+        """Plan invalidation for a single changed instance."""
+        dependencies = self._dependencies.get(model)
+        if dependencies is None:
+            dependencies = self._dependencies[model] = ModelDependencies(model)
+        return dependencies.plan(instance)
+
+    def plan_for_pks(self, model: type[Model], pks) -> InvalidationPlan:
+        """Plan invalidation for rows known only by primary key.
+
+        Used for many-to-many changes, where the related rows are not loaded.
+        """
+        plan = InvalidationPlan()
+        plan.add_tag(list_tag(model))
+        for pk in pks or ():
+            plan.add_key(*row_key(model, pk))
+        return plan
+
+
+def execute_plan(plan: InvalidationPlan) -> int:
+    """Invalidate everything in ``plan`` and return how many entries were hit.
+
+    With Redis, key deletes, tag version bumps and the L1 pub/sub messages
+    all go out in one pipeline (with a sharded cache, batched per node through
+    the cache API instead). Refresh targets are scheduled afterwards.
+    """
+    if not plan:
+        return 0
+
+    if not is_redis_cache() or is_sharded_cache():
+        _execute_plan_commands(plan)
+        schedule_refresh(plan.refresh)
+        return len(plan)
+
+    from django_redis import get_redis_connection
+
+    pipeline = get_redis_connection("default").pipeline(transaction=False)
+    for namespace, key in plan.keys:
+        versioned_key = VersionedCache(namespace).versioned_key(key)
+        pipeline.delete(cache.client.make_key(versioned_key))
+
+    for tag in plan.tags:
+        version = CacheVersion(tag)
+        pipeline.set(
+            cache.client.make_key(version.version_key),
+            cache.client.encode(version.generate_version()),
+            ex=cache.default_timeout,
+        )
+
+    targets = [*plan.keys, *((tag, None) for tag in plan.tags)]
+    publish_invalidations(targets, pipeline=pipeline)
+    try:
+        pipeline.execute()
+    finally:
+        drop_local_entries(targets)
+    schedule_refresh(plan.refresh)
+    return len(plan)
+
+
+def schedule_refresh(targets: set[tuple[str, str]]) -> None:
+    """Queue the write-through refresh of ``targets`` if it is enabled."""
+    if not targets or not CACHE_WRITE_THROUGH["ENABLED"]:
+        return
+
+    pks_by_model: dict[str, list[str]] = {}
+    for model_label, pk in sorted(targets):
+        pks_by_model.setdefault(model_label, []).append(pk)
+
+    try:
+        from core.tasks import refresh_cache_entries
+
+        refresh_cache_entries.apply_async(
+            (pks_by_model,), countdown=CACHE_WRITE_THROUGH["COUNTDOWN"]
+        )
+    except Exception as e:
+        # The entries are invalidated either way; readers repopulate them
+        logger.warning(f"Error scheduling write-through refresh: {e}")
+
+
+def _execute_plan_commands(plan: InvalidationPlan) -> None:
+    """Fallback without a single Redis: one cache call per namespace and tag."""
+    by_namespace: dict[str, list[str]] = {}
+    for namespace, key in plan.keys:
+        by_namespace.setdefault(namespace, []).append(key)
+
+    for namespace, keys in by_namespace.items():
+        VersionedCache(namespace).delete_many(keys)
+
+    for tag in plan.tags:
+        CacheVersion(tag).increment()
+
+
+_state = threading.local()
+
+
+def _pending_plans() -> dict[str, InvalidationPlan]:
+    """Per-thread plans waiting for their transaction to commit, by db alias."""
+    if not hasattr(_state, "pending"):
+        _state.pending = {}
+    return _state.pending
+
+
+def flush_pending(using: str) -> int:
+    """Execute the merged plan queued for a database alias."""
+    plan = _pending_plans().pop(using, None)
+    if not plan:
+        return 0
+
+    count = execute_plan(plan)
+    logger.info(
+        f"Invalidated {count} cache entries on commit "
+        f"(keys: {len(plan.keys)}, tags: {len(plan.tags)})"
+    )
+    return count
+
+
+def schedule_invalidation(plan: InvalidationPlan, using: str | None = None) -> int:
+    """Invalidate ``plan`` now, at commit, or at the end of a batch.
+
+    Returns the number of entries invalidated immediately; deferred plans
+    return 0 and are reported when they are flushed.
+    """
+    if not plan:
+        return 0
+
+    batch = getattr(_state, "batch", None)
+    if batch is not None:
+        batch.update(plan)
+        return 0
+
+    connection = transaction.get_connection(using)
+    pending = _pending_plans()
+    if connection.in_atomic_block:
+        pending.setdefault(connection.alias, InvalidationPlan()).update(plan)
+        # Registered per call: a callback from a rolled-back savepoint is
+        # discarded, and flushing an already-flushed alias is a no-op.
+        transaction.on_commit(
+            partial(flush_pending, connection.alias), using=connection.alias
+        )
+        return 0
+
+    # Plans left behind by a rolled-back transaction are flushed too;
+    # over-invalidating is safe, serving stale data is not.
+    if stale := pending.pop(connection.alias, None):
+        plan.update(stale)
+    return execute_plan(plan)
+
+
+@contextmanager
+def batch_invalidation() -> Iterator[InvalidationPlan]:
+    """Suspend cache invalidation and flush it once when the block exits.
+
+    Meant for management commands and bulk endpoints that write many rows.
+    If the block exits inside a transaction the merged plan is still
+    deferred until commit. Nested blocks join the outermost batch.
+    Usage:
+        with batch_invalidation():
+            for product in products:
+                product.save()
+    """
+    if getattr(_state, "batch", None) is not None:
+        yield _state.batch
+        return
+
+    _state.batch = InvalidationPlan()
+    try:
+        yield _state.batch
+    finally:
+        plan, _state.batch = _state.batch, None
+        schedule_invalidation(plan)
+
+
+_planner: InvalidationPlanner | None = None
+
+
+def get_invalidation_planner() -> InvalidationPlanner:
+    """Get the process-wide planner, building it on first use."""
+    global _planner  # noqa: PLW0603
+
+    if _planner is None:
+        from django.apps import apps
+
+        from .settings import CACHE_INVALIDATION_APPS
+
+        _planner = InvalidationPlanner.build(
+            [
+                model
+                for app_label in CACHE_INVALIDATION_APPS
+                for model in apps.get_app_config(app_label).get_models()
+            ]
+        )
+    return _planner
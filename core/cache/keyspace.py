@@ -0,0 +1,277 @@
+"""Redis key-space analysis and purging of superseded version keys.
+
+``analyze_keyspace`` samples keys with ``SCAN`` and groups them by
+namespace and, for ``VersionedCache`` entries, by namespace version. For
+every group it reports the number of keys, their size (``MEMORY USAGE``)
+and how their TTLs are distributed.
+
+Bumping a ``CacheVersion`` does not delete anything: entries stored under
+the previous version just become unreachable and keep using memory until
+their TTL runs out. Such orphaned entries are reported separately and can
+be deleted incrementally with ``purge_orphaned_versions``.
+
+Versioned keys look like ``<CACHE_KEY_PREFIX>:<namespace>:<version>:<key>``.
+A key is only treated as versioned when its namespace has a live version
+key, so keys whose namespace version expired are reported as unversioned
+and never purged. With a sharded cache every node is scanned.
+"""
+
+import logging
+import re
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import metric_namespace
+from .settings import CACHE_PURGE, is_redis_cache
+from .sharding import node_connections
+from .tags import _unlink_batches
+
+logger = logging.getLogger(__name__)
+
+STATUS_CURRENT = "current"
+STATUS_ORPHANED = "orphaned"
+STATUS_UNVERSIONED = "unversioned"
+
+# Upper bounds (seconds) and labels of the TTL distribution buckets
+TTL_BUCKETS = ((60, "<1m"), (3600, "<1h"), (86400, "<1d"))
+TTL_LONGER = ">=1d"
+TTL_PERSISTENT = "none"
+
+_VERSION_SEGMENT = re.compile(r"^[0-9a-f]{8}$")
+
+
+def _ttl_bucket(ttl_ms: int) -> str:
+    if ttl_ms < 0:
+        return TTL_PERSISTENT
+    for bound, label in TTL_BUCKETS:
+        if ttl_ms < bound * 1000:
+            return label
+    return TTL_LONGER
+
+
+class KeyClassifier:
+    """Maps raw Redis keys to their namespace and version status."""
+
+    def __init__(self, depth: int = 2):
+        self.depth = depth
+        # make_key("") is "<KEY_PREFIX>:<VERSION>:" with the default key function
+        self.raw_prefix = str(cache.client.make_key(""))
+        self.key_prefix = f"{settings.CACHE_KEY_PREFIX}:"
+        self.version_prefix = f"{self.key_prefix}version:"
+        self.versions: dict[str, str] = {}
+
+    def load_versions(self, connection) -> None:
+        """Read the current version of every namespace with a version key."""
+        pattern = cache.client.make_pattern(f"{self.version_prefix}*")
+        namespaces = [
+            self.cache_key(raw_key).removeprefix(self.version_prefix)
+            for raw_key in connection.scan_iter(match=pattern, count=1000)
+        ]
+        self.refresh_versions(connection, namespaces)
+
+    def refresh_versions(self, connection, namespaces: list[str]) -> None:
+        """Re-read the current version of ``namespaces``."""
+        if not namespaces:
+            return
+        raw_keys = [
+            cache.client.make_key(f"{self.version_prefix}{namespace}")
+            for namespace in namespaces
+        ]
+        values = connection.mget(raw_keys)
+        for namespace, value in zip(namespaces, values, strict=True):
+            if value is None:
+                self.versions.pop(namespace, None)
+            else:
+                self.versions[namespace] = cache.client.decode(value)
+
+    def cache_key(self, raw_key: bytes) -> str:
+        """Key as passed to ``cache.set``."""
+        key = raw_key.decode(errors="replace")
+        return key.removeprefix(self.raw_prefix)
+
+    def classify(self, raw_key: bytes) -> tuple[str, str | None, str]:
+        """Return the namespace, version and status of a key.
+
+        Unversioned keys are grouped by their first ``depth`` segments.
+        """
+        key = self.cache_key(raw_key)
+        if key.startswith(self.version_prefix):
+            return "version", None, STATUS_UNVERSIONED
+
+        segments = key.removeprefix(self.key_prefix).split(":")
+        # Longest namespace with a live version that is followed by a version
+        for end in range(len(segments) - 1, 0, -1):
+            namespace = ":".join(segments[:end])
+            if namespace in self.versions and _VERSION_SEGMENT.match(segments[end]):
+                version = segments[end]
+                status = (
+                    STATUS_CURRENT
+                    if version == self.versions[namespace]
+                    else STATUS_ORPHANED
+                )
+                return namespace, version, status
+
+        return ":".join(segments[: self.depth]), None, STATUS_UNVERSIONED
+
+
+def _scan(connection, max_keys: int, batch_size: int) -> Iterator[list[bytes]]:
+    """Yield batches of up to ``batch_size`` keys, at most ``max_keys`` in all."""
+    pattern = cache.client.make_pattern("*")
+    seen = 0
+    batch: list[bytes] = []
+    for raw_key in connection.scan_iter(match=pattern, count=batch_size):
+        batch.append(raw_key)
+        seen += 1
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+        if max_keys and seen >= max_keys:
+            break
+    if batch:
+        yield batch
+
+
+def _scan_nodes(
+    connections: list, max_keys: int, batch_size: int
+) -> Iterator[tuple[Any, list[bytes]]]:
+    """``_scan`` every node in turn, yielding each batch with its connection."""
+    for connection in connections:
+        for batch in _scan(connection, max_keys, batch_size):
+            yield connection, batch
+
+
+def analyze_keyspace(
+    max_keys: int = 10000, batch_size: int | None = None, depth: int = 2
+) -> dict[str, Any]:
+    """Sample keys and aggregate their size and TTL by namespace and version.
+
+    Args:
+        max_keys: Keys to sample, 0 for all of them
+        batch_size: SCAN COUNT hint and keys inspected per pipeline
+        depth: Key segments used as the namespace of unversioned keys
+
+    Returns:
+        Dict with the number of keys sampled, the database size, whether
+        sizes were available, the groups sorted by size and orphan totals
+    """
+    if not is_redis_cache():
+        logger.warning("Key-space analysis needs Redis")
+        return {}
+
+    batch_size = batch_size or CACHE_PURGE["BATCH_SIZE"]
+    connections = node_connections()
+    classifier = KeyClassifier(depth)
+    # Version keys are replicated to every node of a sharded cache
+    classifier.load_versions(connections[0])
+    # Sample every node evenly
+    node_max_keys = -(-max_keys // len(connections))
+
+    groups: dict[tuple[str, str | None, str], dict[str, Any]] = {}
+    sampled = 0
+    sizes_available = True
+    for connection, batch in _scan_nodes(connections, node_max_keys, batch_size):
+        pipeline = connection.pipeline(transaction=False)
+        for raw_key in batch:
+            pipeline.pttl(raw_key)
+            pipeline.memory_usage(raw_key)
+        results = pipeline.execute(raise_on_error=False)
+
+        for index, raw_key in enumerate(batch):
+            ttl, size = results[2 * index], results[2 * index + 1]
+            if isinstance(ttl, Exception) or ttl == -2:  # noqa: PLR2004
+                continue  # Expired or deleted since it was scanned
+            if isinstance(size, Exception) or size is None:
+                sizes_available, size = False, 0
+
+            namespace, version, status = classifier.classify(raw_key)
+            # Namespaces with ids have a version each; group those by status
+            group_namespace = metric_namespace(namespace)
+            if version is not None and group_namespace != namespace:
+                version = "*"
+            group = groups.setdefault(
+                (group_namespace, version, status),
+                {
+                    "namespace": group_namespace,
+                    "version": version,
+                    "status": status,
+                    "keys": 0,
+                    "bytes": 0,
+                    "ttl": {},
+                },
+            )
+            group["keys"] += 1
+            group["bytes"] += size
+            bucket = _ttl_bucket(ttl)
+            group["ttl"][bucket] = group["ttl"].get(bucket, 0) + 1
+            sampled += 1
+
+    report_groups = sorted(groups.values(), key=lambda g: (-g["bytes"], -g["keys"]))
+    for group in report_groups:
+        group["avg_bytes"] = group["bytes"] / group["keys"]
+    orphaned = [g for g in report_groups if g["status"] == STATUS_ORPHANED]
+    return {
+        "sampled": sampled,
+        "total_keys": sum(connection.dbsize() for connection in connections),
+        "sizes_available": sizes_available,
+        "groups": report_groups,
+        "orphaned": {
+            "keys": sum(g["keys"] for g in orphaned),
+            "bytes": sum(g["bytes"] for g in orphaned),
+        },
+    }
+
+
+def purge_orphaned_versions(
+    batch_size: int | None = None, throttle: float | None = None
+) -> int:
+    """Delete entries stored under superseded namespace versions.
+
+    Keys are scanned incrementally; the versions of the namespaces seen in
+    each batch are re-read right before deleting, so entries of a version
+    that became current during the scan are never deleted.
+
+    Args:
+        batch_size: SCAN COUNT hint and keys deleted per round trip
+        throttle: Seconds to sleep between batches (defaults to CACHE_PURGE)
+
+    Returns:
+        Number of keys deleted
+    """
+    if not is_redis_cache():
+        logger.warning("Purging orphaned versions needs Redis")
+        return 0
+
+    batch_size = batch_size or CACHE_PURGE["BATCH_SIZE"]
+    if throttle is None:
+        throttle = CACHE_PURGE["THROTTLE"]
+    connections = node_connections()
+    classifier = KeyClassifier()
+    classifier.load_versions(connections[0])
+
+    deleted = 0
+    for connection, batch in _scan_nodes(connections, 0, batch_size):
+        candidates = {}
+        for raw_key in batch:
+            namespace, _, status = classifier.classify(raw_key)
+            if status == STATUS_ORPHANED:
+                candidates[raw_key] = namespace
+        if not candidates:
+            continue
+        classifier.refresh_versions(
+            connections[0], sorted(set(candidates.values()))
+        )
+        orphaned = [
+            raw_key
+            for raw_key in candidates
+            if classifier.classify(raw_key)[2] == STATUS_ORPHANED
+        ]
+        deleted += _unlink_batches(connection, iter(orphaned), batch_size, 0)
+        if throttle:
+            time.sleep(throttle)
+
+    logger.info(f"Deleted {deleted} keys of superseded cache versions")
+    return deleted
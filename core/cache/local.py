@@ -0,0 +1,223 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+from .settings import CACHE_L1, is_redis_cache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Separates namespace and key in invalidation messages ("product\tproduct:42")
+MESSAGE_SEPARATOR = "\t"
+
+
+class LocalCache:
+    """Bounded in-process LRU cache with a per-entry TTL.
+
+    Used as the L1 tier in front of Redis. Values are shared between callers
+    in the same process, so they must be treated as read-only.
+    Usage:
+        local = LocalCache(max_entries=1024, ttl=30)
+        local.set(("version", "product"), "ab12cd34")
+        local.get(("version", "product"))
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value, refreshing its LRU position."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a single entry."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_namespace(self, namespace: str, key: str | None = None) -> int:
+        """Remove entries keyed ``(kind, namespace, ...)``.
+
+        When ``key`` is given only entries keyed ``(kind, namespace, key, ...)``
+        are removed, which drops every cached version of that key.
+        """
+        with self._lock:
+            stale = [
+                entry_key
+                for entry_key in self._data
+                if isinstance(entry_key, tuple)
+                and len(entry_key) > 1
+                and entry_key[1] == namespace
+                and (key is None or (len(entry_key) > 2 and entry_key[2] == key))
+            ]
+            for entry_key in stale:
+                del self._data[entry_key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class InvalidationSubscriber(threading.Thread):
+    """Background thread that drops L1 entries on namespace version bumps.
+
+    Listens on the Redis pub/sub channel that ``CacheVersion.increment()``
+    publishes to. If the connection drops the whole L1 cache is cleared,
+    since messages may have been missed while disconnected.
+    """
+
+    def __init__(self, local_cache: LocalCache, channel: str):
+        super().__init__(name="cache-l1-invalidation", daemon=True)
+        self.local_cache = local_cache
+        self.channel = channel
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        from django_redis import get_redis_connection
+
+        backoff = 1
+        while not self._stopped.is_set():
+            try:
+                pubsub = get_redis_connection("default").pubsub(
+                    ignore_subscribe_messages=True
+                )
+                pubsub.subscribe(self.channel)
+                backoff = 1
+                for message in pubsub.listen():
+                    if self._stopped.is_set():
+                        break
+                    data = message.get("data")
+                    if isinstance(data, bytes):
+                        data = data.decode()
+                    if data:
+                        namespace, _, key = data.partition(MESSAGE_SEPARATOR)
+                        self.local_cache.delete_namespace(namespace, key or None)
+            except Exception as e:
+                logger.warning(f"L1 cache invalidation listener disconnected: {e}")
+                self.local_cache.clear()
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+_local_cache: LocalCache | None = None
+_local_cache_pid: int | None = None
+_local_cache_lock = threading.Lock()
+
+
+def get_local_cache() -> LocalCache | None:
+    """Get the per-process L1 cache, or ``None`` when L1 is disabled.
+
+    The cache and its subscriber thread are created lazily and recreated
+    after a fork, so every worker process owns its own copy.
+    """
+    global _local_cache, _local_cache_pid  # noqa: PLW0603
+
+    if not CACHE_L1["ENABLED"]:
+        return None
+
+    pid = os.getpid()
+    if _local_cache is not None and _local_cache_pid == pid:
+        return _local_cache
+
+    with _local_cache_lock:
+        if _local_cache is None or _local_cache_pid != pid:
+            local_cache = LocalCache(CACHE_L1["MAX_ENTRIES"], CACHE_L1["TTL"])
+            if is_redis_cache():
+                InvalidationSubscriber(local_cache, CACHE_L1["CHANNEL"]).start()
+            _local_cache = local_cache
+            _local_cache_pid = pid
+    return _local_cache
+
+
+def invalidation_message(namespace: str, key: str | None = None) -> str:
+    """Build the pub/sub payload for a namespace or a single key."""
+    return f"{namespace}{MESSAGE_SEPARATOR}{key}" if key else namespace
+
+
+def publish_invalidation(namespace: str, key: str | None = None) -> None:
+    """Drop ``namespace`` (or one key in it) locally and notify other workers."""
+    publish_invalidations([(namespace, key)])
+
+
+def publish_invalidations(
+    targets: list[tuple[str, str | None]], pipeline: Any = None
+) -> None:
+    """Publish several ``(namespace, key)`` invalidations in one round trip.
+
+    A ``key`` of ``None`` drops the whole namespace. Local entries are
+    dropped once the messages (and the Redis writes queued before them) have
+    been sent, so a concurrent reader cannot refill L1 from the old Redis
+    value; the subscriber drops them again when the message comes back.
+    When a Redis ``pipeline`` is given the messages are queued on it and the
+    caller executes it, then calls ``drop_local_entries(targets)``.
+    """
+    local_cache = get_local_cache()
+    if local_cache is None or not targets:
+        return
+
+    if not is_redis_cache():
+        drop_local_entries(targets)
+        return
+
+    try:
+        if pipeline is None:
+            from django_redis import get_redis_connection
+
+            own_pipeline = get_redis_connection("default").pipeline(
+                transaction=False
+            )
+        else:
+            own_pipeline = pipeline
+        for namespace, key in targets:
+            own_pipeline.publish(
+                CACHE_L1["CHANNEL"], invalidation_message(namespace, key)
+            )
+        if pipeline is None:
+            own_pipeline.execute()
+    except Exception as e:
+        logger.error(f"Error publishing cache invalidation for {targets}: {e}")
+    finally:
+        if pipeline is None:
+            drop_local_entries(targets)
+
+
+def drop_local_entries(targets: list[tuple[str, str | None]]) -> None:
+    """Drop ``(namespace, key)`` targets from this process's L1 cache."""
+    local_cache = get_local_cache()
+    if local_cache is None:
+        return
+    for namespace, key in targets:
+        local_cache.delete_namespace(namespace, key)
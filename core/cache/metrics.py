@@ -0,0 +1,274 @@
+"""Per-namespace cache hit/miss, size and latency metrics.
+
+Every instrumented read and write updates counters held in process memory,
+which costs a dict update under a lock. Every ``FLUSH_INTERVAL`` seconds the
+buffered counters are added to one Redis hash per namespace with a single
+pipeline of ``HINCRBY`` calls, so all workers aggregate into the same
+numbers without a Redis round trip per cache operation.
+
+Latencies are kept as histograms with fixed bucket bounds, from which p50
+and p99 are estimated (as the upper bound of the bucket the percentile
+falls in). Bytes written are the stored size reported by
+``core.cache.codecs.AdaptiveCompressor``, so they are only known when that
+compressor is configured.
+
+Namespaces are normalized (``product:<id>`` becomes ``product:*``) to keep the number of series bounded.
+"""
+
+import atexit
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+from .settings import CACHE_METRICS, cache_key_prefix, is_redis_cache
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ("hits", "misses", "sets", "bytes")
+OPERATIONS = ("get", "set")
+
+NAMESPACES_KEY = "cachemetrics:namespaces"
+
+# Numeric ids and UUIDs (with or without dashes)
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8}(-?[0-9a-f]{4}){3}-?[0-9a-f]{12})$")
+
+_lock = threading.Lock()
+_buffer: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+_last_flush = time.monotonic()
+_capture = threading.local()
+
+
+def metric_namespace(namespace: str) -> str:
+    """Collapse id segments of a namespace, e.g. ``product:*``."""
+    return ":".join(
+        "*" if _ID_SEGMENT.match(segment) else segment
+        for segment in namespace.split(":")
+    )
+
+
+def _bucket(seconds: float) -> str:
+    bounds = CACHE_METRICS["BUCKETS_MS"]
+    index = bisect_left(bounds, seconds * 1000)
+    return str(bounds[index]) if index < len(bounds) else "inf"
+
+
+def _record(namespace: str, fields: dict[str, int]) -> None:
+    if CACHE_METRICS["ENABLED"]:
+        _buffer_fields(namespace, fields)
+
+
+def _buffer_fields(namespace: str, fields: dict[str, int]) -> None:
+    namespace = metric_namespace(namespace)
+    with _lock:
+        counters = _buffer[namespace]
+        for field, value in fields.items():
+            counters[field] += value
+        due = time.monotonic() - _last_flush >= CACHE_METRICS["FLUSH_INTERVAL"]
+    if due:
+        flush_metrics()
+
+
+def record_get(namespace: str, hit: bool, seconds: float) -> None:
+    """Count a cache read and its latency."""
+    _record(namespace, {"hits" if hit else "misses": 1, f"get:{_bucket(seconds)}": 1})
+
+
+def record_set(namespace: str, seconds: float, size: int = 0, count: int = 1) -> None:
+    """Count cache writes, their stored size and the latency of the call."""
+    _record(namespace, {"sets": count, "bytes": size, f"set:{_bucket(seconds)}": 1})
+
+
+def record_counter(namespace: str, field: str, count: int = 1) -> None:
+    """Count an event in the namespace's hash, flushed with the metrics.
+
+    Unlike reads and writes, events are counted even when ``ENABLED`` is off.
+    """
+    _buffer_fields(namespace, {field: count})
+
+
+def note_stored_size(size: int) -> None:
+    """Called by the cache compressor with the size of each stored value."""
+    if getattr(_capture, "active", False):
+        _capture.size += size
+
+
+@contextmanager
+def measure_get(namespace: str) -> Iterator[list[bool]]:
+    """Time a cache read; set ``result[0] = True`` on a hit.
+
+    Usage:
+        with measure_get("product") as result:
+            value = cache.get(key)
+            result[0] = value is not None
+    """
+    result = [False]
+    started = time.perf_counter()
+    yield result
+    record_get(namespace, result[0], time.perf_counter() - started)
+
+
+@contextmanager
+def measure_set(namespace: str, count: int = 1) -> Iterator[None]:
+    """Time a cache write of ``count`` values and record the bytes stored."""
+    _capture.active, _capture.size = True, 0
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _capture.active = False
+        record_set(namespace, time.perf_counter() - started, _capture.size, count)
+
+
+def _hash_key(namespace: str) -> str:
+    return cache_key_prefix(f"cachemetrics:{namespace}")
+
+
+def flush_metrics() -> None:
+    """Add the buffered counters of this process to the shared totals."""
+    global _last_flush  # noqa: PLW0603
+
+    with _lock:
+        pending = {ns: dict(counters) for ns, counters in _buffer.items()}
+        _buffer.clear()
+        _last_flush = time.monotonic()
+    if not pending:
+        return
+
+    try:
+        if is_redis_cache():
+            from django_redis import get_redis_connection
+
+            pipeline = get_redis_connection("default").pipeline(transaction=False)
+            make_key = cache.client.make_key
+            pipeline.sadd(make_key(cache_key_prefix(NAMESPACES_KEY)), *pending)
+            for namespace, counters in pending.items():
+                hash_key = make_key(_hash_key(namespace))
+                for field, value in counters.items():
+                    if value:
+                        pipeline.hincrby(hash_key, field, value)
+            pipeline.execute()
+        else:
+            # Not atomic across processes; good enough for local development
+            namespaces = cache.get(cache_key_prefix(NAMESPACES_KEY), set())
+            namespaces |= set(pending)
+            cache.set(cache_key_prefix(NAMESPACES_KEY), namespaces, None)
+            for namespace, counters in pending.items():
+                totals = cache.get(_hash_key(namespace), {})
+                for field, value in counters.items():
+                    totals[field] = totals.get(field, 0) + value
+                cache.set(_hash_key(namespace), totals, None)
+    except Exception as e:
+        logger.warning(f"Error flushing cache metrics: {e}")
+
+
+atexit.register(flush_metrics)
+
+
+def _read_totals(namespaces: list[str] | None = None) -> dict[str, dict[str, int]]:
+    if is_redis_cache():
+        from django_redis import get_redis_connection
+
+        connection = get_redis_connection("default")
+        make_key = cache.client.make_key
+        if namespaces is None:
+            members = connection.smembers(make_key(cache_key_prefix(NAMESPACES_KEY)))
+            namespaces = sorted(member.decode() for member in members)
+        pipeline = connection.pipeline(transaction=False)
+        for namespace in namespaces:
+            pipeline.hgetall(make_key(_hash_key(namespace)))
+        return {
+            namespace: {field.decode(): int(value) for field, value in raw.items()}
+            for namespace, raw in zip(namespaces, pipeline.execute(), strict=True)
+        }
+
+    if namespaces is None:
+        namespaces = sorted(cache.get(cache_key_prefix(NAMESPACES_KEY), set()))
+    return {namespace: cache.get(_hash_key(namespace), {}) for namespace in namespaces}
+
+
+def get_counters(namespaces: Iterable[str]) -> dict[str, dict[str, int]]:
+    """Aggregated counters of ``namespaces``, including this process's buffer."""
+    flush_metrics()
+    names = {namespace: metric_namespace(namespace) for namespace in namespaces}
+    totals = _read_totals(sorted(set(names.values())))
+    return {namespace: totals.get(name, {}) for namespace, name in names.items()}
+
+
+def reset_counters(namespaces: Iterable[str], fields: Iterable[str]) -> None:
+    """Drop ``fields`` from the buffered and aggregated counters of ``namespaces``."""
+    names = sorted({metric_namespace(namespace) for namespace in namespaces})
+    fields = list(fields)
+    if not names or not fields:
+        return
+    with _lock:
+        for name in names:
+            for field in fields:
+                _buffer.get(name, {}).pop(field, None)
+
+    if is_redis_cache():
+        from django_redis import get_redis_connection
+
+        pipeline = get_redis_connection("default").pipeline(transaction=False)
+        for name in names:
+            pipeline.hdel(cache.client.make_key(_hash_key(name)), *fields)
+        pipeline.execute()
+        return
+    for name, totals in _read_totals(names).items():
+        if totals:
+            for field in fields:
+                totals.pop(field, None)
+            cache.set(_hash_key(name), totals, None)
+
+
+def _percentile(histogram: dict[str, int], quantile: float) -> float | None:
+    """Upper bucket bound of a percentile, capped at the largest bound."""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    bounds = CACHE_METRICS["BUCKETS_MS"]
+    seen = 0
+    for bound in bounds:
+        seen += histogram.get(str(bound), 0)
+        if seen >= quantile * total:
+            return float(bound)
+    return float(bounds[-1])
+
+
+def get_cache_metrics() -> dict[str, dict[str, float | int | None]]:
+    """Totals, hit ratio and latency percentiles (ms) per namespace."""
+    flush_metrics()
+    report = {}
+    for namespace, totals in _read_totals().items():
+        reads = totals.get("hits", 0) + totals.get("misses", 0)
+        entry: dict[str, float | int | None] = {
+            counter: totals.get(counter, 0) for counter in COUNTERS
+        }
+        entry["hit_ratio"] = round(totals.get("hits", 0) / reads, 4) if reads else None
+        for operation in OPERATIONS:
+            histogram = {
+                field.split(":", 1)[1]: value
+                for field, value in totals.items()
+                if field.startswith(f"{operation}:")
+            }
+            entry[f"{operation}_p50_ms"] = _percentile(histogram, 0.5)
+            entry[f"{operation}_p99_ms"] = _percentile(histogram, 0.99)
+        report[namespace] = entry
+    return report
+
+
+def reset_cache_metrics() -> None:
+    """Drop buffered and aggregated metrics of every namespace."""
+    with _lock:
+        _buffer.clear()
+    namespaces = list(_read_totals())
+    cache.delete_many(
+        [_hash_key(namespace) for namespace in namespaces]
+        + [cache_key_prefix(NAMESPACES_KEY)]
+    )
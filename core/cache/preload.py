@@ -2,16 +2,29 @@ import logging
 from typing import Any
 
 from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
 from django.db.models import Count, Q
+from django.test import RequestFactory
+from django.urls import NoReverseMatch, resolve, reverse
 
+from .fingerprint import AUDIENCE_ANONYMOUS, AUDIENCE_CUSTOMER, AUDIENCE_STAFF
 from .versioning import VersionedCache
-from .warming import CacheWarmer
 
 logger = logging.getLogger(__name__)
 
+# URL namespace of the ninja API (see api.urls)
+API_NAMESPACE = "api_v1"
+
 
 class CachePreloader:
     """Manages preloading of common queries and data patterns.
+
+    Catalog pages are preloaded by replaying the GET requests of the
+    endpoints that serve them, so entries are rendered and keyed by
+    ``cached_response`` exactly as a real request would, and the next real
+    request is a cache hit. Requests are made as a (non-staff) customer,
+    the audience most catalog traffic comes from.
     Usage:
         preloader = CachePreloader()
         preloader.preload_all()
@@ -19,8 +32,9 @@ class CachePreloader:
         preloader.preload_products()
     """
 
-    def __init__(self):
-        self.warmer = CacheWarmer()
+    def __init__(self, category_pages: int = 50):
+        self.category_pages = category_pages
+        self.request_factory = RequestFactory()
 
     def preload_all(self):
         """Preload all common queries."""
@@ -39,50 +53,53 @@ class CachePreloader:
         logger.info("Completed cache preload for all common queries")
 
     def preload_products(self):
-        """Preload common product queries."""
+        """Preload the featured and newest published product lists."""
         try:
-            Product = apps.get_model("products", "Product")
-
-            # Common product querysets
-            querysets = [
-                ("featured_products", Product.objects.filter(featured=True)),
-                ("popular_products", Product.objects.filter(popular=True)),
-                ("new_arrivals", Product.objects.order_by("-created_at")[:12]),
-                ("on_sale", Product.objects.filter(on_sale=True)),
-            ]
-
-            # Warm these querysets
-            self.warmer.warm_querysets(querysets)
-
-            # Warm individual popular products
-            popular_products = Product.objects.filter(
-                Q(popular=True) | Q(featured=True)
-            )
-            self.warmer.warm_model(
-                Product,
-                queryset=popular_products,
-                timeout=3600,  # 1 hour
-            )
+            self.warm_endpoint("products/featured")
+            self.warm_endpoint("products?status=published&ordering=-created_at")
+            self.warm_endpoint("products")
 
             logger.info("Completed product cache preload")
 
         except Exception as e:
             logger.error(f"Error preloading products: {e}")
 
+    def preload_category_pages(self):
+        """Preload the first product page of the largest categories."""
+        try:
+            ProductCategory = apps.get_model("products", "ProductCategory")
+
+            published = Q(products__is_active=True, products__status="published")
+            category_ids = (
+                ProductCategory.objects.filter(is_active=True)
+                .annotate(product_count=Count("products", filter=published))
+                .filter(product_count__gt=0)
+                .order_by("-product_count")
+                .values_list("id", flat=True)[: self.category_pages]
+            )
+            for category_id in category_ids:
+                self.warm_route("get_products_by_category", category_id=category_id)
+
+            logger.info(f"Completed category page preload ({len(category_ids)})")
+
+        except Exception as e:
+            logger.error(f"Error preloading category pages: {e}")
+
     def preload_categories(self):
         """Preload category hierarchy and stats."""
         try:
-            Category = apps.get_model("products", "Category")
-            Product = apps.get_model("products", "Product")
+            ProductCategory = apps.get_model("products", "ProductCategory")
 
             # Get categories with product counts
-            categories = Category.objects.annotate(product_count=Count("products"))
+            categories = ProductCategory.objects.annotate(
+                product_count=Count("products")
+            ).only("id", "name", "slug", "parent_id")
 
             # Build category tree with stats
             category_tree = self._build_category_tree(categories)
 
-            # Cache the tree
-            versioned_cache = VersionedCache("categories")
+            # Cache the tree under the tag bumped on any category change
+            versioned_cache = VersionedCache("productcategory:tree")
             versioned_cache.set("category_tree", category_tree, timeout=3600)
 
             logger.info("Completed category cache preload")
@@ -90,59 +107,78 @@ class CachePreloader:
         except Exception as e:
             logger.error(f"Error preloading categories: {e}")
 
-    def preload_cart_data(self):
-        """Preload common cart-related queries."""
-        try:
-            Cart = apps.get_model("cart", "Cart")
-
-            # Preload active cart items with product data
-            active_carts = (
-                Cart.objects.filter(status="active")
-                .select_related("user")
-                .prefetch_related("items__product")
+    def warm_endpoint(
+        self,
+        path: str,
+        audience: str = AUDIENCE_CUSTOMER,
+        url_name: str | None = None,
+    ) -> bool:
+        """Fill the response cache of a GET endpoint by replaying it.
+
+        Args:
+            path: Path relative to the API root, with an optional query string
+            audience: Audience the response is cached for (anon/customer/staff)
+            url_name: Route the path must resolve to; nothing is replayed if
+                another endpoint with the same URL pattern shadows it
+
+        Returns:
+            Whether the endpoint answered with a 2xx response
+        """
+        request = self.request_factory.get(f"{self._api_root()}{path}")
+        if audience == AUDIENCE_ANONYMOUS:
+            request.user = AnonymousUser()
+        else:
+            request.user = get_user_model()(
+                username="cache-preloader", is_staff=audience == AUDIENCE_STAFF
             )
 
-            self.warmer.warm_querysets([("active_carts", active_carts)])
-
-            logger.info("Completed cart cache preload")
-
-        except Exception as e:
-            logger.error(f"Error preloading cart data: {e}")
-
-    def preload_user_data(self):
-        """Preload common user-related queries."""
+        match = resolve(request.path_info)
+        if url_name is not None and match.url_name != url_name:
+            logger.warning(
+                f"Preloading {path} resolved to {match.url_name}, not {url_name}"
+            )
+            return False
+        response = match.func(request, *match.args, **match.kwargs)
+        if not 200 <= response.status_code < 300:  # noqa: PLR2004
+            logger.warning(f"Preloading {path} returned {response.status_code}")
+            return False
+        return True
+
+    def warm_route(
+        self, url_name: str, audience: str = AUDIENCE_CUSTOMER, **kwargs: Any
+    ) -> bool:
+        """Replay the API endpoint named ``url_name`` (its view function name).
+
+        Usage:
+            preloader.warm_route("get_products_by_category", category_id=pk)
+        """
+        path = reverse(f"{API_NAMESPACE}:{url_name}", kwargs=kwargs)
+        return self.warm_endpoint(
+            path.removeprefix(self._api_root()), audience, url_name=url_name
+        )
+
+    @staticmethod
+    def _api_root() -> str:
         try:
-            User = apps.get_model("core", "User")
-
-            # Preload active users with profiles
-            active_users = User.objects.filter(is_active=True).select_related("profile")
-
-            self.warmer.warm_querysets([("active_users", active_users)])
-
-            logger.info("Completed user cache preload")
-
-        except Exception as e:
-            logger.error(f"Error preloading user data: {e}")
+            return reverse(f"{API_NAMESPACE}:api-root")
+        except NoReverseMatch:
+            return "/api/"
 
     def _build_category_tree(self, categories) -> list[dict[str, Any]]:
-        """Build a hierarchical category tree with stats."""
-
-        def build_node(category):
-            return {
+        """Build a hierarchical category tree with stats in one pass."""
+        children: dict[Any, list[dict[str, Any]]] = {}
+        roots = []
+        for category in categories:
+            node = {
                 "id": category.id,
                 "name": category.name,
                 "slug": category.slug,
                 "product_count": category.product_count,
-                "children": [
-                    build_node(child)
-                    for child in categories
-                    if child.parent_id == category.id
-                ],
+                "children": children.setdefault(category.id, []),
             }
+            if category.parent_id is None:
+                roots.append(node)
+            else:
+                children.setdefault(category.parent_id, []).append(node)
 
-        # Build tree starting from root categories
-        return [
-            build_node(category)
-            for category in categories
-            if category.parent_id is None
-        ]
+        return roots
@@ -0,0 +1,199 @@
+"""Rendered response caching for ninja-extra controller endpoints.
+
+Instead of pickling whatever a view returned (QuerySets, model instances,
+paginated dicts of ORM objects) the response is validated against the
+endpoint's declared response schema and rendered to JSON once, the same way
+ninja would, and the resulting bytes are cached together with the status and
+headers. A cache hit is returned as an ``HttpResponse`` which ninja passes
+through untouched, skipping both the ORM and Pydantic.
+"""
+
+import hashlib
+import json
+import logging
+from collections.abc import Callable
+from typing import Any, get_origin
+
+from django.http import HttpRequest, HttpResponse
+from ninja import Schema
+from ninja.constants import NOT_SET
+from ninja.operation import ResponseObject
+from ninja.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+# Headers worth replaying on a cache hit
+CACHED_HEADERS = ("Content-Type", "Content-Language", "Vary")
+
+_renderer = JSONRenderer()
+
+
+class RenderedResponse:
+    """Serialized response body with its status code and headers.
+
+    Usage:
+        rendered = RenderedResponse.from_http_response(response)
+        cache.set(key, rendered)
+        return cache.get(key).to_http_response()
+    """
+
+    __slots__ = ("content", "headers", "status")
+
+    def __init__(self, status: int, content: bytes, headers: dict[str, str]):
+        self.status = status
+        self.content = content
+        self.headers = headers
+
+    @classmethod
+    def from_http_response(cls, response: HttpResponse) -> "RenderedResponse":
+        headers = {
+            name: response[name] for name in CACHED_HEADERS if response.has_header(name)
+        }
+        return cls(response.status_code, bytes(response.content), headers)
+
+    def to_http_response(self) -> HttpResponse:
+        return HttpResponse(self.content, status=self.status, headers=self.headers)
+
+    def __len__(self) -> int:
+        return len(self.content)
+
+
+class EndpointSchema:
+    """Response models of one controller endpoint, built like ninja does."""
+
+    def __init__(
+        self,
+        response: Any,
+        *,
+        by_alias: bool = False,
+        exclude_unset: bool = False,
+        exclude_defaults: bool = False,
+        exclude_none: bool = False,
+    ):
+        self.dump_options = {
+            "by_alias": by_alias,
+            "exclude_unset": exclude_unset,
+            "exclude_defaults": exclude_defaults,
+            "exclude_none": exclude_none,
+        }
+        if response is NOT_SET:
+            self.models: dict[Any, Any] = {200: NOT_SET}
+        elif isinstance(response, dict):
+            self.models = {}
+            for codes, model in response.items():
+                if not isinstance(codes, (list, tuple, set)):
+                    codes = [codes]  # noqa: PLW2901
+                for code in codes:
+                    self.models[code] = _response_model(model)
+        else:
+            self.models = {200: _response_model(response)}
+        self._version: str | None = None
+
+    @classmethod
+    def from_route_params(cls, route_params: Any) -> "EndpointSchema":
+        return cls(
+            route_params.response,
+            by_alias=route_params.by_alias,
+            exclude_unset=route_params.exclude_unset,
+            exclude_defaults=route_params.exclude_defaults,
+            exclude_none=route_params.exclude_none,
+        )
+
+    @property
+    def version(self) -> str:
+        """Short hash of the declared response schemas.
+
+        Changing a schema changes the hash, so entries rendered with the old
+        schema are never served after a deploy.
+        """
+        if self._version is None:
+            schemas = {
+                str(code): model.model_json_schema()
+                if model not in (None, NOT_SET)
+                else repr(model)
+                for code, model in self.models.items()
+            }
+            digest = hashlib.sha256(
+                json.dumps(schemas, sort_keys=True, default=str).encode()
+            ).hexdigest()
+            self._version = digest[:12]
+        return self._version
+
+    def render(self, request: HttpRequest, result: Any) -> RenderedResponse:
+        """Render a view result to JSON bytes the way ninja would."""
+        status = 200
+        if len(self.models) == 1:
+            status = next(iter(self.models))
+        if isinstance(result, tuple) and len(result) == 2:  # noqa: PLR2004
+            status, result = result
+
+        model = self.models.get(status, self.models.get(Ellipsis, NOT_SET))
+        if model is None:
+            return RenderedResponse(status, b"", {})
+
+        if model is not NOT_SET:
+            if _is_page(result) and _declares_list(model):
+                # paginate_response wraps the declared list in an envelope
+                result = {
+                    "results": self._dump(model, request, status, result["results"]),
+                    "pagination": result["pagination"],
+                }
+            else:
+                result = self._dump(model, request, status, result)
+
+        content = _renderer.render(request, result, response_status=status)
+        if isinstance(content, str):
+            content = content.encode()
+        return RenderedResponse(status, content, {"Content-Type": _renderer.media_type})
+
+    def _dump(self, model: Any, request: HttpRequest, status: int, result: Any) -> Any:
+        validated = model.model_validate(
+            ResponseObject(result),
+            context={"request": request, "response_status": status},
+        )
+        return validated.model_dump(**self.dump_options)["response"]
+
+
+def _is_page(result: Any) -> bool:
+    """Whether ``result`` is the envelope built by ``paginate_response``."""
+    return isinstance(result, dict) and result.keys() == {"results", "pagination"}
+
+
+def _declares_list(model: Any) -> bool:
+    annotation = model.model_fields["response"].annotation
+    return get_origin(annotation) in (list, tuple, set)
+
+
+def _response_model(model: Any) -> Any:
+    if model is None:
+        return None
+    attrs = {"__annotations__": {"response": model}}
+    return type("NinjaResponseSchema", (Schema,), attrs)
+
+
+_endpoint_schemas: dict[tuple[type, str], EndpointSchema | None] = {}
+
+
+def get_endpoint_schema(controller: Any, func: Callable) -> EndpointSchema | None:
+    """Find the response schema declared with ``@http_get`` for ``func``.
+
+    Returns ``None`` when ``func`` is not a ninja-extra controller route.
+    """
+    if controller is None:
+        return None
+
+    cache_key = (type(controller), func.__name__)
+    if cache_key not in _endpoint_schemas:
+        schema = None
+        try:
+            from ninja_extra.constants import ROUTE_OBJECT
+            from ninja_extra.reflect import reflect
+
+            method = getattr(type(controller), func.__name__, None)
+            route = reflect.get_metadata(ROUTE_OBJECT, method) if method else None
+            if route is not None:
+                schema = EndpointSchema.from_route_params(route.route_params)
+        except Exception as e:
+            logger.warning(f"Could not resolve response schema of {func.__name__}: {e}")
+        _endpoint_schemas[cache_key] = schema
+    return _endpoint_schemas[cache_key]
@@ -4,6 +4,119 @@ from django.core.cache.backends.base import DEFAULT_TIMEOUT
 
 CACHE_TTL = getattr(settings, "CACHE_TTL", DEFAULT_TIMEOUT)
 
+CACHE_L1 = {
+    "ENABLED": True,
+    "MAX_ENTRIES": 2048,
+    "TTL": 30,
+    "CHANNEL": "ecommerce:cache:invalidate",
+    **getattr(settings, "CACHE_L1", {}),
+}
+
+# Single-flight recomputation for cached views (see core.cache.stampede)
+CACHE_STAMPEDE = {
+    "LOCK_TIMEOUT": 10,
+    "WAIT_TIMEOUT": 2.0,
+    "POLL_INTERVAL": 0.05,
+    "STALE_TTL": 60,
+    "SWR_STALE_TTL": 3600,
+    "XFETCH_BETA": 0.0,
+    **getattr(settings, "CACHE_STAMPEDE", {}),
+}
+
+# Normalization of request fingerprints (see core.cache.fingerprint)
+CACHE_FINGERPRINT = {
+    # Query parameters that never change a response
+    "IGNORED_PARAMS": ["_", "fbclid", "gclid"],
+    "IGNORED_PREFIXES": ["utm_"],
+    # Values equal to the endpoint default, e.g. ?page=1
+    "DEFAULT_VALUES": {"page": "1"},
+    "LENGTH": 32,
+    **getattr(settings, "CACHE_FINGERPRINT", {}),
+}
+
+# Serialization and compression of cached values (see core.cache.codecs)
+CACHE_SERIALIZATION = {
+    # pickle, msgpack or orjson
+    "DEFAULT": "pickle",
+    # Namespace prefix -> serializer, e.g. {"productcategory": "orjson"}
+    "NAMESPACES": {},
+    # zlib, lz4, zstd or None
+    "COMPRESSOR": "zlib",
+    # Values smaller than this (in bytes) are stored uncompressed
+    "COMPRESS_MIN_LENGTH": 1024,
+    **getattr(settings, "CACHE_SERIALIZATION", {}),
+}
+
+# Batched deletes of tag sets and SCAN patterns (see core.cache.tags)
+CACHE_PURGE = {
+    # SCAN COUNT hint and keys deleted per round trip
+    "BATCH_SIZE": 500,
+    # Seconds to sleep between batches, to spread the load on Redis
+    "THROTTLE": 0.0,
+    **getattr(settings, "CACHE_PURGE", {}),
+}
+
+# Per-namespace hit/miss and latency metrics (see core.cache.metrics)
+CACHE_METRICS = {
+    "ENABLED": True,
+    # Seconds between flushes of the in-process counters to Redis
+    "FLUSH_INTERVAL": 10,
+    # Upper bounds of the latency histogram buckets, in milliseconds
+    "BUCKETS_MS": [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000],
+    **getattr(settings, "CACHE_METRICS", {}),
+}
+
+# Background cache warmup when a web worker boots (see core.cache.warmup)
+CACHE_WARMUP = {
+    "ENABLED": False,
+    # Seconds after which the worker reports ready even if still warming
+    "TIMEOUT": 120,
+    # Built-in steps (core.cache.warmup.WARMUP_STEPS) or dotted callables,
+    # run after CachePreloader.preload_all()
+    "HOT_KEYS": ["top_products", "category_tree", "featured_products"],
+    "TOP_PRODUCTS": 200,
+    "HOT_KEY_TIMEOUT": 3600,
+    # Workers booting this long after a finished warmup skip their own
+    "MARKER_TTL": 300,
+    "POLL_INTERVAL": 1.0,
+    **getattr(settings, "CACHE_WARMUP", {}),
+}
+
+# Write-through refresh of invalidated entries (see core.cache.writethrough)
+CACHE_WRITE_THROUGH = {
+    "ENABLED": False,
+    # Audiences (anon/customer/staff) whose detail responses are refreshed
+    "AUDIENCES": ["customer"],
+    # Timeout of the refreshed row entries, in seconds
+    "TIMEOUT": 3600,
+    # Seconds to wait before refreshing, e.g. to let read replicas catch up
+    "COUNTDOWN": 0,
+    **getattr(settings, "CACHE_WRITE_THROUGH", {}),
+}
+
+# Apps whose models drive cache invalidation (see core.cache.invalidation)
+CACHE_INVALIDATION_APPS = getattr(
+    settings, "CACHE_INVALIDATION_APPS", ["core", "products", "cart", "orders"]
+)
+
+
+def is_redis_cache() -> bool:
+    """Check whether the default cache is backed by django-redis."""
+    return settings.CACHES["default"]["BACKEND"].startswith("django_redis")
+
+
+def is_sharded_cache() -> bool:
+    """Check whether the default cache spreads keys over several Redis nodes.
+
+    Raw single-connection commands (pipelines over many keys, Redis sets)
+    only see one node then, so callers use the cache API or every node.
+    """
+    if not is_redis_cache():
+        return False
+    from django_redis.client import ShardClient
+
+    return isinstance(cache.client, ShardClient)
+
 
 def cache_key_prefix(key: str) -> str:
     """Generate a cache key with the appropriate prefix."""
@@ -17,9 +130,14 @@ def get_cached_data(key: str, default=None):
     return cache.get(cache_key_prefix(key), default)
 
 
-def set_cached_data(key: str, value, timeout=CACHE_TTL):
-    """Set data in cache with proper key prefix."""
-    return cache.set(cache_key_prefix(key), value, timeout)
+def set_cached_data(key: str, value, timeout=CACHE_TTL, tags=None):
+    """Set data in cache with proper key prefix, optionally under tags."""
+    result = cache.set(cache_key_prefix(key), value, timeout)
+    if tags:
+        from .tags import tag_keys
+
+        tag_keys([cache_key_prefix(key)], tags, timeout)
+    return result
 
 
 def delete_cached_data(key: str):
@@ -27,9 +145,14 @@ def delete_cached_data(key: str):
     return cache.delete(cache_key_prefix(key))
 
 
-def clear_cache_pattern(pattern: str):
-    """Clear all cache keys matching a pattern."""
-    prefix = settings.CACHES["default"].get("KEY_PREFIX", "")
-    pattern = f"{prefix}:{pattern}" if prefix else pattern
-    keys = cache.keys(pattern)
-    return cache.delete_many(keys)
+def clear_cache_pattern(
+    pattern: str, batch_size: int | None = None, throttle: float | None = None
+) -> int:
+    """Clear all cache keys matching a pattern.
+
+    Keys are found with an incremental SCAN and deleted in batches (see
+    core.cache.tags), never with a blocking KEYS.
+    """
+    from .tags import purge_pattern
+
+    return purge_pattern(cache_key_prefix(pattern), batch_size, throttle)
@@ -0,0 +1,280 @@
+"""Consistent-hash sharding of the default cache over several Redis nodes.
+
+Configured by listing several URLs as the cache ``LOCATION`` together with
+``CLIENT_CLASS = "core.cache.sharding.ShardedRedisClient"`` (see
+``REDIS_CACHE_URLS`` in api/settings/common.py). Every key lives on the
+node that owns it on a hash ring of virtual nodes, so adding or removing a
+node only moves about ``1/N`` of the keys. A ``{hash tag}`` in a key pins
+it to the node owning the tag, as with Redis Cluster.
+
+Namespace version keys (``<CACHE_KEY_PREFIX>:version:<namespace>``) are read
+on every versioned cache access, so instead of living on one node they are
+written to all of them. Each process reads them from its own preferred node
+and falls back to the ring owner on a miss or connection error, so no
+single node is hot and losing a node does not lose the versions.
+
+``get_many``, ``set_many`` and ``delete_many`` group keys by node and send
+one ``MGET`` / pipeline / ``DEL`` per node. Raw connections obtained with
+``get_redis_connection("default")`` (pub/sub, metrics) point at the first
+node; code that needs every node uses ``node_connections()``.
+
+To try it locally, start a few ``redis-server`` instances (``make
+redis-shards``) and set ``REDIS_CACHE_URLS``.
+"""
+
+import bisect
+import hashlib
+import logging
+import os
+from collections.abc import Iterable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.client import DefaultClient, ShardClient
+from django_redis.util import CacheKey
+
+logger = logging.getLogger(__name__)
+
+# Virtual nodes per Redis node on the hash ring
+DEFAULT_VNODES = 160
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class ConsistentHashRing:
+    """Hash ring mapping keys to node names through virtual nodes.
+
+    Usage:
+        ring = ConsistentHashRing(["redis://a:6379/0", "redis://b:6379/0"])
+        ring.get_node("ecommerce:1:product:42")
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = DEFAULT_VNODES):
+        self.vnodes = vnodes
+        self.nodes: list[str] = []
+        self._points: list[int] = []
+        self._owners: list[str] = []
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node: str) -> None:
+        self.nodes.append(node)
+        points = sorted(
+            [*zip(self._points, self._owners, strict=True)]
+            + [(_hash(f"{node}#{index}"), node) for index in range(self.vnodes)]
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [owner for _, owner in points]
+
+    def remove_node(self, node: str) -> None:
+        self.nodes.remove(node)
+        points = [
+            (point, owner)
+            for point, owner in zip(self._points, self._owners, strict=True)
+            if owner != node
+        ]
+        self._points = [point for point, _ in points]
+        self._owners = [owner for _, owner in points]
+
+    def get_node(self, key: str) -> str:
+        """Node owning ``key``: the first virtual node clockwise of its hash."""
+        if not self._points:
+            raise ValueError("The hash ring has no nodes")
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+    def __call__(self, key: str) -> str:
+        return self.get_node(key)
+
+
+class ShardedRedisClient(ShardClient):
+    """django-redis client spreading keys over several nodes.
+
+    Extra ``OPTIONS``:
+        VNODES: Virtual nodes per Redis node (default 160)
+        REPLICATED_PREFIXES: Key prefixes written to every node (default the
+            namespace version keys)
+    """
+
+    def __init__(self, server, params, backend):
+        super().__init__(server, params, backend)
+        self._ring = ConsistentHashRing(
+            self._server, self._options.get("VNODES", DEFAULT_VNODES)
+        )
+        self._replicated_prefixes = tuple(
+            self._options.get(
+                "REPLICATED_PREFIXES", [f"{settings.CACHE_KEY_PREFIX}:version:"]
+            )
+        )
+        # Spread reads of replicated keys over the nodes, one node per process
+        self._preferred_node = self._server[os.getpid() % len(self._server)]
+
+    def get_client(self, write: bool = True, tried=None, key=None):
+        """Raw connection of the node owning ``key``, else of the first node."""
+        if key is not None:
+            return self.get_server(self.make_key(key))
+        return self._serverdict[self._server[0]]
+
+    def node_connections(self) -> list:
+        """Raw connections of every node, in configuration order."""
+        return [self._serverdict[name] for name in self._server]
+
+    def is_replicated(self, key: Any) -> bool:
+        original = self.reverse_key(key) if isinstance(key, CacheKey) else str(key)
+        return original.startswith(self._replicated_prefixes)
+
+    def _group_by_node(self, keys: Iterable[Any], version=None) -> dict[str, list]:
+        groups: dict[str, list] = {}
+        for key in keys:
+            made_key = self.make_key(key, version=version)
+            groups.setdefault(self.get_server_name(made_key), []).append(key)
+        return groups
+
+    def _replica_order(self, made_key: CacheKey) -> list[str]:
+        owner = self.get_server_name(made_key)
+        if self._preferred_node == owner:
+            return [owner]
+        return [self._preferred_node, owner]
+
+    def get(self, key, default=None, version=None, client=None):
+        if client is not None:
+            return DefaultClient.get(self, key, default, version, client)
+
+        made_key = self.make_key(key, version=version)
+        if not self.is_replicated(made_key):
+            return DefaultClient.get(
+                self, made_key, default, version, self.get_server(made_key)
+            )
+
+        nodes = self._replica_order(made_key)
+        for node in nodes[:-1]:
+            try:
+                value = DefaultClient.get(
+                    self, made_key, None, version, self._serverdict[node]
+                )
+            except Exception as e:
+                logger.warning(f"Replica {node} unavailable for {made_key}: {e}")
+                continue
+            if value is not None:
+                return value
+        return DefaultClient.get(
+            self, made_key, default, version, self._serverdict[nodes[-1]]
+        )
+
+    def set(
+        self,
+        key,
+        value,
+        timeout=DEFAULT_TIMEOUT,
+        version=None,
+        client=None,
+        nx=False,
+        xx=False,
+    ):
+        if client is not None:
+            return DefaultClient.set(
+                self, key, value, timeout, version, client, nx=nx, xx=xx
+            )
+
+        made_key = self.make_key(key, version=version)
+        owner = self.get_server(made_key)
+        result = DefaultClient.set(
+            self, made_key, value, timeout, version, owner, nx=nx, xx=xx
+        )
+        if result and self.is_replicated(made_key):
+            self._replicate(made_key, value, timeout, version, owner)
+        return result
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        # The owner node decides which concurrent add wins
+        return self.set(key, value, timeout, version, client, nx=True)
+
+    def _replicate(self, made_key, value, timeout, version, owner) -> None:
+        for replica in self.node_connections():
+            if replica is owner:
+                continue
+            try:
+                DefaultClient.set(self, made_key, value, timeout, version, replica)
+            except Exception as e:
+                logger.warning(f"Failed to replicate {made_key}: {e}")
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        if client is not None:
+            return DefaultClient.delete(self, key, version, prefix, client)
+
+        made_key = self.make_key(key, version=version, prefix=prefix)
+        if not self.is_replicated(made_key):
+            return DefaultClient.delete(
+                self, made_key, version, prefix, self.get_server(made_key)
+            )
+        return max(
+            DefaultClient.delete(self, made_key, version, prefix, node)
+            for node in self.node_connections()
+        )
+
+    def get_many(self, keys, version=None, client=None):
+        """One MGET per node; replicated keys are read one by one."""
+        recovered = {}
+        plain = []
+        for key in keys:
+            if self.is_replicated(key):
+                value = self.get(key, version=version)
+                if value is not None:
+                    recovered[key] = value
+            else:
+                plain.append(key)
+        for node, node_keys in self._group_by_node(plain, version).items():
+            recovered.update(
+                DefaultClient.get_many(
+                    self, node_keys, version, self._serverdict[node]
+                )
+            )
+        return recovered
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        """One pipeline per node; replicated keys go to every node."""
+        groups = self._group_by_node(data, version)
+        for key in data:
+            if self.is_replicated(key):
+                for node in self._server:
+                    if key not in groups.setdefault(node, []):
+                        groups[node].append(key)
+        for node, node_keys in groups.items():
+            DefaultClient.set_many(
+                self,
+                {key: data[key] for key in node_keys},
+                timeout,
+                version,
+                self._serverdict[node],
+            )
+
+    def delete_many(self, keys, version=None, client=None):
+        """One DEL per node; replicated keys are deleted from every node."""
+        keys = list(keys)
+        groups = self._group_by_node(keys, version)
+        for key in keys:
+            if self.is_replicated(key):
+                for node in self._server:
+                    if key not in groups.setdefault(node, []):
+                        groups[node].append(key)
+        return sum(
+            DefaultClient.delete_many(self, node_keys, version, self._serverdict[node])
+            for node, node_keys in groups.items()
+            if node_keys
+        )
+
+
+def node_connections() -> list:
+    """Raw connections of every Redis node behind the default cache."""
+    if isinstance(cache.client, ShardedRedisClient):
+        return cache.client.node_connections()
+    if isinstance(cache.client, ShardClient):
+        return list(cache.client._serverdict.values())
+
+    from django_redis import get_redis_connection
+
+    return [get_redis_connection("default")]
@@ -1,78 +1,85 @@
 import logging
 
-from django.apps import apps
-from django.db.models.signals import post_delete, post_save
-from django.dispatch import receiver
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
-from .versioning import VersionedCache
+from .invalidation import get_invalidation_planner, schedule_invalidation
 
 logger = logging.getLogger(__name__)
 
+M2M_ACTIONS = {"post_add", "post_remove", "post_clear"}
+
 
 def register_cache_signals():
-    """Register cache invalidation signals for all models."""
-    for app_config in apps.get_app_configs():
-        for model in app_config.get_models():
-            if not model._meta.abstract:
-                # Register save signal
-                post_save.connect(
-                    invalidate_model_cache,
-                    sender=model,
-                    dispatch_uid=f"cache_invalidate_save_{model._meta.model_name}",
-                )
-                # Register delete signal
-                post_delete.connect(
-                    invalidate_model_cache,
-                    sender=model,
-                    dispatch_uid=f"cache_invalidate_delete_{model._meta.model_name}",
-                )
-                logger.info(f"Registered cache signals for {model._meta.model_name}")
-
-
-@receiver([post_save, post_delete])
-def invalidate_model_cache(sender, instance, **kwargs):
-    """Invalidate cache when a model instance is saved or deleted."""
+    """Register cache invalidation signals for tracked models.
+
+    Builds the invalidation planner once, then connects every tracked model
+    and the through tables of its many-to-many fields.
+    """
+    planner = get_invalidation_planner()
+
+    for model in planner.models:
+        if model._meta.abstract:
+            continue
+
+        label = model._meta.label_lower
+        # Register save signal
+        post_save.connect(
+            invalidate_model_cache,
+            sender=model,
+            dispatch_uid=f"cache_invalidate_save_{label}",
+        )
+        # Register delete signal
+        post_delete.connect(
+            invalidate_model_cache,
+            sender=model,
+            dispatch_uid=f"cache_invalidate_delete_{label}",
+        )
+        # Register many-to-many changes (e.g. adding a product to a tag)
+        for field in model._meta.local_many_to_many:
+            through = field.remote_field.through
+            m2m_changed.connect(
+                invalidate_m2m_cache,
+                sender=through,
+                dispatch_uid=f"cache_invalidate_m2m_{through._meta.label_lower}",
+            )
+        logger.debug(f"Registered cache signals for {label}")
+
+
+def invalidate_model_cache(sender, instance, using=None, **kwargs):
+    """Invalidate the cache entries that depend on a saved or deleted instance.
+
+    Inside a transaction the invalidation is deferred until commit.
+    """
     try:
-        # Get the model namespace
-        namespace = sender._meta.model_name
-
-        # Create versioned cache instance
-        versioned_cache = VersionedCache(namespace)
-
-        # Invalidate all cache for this model
-        versioned_cache.invalidate_all()
-
-        # Log the invalidation
-        logger.info(f"Invalidated cache for {namespace} - Instance ID: {instance.pk}")
+        plan = get_invalidation_planner().plan(sender, instance)
+        count = schedule_invalidation(plan, using)
 
-        # Handle related models if needed
-        handle_related_models(sender, instance)
+        logger.debug(
+            f"Planned {len(plan)} cache entries for {sender._meta.model_name} - "
+            f"Instance ID: {instance.pk}, invalidated now: {count}"
+        )
 
     except Exception as e:
         logger.error(f"Error invalidating cache for {sender._meta.model_name}: {e}")
 
 
-def handle_related_models(model, instance):
-    """Invalidate cache for related models."""
+def invalidate_m2m_cache(
+    sender, instance, action, model, pk_set=None, using=None, **kwargs
+):
+    """Invalidate both sides of a many-to-many change."""
+    if action not in M2M_ACTIONS:
+        return
+
     try:
-        # Get all related fields
-        for field in model._meta.get_fields():
-            # Handle forward relationships
-            if hasattr(field, "related_model") and field.related_model:
-                related_namespace = field.related_model._meta.model_name
-                versioned_cache = VersionedCache(related_namespace)
-                versioned_cache.invalidate_all()
-                logger.info(f"Invalidated related cache for {related_namespace}")
-
-            # Handle reverse relationships
-            if hasattr(field, "remote_field") and field.remote_field:
-                if hasattr(field.remote_field, "model"):
-                    remote_namespace = field.remote_field.model._meta.model_name
-                    versioned_cache = VersionedCache(remote_namespace)
-                    versioned_cache.invalidate_all()
-                    logger.info(
-                        f"Invalidated reverse related cache for {remote_namespace}"
-                    )
+        planner = get_invalidation_planner()
+        plan = planner.plan(type(instance), instance)
+        plan.update(planner.plan_for_pks(model, pk_set))
+        count = schedule_invalidation(plan, using)
+
+        logger.debug(
+            f"Planned {len(plan)} cache entries for {sender._meta.model_name} "
+            f"{action} - Instance ID: {instance.pk}, invalidated now: {count}"
+        )
 
     except Exception as e:
-        logger.error(f"Error handling related models for {model._meta.model_name}: {e}")
+        logger.error(f"Error invalidating cache for {sender._meta.model_name}: {e}")
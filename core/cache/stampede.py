@@ -0,0 +1,285 @@
+"""Stampede protection for cached responses.
+
+When a hot entry expires every worker that misses at the same moment would
+otherwise rerun the same expensive query. ``get_or_compute`` makes sure only
+one of them does:
+
+- Entries are stored with a soft expiry and kept for an extra stale window.
+- The worker that wins a short lock recomputes; the others serve the stale
+  value, or wait briefly for the winner when there is nothing to serve.
+- Optionally, entries are recomputed a little before they expire, with a
+  probability that grows as expiry approaches (XFetch), so the lock is
+  rarely contended at all.
+- With a ``refresh`` callback (stale-while-revalidate) the lock winner does
+  not recompute inline either: it schedules a background refresh and serves
+  the stale value like everyone else.
+- Inside ``force_recompute()`` cached values are ignored and overwritten,
+  which is how write-through refreshes replay an endpoint after a change.
+
+Recomputations and fallbacks are counted per key prefix in the buffered
+cache metrics (see core.cache.metrics), so recording one costs no Redis
+round trip, and can be read with ``get_stampede_stats()``.
+"""
+
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from django.core.cache import cache
+
+from .metrics import (
+    get_counters,
+    measure_get,
+    measure_set,
+    record_counter,
+    reset_counters,
+)
+from .settings import CACHE_STAMPEDE
+
+logger = logging.getLogger(__name__)
+
+STAMPEDE_EVENTS = (
+    "recompute",
+    "early_recompute",
+    "stale_served",
+    "waited",
+    "lock_timeout",
+    "background_refresh",
+)
+
+# Key prefixes that use single-flight caching, registered at decoration time
+_tracked_prefixes: set[str] = set()
+
+_forced = threading.local()
+
+
+class CacheEnvelope:
+    """Cached value together with its soft expiry and recompute cost."""
+
+    __slots__ = ("delta", "expires_at", "value")
+
+    def __init__(self, value: Any, expires_at: float, delta: float):
+        self.value = value
+        self.expires_at = expires_at
+        self.delta = delta
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def should_recompute_early(self, now: float, beta: float) -> bool:
+        """XFetch: recompute early with probability rising towards expiry."""
+        if beta <= 0:
+            return False
+        # -log(random()) is exponentially distributed; 1 - random() avoids log(0)
+        jitter = -math.log(1 - random.random())
+        return now + self.delta * beta * jitter >= self.expires_at
+
+
+def track_prefix(prefix: str) -> None:
+    """Register a key prefix so its counters show up in the stats."""
+    _tracked_prefixes.add(prefix)
+
+
+def record_event(prefix: str, event: str) -> None:
+    """Count a stampede event in the prefix's buffered cache metrics."""
+    record_counter(prefix, f"stampede:{event}")
+
+
+def get_stampede_stats() -> dict[str, dict[str, int]]:
+    """Return the recompute and fallback counters for every tracked prefix."""
+    totals = get_counters(sorted(_tracked_prefixes))
+    return {
+        prefix: {
+            event: int(counters.get(f"stampede:{event}", 0))
+            for event in STAMPEDE_EVENTS
+        }
+        for prefix, counters in totals.items()
+    }
+
+
+def reset_stampede_stats() -> None:
+    """Reset the counters for every tracked prefix."""
+    reset_counters(
+        _tracked_prefixes, [f"stampede:{event}" for event in STAMPEDE_EVENTS]
+    )
+
+
+@contextmanager
+def force_recompute() -> Iterator[None]:
+    """Recompute and overwrite every entry read through ``get_or_compute``.
+
+    Entries whose new value is not cacheable (e.g. a 404 for a deactivated
+    product) are deleted instead.
+    Usage:
+        with force_recompute():
+            preloader.warm_endpoint(f"products/{product_id}")
+    """
+    previous = getattr(_forced, "active", False)
+    _forced.active = True
+    try:
+        yield
+    finally:
+        _forced.active = previous
+
+
+def _lock_key(key: str) -> str:
+    return f"{key}:lock"
+
+
+def _acquire_lock(key: str, lock_timeout: int) -> str | None:
+    token = uuid.uuid4().hex
+    return token if cache.add(_lock_key(key), token, lock_timeout) else None
+
+
+def release_lock(key: str, token: str) -> None:
+    """Release the recompute lock of ``key`` if ``token`` still owns it."""
+    # Only release our own lock; a slow recompute may have outlived it
+    if cache.get(_lock_key(key)) == token:
+        cache.delete(_lock_key(key))
+
+
+def store(
+    key: str,
+    value: Any,
+    timeout: int | None,
+    *,
+    delta: float = 0.0,
+    stale_ttl: int | None = None,
+) -> None:
+    """Store ``value`` in the envelope format read by ``get_or_compute``."""
+    if stale_ttl is None:
+        stale_ttl = CACHE_STAMPEDE["STALE_TTL"]
+
+    if timeout is None:
+        expires_at, hard_timeout = math.inf, None
+    else:
+        expires_at, hard_timeout = time.time() + timeout, timeout + stale_ttl
+    cache.set(key, CacheEnvelope(value, expires_at, delta), hard_timeout)
+
+
+def get_or_compute(
+    key: str,
+    compute: Callable[[], Any],
+    timeout: int | None,
+    *,
+    prefix: str = "default",
+    cacheable: Callable[[Any], bool] | None = None,
+    beta: float | None = None,
+    stale_ttl: int | None = None,
+    lock_timeout: int | None = None,
+    wait_timeout: float | None = None,
+    refresh: Callable[[str], None] | None = None,
+    namespace: str | None = None,
+) -> Any:
+    """Return the cached value for ``key``, recomputing it at most once.
+
+    Args:
+        key: Full cache key of the entry
+        compute: Callable producing the value on a miss
+        timeout: Seconds the value is considered fresh
+        prefix: Counter group for ``get_stampede_stats()``
+        cacheable: Predicate deciding whether a computed value is stored
+        beta: XFetch aggressiveness; 0 disables early recomputation
+        stale_ttl: Seconds a value may be served after it expires
+        lock_timeout: Seconds the recompute lock is held at most
+        wait_timeout: Seconds to wait for another worker when nothing is cached
+        refresh: Schedules a background recompute of a stale entry. It receives
+            the lock token and must release the lock with ``release_lock``
+            once the new value is stored.
+        namespace: Metrics namespace of the entry, defaults to ``prefix``
+    """
+    if beta is None:
+        beta = CACHE_STAMPEDE["XFETCH_BETA"]
+    if stale_ttl is None:
+        stale_ttl = CACHE_STAMPEDE["STALE_TTL"]
+    if lock_timeout is None:
+        lock_timeout = CACHE_STAMPEDE["LOCK_TIMEOUT"]
+    if wait_timeout is None:
+        wait_timeout = CACHE_STAMPEDE["WAIT_TIMEOUT"]
+
+    namespace = namespace or prefix
+
+    if getattr(_forced, "active", False):
+        return _recompute(key, compute, timeout, namespace, cacheable, stale_ttl)
+
+    now = time.time()
+    with measure_get(namespace) as hit:
+        envelope = cache.get(key)
+        if not isinstance(envelope, CacheEnvelope):
+            envelope = None
+        hit[0] = envelope is not None
+
+    early = False
+    if envelope is not None and envelope.is_fresh(now):
+        if not envelope.should_recompute_early(now, beta):
+            return envelope.value
+        early = True
+
+    token = _acquire_lock(key, lock_timeout)
+    if token is not None and envelope is not None and refresh is not None:
+        try:
+            refresh(token)
+        except Exception as e:
+            logger.warning(f"Error scheduling background refresh of {key}: {e}")
+        else:
+            record_event(prefix, "background_refresh")
+            return envelope.value
+
+    if token is None:
+        if envelope is not None:
+            # Someone else is recomputing; the current value is good enough
+            if not early:
+                record_event(prefix, "stale_served")
+            return envelope.value
+
+        deadline = now + wait_timeout
+        while time.time() < deadline:
+            time.sleep(CACHE_STAMPEDE["POLL_INTERVAL"])
+            envelope = cache.get(key)
+            if isinstance(envelope, CacheEnvelope):
+                record_event(prefix, "waited")
+                return envelope.value
+        # The lock holder is too slow (or died); compute without the lock
+        record_event(prefix, "lock_timeout")
+
+    try:
+        started = time.time()
+        value = compute()
+        finished = time.time()
+        record_event(prefix, "early_recompute" if early else "recompute")
+
+        if cacheable is None or cacheable(value):
+            with measure_set(namespace):
+                store(
+                    key, value, timeout, delta=finished - started, stale_ttl=stale_ttl
+                )
+        return value
+    finally:
+        if token is not None:
+            release_lock(key, token)
+
+
+def _recompute(
+    key: str,
+    compute: Callable[[], Any],
+    timeout: int | None,
+    namespace: str,
+    cacheable: Callable[[Any], bool] | None,
+    stale_ttl: int,
+) -> Any:
+    """Compute and store ``key`` unconditionally (see ``force_recompute``)."""
+    started = time.time()
+    value = compute()
+    finished = time.time()
+    if cacheable is None or cacheable(value):
+        with measure_set(namespace):
+            store(key, value, timeout, delta=finished - started, stale_ttl=stale_ttl)
+    else:
+        cache.delete(key)
+    return value
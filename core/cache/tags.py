@@ -0,0 +1,165 @@
+"""Tag-set invalidation and non-blocking pattern deletes.
+
+``KEYS`` walks the whole keyspace in one blocking call, which stalls every
+client of a shared Redis. Instead:
+
+- cache keys can be registered under one or more tags, each a Redis set of
+  the full keys tagged with it. ``invalidate_tags`` deletes exactly those
+  members in batches, then the set itself;
+- ad-hoc patterns are deleted incrementally with ``SCAN``, a batch at a
+  time, optionally sleeping between batches to bound the load on Redis.
+
+Tag sets expire with the longest-lived key registered under them, so they
+never outgrow the keys they track by much. Without Redis (local
+development) or with a sharded cache, tags are kept as plain cache entries;
+pattern deletes need Redis and scan every node of a sharded cache.
+"""
+
+import logging
+import time
+from collections.abc import Iterable, Iterator
+
+from django.core.cache import cache
+
+from .settings import CACHE_PURGE, is_redis_cache, is_sharded_cache
+
+logger = logging.getLogger(__name__)
+
+TAG_SET_PREFIX = "tagset"
+
+
+def tag_set_key(tag: str) -> str:
+    """Cache key of the set holding the keys tagged with ``tag``."""
+    return f"{TAG_SET_PREFIX}:{tag}"
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def tag_keys(keys: Iterable[str], tags: Iterable[str], timeout: int | None) -> None:
+    """Register cache keys under tags.
+
+    Args:
+        keys: Keys as passed to ``cache.set``
+        tags: Tags to register the keys under
+        timeout: Lifetime of the keys; tag sets are kept at least this long
+    """
+    keys, tags = list(keys), list(tags)
+    if not keys or not tags:
+        return
+
+    if not is_redis_cache() or is_sharded_cache():
+        for tag in tags:
+            members = cache.get(tag_set_key(tag), set())
+            cache.set(tag_set_key(tag), members | set(keys), timeout)
+        return
+
+    try:
+        members = [cache.client.make_key(key) for key in keys]
+        pipeline = _redis().pipeline(transaction=False)
+        for tag in tags:
+            set_key = cache.client.make_key(tag_set_key(tag))
+            pipeline.sadd(set_key, *members)
+            if timeout is None:
+                pipeline.persist(set_key)
+            else:
+                # NX gives a new set an expiry, GT only ever extends it
+                pipeline.expire(set_key, timeout, nx=True)
+                pipeline.expire(set_key, timeout, gt=True)
+        pipeline.execute()
+    except Exception as e:
+        logger.warning(f"Failed to register cache tags {tags}: {e}")
+
+
+def invalidate_tags(
+    tags: Iterable[str],
+    batch_size: int | None = None,
+    throttle: float | None = None,
+) -> int:
+    """Delete every key registered under ``tags``, then the tag sets.
+
+    Args:
+        tags: Tags to invalidate
+        batch_size: Keys deleted per round trip (defaults to CACHE_PURGE)
+        throttle: Seconds to sleep between batches (defaults to CACHE_PURGE)
+
+    Returns:
+        Number of keys deleted
+    """
+    tags = list(tags)
+    if not is_redis_cache() or is_sharded_cache():
+        deleted = 0
+        for tag in tags:
+            members = cache.get(tag_set_key(tag), set())
+            cache.delete_many(list(members))
+            cache.delete(tag_set_key(tag))
+            deleted += len(members)
+        return deleted
+
+    batch_size = batch_size or CACHE_PURGE["BATCH_SIZE"]
+    connection = _redis()
+    deleted = 0
+    for tag in tags:
+        set_key = cache.client.make_key(tag_set_key(tag))
+        members = connection.sscan_iter(set_key, count=batch_size)
+        deleted += _unlink_batches(connection, members, batch_size, throttle)
+        connection.unlink(set_key)
+    logger.debug(f"Invalidated tags {tags}: {deleted} keys")
+    return deleted
+
+
+def purge_pattern(
+    pattern: str,
+    batch_size: int | None = None,
+    throttle: float | None = None,
+) -> int:
+    """Delete keys matching a glob pattern incrementally with ``SCAN``.
+
+    Args:
+        pattern: Pattern of keys as passed to ``cache.set``, e.g. ``"view:*"``
+        batch_size: SCAN COUNT hint and keys deleted per round trip
+        throttle: Seconds to sleep between batches
+
+    Returns:
+        Number of keys deleted
+    """
+    if not is_redis_cache():
+        logger.warning(f"Pattern deletes need Redis, not clearing {pattern}")
+        return 0
+
+    from .sharding import node_connections
+
+    batch_size = batch_size or CACHE_PURGE["BATCH_SIZE"]
+    deleted = 0
+    for connection in node_connections():
+        keys = connection.scan_iter(
+            match=cache.client.make_pattern(pattern), count=batch_size
+        )
+        deleted += _unlink_batches(connection, keys, batch_size, throttle)
+    logger.info(f"Deleted {deleted} keys matching {pattern}")
+    return deleted
+
+
+def _unlink_batches(
+    connection, keys: Iterator[bytes], batch_size: int, throttle: float | None
+) -> int:
+    """UNLINK ``keys`` ``batch_size`` at a time, sleeping between batches."""
+    if throttle is None:
+        throttle = CACHE_PURGE["THROTTLE"]
+
+    deleted = 0
+    batch: list[bytes] = []
+    for key in keys:
+        batch.append(key)
+        if len(batch) >= batch_size:
+            deleted += connection.unlink(*batch)
+            batch = []
+            if throttle:
+                time.sleep(throttle)
+    if batch:
+        deleted += connection.unlink(*batch)
+    return deleted
+
@@ -5,9 +5,21 @@ from typing import Any
 from django.conf import settings
 from django.core.cache import cache
 
+from .codecs import encode_for
+from .local import (
+    _MISSING,
+    get_local_cache,
+    publish_invalidation,
+    publish_invalidations,
+)
+from .metrics import measure_get, measure_set
+
 
 class CacheVersion:
     """Manages cache versioning to handle cache invalidation.
+
+    Versions are kept in the per-process L1 cache, so reading a hot
+    namespace version costs no Redis round trip until it is bumped.
     Usage:
         version = CacheVersion('products')
         version.increment()  # Invalidates all product cache
@@ -17,29 +29,51 @@ class CacheVersion:
     def __init__(self, namespace: str):
         self.namespace = namespace
         self._version_key = f"{settings.CACHE_KEY_PREFIX}:version:{namespace}"
+        self._local_key = ("version", namespace)
+
+    @property
+    def version_key(self) -> str:
+        """Cache key holding the namespace version."""
+        return self._version_key
 
     def get(self) -> str:
         """Get current version for namespace."""
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            version = local_cache.get(self._local_key)
+            if version is not None:
+                return version
+
         version = cache.get(self._version_key)
         if version is None:
-            version = self._generate_version()
-            cache.set(self._version_key, version)
+            version = self.generate_version()
+            # add() so concurrent workers agree on a single initial version
+            if not cache.add(self._version_key, version):
+                version = cache.get(self._version_key, version)
+
+        if local_cache is not None:
+            local_cache.set(self._local_key, version)
         return version
 
     def increment(self) -> str:
         """Increment version to invalidate cache."""
-        new_version = self._generate_version()
+        new_version = self.generate_version()
         cache.set(self._version_key, new_version)
+        publish_invalidation(self.namespace)
         return new_version
 
-    def _generate_version(self) -> str:
-        """Generate a new version hash."""
+    def generate_version(self) -> str:
+        """Generate a new version hash without storing it."""
         timestamp = str(time.time())
         return hashlib.md5(f"{self.namespace}:{timestamp}".encode()).hexdigest()[:8]
 
 
 class VersionedCache:
     """Cache wrapper that includes versioning.
+
+    Reads go through the per-process L1 cache first and fall back to Redis.
+    Values returned from L1 are shared within the worker and must not be
+    mutated by callers.
     Usage:
         cache = VersionedCache('products')
         cache.set('item:1', item_data)
@@ -50,22 +84,91 @@ class VersionedCache:
         self.namespace = namespace
         self.version = CacheVersion(namespace)
 
-    def _versioned_key(self, key: str) -> str:
+    def _versioned_key(self, key: str, version: str | None = None) -> str:
         """Generate versioned cache key."""
-        version = self.version.get()
+        version = version or self.version.get()
         return f"{settings.CACHE_KEY_PREFIX}:{self.namespace}:{version}:{key}"
 
+    def versioned_key(self, key: str) -> str:
+        """Full cache key for ``key`` under the current namespace version."""
+        return self._versioned_key(key)
+
+    def _local_key(self, key: str, version: str) -> tuple:
+        return ("value", self.namespace, key, version)
+
     def get(self, key: str, default: Any = None) -> Any:
         """Get value from cache with versioning."""
-        return cache.get(self._versioned_key(key), default)
+        with measure_get(self.namespace) as hit:
+            version = self.version.get()
+            local_cache = get_local_cache()
+            if local_cache is not None:
+                value = local_cache.get(self._local_key(key, version), _MISSING)
+                if value is not _MISSING:
+                    hit[0] = True
+                    return value
+
+            value = cache.get(self._versioned_key(key, version), _MISSING)
+            hit[0] = value is not _MISSING
+        if value is _MISSING:
+            return default
+
+        if local_cache is not None:
+            local_cache.set(self._local_key(key, version), value)
+        return value
 
     def set(self, key: str, value: Any, timeout: int | None = None) -> bool:
         """Set value in cache with versioning."""
-        return cache.set(self._versioned_key(key), value, timeout)
+        version = self.version.get()
+        value_to_store = encode_for(self.namespace, value)
+        with measure_set(self.namespace):
+            result = cache.set(
+                self._versioned_key(key, version), value_to_store, timeout
+            )
+
+        # Other workers pick up an overwritten value once their L1 entry
+        # expires; use delete() or invalidate_all() when that is too late.
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            local_key = self._local_key(key, version)
+            if timeout is None:
+                local_cache.set(local_key, value)
+            elif timeout > 0:
+                # Never serve the local copy longer than the shared entry lives
+                local_cache.set(local_key, value, min(timeout, local_cache.ttl))
+            else:
+                local_cache.delete(local_key)
+        return result
+
+    def set_many(self, data: dict[str, Any], timeout: int | None = None) -> list:
+        """Set several values in one Redis pipeline.
+
+        Meant for bulk loads such as cache warming, so values are not copied
+        into the L1 cache. Returns the keys that failed to be stored.
+        """
+        if not data:
+            return []
+        version = self.version.get()
+        versioned = {
+            self._versioned_key(key, version): encode_for(self.namespace, value)
+            for key, value in data.items()
+        }
+        with measure_set(self.namespace, count=len(versioned)):
+            return cache.set_many(versioned, timeout) or []
 
     def delete(self, key: str) -> bool:
         """Delete value from cache."""
-        return cache.delete(self._versioned_key(key))
+        result = cache.delete(self._versioned_key(key))
+        publish_invalidation(self.namespace, key)
+        return result
+
+    def delete_many(self, keys: list[str]) -> int:
+        """Delete several values from cache in one round trip."""
+        if not keys:
+            return 0
+        version = self.version.get()
+        result = cache.delete_many([self._versioned_key(key, version) for key in keys])
+        publish_invalidations([(self.namespace, key) for key in keys])
+        return result or 0
 
     def invalidate_all(self) -> None:
         """Invalidate all cache for this namespace."""
@@ -1,10 +1,16 @@
 import logging
+import multiprocessing
 import time
-from concurrent.futures import ThreadPoolExecutor
+import uuid
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Any
 
+from django.apps import apps
+from django.db import connections
 from django.db.models import Model, QuerySet
 
+from .invalidation import list_tag, row_key
 from .versioning import VersionedCache
 
 logger = logging.getLogger(__name__)
@@ -14,7 +20,7 @@ class CacheWarmer:
     """Manages cache warming for different data types.
     Usage:
         warmer = CacheWarmer()
-        warmer.warm_model(Product, chunk_size=100)
+        warmer.warm_model(Product, chunk_size=1000, processes=4)
         warmer.warm_querysets([
             ('popular_products', Product.objects.filter(popular=True)),
             ('featured_products', Product.objects.filter(featured=True))
@@ -25,43 +31,65 @@ class CacheWarmer:
         self.max_workers = max_workers
 
     def warm_model(
-        self, model: type[Model], chunk_size: int = 100, timeout: int | None = None
-    ) -> None:
-        """Warm cache for all instances of a model."""
-        cache_ns = model._meta.model_name
-        versioned_cache = VersionedCache(cache_ns)
+        self,
+        model: type[Model],
+        chunk_size: int = 100,
+        timeout: int | None = None,
+        queryset: QuerySet | None = None,
+        processes: int = 1,
+    ) -> dict[str, float]:
+        """Warm cache for all instances of a model.
 
-        # Get total count for logging
-        total = model.objects.count()
-        processed = 0
-        start_time = time.time()
+        Rows are read in primary key order with keyset pagination
+        (``pk > last_pk``) and each chunk is written with one pipelined
+        ``set_many``. With ``processes > 1`` the primary key range is split
+        into that many slices, each warmed by its own process.
 
-        logger.info(f"Starting cache warming for {model.__name__}, {total} items")
-
-        # Process in chunks for memory efficiency
-        for chunk in self._chunked_queryset(model.objects.all(), chunk_size):
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                # Create cache tasks
-                futures = []
-                for instance in chunk:
-                    cache_key = f"{model._meta.model_name}:{instance.pk}"
-                    futures.append(
-                        executor.submit(
-                            versioned_cache.set, cache_key, instance, timeout
-                        )
-                    )
+        Args:
+            model: Model whose rows are cached under ``<model_name>:<pk>``
+            chunk_size: Rows fetched and written per round trip
+            timeout: Cache timeout in seconds
+            queryset: Subset of rows to warm, defaults to all rows
+            processes: Number of worker processes
 
-                # Wait for all tasks to complete
-                for future in futures:
-                    future.result()
+        Returns:
+            Dict with the number of rows warmed, seconds taken and rows/sec
+        """
+        if queryset is None:
+            queryset = model._default_manager.all()
 
-            processed += len(chunk)
-            logger.info(f"Warmed {processed}/{total} {model.__name__} instances")
+        start_time = time.time()
+        logger.info(f"Starting cache warming for {model.__name__}")
+
+        ranges = _pk_ranges(queryset, processes) if processes > 1 else []
+        if len(ranges) > 1:
+            # Children must open their own database connections
+            connections.close_all()
+            context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(len(ranges), mp_context=context) as executor:
+                futures = [
+                    executor.submit(
+                        _warm_slice,
+                        model._meta.label,
+                        queryset.query,
+                        chunk_size,
+                        timeout,
+                        lower,
+                        upper,
+                    )
+                    for lower, upper in ranges
+                ]
+                processed = sum(future.result() for future in futures)
+        else:
+            processed = _warm_range(queryset, chunk_size, timeout)
 
         duration = time.time() - start_time
+        rate = processed / duration if duration else float(processed)
         logger.info(
-            f"Completed warming {total} {model.__name__} instances in {duration:.2f}s"
+            f"Completed warming {processed} {model.__name__} instances in "
+            f"{duration:.2f}s ({rate:.0f} rows/s)"
         )
+        return {"rows": processed, "seconds": duration, "rows_per_sec": rate}
 
     def warm_querysets(
         self, querysets: list[tuple[str, QuerySet]], timeout: int | None = None
@@ -78,10 +106,9 @@ class CacheWarmer:
         logger.info(f"Starting cache warming for {total} querysets")
 
         for idx, (cache_key, queryset) in enumerate(querysets, 1):
-            # Get model name for namespace
-            model = queryset.model
-            cache_ns = model._meta.model_name
-            versioned_cache = VersionedCache(cache_ns)
+            # Querysets live under the model's list tag, which is bumped
+            # whenever any row of the model changes
+            versioned_cache = VersionedCache(list_tag(queryset.model))
 
             # Cache the queryset
             versioned_cache.set(cache_key, list(queryset), timeout)
@@ -124,13 +151,104 @@ class CacheWarmer:
         duration = time.time() - start_time
         logger.info(f"Completed warming {total} custom items in {duration:.2f}s")
 
-    @staticmethod
-    def _chunked_queryset(queryset: QuerySet, chunk_size: int):
-        """Split a queryset into chunks for efficient processing."""
-        start = 0
-        while True:
-            chunk = queryset[start : start + chunk_size]
-            if not chunk:
-                break
-            yield chunk
-            start += chunk_size
+
+def keyset_chunks(
+    queryset: QuerySet, chunk_size: int, lower: Any = None, upper: Any = None
+) -> Iterator[list[Model]]:
+    """Yield lists of rows in primary key order using keyset pagination.
+
+    Every chunk is fetched with ``pk > <last pk of previous chunk>``, so the
+    cost of a chunk does not grow with its position the way OFFSET does.
+
+    Args:
+        queryset: Rows to iterate
+        chunk_size: Rows per chunk
+        lower: Exclusive lower bound of the primary key, if any
+        upper: Inclusive upper bound of the primary key, if any
+    """
+    queryset = queryset.order_by("pk")
+    if upper is not None:
+        queryset = queryset.filter(pk__lte=upper)
+
+    last_pk = lower
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+def _warm_range(
+    queryset: QuerySet,
+    chunk_size: int,
+    timeout: int | None,
+    lower: Any = None,
+    upper: Any = None,
+) -> int:
+    """Cache every row of ``queryset`` with ``lower < pk <= upper``."""
+    model = queryset.model
+    namespace, _ = row_key(model, None)
+    versioned_cache = VersionedCache(namespace)
+
+    processed = 0
+    for chunk in keyset_chunks(queryset, chunk_size, lower, upper):
+        failed = versioned_cache.set_many(
+            {row_key(model, instance.pk)[1]: instance for instance in chunk}, timeout
+        )
+        if failed:
+            logger.warning(f"Failed to cache {len(failed)} {model.__name__} rows")
+        processed += len(chunk)
+        logger.debug(f"Warmed {processed} {model.__name__} instances")
+    return processed
+
+
+def _warm_slice(
+    model_label: str,
+    query: Any,
+    chunk_size: int,
+    timeout: int | None,
+    lower: Any,
+    upper: Any,
+) -> int:
+    """Process pool entry point for ``_warm_range``.
+
+    Querysets are evaluated when pickled, so only the model label and the
+    query are sent to the worker and the queryset is rebuilt there.
+    """
+    queryset = apps.get_model(model_label)._default_manager.all()
+    queryset.query = query
+    return _warm_range(queryset, chunk_size, timeout, lower, upper)
+
+
+def _uuid_from_int(value: int) -> uuid.UUID:
+    return uuid.UUID(int=value)
+
+
+def _pk_ranges(queryset: QuerySet, parts: int) -> list[tuple[Any, Any]]:
+    """Split the primary key range of ``queryset`` into ``parts`` slices.
+
+    Slices are ``(exclusive lower, inclusive upper)`` bounds between the
+    smallest and largest key. UUID keys are split as 128-bit integers, which
+    spreads random UUIDs evenly. Other key types are not split.
+    """
+    # Ordered reads rather than Min/Max: PostgreSQL has no min(uuid)
+    keys = queryset.order_by("pk").values_list("pk", flat=True)
+    first, last = keys.first(), keys.last()
+    if first is None:
+        return []
+
+    convert: Callable[[int], Any]
+    if isinstance(first, uuid.UUID):
+        low, high, convert = first.int, last.int, _uuid_from_int
+    elif isinstance(first, int):
+        low, high, convert = first, last, int
+    else:
+        return [(None, None)]
+
+    step = max(1, -(-(high - low) // parts))
+    ranges: list[tuple[Any, Any]] = [(None, convert(min(low + step, high)))]
+    for lower in range(low + step, high, step):
+        ranges.append((convert(lower), convert(min(lower + step, high))))
+    return ranges
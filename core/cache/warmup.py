@@ -0,0 +1,241 @@
+"""Deploy-time cache warmup gate.
+
+Every worker starts with a cold L1 cache, and after a deploy Redis may have
+lost entries too, so the first requests would all hit Postgres at once.
+``start_warmup()`` is called when a web worker boots and runs a warmup in a
+background thread:
+
+1. ``CachePreloader.preload_all()``;
+2. the hot keys configured in ``CACHE_WARMUP["HOT_KEYS"]``, either names of
+   built-in steps (``WARMUP_STEPS``) or dotted paths to callables.
+
+Until the warmup finishes or ``TIMEOUT`` seconds have passed,
+``is_warm()`` is false and the readiness probe reports the worker as not
+ready, so the load balancer keeps sending traffic to warm pods.
+
+Only one worker at a time does the actual work: the others wait for a
+shared "done" marker in the cache, which also lets workers that boot
+shortly after a completed warmup (scale-ups, restarts) skip it.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import close_old_connections, connections
+from django.db.models import F, Sum
+from django.utils.module_loading import import_string
+
+from .preload import CachePreloader
+from .settings import CACHE_WARMUP, cache_key_prefix
+from .versioning import VersionedCache
+from .warming import CacheWarmer
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = "warmup:lock"
+DONE_KEY = "warmup:done"
+
+STATUS_DISABLED = "disabled"
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_WAITING = "waiting"
+STATUS_DONE = "done"
+STATUS_SKIPPED = "skipped"
+STATUS_TIMED_OUT = "timed_out"
+STATUS_FAILED = "failed"
+
+
+class WarmupState:
+    """Progress of the warmup in this process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.status = STATUS_PENDING
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.steps: dict[str, dict[str, Any]] = {}
+
+    def set_status(self, status: str) -> None:
+        with self.lock:
+            self.status = status
+            if status not in (STATUS_PENDING, STATUS_RUNNING, STATUS_WAITING):
+                self.finished_at = time.time()
+
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def as_dict(self) -> dict[str, Any]:
+        with self.lock:
+            steps = {name: dict(step) for name, step in self.steps.items()}
+            completed = sum(step["status"] != STATUS_PENDING for step in steps.values())
+            return {
+                "status": self.status,
+                "ready": is_warm(),
+                "elapsed_seconds": round(self.elapsed(), 2),
+                "timeout_seconds": CACHE_WARMUP["TIMEOUT"],
+                "progress": f"{completed}/{len(steps)}",
+                "steps": steps,
+            }
+
+
+_state = WarmupState()
+_thread: threading.Thread | None = None
+
+
+def warm_top_products() -> None:
+    """Cache the rows of the best-selling active products."""
+    Product = apps.get_model("products", "Product")
+    top_ids = list(
+        Product.objects.filter(is_active=True)
+        .annotate(units_sold=Sum("variants__order_items__quantity"))
+        .order_by(F("units_sold").desc(nulls_last=True))
+        .values_list("pk", flat=True)[: CACHE_WARMUP["TOP_PRODUCTS"]]
+    )
+    CacheWarmer().warm_model(
+        Product,
+        queryset=Product.objects.filter(pk__in=top_ids).select_related("category"),
+        timeout=CACHE_WARMUP["HOT_KEY_TIMEOUT"],
+    )
+
+
+def warm_category_tree() -> None:
+    """Cache the category tree unless the preloader already did."""
+    if VersionedCache("productcategory:tree").get("category_tree") is None:
+        CachePreloader().preload_categories()
+
+
+def warm_featured_products() -> None:
+    """Cache the featured products endpoint and the featured product rows."""
+    Product = apps.get_model("products", "Product")
+    CachePreloader().warm_endpoint("products/featured")
+    CacheWarmer().warm_model(
+        Product,
+        queryset=Product.objects.filter(featured=True, is_active=True),
+        timeout=CACHE_WARMUP["HOT_KEY_TIMEOUT"],
+    )
+
+
+WARMUP_STEPS: dict[str, Callable[[], None]] = {
+    "top_products": warm_top_products,
+    "category_tree": warm_category_tree,
+    "featured_products": warm_featured_products,
+}
+
+
+def _resolve(name: str) -> Callable[[], None]:
+    if name in WARMUP_STEPS:
+        return WARMUP_STEPS[name]
+    return import_string(name)
+
+
+def _steps() -> list[tuple[str, Callable[[], None]]]:
+    steps = [("preloader", CachePreloader().preload_all)]
+    steps.extend((name, _resolve(name)) for name in CACHE_WARMUP["HOT_KEYS"])
+    return steps
+
+
+def _run_steps(steps: list[tuple[str, Callable[[], None]]]) -> None:
+    for name, step in steps:
+        with _state.lock:
+            _state.steps[name]["status"] = STATUS_RUNNING
+        started = time.time()
+        try:
+            step()
+        except Exception as e:
+            logger.error(f"Cache warmup step {name} failed: {e}")
+            status, error = STATUS_FAILED, str(e)
+        else:
+            status, error = STATUS_DONE, None
+        with _state.lock:
+            _state.steps[name].update(
+                status=status, seconds=round(time.time() - started, 2), error=error
+            )
+
+
+def _wait_for_other_worker(deadline: float) -> bool:
+    while time.time() < deadline:
+        if cache.get(cache_key_prefix(DONE_KEY)):
+            return True
+        time.sleep(CACHE_WARMUP["POLL_INTERVAL"])
+    return False
+
+
+def run_warmup() -> None:
+    """Run the warmup in the current thread, updating the shared progress."""
+    if _state.started_at is None:
+        _state.started_at = time.time()
+    _state.set_status(STATUS_RUNNING)
+    deadline = _state.started_at + CACHE_WARMUP["TIMEOUT"]
+
+    try:
+        steps = _steps()
+        with _state.lock:
+            _state.steps = {
+                name: {"status": STATUS_PENDING, "seconds": None, "error": None}
+                for name, _ in steps
+            }
+
+        close_old_connections()
+        if cache.get(cache_key_prefix(DONE_KEY)):
+            logger.info("Cache already warmed by another worker, skipping warmup")
+            _state.set_status(STATUS_SKIPPED)
+            return
+
+        lock_key = cache_key_prefix(LOCK_KEY)
+        if not cache.add(lock_key, True, CACHE_WARMUP["TIMEOUT"]):
+            _state.set_status(STATUS_WAITING)
+            done = _wait_for_other_worker(deadline)
+            _state.set_status(STATUS_SKIPPED if done else STATUS_TIMED_OUT)
+            return
+
+        logger.info(f"Starting cache warmup: {', '.join(name for name, _ in steps)}")
+        try:
+            _run_steps(steps)
+        finally:
+            cache.delete(lock_key)
+        cache.set(cache_key_prefix(DONE_KEY), True, CACHE_WARMUP["MARKER_TTL"])
+
+        status = STATUS_DONE if time.time() < deadline else STATUS_TIMED_OUT
+        _state.set_status(status)
+        logger.info(f"Cache warmup {status} in {_state.elapsed():.2f}s")
+    except Exception as e:
+        logger.error(f"Cache warmup failed: {e}")
+        _state.set_status(STATUS_FAILED)
+    finally:
+        connections.close_all()
+
+
+def start_warmup() -> None:
+    """Start the warmup in a background thread (once per process)."""
+    global _thread  # noqa: PLW0603
+
+    if not CACHE_WARMUP["ENABLED"]:
+        _state.set_status(STATUS_DISABLED)
+        return
+    if _thread is not None:
+        return
+    # Not ready from now on, before the thread gets scheduled
+    _state.started_at = time.time()
+    _state.set_status(STATUS_RUNNING)
+    _thread = threading.Thread(target=run_warmup, name="cache-warmup", daemon=True)
+    _thread.start()
+
+
+def is_warm() -> bool:
+    """Whether this worker may receive traffic as far as the cache goes."""
+    if _state.status in (STATUS_RUNNING, STATUS_WAITING):
+        return _state.elapsed() >= CACHE_WARMUP["TIMEOUT"]
+    # Not started yet (e.g. management commands) counts as warm
+    return True
+
+
+def get_warmup_status() -> dict[str, Any]:
+    """Status, elapsed time and per-step progress of the warmup."""
+    return _state.as_dict()
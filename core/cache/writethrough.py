@@ -0,0 +1,68 @@
+"""Write-through refresh of hot cache entries after a committed change.
+
+Invalidation alone leaves the next reader of a changed product to pay the
+full miss: ``get_product`` prefetches variants, options, images, attributes,
+reviews and bundles. With ``CACHE_WRITE_THROUGH["ENABLED"]`` the refresh
+targets of an executed invalidation plan (see ``CACHE_DEPENDENCIES``) are
+passed to the ``refresh_cache_entries`` Celery task, which recomputes:
+
+- the product row (card) entries read by list rendering and the warmers;
+- the rendered product detail responses, by replaying the endpoint for
+  each configured audience inside ``force_recompute()``.
+
+Readers keep being served by the cache except in the short window between
+the commit and the end of the refresh.
+"""
+
+import logging
+from collections.abc import Callable
+
+from django.apps import apps
+
+from .preload import CachePreloader
+from .settings import CACHE_WRITE_THROUGH
+from .stampede import force_recompute
+from .warming import CacheWarmer
+
+logger = logging.getLogger(__name__)
+
+# Endpoints replayed for each refreshed product, relative to the API root
+PRODUCT_PATHS = ["products/{pk}"]
+
+
+def refresh_products(pks: list[str]) -> None:
+    """Recompute the row and detail response entries of products."""
+    Product = apps.get_model("products", "Product")
+    CacheWarmer().warm_model(
+        Product,
+        queryset=Product.objects.filter(pk__in=pks, is_active=True).select_related(
+            "category"
+        ),
+        timeout=CACHE_WRITE_THROUGH["TIMEOUT"],
+    )
+
+    preloader = CachePreloader()
+    with force_recompute():
+        for pk in pks:
+            for path in PRODUCT_PATHS:
+                for audience in CACHE_WRITE_THROUGH["AUDIENCES"]:
+                    preloader.warm_endpoint(path.format(pk=pk), audience)
+
+
+WRITE_THROUGH_REFRESHERS: dict[str, Callable[[list[str]], None]] = {
+    "products.Product": refresh_products,
+}
+
+
+def refresh_cache_entries(pks_by_model: dict[str, list[str]]) -> None:
+    """Run the refresher of every model label in ``pks_by_model``."""
+    for model_label, pks in pks_by_model.items():
+        refresher = WRITE_THROUGH_REFRESHERS.get(model_label)
+        if refresher is None:
+            logger.warning(f"No write-through refresher for {model_label}")
+            continue
+        try:
+            refresher(pks)
+            logger.info(f"Refreshed cache entries of {len(pks)} {model_label} rows")
+        except Exception as e:
+            logger.error(f"Error refreshing cache entries of {model_label}: {e}")
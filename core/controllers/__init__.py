@@ -1,5 +1,6 @@
 from .address_controller import AddressController
 from .auth_controller import AuthController
+from .cache_controller import CacheController
 from .customer_controller import CustomerController
 from .feedback_controller import FeedbackController
 from .user_controller import UserController
@@ -10,4 +11,5 @@ __all__ = [
     CustomerController,
     AddressController,
     FeedbackController,
+    CacheController,
 ]
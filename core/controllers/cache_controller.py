@@ -0,0 +1,21 @@
+"""Cache statistics controller for staff."""
+
+from ninja_extra import api_controller, http_get
+
+from api.decorators import admin_endpoint
+from core.cache.metrics import get_cache_metrics
+from core.schemas import CacheNamespaceStatsSchema
+
+
+@api_controller("/cache", tags=["Cache"])
+class CacheController:
+    """Cache monitoring endpoints, restricted to staff users."""
+
+    @http_get("/stats", response={200: list[CacheNamespaceStatsSchema]})
+    @admin_endpoint()
+    def cache_stats(self, request):
+        """Hit ratio, bytes written and p50/p99 latency per cache namespace."""
+        return 200, [
+            {"namespace": namespace, **entry}
+            for namespace, entry in get_cache_metrics().items()
+        ]
@@ -4,9 +4,11 @@ import logging
 from uuid import UUID
 
 from django.shortcuts import get_object_or_404
+from ninja import Query
 from ninja_extra import api_controller, http_delete, http_get, http_post, http_put
 
 from api.decorators import (
+    admin_endpoint,
     create_endpoint,
     delete_endpoint,
     detail_endpoint,
@@ -14,6 +16,8 @@ from api.decorators import (
     search_and_filter,
     update_endpoint,
 )
+from api.exports import streaming_export_response
+from api.search_filters import CustomerSearchFilter
 from core.models import Customer
 from core.schemas.customer import (
     CustomerCreateSchema,
@@ -63,6 +67,17 @@ class CustomerController:
         """Get all customers with advanced filtering and search."""
         return 200, Customer.objects.filter(is_active=True)
 
+    @http_get("/export", response={400: dict, 401: dict, 403: dict})
+    @admin_endpoint()
+    def export_customers(
+        self,
+        request,
+        filters: CustomerSearchFilter = Query(...),
+        export_format: str = Query("ndjson", alias="format"),
+    ):
+        """Stream the filtered customers as NDJSON or CSV (``?format=csv``)."""
+        return streaming_export_response("customers", filters, export_format)
+
     @http_get("/{customer_id}", response={200: CustomerSchema, 404: dict})
     @detail_endpoint(
         select_related=["user"],
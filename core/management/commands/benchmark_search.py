@@ -0,0 +1,128 @@
+import itertools
+import random
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+
+from api.search_filters import SEARCH_MODE_TRIGRAM, AdvancedSearchEngine
+from core.cache.benchmark import time_hits
+
+LOOKUPS = {
+    "variant_sku": ("products.ProductVariant", "sku"),
+    "order_number": ("orders.Order", "order_number"),
+    "order_email": ("orders.Order", "email"),
+    "user_email": ("core.User", "email"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark icontains against trigram lookups of SKUs, order numbers "
+        "and emails (PostgreSQL only)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lookup",
+            action="append",
+            choices=sorted(LOOKUPS),
+            help="Lookup to benchmark (repeatable, default: all)",
+        )
+        parser.add_argument(
+            "--samples",
+            type=int,
+            default=20,
+            help="Existing values the search terms are taken from",
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=5, help="Runs of each search term"
+        )
+        parser.add_argument(
+            "--limit", type=int, default=20, help="Rows fetched per search"
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        for name in options["lookup"] or LOOKUPS:
+            model_label, field = LOOKUPS[name]
+            model = apps.get_model(model_label)
+            alias = router.db_for_read(model)
+            if connections[alias].vendor != "postgresql":
+                raise CommandError("Trigram lookups need PostgreSQL")
+
+            values = list(
+                model.objects.order_by("?").values_list(field, flat=True)[
+                    : options["samples"]
+                ]
+            )
+            if not values:
+                self.stdout.write(f"{name}: no rows, skipped")
+                continue
+
+            partial_terms = [self.partial(value, rng) for value in values]
+            terms = {
+                "partial": partial_terms,
+                "typo": [self.typo(term, rng) for term in partial_terms],
+            }
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{name} ({model_label})"))
+            for kind, kind_terms in terms.items():
+                for path in ("icontains (seq scan)", "icontains", "trigram"):
+                    result = self.measure(
+                        model, field, path, kind_terms, alias, options
+                    )
+                    self.stdout.write(
+                        f"  {kind:<8} {path:<21} "
+                        f"p50 {result['p50_ms']:8.2f} ms  "
+                        f"p99 {result['p99_ms']:8.2f} ms  "
+                        f"matched {result['matched']}/{len(kind_terms)}  "
+                        f"trigram index {'yes' if result['indexed'] else 'no'}"
+                    )
+
+    def measure(self, model, field, path, terms, alias, options) -> dict:
+        """Latency of one lookup path over the terms, with match/index stats.
+
+        "icontains (seq scan)" is the lookup without the trigram indexes:
+        bitmap scans, the only way PostgreSQL uses a GIN index, are disabled.
+        """
+        if path == "trigram":
+            engine = AdvancedSearchEngine(
+                model, search_mode=SEARCH_MODE_TRIGRAM, trigram_fields=[field]
+            )
+            querysets = [
+                engine.filter_text(model.objects.all(), field, term) for term in terms
+            ]
+        else:
+            querysets = [
+                model.objects.filter(**{f"{field}__icontains": term}) for term in terms
+            ]
+        querysets = [queryset[: options["limit"]] for queryset in querysets]
+
+        with transaction.atomic(using=alias):
+            if path == "icontains (seq scan)":
+                with connections[alias].cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_bitmapscan = off")
+
+            matched = sum(1 for queryset in querysets if queryset.exists())
+            indexed = all("_trgm" in queryset.explain() for queryset in querysets)
+            cycle = itertools.cycle(querysets)
+            timings = time_hits(
+                lambda: list(next(cycle).all()), options["iterations"] * len(terms)
+            )
+        return {**timings, "matched": matched, "indexed": indexed}
+
+    def partial(self, value: str, rng: random.Random) -> str:
+        """A random substring of about half of ``value`` (at least 5 chars)."""
+        length = min(len(value), max(5, len(value) // 2))
+        start = rng.randint(0, len(value) - length)
+        return value[start : start + length]
+
+    def typo(self, term: str, rng: random.Random) -> str:
+        """``term`` with two adjacent characters swapped."""
+        if len(term) < 2:
+            return term
+        position = rng.randrange(len(term) - 1)
+        return (
+            term[:position] + term[position + 1] + term[position] + term[position + 2 :]
+        )
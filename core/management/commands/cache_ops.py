@@ -5,12 +5,31 @@ from django.apps import apps
 from django.core.cache import cache
 from django.core.management.base import BaseCommand
 
+from core.cache.benchmark import benchmark_codecs, benchmark_response_cache
+from core.cache.invalidation import list_tag
+from core.cache.keyspace import (
+    TTL_BUCKETS,
+    TTL_LONGER,
+    TTL_PERSISTENT,
+    analyze_keyspace,
+    purge_orphaned_versions,
+)
+from core.cache.metrics import get_cache_metrics
 from core.cache.preload import CachePreloader
-from core.cache.versioning import VersionedCache
+from core.cache.settings import clear_cache_pattern, is_redis_cache
+from core.cache.tags import invalidate_tags
+from core.cache.versioning import CacheVersion, VersionedCache
 from core.cache.warming import CacheWarmer
 
 logger = logging.getLogger(__name__)
 
+LATENCY_FIELDS = ("get_p50_ms", "get_p99_ms", "set_p50_ms", "set_p99_ms")
+TTL_LABELS = (
+    *(label for _, label in TTL_BUCKETS),
+    TTL_LONGER,
+    TTL_PERSISTENT,
+)
+
 
 class Command(BaseCommand):
     help = "Manage cache operations (warm, clear, preload, etc.)"
@@ -18,7 +37,15 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument(
             "operation",
-            choices=["warm", "clear", "preload", "stats", "version"],
+            choices=[
+                "warm",
+                "clear",
+                "preload",
+                "stats",
+                "version",
+                "benchmark",
+                "analyze",
+            ],
             help="Operation to perform",
         )
         parser.add_argument(
@@ -32,10 +59,68 @@ class Command(BaseCommand):
             default=100,
             help="Chunk size for warming operations",
         )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Worker processes per model for warming operations",
+        )
         parser.add_argument("--timeout", type=int, help="Cache timeout in seconds")
+        parser.add_argument(
+            "--pattern",
+            help="Clear only keys matching this glob pattern (incremental SCAN)",
+        )
+        parser.add_argument(
+            "--tags", nargs="+", help="Clear only keys registered under these tags"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Keys scanned and deleted per round trip (clear, analyze)",
+        )
+        parser.add_argument(
+            "--throttle",
+            type=float,
+            help="Seconds to sleep between delete batches (clear, analyze)",
+        )
+        parser.add_argument(
+            "--max-keys",
+            type=int,
+            default=10000,
+            help="Keys sampled by analyze (0 = all keys)",
+        )
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=2,
+            help="Key segments that name the namespace of unversioned keys",
+        )
+        parser.add_argument(
+            "--purge-orphans",
+            action="store_true",
+            help="Delete entries of superseded cache versions after analyzing",
+        )
         parser.add_argument(
             "--force", action="store_true", help="Force operation without confirmation"
         )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=200,
+            help="Cache reads per benchmark case",
+        )
+        parser.add_argument(
+            "--sample-size",
+            type=int,
+            default=20,
+            help="Rows in the benchmark payload (one list endpoint page)",
+        )
+        parser.add_argument(
+            "--target",
+            choices=["all", "responses", "codecs"],
+            default="all",
+            help="What to benchmark: response storage formats or value codecs",
+        )
 
     def handle(self, *args, **options):
         operation = options["operation"]
@@ -45,7 +130,10 @@ class Command(BaseCommand):
         force = options["force"]
 
         # Confirm dangerous operations
-        if operation in ["clear"] and not force:
+        destructive = operation == "clear" or (
+            operation == "analyze" and options["purge_orphans"]
+        )
+        if destructive and not force:
             if not self.confirm_operation(operation):
                 self.stdout.write(self.style.WARNING("Operation cancelled"))
                 return
@@ -55,15 +143,33 @@ class Command(BaseCommand):
 
         try:
             if operation == "warm":
-                self.warm_cache(models, chunk_size, timeout)
+                self.warm_cache(models, chunk_size, timeout, options["processes"])
             elif operation == "clear":
-                self.clear_cache(models)
+                self.clear_cache(
+                    models,
+                    options["pattern"],
+                    options["tags"],
+                    options["batch_size"],
+                    options["throttle"],
+                )
             elif operation == "preload":
                 self.preload_cache(models)
             elif operation == "stats":
                 self.show_stats()
             elif operation == "version":
                 self.show_versions(models)
+            elif operation == "benchmark":
+                self.run_benchmark(
+                    options["iterations"], options["sample_size"], options["target"]
+                )
+            elif operation == "analyze":
+                self.analyze_keyspace(
+                    options["max_keys"],
+                    options["depth"],
+                    options["batch_size"],
+                    options["throttle"],
+                    options["purge_orphans"],
+                )
 
             duration = time.time() - start_time
             self.stdout.write(
@@ -74,7 +180,9 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f"Error during operation: {e!s}"))
             logger.error(f"Cache operation error: {e!s}", exc_info=True)
 
-    def warm_cache(self, models: list[str], chunk_size: int, timeout: int) -> None:
+    def warm_cache(
+        self, models: list[str], chunk_size: int, timeout: int, processes: int
+    ) -> None:
         """Warm cache for specified models."""
         warmer = CacheWarmer()
 
@@ -85,7 +193,10 @@ class Command(BaseCommand):
                     app_label, model_name = model_path.split(".")
                     model = apps.get_model(app_label, model_name)
                     self.stdout.write(f"Warming cache for {model_path}...")
-                    warmer.warm_model(model, chunk_size, timeout)
+                    result = warmer.warm_model(
+                        model, chunk_size, timeout, processes=processes
+                    )
+                    self.report_warming(result)
                 except Exception as e:
                     self.stdout.write(
                         self.style.ERROR(f"Error warming {model_path}: {e!s}")
@@ -96,10 +207,40 @@ class Command(BaseCommand):
                 for model in app_config.get_models():
                     if not model._meta.abstract:
                         self.stdout.write(f"Warming cache for {model._meta.label}...")
-                        warmer.warm_model(model, chunk_size, timeout)
+                        result = warmer.warm_model(
+                            model, chunk_size, timeout, processes=processes
+                        )
+                        self.report_warming(result)
+
+    def report_warming(self, result: dict[str, float]) -> None:
+        """Print throughput of one warm_model run."""
+        self.stdout.write(
+            f"  {result['rows']} rows in {result['seconds']:.2f}s "
+            f"({result['rows_per_sec']:.0f} rows/sec)"
+        )
+
+    def clear_cache(
+        self,
+        models: list[str],
+        pattern: str | None = None,
+        tags: list[str] | None = None,
+        batch_size: int | None = None,
+        throttle: float | None = None,
+    ) -> None:
+        """Clear cache for specified models, tags or a key pattern."""
+        if tags:
+            deleted = invalidate_tags(tags, batch_size, throttle)
+            self.stdout.write(
+                self.style.SUCCESS(f"Cleared {deleted} keys tagged {', '.join(tags)}")
+            )
+        if pattern:
+            deleted = clear_cache_pattern(pattern, batch_size, throttle)
+            self.stdout.write(
+                self.style.SUCCESS(f"Cleared {deleted} keys matching {pattern}")
+            )
+        if tags or pattern:
+            return
 
-    def clear_cache(self, models: list[str]) -> None:
-        """Clear cache for specified models."""
         if models:
             # Clear specific models
             for model_path in models:
@@ -109,6 +250,7 @@ class Command(BaseCommand):
                     namespace = model._meta.model_name
                     versioned_cache = VersionedCache(namespace)
                     versioned_cache.invalidate_all()
+                    CacheVersion(list_tag(model)).increment()
                     self.stdout.write(
                         self.style.SUCCESS(f"Cleared cache for {model_path}")
                     )
@@ -147,16 +289,41 @@ class Command(BaseCommand):
             preloader.preload_all()
 
     def show_stats(self) -> None:
-        """Show cache statistics."""
-        stats = cache.info()
-        self.stdout.write("\nCache Statistics:")
-        self.stdout.write("-" * 40)
+        """Show per-namespace hit ratio, latency and size statistics."""
+        metrics = get_cache_metrics()
+        self.stdout.write("\nCache Statistics by namespace:")
+        self.stdout.write("-" * 104)
+        self.stdout.write(
+            f"{'namespace':<32}{'hits':>9}{'misses':>9}{'hit %':>7}{'sets':>8}"
+            f"{'bytes':>11}{'get p50':>9}{'get p99':>9}{'set p50':>9}{'set p99':>9}"
+        )
+        for namespace, entry in metrics.items():
+            ratio = entry["hit_ratio"]
+            self.stdout.write(
+                f"{namespace:<32}{entry['hits']:>9}{entry['misses']:>9}"
+                f"{'-' if ratio is None else f'{ratio * 100:.1f}':>7}"
+                f"{entry['sets']:>8}{entry['bytes']:>11}"
+                + "".join(
+                    f"{'-' if entry[field] is None else entry[field]:>9}"
+                    for field in LATENCY_FIELDS
+                )
+            )
+        if not metrics:
+            self.stdout.write("No cache metrics recorded yet")
+        self.stdout.write("Latencies are histogram bucket upper bounds in ms")
 
-        if isinstance(stats, dict):
-            for key, value in stats.items():
-                self.stdout.write(f"{key}: {value}")
-        else:
-            self.stdout.write(str(stats))
+        if is_redis_cache():
+            from django_redis import get_redis_connection
+
+            try:
+                info = get_redis_connection("default").info()
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"Redis INFO unavailable: {e!s}"))
+                return
+            self.stdout.write("\nRedis:")
+            self.stdout.write("-" * 40)
+            for key in ("used_memory_human", "keyspace_hits", "keyspace_misses"):
+                self.stdout.write(f"{key}: {info.get(key)}")
 
     def show_versions(self, models: list[str]) -> None:
         """Show cache versions for models."""
@@ -169,9 +336,7 @@ class Command(BaseCommand):
                 try:
                     app_label, model_name = model_path.split(".")
                     model = apps.get_model(app_label, model_name)
-                    namespace = model._meta.model_name
-                    versioned_cache = VersionedCache(namespace)
-                    version = versioned_cache.get()
+                    version = CacheVersion(model._meta.model_name).get()
                     self.stdout.write(f"{model_path}: {version}")
                 except Exception as e:
                     self.stdout.write(
@@ -184,11 +349,116 @@ class Command(BaseCommand):
             for app_config in apps.get_app_configs():
                 for model in app_config.get_models():
                     if not model._meta.abstract:
-                        namespace = model._meta.model_name
-                        versioned_cache = VersionedCache(namespace)
-                        version = versioned_cache.get()
+                        version = CacheVersion(model._meta.model_name).get()
                         self.stdout.write(f"{model._meta.label}: {version}")
 
+    def analyze_keyspace(
+        self,
+        max_keys: int,
+        depth: int,
+        batch_size: int | None,
+        throttle: float | None,
+        purge_orphans: bool,
+    ) -> None:
+        """Report key counts, sizes and TTLs by namespace and version."""
+        if not is_redis_cache():
+            self.stdout.write(self.style.WARNING("Key-space analysis needs Redis"))
+            return
+
+        report = analyze_keyspace(max_keys, batch_size, depth)
+        self.stdout.write(
+            f"\nKey space ({report['sampled']} of {report['total_keys']} keys "
+            "sampled):"
+        )
+        self.stdout.write("-" * 110)
+        self.stdout.write(
+            f"{'namespace':<32}{'version':<10}{'status':<13}{'keys':>8}"
+            f"{'bytes':>12}{'avg':>9}"
+            + "".join(f"{label:>6}" for label in TTL_LABELS)
+        )
+        for group in report["groups"]:
+            self.stdout.write(
+                f"{group['namespace']:<32}{group['version'] or '-':<10}"
+                f"{group['status']:<13}{group['keys']:>8}{group['bytes']:>12}"
+                f"{group['avg_bytes']:>9.0f}"
+                + "".join(f"{group['ttl'].get(label, 0):>6}" for label in TTL_LABELS)
+            )
+        if not report["sizes_available"]:
+            self.stdout.write(self.style.WARNING("MEMORY USAGE unavailable, bytes=0"))
+
+        orphaned = report["orphaned"]
+        self.stdout.write(
+            f"Orphaned (superseded versions): {orphaned['keys']} keys, "
+            f"{orphaned['bytes']} bytes"
+        )
+
+        if purge_orphans:
+            deleted = purge_orphaned_versions(batch_size, throttle)
+            self.stdout.write(
+                self.style.SUCCESS(f"Deleted {deleted} keys of superseded versions")
+            )
+
+    def run_benchmark(self, iterations: int, sample_size: int, target: str) -> None:
+        """Benchmark cache hit latency and entry size per storage format."""
+        from products.models import Product
+        from products.schemas import ProductListSchema
+
+        queryset = Product.objects.filter(is_active=True).select_related("category")
+        queryset = queryset.prefetch_related("variants", "images")[:sample_size]
+
+        if target in ("all", "responses"):
+            self.benchmark_responses(queryset, ProductListSchema, iterations)
+        if target in ("all", "codecs"):
+            self.benchmark_codecs(queryset, ProductListSchema, iterations)
+
+    def benchmark_responses(self, queryset, schema, iterations: int) -> None:
+        """Compare cached ORM objects with cached rendered JSON."""
+        sample_size = len(queryset)
+        self.stdout.write(
+            f"\nList endpoint cache hits ({sample_size} products, "
+            f"{iterations} reads):"
+        )
+        self.stdout.write("-" * 60)
+        self.stdout.write(
+            f"{'format':<12}{'avg ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'bytes':>12}"
+        )
+        results = benchmark_response_cache(queryset, list[schema], iterations)
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<12}{result['avg_ms']:>10.3f}{result['p50_ms']:>10.3f}"
+                f"{result['p99_ms']:>10.3f}{result['bytes']:>12}"
+            )
+
+    def benchmark_codecs(self, queryset, schema, iterations: int) -> None:
+        """Compare serializer / compressor pairs on typical cached values."""
+        from products.models import ProductCategory
+
+        page = [
+            schema.model_validate(product).model_dump(mode="json")
+            for product in queryset
+        ]
+        payloads = {
+            "version": CacheVersion("benchmark").generate_version(),
+            "product": page[0] if page else {},
+            "product page": page,
+            "category tree": list(
+                ProductCategory.objects.values("id", "name", "slug", "parent_id")
+            ),
+        }
+
+        self.stdout.write(f"\nValue codecs ({iterations} rounds):")
+        self.stdout.write("-" * 72)
+        self.stdout.write(
+            f"{'payload':<16}{'codec':<18}{'encode us':>12}{'decode us':>12}"
+            f"{'bytes':>12}"
+        )
+        for payload_name, results in benchmark_codecs(payloads, iterations).items():
+            for codec, result in results.items():
+                self.stdout.write(
+                    f"{payload_name:<16}{codec:<18}{result['encode_us']:>12.1f}"
+                    f"{result['decode_us']:>12.1f}{result['bytes']:>12}"
+                )
+
     def confirm_operation(self, operation: str) -> bool:
         """Confirm dangerous operations."""
         self.stdout.write(
@@ -0,0 +1,93 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from pydantic import ValidationError as SchemaValidationError
+
+from api.config.constants import EXPORT_CHUNK_SIZE
+from api.exceptions import ValidationError
+from api.exports import EXPORTS, FORMAT_CSV, FORMAT_NDJSON, iter_export
+
+
+class Command(BaseCommand):
+    help = "Stream orders, products or customers to NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument("export", choices=sorted(EXPORTS), help="What to export")
+        parser.add_argument(
+            "--format",
+            choices=[FORMAT_NDJSON, FORMAT_CSV],
+            default=FORMAT_NDJSON,
+            help="Output format",
+        )
+        parser.add_argument(
+            "--output", "-o", help="File to write to (default: standard output)"
+        )
+        parser.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            metavar="FIELD=VALUE",
+            help=(
+                "Search filter, as accepted by the export endpoint "
+                "(repeatable, e.g. --filter status=pending --filter search=acme)"
+            ),
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help="Rows fetched from the database at a time",
+        )
+
+    def handle(self, *args, **options):
+        export = EXPORTS[options["export"]]
+        filters = self.parse_filters(export.filter_class, options["filter"])
+
+        try:
+            lines = iter_export(
+                options["export"], filters, options["format"], options["chunk_size"]
+            )
+        except ValidationError as e:
+            raise CommandError(f"{e.message}: {e.details}") from e
+
+        binary = options["format"] == FORMAT_NDJSON
+        if options["output"]:
+            mode, kwargs = ("wb", {}) if binary else ("w", {"newline": ""})
+            with open(options["output"], mode, **kwargs) as output:
+                rows = self.write_lines(output, lines)
+            if not binary:
+                rows -= 1  # CSV header
+            self.stderr.write(
+                self.style.SUCCESS(f"Exported {rows} rows to {options['output']}")
+            )
+        else:
+            output = sys.stdout.buffer if binary else sys.stdout
+            self.write_lines(output, lines)
+
+    def parse_filters(self, filter_class, pairs: list[str]):
+        data: dict = {}
+        for pair in pairs:
+            field, separator, value = pair.partition("=")
+            if not separator:
+                raise CommandError(f"Filters must look like FIELD=VALUE, got {pair!r}")
+            if field not in filter_class.model_fields:
+                raise CommandError(f"Unknown filter: {field}")
+            # List filters (e.g. tags) may be given several times
+            annotation = str(filter_class.model_fields[field].annotation)
+            if annotation.startswith("list") or "List" in annotation:
+                data.setdefault(field, []).append(value)
+            else:
+                data[field] = value
+        try:
+            return filter_class(**data)
+        except SchemaValidationError as e:
+            raise CommandError(f"Invalid filters: {e}") from e
+
+    def write_lines(self, output, lines) -> int:
+        """Write encoded lines one at a time; returns how many were written."""
+        written = 0
+        for line in lines:
+            output.write(line)
+            written += 1
+        output.flush()
+        return written
@@ -3,6 +3,8 @@
 from django.core.management import call_command
 from django.core.management.base import BaseCommand
 
+from core.cache.invalidation import batch_invalidation
+
 
 class Command(BaseCommand):
     """Generate comprehensive test data for all apps."""
@@ -39,29 +41,33 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING("⚠️  Reset option not implemented yet"))
 
         try:
-            # Generate core data
-            self.stdout.write("📝 Generating core data...")
-            call_command("generate_core_data", model="User", count=10 if quick else 25)
-            call_command("generate_customers", count=15 if quick else 50)
-
-            # Generate product data
-            self.stdout.write("🛍️  Generating product data...")
-            call_command("generate_categories", count=5 if quick else 12)
-            call_command("generate_collections", count=3 if quick else 8)
-            call_command("generate_products", count=20 if quick else 100)
-            call_command("generate_variants", count=30 if quick else 200)
-            call_command("generate_reviews", count=50 if quick else 300)
-
-            # Generate order data (if available)
-            self.stdout.write("📦 Checking for order data generation...")
-            try:
-                call_command("generate_orders", count=10 if quick else 50)
-            except Exception:
-                self.stdout.write(
-                    self.style.WARNING(
-                        "Order generation command not found, skipping..."
-                    )
+            # Coalesce cache invalidation for every generated row into one flush
+            with batch_invalidation():
+                # Generate core data
+                self.stdout.write("📝 Generating core data...")
+                call_command(
+                    "generate_core_data", model="User", count=10 if quick else 25
                 )
+                call_command("generate_customers", count=15 if quick else 50)
+
+                # Generate product data
+                self.stdout.write("🛍️  Generating product data...")
+                call_command("generate_categories", count=5 if quick else 12)
+                call_command("generate_collections", count=3 if quick else 8)
+                call_command("generate_products", count=20 if quick else 100)
+                call_command("generate_variants", count=30 if quick else 200)
+                call_command("generate_reviews", count=50 if quick else 300)
+
+                # Generate order data (if available)
+                self.stdout.write("📦 Checking for order data generation...")
+                try:
+                    call_command("generate_orders", count=10 if quick else 50)
+                except Exception:
+                    self.stdout.write(
+                        self.style.WARNING(
+                            "Order generation command not found, skipping..."
+                        )
+                    )
 
             # Success message
             mode = "quick" if quick else "full"
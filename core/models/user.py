@@ -4,8 +4,10 @@ import uuid
 
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import BaseUserManager, Permission, PermissionsMixin
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 
 
@@ -69,6 +71,10 @@ class User(AbstractBaseUser, PermissionsMixin):
             # Compound indexes for common queries
             models.Index(fields=["is_staff", "is_superuser"]),
             models.Index(fields=["email", "is_staff"]),
+            # Trigram index for partial and fuzzy email lookups
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"), name="user_email_trgm"
+            ),
         ]
 
     def __str__(self):
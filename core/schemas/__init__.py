@@ -6,6 +6,7 @@ from .auth_schema import (
     PasswordlessLoginRequest,
     PasswordlessLoginVerify,
 )
+from .cache_schema import CacheNamespaceStatsSchema
 from .customer_schema import (
     CustomerCreateSchema,
     CustomerSchema,
@@ -38,4 +39,5 @@ all = [
     CustomerSchema,
     CustomerCreateSchema,
     CustomerUpdateSchema,
+    CacheNamespaceStatsSchema,
 ]
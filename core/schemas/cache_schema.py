@@ -0,0 +1,14 @@
+from ninja import Schema
+
+
+class CacheNamespaceStatsSchema(Schema):
+    namespace: str
+    hits: int
+    misses: int
+    sets: int
+    bytes: int
+    hit_ratio: float | None = None
+    get_p50_ms: float | None = None
+    get_p99_ms: float | None = None
+    set_p50_ms: float | None = None
+    set_p99_ms: float | None = None
@@ -57,6 +57,38 @@ def send_notification_email(self, recipient_email, subject, message):
         raise self.retry(exc=exc, countdown=60, max_retries=3)
 
 
+@shared_task(ignore_result=True)
+def refresh_cached_response(endpoint, cache_key, call, lock_token=None):
+    """Refresh a stale_while_revalidate API cache entry in the background.
+
+    Args:
+        endpoint (str): Name of the cached endpoint ("module:qualname")
+        cache_key (str): Cache key of the entry to refresh
+        call (dict): Description of the original call
+        lock_token (str, optional): Recompute lock to release when done
+    """
+    from api.decorators import refresh_cached_response as refresh
+
+    try:
+        if refresh(endpoint, cache_key, call, lock_token):
+            logger.info(f"Refreshed cached response {cache_key}")
+    except Exception as exc:
+        # The stale entry keeps being served; the next request retries
+        logger.error(f"Error refreshing cached response {cache_key}: {exc}")
+
+
+@shared_task(ignore_result=True)
+def refresh_cache_entries(pks_by_model):
+    """Repopulate the cache entries of rows changed by a committed write.
+
+    Args:
+        pks_by_model (dict): Primary keys to refresh, by model label
+    """
+    from core.cache.writethrough import refresh_cache_entries as refresh
+
+    refresh(pks_by_model)
+
+
 @shared_task(bind=True)
 def generate_report(self, report_type, filters=None):
     """Generate reports asynchronously.
@@ -0,0 +1,12 @@
+import pytest
+from django.core.cache import cache
+
+from core.cache.local import get_local_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty shared and in-process cache."""
+    cache.clear()
+    if (local_cache := get_local_cache()) is not None:
+        local_cache.clear()
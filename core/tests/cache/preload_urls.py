@@ -0,0 +1,33 @@
+"""URLconf with an endpoint shadowed by another using the same pattern."""
+
+from django.http import HttpResponse
+from django.urls import include, path
+
+calls = []
+
+
+def category_detail(_request, pk):
+    calls.append(("category_detail", pk))
+    return HttpResponse()
+
+
+def products_by_category(_request, category_id):
+    calls.append(("products_by_category", category_id))
+    return HttpResponse()
+
+
+api_patterns = [
+    path("products/categories/<uuid:pk>", category_detail, name="get_category"),
+    path(
+        "products/categories/<uuid:category_id>",
+        products_by_category,
+        name="shadowed_listing",
+    ),
+    path(
+        "products/categories/<uuid:category_id>/products",
+        products_by_category,
+        name="get_products_by_category",
+    ),
+]
+
+urlpatterns = [path("api/", include((api_patterns, "api_v1")))]
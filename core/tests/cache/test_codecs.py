@@ -0,0 +1,116 @@
+import pickle
+import zlib
+from decimal import Decimal
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from core.cache.codecs import (
+    COMPRESSORS,
+    PICKLE,
+    SERIALIZERS,
+    UNCOMPRESSED,
+    CodecSerializer,
+    Encoded,
+    compress,
+    decompress,
+    deserialize,
+    is_available,
+    serialize,
+)
+
+PAYLOAD = {"id": "abc", "name": "Product", "tags": ["a", "b"], "price": 1999}
+
+
+def _available(registry):
+    return [
+        pytest.param(
+            name,
+            marks=pytest.mark.skipif(
+                not is_available(name), reason=f"{name} is not installed"
+            ),
+        )
+        for name in registry
+    ]
+
+
+class TestSerializers:
+    """Test tagged serialization round trips."""
+
+    @pytest.mark.parametrize("serializer", _available(SERIALIZERS))
+    def test_round_trip(self, serializer):
+        """Test JSON-like values survive every serializer."""
+        data = serialize(PAYLOAD, serializer)
+
+        assert data[:1] == SERIALIZERS[serializer][0]
+        assert deserialize(data) == PAYLOAD
+
+    @pytest.mark.skipif(not is_available("orjson"), reason="orjson is not installed")
+    def test_fallback_to_pickle(self):
+        """Test values a serializer cannot encode are pickled."""
+        value = {"price": Decimal("19.99")}
+        data = serialize(value, "orjson")
+
+        assert data[:1] == PICKLE
+        assert deserialize(data) == value
+
+    def test_legacy_pickle(self):
+        """Test untagged pickles written before the codecs are still read."""
+        assert deserialize(pickle.dumps(PAYLOAD)) == PAYLOAD
+
+    def test_unknown_serializer(self):
+        """Test an unknown serializer name is a configuration error."""
+        with pytest.raises(ImproperlyConfigured):
+            serialize(PAYLOAD, "yaml")
+
+    def test_codec_serializer(self):
+        """Test the django-redis serializer honours per-value serializers."""
+        serializer = CodecSerializer({})
+
+        assert serializer.loads(serializer.dumps(PAYLOAD)) == PAYLOAD
+        data = serializer.dumps(Encoded(PAYLOAD, "pickle"))
+        assert serializer.loads(data) == PAYLOAD
+
+
+class TestCompressors:
+    """Test tagged, size-adaptive compression round trips."""
+
+    @pytest.mark.parametrize("compressor", _available(COMPRESSORS))
+    def test_round_trip(self, compressor):
+        """Test large values are compressed and restored."""
+        data = b"product " * 1000
+        compressed = compress(data, compressor, min_length=1024)
+
+        assert compressed[:1] == COMPRESSORS[compressor][0]
+        assert len(compressed) < len(data)
+        assert decompress(compressed) == data
+
+    def test_small_values_stored_uncompressed(self):
+        """Test values below the threshold are only tagged."""
+        compressed = compress(b"product", "zlib", min_length=1024)
+
+        assert compressed == UNCOMPRESSED + b"product"
+        assert decompress(compressed) == b"product"
+
+    def test_incompressible_values_stored_uncompressed(self):
+        """Test values that do not shrink are stored as they are."""
+        data = bytes(range(256)) * 4
+        data = zlib.compress(data)
+
+        assert compress(data, "zlib", min_length=1)[:1] == UNCOMPRESSED
+
+    def test_disabled(self):
+        """Test no compressor only tags the value."""
+        assert compress(b"product " * 1000, None, min_length=0)[:1] == UNCOMPRESSED
+
+    def test_legacy_zlib(self):
+        """Test untagged zlib pickles written before the codecs are still read."""
+        legacy = zlib.compress(pickle.dumps(PAYLOAD))
+
+        assert deserialize(decompress(legacy)) == PAYLOAD
+
+    def test_legacy_raw(self):
+        """Test untagged uncompressed pickles are still read."""
+        legacy = pickle.dumps(PAYLOAD)
+
+        assert deserialize(decompress(legacy)) == PAYLOAD
@@ -0,0 +1,136 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from django.utils.http import http_date
+
+from core.cache.conditional import ConditionalValidators, list_versions
+from core.cache.fingerprint import request_cache_key
+from core.cache.invalidation import list_tag
+from core.cache.versioning import CacheVersion
+from products.models import Product, ProductCategory
+from products.tests.factories import ProductFactory
+
+
+@pytest.mark.django_db
+class TestConditionalValidators:
+    """Test ETag and Last-Modified validators of conditional GETs."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.factory = RequestFactory()
+        suffix = uuid.uuid4().hex[:8]
+        self.product = ProductFactory(
+            slug=f"product-{suffix}", category__slug=f"category-{suffix}"
+        )
+
+    def get(self, url="/api/products/", **headers):
+        request = self.factory.get(url, **headers)
+        request.user = AnonymousUser()
+        return request
+
+    def validators(self, request=None):
+        return ConditionalValidators.for_request(request or self.get(), [Product])
+
+    def test_headers(self):
+        """Test the ETag is weak and Last-Modified is the newest update."""
+        validators = self.validators()
+        headers = validators.headers()
+
+        assert headers["ETag"].startswith('W/"')
+        assert validators.last_modified == self.product.updated_at
+        assert headers["Last-Modified"] == http_date(
+            self.product.updated_at.timestamp()
+        )
+
+    def test_etag_stable_until_write(self):
+        """Test the ETag only changes when a dependency's list tag is bumped."""
+        etag = self.validators().etag
+
+        assert self.validators().etag == etag
+        CacheVersion(list_tag(ProductCategory)).increment()
+        assert self.validators().etag == etag
+        CacheVersion(list_tag(Product)).increment()
+        assert self.validators().etag != etag
+
+    def test_etag_depends_on_index_versions(self):
+        """Test the ETag changes with the version of a local index."""
+        request = self.get()
+        etag = ConditionalValidators.for_request(request, [Product], ["a"]).etag
+
+        assert ConditionalValidators.for_request(request, [Product], ["a"]).etag == etag
+        assert ConditionalValidators.for_request(request, [Product], ["b"]).etag != etag
+        assert self.validators(request).etag != etag
+
+    def test_etag_depends_on_request(self):
+        """Test different queries get different ETags."""
+        assert (
+            self.validators().etag
+            != self.validators(self.get("/api/products/?q=x")).etag
+        )
+
+    def test_if_none_match(self):
+        """Test If-None-Match with weak comparison, lists and wildcards."""
+        etag = self.validators().etag
+        strong = etag.removeprefix("W/")
+
+        for header in (etag, strong, f'"other", {etag}', "*"):
+            request = self.get(HTTP_IF_NONE_MATCH=header)
+            assert self.validators(request).not_modified(request)
+
+        request = self.get(HTTP_IF_NONE_MATCH='"other"')
+        assert not self.validators(request).not_modified(request)
+
+    def test_if_none_match_after_write(self):
+        """Test a stale ETag no longer matches after a write."""
+        etag = self.validators().etag
+        CacheVersion(list_tag(Product)).increment()
+
+        request = self.get(HTTP_IF_NONE_MATCH=etag)
+        assert not self.validators(request).not_modified(request)
+
+    def test_if_modified_since(self):
+        """Test If-Modified-Since against the newest update."""
+        updated = self.product.updated_at.timestamp()
+
+        request = self.get(HTTP_IF_MODIFIED_SINCE=http_date(updated + 1))
+        assert self.validators(request).not_modified(request)
+
+        request = self.get(HTTP_IF_MODIFIED_SINCE=http_date(updated - 1))
+        assert not self.validators(request).not_modified(request)
+
+    def test_if_none_match_takes_precedence(self):
+        """Test If-Modified-Since is ignored when If-None-Match is sent."""
+        since = http_date(self.product.updated_at.timestamp() + 1)
+        request = self.get(HTTP_IF_NONE_MATCH='"other"', HTTP_IF_MODIFIED_SINCE=since)
+
+        assert not self.validators(request).not_modified(request)
+
+    def test_last_modified_cached_until_write(self):
+        """Test the newest update is recomputed only after a tag bump."""
+        previous = self.validators().last_modified
+        Product.objects.filter(pk=self.product.pk).update(
+            updated_at=previous + timedelta(days=1)
+        )
+
+        assert self.validators().last_modified == previous
+        CacheVersion(list_tag(Product)).increment()
+        assert self.validators().last_modified == previous + timedelta(days=1)
+
+    def test_cached_body_key_follows_etag(self):
+        """Test the cached body moves to a new key whenever the ETag changes."""
+        request = self.get()
+
+        def key():
+            return request_cache_key(
+                "api:list_products", request, versions=list_versions([Product])
+            )
+
+        before = key(), self.validators(request).etag
+        CacheVersion(list_tag(Product)).increment()
+        after = key(), self.validators(request).etag
+
+        assert before[0] != after[0]
+        assert before[1] != after[1]
@@ -0,0 +1,110 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.http import QueryDict
+from django.test import RequestFactory
+
+from core.cache.fingerprint import canonical_query, request_cache_key
+from core.tests.factories import AdminUserFactory, UserFactory
+
+
+class TestCanonicalQuery:
+    """Test normalization of query strings."""
+
+    def test_parameters_sorted(self):
+        """Test parameter order does not matter."""
+        assert canonical_query(QueryDict("b=2&a=1")) == canonical_query(
+            QueryDict("a=1&b=2")
+        )
+
+    def test_values_kept_in_order(self):
+        """Test repeated values keep their order, since the last one wins."""
+        assert canonical_query(QueryDict("tag=x&tag=y")) == [("tag", ("x", "y"))]
+        assert canonical_query(QueryDict("tag=y&tag=x")) == [("tag", ("y", "x"))]
+
+    def test_ignored_parameters_dropped(self):
+        """Test empty, default and tracking parameters are dropped."""
+        query = QueryDict("q=shoe&page=1&search=&utm_source=mail&fbclid=abc&_=1")
+
+        assert canonical_query(query) == [("q", ("shoe",))]
+
+    def test_non_default_value_kept(self):
+        """Test a parameter is only dropped at its default value."""
+        assert canonical_query(QueryDict("page=2")) == [("page", ("2",))]
+
+    def test_allowed_params(self):
+        """Test parameters an endpoint does not read are ignored."""
+        query = QueryDict("q=shoe&debug=1")
+
+        assert canonical_query(query, allowed_params=["q"]) == [("q", ("shoe",))]
+
+    def test_plain_mapping(self):
+        """Test a mapping with scalar and list values."""
+        query = {"tag": ["x", "y"], "page": 3}
+
+        assert canonical_query(query) == [("page", ("3",)), ("tag", ("x", "y"))]
+
+
+@pytest.mark.django_db
+class TestRequestCacheKey:
+    """Test cache keys built from requests."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.factory = RequestFactory()
+
+    def get(self, url, user=None):
+        request = self.factory.get(url)
+        request.user = user or AnonymousUser()
+        return request
+
+    def key(self, request, **kwargs):
+        return request_cache_key("api:test", request, **kwargs)
+
+    def test_equivalent_queries_share_key(self):
+        """Test differently spelled but equivalent requests share a key."""
+        assert self.key(self.get("/api/products/?b=2&a=1&utm_source=x")) == (
+            self.key(self.get("/api/products/?a=1&b=2&page=1"))
+        )
+
+    def test_key_format(self):
+        """Test keys keep their readable prefix and a fixed-length digest."""
+        prefix, digest = self.key(self.get("/api/products/?q=" + "x" * 5000)).rsplit(
+            ":", 1
+        )
+
+        assert prefix == "api:test"
+        assert len(digest) == 32
+
+    def test_path_and_query_change_key(self):
+        """Test different paths or parameters produce different keys."""
+        base = self.key(self.get("/api/products/?q=a"))
+
+        assert base != self.key(self.get("/api/products/?q=b"))
+        assert base != self.key(self.get("/api/categories/?q=a"))
+
+    def test_audience_changes_key(self):
+        """Test anonymous, customer and staff responses never share a key."""
+        keys = {
+            self.key(self.get("/api/products/")),
+            self.key(self.get("/api/products/", UserFactory())),
+            self.key(self.get("/api/products/", AdminUserFactory())),
+        }
+
+        assert len(keys) == 3
+
+    def test_user_scoped(self):
+        """Test user-scoped responses get a key per user."""
+        first = self.get("/api/cart/", UserFactory())
+        second = self.get("/api/cart/", UserFactory())
+
+        assert self.key(first) == self.key(second)
+        assert self.key(first, user_scoped=True) != self.key(second, user_scoped=True)
+
+    def test_schema_version_and_versions_change_key(self):
+        """Test a new schema or data version moves the response to a new key."""
+        request = self.get("/api/products/")
+        base = self.key(request)
+
+        assert base != self.key(request, schema_version="abc")
+        assert base != self.key(request, versions=["v1"])
+        assert self.key(request, versions=["v1"]) != self.key(request, versions=["v2"])
@@ -0,0 +1,231 @@
+import uuid
+
+import pytest
+from django.db import transaction
+
+from core.cache import invalidation
+from core.cache.invalidation import (
+    InvalidationPlan,
+    InvalidationPlanner,
+    batch_invalidation,
+    execute_plan,
+    list_tag,
+    row_key,
+    schedule_invalidation,
+)
+from core.cache.versioning import CacheVersion, VersionedCache
+from products.models import Product, ProductCategory, ProductImage, ProductVariant
+from products.tests.factories import ProductFactory, ProductVariantFactory
+
+
+def _product(**kwargs) -> Product:
+    suffix = uuid.uuid4().hex[:8]
+    return ProductFactory(
+        slug=f"product-{suffix}", category__slug=f"category-{suffix}", **kwargs
+    )
+
+
+def _plan(*tags: str) -> InvalidationPlan:
+    plan = InvalidationPlan()
+    for tag in tags:
+        plan.add_tag(tag)
+    return plan
+
+
+@pytest.mark.django_db
+class TestInvalidationPlanner:
+    """Test the plans built from model metadata and declarations."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.planner = InvalidationPlanner.build(
+            [Product, ProductCategory, ProductVariant, ProductImage]
+        )
+
+    def test_plan_for_product(self):
+        """Test a product plans its row, its category row and its list tag."""
+        product = _product()
+
+        plan = self.planner.plan(Product, product)
+
+        assert ("product", f"product:{product.pk}") in plan.keys
+        assert (
+            "productcategory",
+            f"productcategory:{product.category_id}",
+        ) in plan.keys
+        assert plan.tags == {"product:list"}
+        assert plan.refresh == {("products.Product", str(product.pk))}
+
+    def test_plan_skips_audit_fields(self):
+        """Test created_by and updated_by never invalidate the user row."""
+        product = _product()
+
+        plan = self.planner.plan(Product, product)
+
+        assert all(namespace != "user" for namespace, _ in plan.keys)
+
+    def test_plan_for_variant_includes_parent(self):
+        """Test a variant invalidates the product that embeds it."""
+        variant = ProductVariantFactory(product=_product(), sku="SKU-1")
+
+        plan = self.planner.plan(ProductVariant, variant)
+
+        assert ("product", f"product:{variant.product_id}") in plan.keys
+        assert ("productvariant", f"productvariant:{variant.pk}") in plan.keys
+        assert plan.tags == {"productvariant:list", "product:list"}
+        assert plan.refresh == {("products.Product", str(variant.product_id))}
+
+    def test_plan_skips_templates_with_none(self):
+        """Test a template referencing a None attribute is skipped."""
+        planner = InvalidationPlanner.build(
+            [ProductCategory],
+            {"products.ProductCategory": {"tags": ["category:{parent_id}"]}},
+        )
+        category = _product().category
+
+        plan = planner.plan(ProductCategory, category)
+
+        assert plan.tags == {"productcategory:list"}
+
+    def test_plan_for_pks(self):
+        """Test planning rows known only by primary key."""
+        plan = self.planner.plan_for_pks(Product, ["a", "b"])
+
+        assert plan.keys == {("product", "product:a"), ("product", "product:b")}
+        assert plan.tags == {"product:list"}
+
+
+@pytest.mark.django_db
+class TestScheduleInvalidation:
+    """Test when scheduled plans are executed."""
+
+    @pytest.fixture(autouse=True)
+    def executed(self, monkeypatch):
+        """Record executed plans instead of touching the cache."""
+        executed = []
+
+        def execute_plan(plan):
+            executed.append(plan)
+            return len(plan)
+
+        monkeypatch.setattr(invalidation, "execute_plan", execute_plan)
+        # Plans queued by rolled-back transactions of earlier tests
+        invalidation.flush_pending("default")
+        executed.clear()
+        return executed
+
+    def test_empty_plan(self, executed):
+        """Test an empty plan is a no-op."""
+        assert schedule_invalidation(InvalidationPlan()) == 0
+        assert executed == []
+
+    def test_plans_merged_until_commit(
+        self, executed, django_capture_on_commit_callbacks
+    ):
+        """Test plans inside atomic() are merged and executed once on commit."""
+        with django_capture_on_commit_callbacks(execute=True), transaction.atomic():
+            assert schedule_invalidation(_plan("product:list")) == 0
+            assert schedule_invalidation(_plan("cart:list")) == 0
+            assert executed == []
+
+        assert len(executed) == 1
+        assert executed[0].tags == {"product:list", "cart:list"}
+
+    def test_rolled_back_savepoint_is_still_flushed(
+        self, executed, django_capture_on_commit_callbacks
+    ):
+        """Test a plan from a rolled-back savepoint is flushed with the next one."""
+
+        def rolled_back():
+            with transaction.atomic():
+                schedule_invalidation(_plan("order:list"))
+                raise RuntimeError
+
+        with django_capture_on_commit_callbacks(execute=True), transaction.atomic():
+            with pytest.raises(RuntimeError):
+                rolled_back()
+            schedule_invalidation(_plan("cart:list"))
+
+        assert len(executed) == 1
+        assert executed[0].tags == {"order:list", "cart:list"}
+
+    def test_batch_invalidation(self, executed, django_capture_on_commit_callbacks):
+        """Test a batch merges plans, including those of nested batches."""
+        with django_capture_on_commit_callbacks(execute=True), batch_invalidation():
+            schedule_invalidation(_plan("product:list"))
+            with batch_invalidation():
+                schedule_invalidation(_plan("order:list"))
+            assert executed == []
+
+        assert len(executed) == 1
+        assert executed[0].tags == {"product:list", "order:list"}
+
+
+@pytest.mark.django_db
+class TestExecutePlan:
+    """Test invalidating the entries of a plan in the cache."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.product = _product()
+        self.other = _product()
+        # Creating them queued a plan for the test transaction's commit
+        invalidation.flush_pending("default")
+        self.namespace, self.key = row_key(Product, self.product.pk)
+        self.tag = list_tag(Product)
+        VersionedCache(self.namespace).set(self.key, "row")
+        VersionedCache(self.tag).set("page:1", "page")
+
+    def test_deletes_keys_and_bumps_tags(self):
+        """Test keys are deleted, tags get a new version and L1 copies go too."""
+        # Reads fill the local cache
+        assert VersionedCache(self.namespace).get(self.key) == "row"
+        assert VersionedCache(self.tag).get("page:1") == "page"
+        version = CacheVersion(self.tag).get()
+        plan = InvalidationPlan()
+        plan.add_key(self.namespace, self.key)
+        plan.add_tag(self.tag)
+
+        assert execute_plan(plan) == 2
+
+        assert VersionedCache(self.namespace).get(self.key) is None
+        assert VersionedCache(self.tag).get("page:1") is None
+        assert CacheVersion(self.tag).get() != version
+
+    def test_untouched_entries_survive(self):
+        """Test entries outside the plan are kept."""
+        other_key = f"product:{self.other.pk}"
+        VersionedCache("product").set(other_key, "other")
+        plan = InvalidationPlan()
+        plan.add_key(self.namespace, self.key)
+
+        execute_plan(plan)
+
+        assert VersionedCache("product").get(other_key) == "other"
+        assert VersionedCache(self.tag).get("page:1") == "page"
+
+    def test_saves_in_transaction_invalidate_once(
+        self, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        """Test rows saved in one transaction are invalidated in one plan."""
+        executed = []
+
+        def record(plan):
+            executed.append(plan)
+            return execute_plan(plan)
+
+        monkeypatch.setattr(invalidation, "execute_plan", record)
+
+        with django_capture_on_commit_callbacks(execute=True), transaction.atomic():
+            self.product.name = "Renamed"
+            self.product.save()
+            self.other.name = "Renamed too"
+            self.other.save()
+            assert VersionedCache(self.namespace).get(self.key) == "row"
+
+        assert len(executed) == 1
+        assert {self.key, f"product:{self.other.pk}"} <= {
+            key for _, key in executed[0].keys
+        }
+        assert VersionedCache(self.namespace).get(self.key) is None
+        assert VersionedCache(self.tag).get("page:1") is None
@@ -0,0 +1,120 @@
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import keyspace
+from core.cache.keyspace import (
+    STATUS_CURRENT,
+    STATUS_ORPHANED,
+    KeyClassifier,
+    analyze_keyspace,
+    purge_orphaned_versions,
+)
+from core.cache.settings import is_redis_cache
+from core.cache.versioning import CacheVersion, VersionedCache
+
+redis_only = pytest.mark.skipif(
+    not is_redis_cache(), reason="Needs a django-redis default cache"
+)
+
+
+@redis_only
+class TestPurgeOrphanedVersions:
+    """Test purging entries of superseded namespace versions."""
+
+    def setup_method(self):
+        """Set up test data."""
+        cache.clear()
+        self.versioned_cache = VersionedCache("product")
+        self.versioned_cache.set_many({f"item:{n}": n for n in range(5)}, 60)
+        self.old_version = CacheVersion("product").get()
+        CacheVersion("product").increment()
+        self.versioned_cache.set_many({f"item:{n}": n * 10 for n in range(3)}, 60)
+        cache.set("plain:key", 1)
+
+    def stored(self, version, key):
+        return cache.get(f"{settings.CACHE_KEY_PREFIX}:product:{version}:{key}")
+
+    def test_only_orphaned_entries_are_deleted(self):
+        """Test superseded entries go and current and plain keys stay."""
+        assert purge_orphaned_versions(batch_size=2, throttle=0) == 5
+
+        assert [self.versioned_cache.get(f"item:{n}") for n in range(5)] == [
+            0,
+            10,
+            20,
+            None,
+            None,
+        ]
+        assert cache.get("plain:key") == 1
+        assert purge_orphaned_versions(throttle=0) == 0
+
+    def test_version_restored_during_scan(self, monkeypatch):
+        """Test entries of a version that becomes current mid-scan are kept."""
+        current = CacheVersion("product").get()
+        load_versions = KeyClassifier.load_versions
+
+        def load_then_restore(classifier, connection):
+            load_versions(classifier, connection)
+            cache.set(CacheVersion("product").version_key, self.old_version)
+
+        monkeypatch.setattr(KeyClassifier, "load_versions", load_then_restore)
+
+        assert purge_orphaned_versions(throttle=0) == 0
+
+        assert self.stored(self.old_version, "item:4") == 4
+        assert self.stored(current, "item:0") == 0
+
+    def test_expired_namespace_version_is_kept(self):
+        """Test entries of a namespace without a live version are never purged."""
+        cache.delete(CacheVersion("product").version_key)
+
+        assert purge_orphaned_versions(throttle=0) == 0
+
+    def test_throttle(self, monkeypatch):
+        """Test the purge pauses between batches with orphaned keys."""
+        sleeps = []
+        monkeypatch.setattr(keyspace.time, "sleep", sleeps.append)
+
+        purge_orphaned_versions(batch_size=1000, throttle=0.01)
+
+        assert sleeps == [0.01]
+
+
+@redis_only
+class TestAnalyzeKeyspace:
+    """Test the key-space report."""
+
+    def setup_method(self):
+        """Set up test data."""
+        cache.clear()
+        VersionedCache("product").set_many({"a": 1, "b": 2}, 600)
+        CacheVersion("product").increment()
+        VersionedCache("product").set("a", 1, 7200)
+        cache.set("plain:key", "x" * 100, None)
+
+    def test_groups(self):
+        """Test keys are grouped by namespace, version status and TTL."""
+        report = analyze_keyspace(max_keys=0)
+
+        groups = {(g["namespace"], g["status"]): g for g in report["groups"]}
+        current = groups["product", STATUS_CURRENT]
+        orphaned = groups["product", STATUS_ORPHANED]
+        assert current["keys"] == 1
+        assert current["ttl"] == {"<1d": 1}
+        assert orphaned["keys"] == 2
+        assert orphaned["ttl"] == {"<1h": 2}
+        assert groups["plain:key", "unversioned"]["ttl"] == {"none": 1}
+        assert report["orphaned"]["keys"] == 2
+        assert report["sampled"] == report["total_keys"]
+
+    def test_max_keys(self):
+        """Test sampling stops after max_keys keys."""
+        assert analyze_keyspace(max_keys=2, batch_size=1)["sampled"] == 2
+
+
+@pytest.mark.skipif(is_redis_cache(), reason="Needs a non-Redis default cache")
+def test_without_redis():
+    """Test the analysis and purge are skipped without Redis."""
+    assert analyze_keyspace() == {}
+    assert purge_orphaned_versions() == 0
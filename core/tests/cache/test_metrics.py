@@ -0,0 +1,142 @@
+import pytest
+from django.core.cache import cache
+
+from core.cache import metrics
+from core.cache.metrics import (
+    flush_metrics,
+    get_cache_metrics,
+    get_counters,
+    metric_namespace,
+    record_counter,
+    record_get,
+    record_set,
+    reset_cache_metrics,
+    reset_counters,
+)
+from core.cache.settings import CACHE_METRICS
+from core.cache.versioning import VersionedCache
+
+
+class TestCacheMetrics:
+    """Test buffering, flushing and reporting of cache metrics."""
+
+    @pytest.fixture(autouse=True)
+    def clean_metrics(self, monkeypatch):
+        """Start from empty counters with a long flush interval."""
+        monkeypatch.setitem(CACHE_METRICS, "ENABLED", True)
+        monkeypatch.setitem(CACHE_METRICS, "FLUSH_INTERVAL", 3600)
+        flush_metrics()
+        reset_cache_metrics()
+
+    @pytest.mark.parametrize(
+        ("namespace", "expected"),
+        [
+            ("product", "product"),
+            ("product:42", "product:*"),
+            (
+                "product:1f0c8e2a-3b4d-4e5f-8a9b-0c1d2e3f4a5b:reviews",
+                "product:*:reviews",
+            ),
+            ("product:1f0c8e2a3b4d4e5f8a9b0c1d2e3f4a5b", "product:*"),
+            ("product:list", "product:list"),
+        ],
+    )
+    def test_metric_namespace(self, namespace, expected):
+        """Test id segments are collapsed to keep the series bounded."""
+        assert metric_namespace(namespace) == expected
+
+    def test_buffered_until_flush(self, monkeypatch):
+        """Test recording does not write to the cache until a flush."""
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("metrics must not write per operation")
+
+        with monkeypatch.context() as patched:
+            patched.setattr(cache, "set", fail)
+            patched.setattr(cache, "get", fail)
+            record_get("product", hit=True, seconds=0.0001)
+            record_get("product", hit=False, seconds=0.0001)
+            record_set("product", seconds=0.0001, size=120)
+
+        report = get_cache_metrics()["product"]
+        assert report["hits"] == report["misses"] == report["sets"] == 1
+        assert report["bytes"] == 120
+        assert report["hit_ratio"] == 0.5
+
+    def test_flush_interval(self, monkeypatch):
+        """Test a record after the flush interval flushes the buffer."""
+        flushes = []
+        monkeypatch.setattr(
+            metrics, "flush_metrics", lambda: flushes.append(flush_metrics())
+        )
+
+        record_get("product", hit=True, seconds=0.0001)
+        assert flushes == []
+
+        monkeypatch.setitem(CACHE_METRICS, "FLUSH_INTERVAL", 0)
+        record_get("product", hit=True, seconds=0.0001)
+        assert len(flushes) == 1
+        assert get_cache_metrics()["product"]["hits"] == 2
+
+    def test_flushes_add_up(self):
+        """Test consecutive flushes add to the shared totals."""
+        for _ in range(3):
+            record_get("product:1", hit=True, seconds=0.0001)
+            flush_metrics()
+
+        assert get_counters(["product:2"])["product:2"]["hits"] == 3
+
+    def test_percentiles(self):
+        """Test p50 and p99 are the upper bounds of their histogram buckets."""
+        for _ in range(98):
+            record_get("product", hit=True, seconds=0.0004)
+        record_get("product", hit=True, seconds=0.02)
+        record_get("product", hit=True, seconds=0.02)
+
+        report = get_cache_metrics()["product"]
+        assert report["get_p50_ms"] == 0.5
+        assert report["get_p99_ms"] == 25.0
+        assert report["set_p50_ms"] is None
+
+    def test_disabled(self, monkeypatch):
+        """Test reads and writes are not counted when disabled, events still are."""
+        monkeypatch.setitem(CACHE_METRICS, "ENABLED", False)
+
+        record_get("product", hit=True, seconds=0.0001)
+        record_counter("product", "stampede:recompute")
+
+        assert get_counters(["product"])["product"] == {"stampede:recompute": 1}
+
+    def test_reset_counters(self):
+        """Test resetting fields drops buffered and flushed values."""
+        record_counter("product", "stampede:recompute")
+        flush_metrics()
+        record_counter("product", "stampede:recompute")
+        record_get("product", hit=True, seconds=0.0001)
+
+        reset_counters(["product"], ["stampede:recompute"])
+
+        counters = get_counters(["product"])["product"]
+        assert "stampede:recompute" not in counters
+        assert counters["hits"] == 1
+
+    def test_versioned_cache_is_instrumented(self):
+        """Test reads and writes through VersionedCache are counted."""
+        versioned_cache = VersionedCache("metrics-test")
+        versioned_cache.get("missing")
+        versioned_cache.set("present", 1)
+        versioned_cache.get("present")
+
+        report = get_cache_metrics()["metrics-test"]
+        assert report["misses"] == 1
+        assert report["hits"] == 1
+        assert report["sets"] == 1
+
+    def test_reset_cache_metrics(self):
+        """Test a reset drops every namespace."""
+        record_get("product", hit=True, seconds=0.0001)
+        flush_metrics()
+
+        reset_cache_metrics()
+
+        assert get_cache_metrics() == {}
@@ -0,0 +1,60 @@
+import logging
+import uuid
+
+import pytest
+
+from core.cache.preload import CachePreloader
+
+from . import preload_urls
+
+
+@pytest.mark.django_db
+class TestCachePreloader:
+    """Test the preload steps run by preload_all."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.preloader = CachePreloader()
+        self.replayed = []
+
+    @pytest.fixture(autouse=True)
+    def replay(self, monkeypatch):
+        """Record replayed endpoints instead of calling the API."""
+
+        def warm_endpoint(path, _audience=None):
+            self.replayed.append(path)
+            return True
+
+        monkeypatch.setattr(self.preloader, "warm_endpoint", warm_endpoint)
+
+    def test_preload_all_runs_steps_only(self, caplog):
+        """Test every preload step runs without errors."""
+        with caplog.at_level(logging.ERROR, logger="core.cache.preload"):
+            self.preloader.preload_all()
+
+        assert caplog.records == []
+        assert "products/featured" in self.replayed
+
+
+@pytest.mark.urls("core.tests.cache.preload_urls")
+class TestWarmRoute:
+    """Test replaying endpoints by route name."""
+
+    def setup_method(self):
+        """Set up test data."""
+        preload_urls.calls.clear()
+        self.category_id = uuid.uuid4()
+
+    def test_replays_named_route(self):
+        """Test the endpoint behind the route name is replayed."""
+        assert CachePreloader().warm_route(
+            "get_products_by_category", category_id=self.category_id
+        )
+        assert preload_urls.calls == [("products_by_category", self.category_id)]
+
+    def test_shadowed_route_not_replayed(self):
+        """Test a route shadowed by another endpoint is reported, not replayed."""
+        assert not CachePreloader().warm_route(
+            "shadowed_listing", category_id=self.category_id
+        )
+        assert preload_urls.calls == []
@@ -0,0 +1,72 @@
+import json
+import uuid
+
+import pytest
+from django.test import RequestFactory
+
+from api.utils.pagination import cursor_paginate_queryset, paginate_queryset
+from core.cache.responses import EndpointSchema, RenderedResponse
+from products.models import ProductCategory
+from products.schemas import CategorySchema
+from products.tests.factories import ProductCategoryFactory
+
+
+@pytest.mark.django_db
+class TestEndpointSchema:
+    """Test rendering view results against the declared response schema."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.request = RequestFactory().get("/api/products/categories")
+        self.schema = EndpointSchema({200: list[CategorySchema]})
+        suffix = uuid.uuid4().hex[:8]
+        self.categories = [
+            ProductCategoryFactory(slug=f"category-{suffix}-{number}")
+            for number in range(3)
+        ]
+        self.queryset = ProductCategory.objects.filter(
+            pk__in=[category.pk for category in self.categories]
+        ).order_by("slug")
+
+    def render(self, result):
+        rendered = self.schema.render(self.request, result)
+        assert isinstance(rendered, RenderedResponse)
+        return rendered.status, json.loads(rendered.content)
+
+    def test_list(self):
+        """Test a plain list is rendered with the list schema."""
+        status, body = self.render((200, self.queryset))
+
+        assert status == 200
+        assert [row["slug"] for row in body] == [c.slug for c in self.categories]
+
+    def test_page(self):
+        """Test a paginated envelope renders its results and keeps pagination."""
+        page = paginate_queryset(self.queryset, page=1, page_size=2)
+
+        status, body = self.render((200, page))
+
+        assert status == 200
+        assert [row["slug"] for row in body["results"]] == [
+            c.slug for c in self.categories[:2]
+        ]
+        assert set(body["results"][0]) == set(CategorySchema.model_fields)
+        assert body["pagination"]["total_count"] == 3
+        assert body["pagination"]["next_page"] == 2
+
+    def test_cursor_page(self):
+        """Test a keyset paginated envelope renders the same way."""
+        page = cursor_paginate_queryset(self.queryset, page_size=2, ordering=("slug",))
+
+        _, body = self.render((200, page))
+
+        assert len(body["results"]) == 2
+        assert body["pagination"]["has_next"] is True
+        assert body["pagination"]["next_cursor"]
+
+    def test_page_with_invalid_rows(self):
+        """Test a page whose rows do not match the schema still fails."""
+        page = {"results": [{"id": "not-a-uuid"}], "pagination": {}}
+
+        with pytest.raises(ValueError, match="validation error"):
+            self.schema.render(self.request, (200, page))
@@ -0,0 +1,184 @@
+import os
+import uuid
+
+import pytest
+from django.conf import settings
+from django_redis.cache import RedisCache
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from core.cache import sharding
+from core.cache.sharding import ConsistentHashRing, ShardedRedisClient
+
+KEYS = [f"ecommerce:1:product:{number}" for number in range(10_000)]
+
+
+def _owners(ring, keys=KEYS):
+    return {key: ring.get_node(key) for key in keys}
+
+
+class TestConsistentHashRing:
+    """Test key distribution and remapping of the hash ring."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.nodes = [f"redis://node{number}:6379/0" for number in range(4)]
+        self.ring = ConsistentHashRing(self.nodes[:3])
+
+    def test_distribution(self):
+        """Test keys are spread evenly over the nodes."""
+        owners = list(_owners(self.ring).values())
+
+        for node in self.nodes[:3]:
+            share = owners.count(node) / len(KEYS)
+            assert 0.25 < share < 0.42
+
+    def test_adding_a_node_moves_about_one_nth(self):
+        """Test a new node only takes keys over, about 1/N of them."""
+        before = _owners(self.ring)
+        self.ring.add_node(self.nodes[3])
+        after = _owners(self.ring)
+
+        moved = [key for key in KEYS if before[key] != after[key]]
+        assert 0.17 < len(moved) / len(KEYS) < 0.33
+        assert {after[key] for key in moved} == {self.nodes[3]}
+
+    def test_removing_a_node_only_moves_its_keys(self):
+        """Test keys of the remaining nodes stay where they are."""
+        before = _owners(self.ring)
+        self.ring.remove_node(self.nodes[1])
+        after = _owners(self.ring)
+
+        for key in KEYS:
+            if before[key] == self.nodes[1]:
+                assert after[key] != self.nodes[1]
+            else:
+                assert after[key] == before[key]
+
+    def test_empty_ring(self):
+        """Test a ring without nodes refuses lookups."""
+        with pytest.raises(ValueError, match="no nodes"):
+            ConsistentHashRing().get_node("key")
+
+
+class TestShardedRedisClient:
+    """Test the sharded client over several fakeredis nodes."""
+
+    def setup_method(self):
+        """Set up test data."""
+        fakeredis = pytest.importorskip("fakeredis")
+        # Every host gets its own fake server
+        run = uuid.uuid4().hex[:8]
+        self.nodes = [f"redis://{run}-node{number}:6379/0" for number in range(3)]
+        self.cache = RedisCache(
+            self.nodes,
+            {
+                "OPTIONS": {
+                    "CLIENT_CLASS": "core.cache.sharding.ShardedRedisClient",
+                    "CONNECTION_POOL_KWARGS": {
+                        "connection_class": fakeredis.FakeConnection
+                    },
+                },
+                "KEY_PREFIX": "test",
+            },
+        )
+        self.client = self.cache.client
+        assert isinstance(self.client, ShardedRedisClient)
+        self.connections = dict(
+            zip(self.nodes, self.client.node_connections(), strict=True)
+        )
+        self.version_key = f"{settings.CACHE_KEY_PREFIX}:version:products"
+
+    def nodes_with(self, key):
+        made_key = str(self.client.make_key(key))
+        return {
+            node
+            for node, connection in self.connections.items()
+            if connection.exists(made_key)
+        }
+
+    def owner(self, key):
+        return self.client.get_server_name(self.client.make_key(key))
+
+    def test_keys_live_on_their_owner(self):
+        """Test a plain key is written to and read from its ring owner only."""
+        keys = [f"product:{number}" for number in range(30)]
+        for key in keys:
+            self.cache.set(key, key)
+
+        for key in keys:
+            assert self.nodes_with(key) == {self.owner(key)}
+            assert self.cache.get(key) == key
+        assert len({self.owner(key) for key in keys}) == 3
+
+    def test_hash_tags_pin_keys(self):
+        """Test keys sharing a {hash tag} land on the same node."""
+        owners = {self.owner(f"{{cart:7}}:item:{number}") for number in range(20)}
+
+        assert len(owners) == 1
+
+    def test_many_operations_group_by_node(self, monkeypatch):
+        """Test get_many, set_many and delete_many send one call per node."""
+        calls = []
+        for name in ("get_many", "set_many", "delete_many"):
+            original = getattr(sharding.DefaultClient, name)
+
+            def record(client, keys, *args, original=original, name=name, **kwargs):
+                calls.append((name, list(keys), args[-1]))
+                return original(client, keys, *args, **kwargs)
+
+            monkeypatch.setattr(sharding.DefaultClient, name, record)
+
+        data = {f"product:{number}": number for number in range(30)}
+        self.cache.set_many(data)
+        assert self.cache.get_many(list(data)) == data
+        self.cache.delete_many(list(data))
+        assert self.nodes_with("product:1") == set()
+
+        nodes_by_operation = {}
+        for name, keys, connection in calls:
+            node = next(n for n, c in self.connections.items() if c is connection)
+            assert {self.owner(key) for key in keys} == {node}
+            nodes_by_operation.setdefault(name, []).append(node)
+        for nodes in nodes_by_operation.values():
+            assert sorted(nodes) == sorted(self.nodes)
+
+    def test_version_keys_are_replicated(self):
+        """Test namespace version keys are written to and deleted from every node."""
+        self.cache.set(self.version_key, "v1")
+        assert self.nodes_with(self.version_key) == set(self.nodes)
+
+        self.cache.set_many({self.version_key: "v2", "product:1": 1})
+        assert self.nodes_with(self.version_key) == set(self.nodes)
+        assert self.nodes_with("product:1") == {self.owner("product:1")}
+        assert self.cache.get_many([self.version_key]) == {self.version_key: "v2"}
+
+        self.cache.delete(self.version_key)
+        assert self.nodes_with(self.version_key) == set()
+
+    def test_add_is_decided_by_the_owner(self):
+        """Test add() of a version key only wins once and is replicated."""
+        assert self.cache.add(self.version_key, "v1")
+        assert not self.cache.add(self.version_key, "v2")
+
+        assert self.cache.get(self.version_key) == "v1"
+        assert self.nodes_with(self.version_key) == set(self.nodes)
+
+    def test_replica_fallback(self, monkeypatch):
+        """Test replicated keys are read from the owner when a replica misses or fails."""
+        preferred = self.nodes[os.getpid() % len(self.nodes)]
+        key = next(
+            f"{self.version_key}-{number}"
+            for number in range(100)
+            if self.owner(f"{self.version_key}-{number}") != preferred
+        )
+        self.cache.set(key, "v1")
+        made_key = str(self.client.make_key(key))
+
+        self.connections[preferred].delete(made_key)
+        assert self.cache.get(key) == "v1"
+
+        def unavailable(*_args, **_kwargs):
+            raise RedisConnectionError("node down")
+
+        monkeypatch.setattr(self.connections[preferred], "get", unavailable)
+        assert self.cache.get(key) == "v1"
@@ -0,0 +1,221 @@
+import math
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+
+from core.cache import stampede
+from core.cache.stampede import (
+    CacheEnvelope,
+    force_recompute,
+    get_or_compute,
+    get_stampede_stats,
+    release_lock,
+    reset_stampede_stats,
+    store,
+    track_prefix,
+)
+
+KEY = "test:stampede"
+
+
+class TestCacheEnvelope:
+    """Test the XFetch early recompute decision."""
+
+    @pytest.fixture(autouse=True)
+    def unit_jitter(self, monkeypatch):
+        """Make -log(1 - random()) exactly 1."""
+        monkeypatch.setattr(stampede.random, "random", lambda: 1 - math.exp(-1))
+
+    def test_disabled_without_beta(self):
+        """Test beta=0 never recomputes early."""
+        envelope = CacheEnvelope("value", expires_at=101.0, delta=10.0)
+
+        assert not envelope.should_recompute_early(100.0, beta=0)
+
+    def test_recompute_close_to_expiry(self):
+        """Test recomputing when the expected cost reaches expiry."""
+        envelope = CacheEnvelope("value", expires_at=105.0, delta=10.0)
+
+        assert envelope.should_recompute_early(100.0, beta=1.0)
+
+    def test_no_recompute_far_from_expiry(self):
+        """Test serving the value when expiry is further than the cost."""
+        envelope = CacheEnvelope("value", expires_at=120.0, delta=10.0)
+
+        assert not envelope.should_recompute_early(100.0, beta=1.0)
+        assert envelope.should_recompute_early(100.0, beta=2.0)
+
+
+class TestGetOrCompute:
+    """Test single-flight recomputation through get_or_compute."""
+
+    def setup_method(self):
+        """Set up test data."""
+        cache.clear()
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return f"value-{self.calls}"
+
+    def test_miss_then_hit(self):
+        """Test a value is computed once and then served from the cache."""
+        assert get_or_compute(KEY, self.compute, 60) == "value-1"
+        assert get_or_compute(KEY, self.compute, 60) == "value-1"
+        assert self.calls == 1
+
+    def test_uncacheable_value_not_stored(self):
+        """Test values rejected by ``cacheable`` are recomputed every time."""
+        get_or_compute(KEY, self.compute, 60, cacheable=lambda _: False)
+        get_or_compute(KEY, self.compute, 60, cacheable=lambda _: False)
+
+        assert self.calls == 2
+
+    def test_stale_value_recomputed_by_lock_winner(self):
+        """Test an expired entry is recomputed by the worker taking the lock."""
+        store(KEY, "stale", -1)
+
+        assert get_or_compute(KEY, self.compute, 60) == "value-1"
+        assert cache.get(f"{KEY}:lock") is None
+
+    def test_stale_value_served_while_locked(self):
+        """Test other workers serve the stale value during a recompute."""
+        store(KEY, "stale", -1)
+        cache.add(f"{KEY}:lock", "other-worker", 10)
+
+        assert get_or_compute(KEY, self.compute, 60) == "stale"
+        assert self.calls == 0
+
+    def test_lock_timeout_computes_without_lock(self):
+        """Test a worker gives up waiting when the lock holder is too slow."""
+        cache.add(f"{KEY}:lock", "other-worker", 10)
+
+        assert get_or_compute(KEY, self.compute, 60, wait_timeout=0) == "value-1"
+        assert cache.get(f"{KEY}:lock") == "other-worker"
+
+    def test_background_refresh(self):
+        """Test the lock winner schedules a refresh and serves the stale value."""
+        store(KEY, "stale", -1)
+        tokens = []
+
+        value = get_or_compute(KEY, self.compute, 60, refresh=tokens.append)
+
+        assert value == "stale"
+        assert self.calls == 0
+        assert len(tokens) == 1
+        # The lock stays held until the refresh releases it
+        assert cache.get(f"{KEY}:lock") == tokens[0]
+        release_lock(KEY, tokens[0])
+        assert cache.get(f"{KEY}:lock") is None
+
+    def test_background_refresh_not_used_on_miss(self):
+        """Test a miss is computed inline since there is nothing to serve."""
+        tokens = []
+
+        assert get_or_compute(KEY, self.compute, 60, refresh=tokens.append) == (
+            "value-1"
+        )
+        assert tokens == []
+
+    def test_background_refresh_falls_back_to_inline(self):
+        """Test a refresh that cannot be scheduled recomputes inline."""
+        store(KEY, "stale", -1)
+
+        def unavailable(_token):
+            raise ConnectionError("broker down")
+
+        assert get_or_compute(KEY, self.compute, 60, refresh=unavailable) == ("value-1")
+        assert cache.get(f"{KEY}:lock") is None
+        assert get_or_compute(KEY, self.compute, 60) == "value-1"
+
+    def test_release_lock_of_other_token(self):
+        """Test a refresh whose lock expired does not release the next owner's."""
+        cache.add(f"{KEY}:lock", "next-owner", 10)
+
+        release_lock(KEY, "expired-owner")
+
+        assert cache.get(f"{KEY}:lock") == "next-owner"
+
+    def test_force_recompute(self):
+        """Test fresh entries are recomputed inside force_recompute()."""
+        get_or_compute(KEY, self.compute, 60)
+
+        with force_recompute():
+            assert get_or_compute(KEY, self.compute, 60) == "value-2"
+        assert get_or_compute(KEY, self.compute, 60) == "value-2"
+
+    def test_concurrent_misses_compute_once(self):
+        """Test concurrent misses wait for a single recompute."""
+        workers = 8
+        barrier = threading.Barrier(workers)
+        results = []
+
+        def slow_compute():
+            time.sleep(0.2)
+            return self.compute()
+
+        def worker():
+            barrier.wait()
+            results.append(
+                get_or_compute(KEY, slow_compute, 60, wait_timeout=5, prefix="test")
+            )
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert self.calls == 1
+        assert results == ["value-1"] * workers
+
+
+class TestStampedeStats:
+    """Test the buffered stampede counters."""
+
+    def setup_method(self):
+        """Set up test data."""
+        track_prefix("stats")
+        reset_stampede_stats()
+
+    def test_events_counted_without_cache_writes(self, monkeypatch):
+        """Test events are buffered and only reach the cache on a flush."""
+        store(KEY, "stale", -1)
+        cache.add(f"{KEY}:lock", "other-worker", 10)
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("stampede counters must not write to the cache")
+
+        with monkeypatch.context() as patched:
+            patched.setattr(cache, "incr", fail)
+            for _ in range(3):
+                get_or_compute(KEY, lambda: "fresh", 60, prefix="stats")
+        cache.delete(f"{KEY}:lock")
+        get_or_compute(KEY, lambda: "fresh", 60, prefix="stats")
+
+        stats = get_stampede_stats()["stats"]
+        assert stats["stale_served"] == 3
+        assert stats["recompute"] == 1
+        assert stats["waited"] == 0
+
+    def test_background_refresh_counted(self):
+        """Test scheduled background refreshes are counted."""
+        store(KEY, "stale", -1)
+
+        get_or_compute(
+            KEY, lambda: "fresh", 60, prefix="stats", refresh=lambda _token: None
+        )
+
+        stats = get_stampede_stats()["stats"]
+        assert stats["background_refresh"] == 1
+        assert stats["recompute"] == 0
+
+    def test_reset(self):
+        """Test resetting drops the counters of tracked prefixes."""
+        get_or_compute(KEY, lambda: "fresh", 60, prefix="stats")
+
+        reset_stampede_stats()
+
+        assert get_stampede_stats()["stats"]["recompute"] == 0
@@ -0,0 +1,130 @@
+import pytest
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+from core.cache import tags
+from core.cache.decorators import cached_view
+from core.cache.settings import cache_key_prefix, clear_cache_pattern, is_redis_cache
+from core.cache.tags import invalidate_tags, purge_pattern, tag_keys, tag_set_key
+
+redis_only = pytest.mark.skipif(
+    not is_redis_cache(), reason="Needs a django-redis default cache"
+)
+
+
+class TestTagSets:
+    """Test registering keys under tags and invalidating them."""
+
+    def setup_method(self):
+        """Set up test data."""
+        cache.clear()
+        cache.set_many({"view:a": 1, "view:b": 2, "view:c": 3, "other:d": 4})
+
+    def test_invalidate_tags(self):
+        """Test only the keys registered under the tags are deleted."""
+        tag_keys(["view:a", "view:b"], ["catalog"], 60)
+        tag_keys(["view:c"], ["cart"], 60)
+
+        assert invalidate_tags(["catalog"]) == 2
+
+        assert cache.get_many(["view:a", "view:b", "view:c", "other:d"]) == {
+            "view:c": 3,
+            "other:d": 4,
+        }
+        assert invalidate_tags(["catalog"]) == 0
+
+    def test_key_under_several_tags(self):
+        """Test a key tagged twice is deleted by either tag."""
+        tag_keys(["view:a"], ["catalog", "home"], 60)
+
+        invalidate_tags(["home"])
+
+        assert cache.get("view:a") is None
+        assert cache.get("view:b") == 2
+
+    def test_registrations_accumulate(self):
+        """Test registering more keys under a tag keeps the earlier ones."""
+        tag_keys(["view:a"], ["catalog"], 60)
+        tag_keys(["view:b"], ["catalog"], 60)
+
+        assert invalidate_tags(["catalog"]) == 2
+
+    @redis_only
+    def test_batches(self, monkeypatch):
+        """Test members are unlinked in batches with a pause between them."""
+        sleeps = []
+        monkeypatch.setattr(tags.time, "sleep", sleeps.append)
+        tag_keys(["view:a", "view:b", "view:c"], ["catalog"], 60)
+
+        assert invalidate_tags(["catalog"], batch_size=2, throttle=0.01) == 3
+
+        assert sleeps == [0.01]
+        assert cache.get("view:c") is None
+        assert not get_redis_connection("default").exists(
+            cache.client.make_key(tag_set_key("catalog"))
+        )
+
+    @redis_only
+    def test_tag_set_ttl_only_grows(self):
+        """Test a tag set lives as long as its longest-lived key."""
+        set_key = cache.client.make_key(tag_set_key("catalog"))
+        tag_keys(["view:a"], ["catalog"], 600)
+        tag_keys(["view:b"], ["catalog"], 60)
+
+        assert get_redis_connection("default").ttl(set_key) > 60
+
+        tag_keys(["view:c"], ["catalog"], None)
+        assert get_redis_connection("default").ttl(set_key) == -1
+
+    def test_cached_view_registers_tags(self):
+        """Test entries cached by cached_view are dropped with their tag."""
+        calls = []
+
+        @cached_view(timeout=60, key_prefix="tagged", tags=["catalog"])
+        def view(_controller, item):
+            calls.append(item)
+            return {"item": item}
+
+        assert view(None, None, 1) == {"item": 1}
+        assert view(None, None, 1) == {"item": 1}
+        invalidate_tags(["catalog"])
+        assert view(None, None, 1) == {"item": 1}
+
+        assert calls == [1, 1]
+
+
+class TestPurgePattern:
+    """Test deleting keys by pattern with SCAN."""
+
+    def setup_method(self):
+        """Set up test data."""
+        cache.clear()
+        cache.set_many({f"view:{number}": number for number in range(5)})
+        cache.set("other:1", 1)
+
+    @redis_only
+    def test_purge_pattern(self, monkeypatch):
+        """Test matching keys are deleted in batches and others are kept."""
+        sleeps = []
+        monkeypatch.setattr(tags.time, "sleep", sleeps.append)
+
+        assert purge_pattern("view:*", batch_size=2, throttle=0.01) == 5
+
+        assert cache.get_many([f"view:{number}" for number in range(5)]) == {}
+        assert cache.get("other:1") == 1
+        assert len(sleeps) == 2
+
+    @redis_only
+    def test_clear_cache_pattern_adds_prefix(self):
+        """Test clear_cache_pattern matches keys under the cache key prefix."""
+        cache.set(cache_key_prefix("view:x"), 1)
+
+        assert clear_cache_pattern("view:*") == 1
+        assert cache.get(cache_key_prefix("view:x")) is None
+        assert cache.get("view:1") == 1
+
+    @pytest.mark.skipif(is_redis_cache(), reason="Needs a non-Redis default cache")
+    def test_without_redis(self):
+        """Test pattern deletes are skipped without Redis."""
+        assert purge_pattern("view:*") == 0
+        assert cache.get("view:1") == 1
@@ -0,0 +1,68 @@
+import pytest
+from django.core.cache import cache
+
+from core.cache import local
+from core.cache.local import get_local_cache
+from core.cache.versioning import CacheVersion, VersionedCache
+
+
+class TestVersionedCache:
+    """Test versioned entries and their L1 copies."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.versioned_cache = VersionedCache("test")
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """Controllable monotonic clock of the L1 cache."""
+        now = [1000.0]
+        monkeypatch.setattr(local.time, "monotonic", lambda: now[0])
+        return now
+
+    def drop_shared(self, key):
+        """Remove the shared entry without notifying the L1 cache."""
+        cache.delete(self.versioned_cache.versioned_key(key))
+
+    def test_set_and_get(self):
+        """Test a value is read back under the current version."""
+        self.versioned_cache.set("item", {"id": 1})
+
+        assert self.versioned_cache.get("item") == {"id": 1}
+        assert self.versioned_cache.get("missing", "default") == "default"
+
+    def test_invalidate_all(self):
+        """Test bumping the version hides every entry of the namespace."""
+        self.versioned_cache.set("item", 1)
+        version = CacheVersion("test").get()
+
+        self.versioned_cache.invalidate_all()
+
+        assert CacheVersion("test").get() != version
+        assert self.versioned_cache.get("item") is None
+
+    def test_local_copy_expires_with_short_timeout(self, clock):
+        """Test the L1 copy never outlives a shorter cache timeout."""
+        self.versioned_cache.set("item", 1, timeout=5)
+        self.drop_shared("item")
+
+        assert self.versioned_cache.get("item") == 1
+        clock[0] += 6
+        assert self.versioned_cache.get("item") is None
+
+    def test_local_copy_capped_by_l1_ttl(self, clock):
+        """Test long timeouts keep the local copy for the L1 TTL only."""
+        self.versioned_cache.set("item", 1, timeout=3600)
+        self.drop_shared("item")
+
+        clock[0] += 6
+        assert self.versioned_cache.get("item") == 1
+        clock[0] += get_local_cache().ttl
+        assert self.versioned_cache.get("item") is None
+
+    def test_expired_timeout_not_kept_locally(self):
+        """Test a non-positive timeout leaves no local copy behind."""
+        self.versioned_cache.set("item", 1, timeout=60)
+        self.versioned_cache.set("item", 2, timeout=0)
+
+        assert self.versioned_cache.get("item") is None
@@ -0,0 +1,98 @@
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.cache.invalidation import row_key
+from core.cache.versioning import VersionedCache
+from core.cache.warming import CacheWarmer, _pk_ranges, _warm_range, keyset_chunks
+from core.tests.factories import UserFactory
+from products.models import ProductCategory
+from products.tests.factories import ProductCategoryFactory
+
+
+@pytest.mark.django_db
+class TestKeysetWarming:
+    """Test keyset chunking, primary key slicing and model warming."""
+
+    def setup_method(self):
+        """Set up test data."""
+        suffix = uuid.uuid4().hex[:8]
+        user = UserFactory()
+        self.categories = [
+            ProductCategoryFactory(slug=f"warm-{suffix}-{number}", created_by=user)
+            for number in range(25)
+        ]
+        self.pks = sorted(category.pk for category in self.categories)
+        self.queryset = ProductCategory.objects.filter(pk__in=self.pks)
+
+    def test_keyset_chunks(self):
+        """Test chunks cover every row once, in primary key order."""
+        chunks = list(keyset_chunks(self.queryset, 10))
+
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+        assert [row.pk for chunk in chunks for row in chunk] == self.pks
+
+    def test_keyset_chunks_bounds(self):
+        """Test the lower bound is exclusive and the upper bound inclusive."""
+        rows = [
+            row.pk
+            for chunk in keyset_chunks(self.queryset, 4, self.pks[4], self.pks[14])
+            for row in chunk
+        ]
+
+        assert rows == self.pks[5:15]
+
+    def test_keyset_chunks_do_not_offset(self):
+        """Test every chunk query seeks by primary key instead of OFFSET."""
+        with CaptureQueriesContext(connection) as queries:
+            list(keyset_chunks(self.queryset, 10))
+
+        assert len(queries) == 4
+        assert all("OFFSET" not in query["sql"] for query in queries)
+
+    @pytest.mark.parametrize("parts", [1, 2, 3, 7])
+    def test_pk_ranges_partition_rows(self, parts):
+        """Test slices of the key range cover every row exactly once."""
+        ranges = _pk_ranges(self.queryset, parts)
+
+        assert 1 <= len(ranges) <= parts
+        assert ranges[0][0] is None
+        assert ranges[-1][1] == self.pks[-1]
+        rows = [
+            row.pk
+            for lower, upper in ranges
+            for chunk in keyset_chunks(self.queryset, 10, lower, upper)
+            for row in chunk
+        ]
+        assert rows == self.pks
+
+    def test_pk_ranges_empty(self):
+        """Test an empty queryset has no slices."""
+        assert _pk_ranges(self.queryset.none(), 4) == []
+
+    def test_warm_range(self):
+        """Test a slice caches only its own rows under their row keys."""
+        lower, upper = self.pks[9], self.pks[19]
+
+        assert _warm_range(self.queryset, 4, 60, lower, upper) == 10
+
+        namespace, _ = row_key(ProductCategory, None)
+        versioned_cache = VersionedCache(namespace)
+        cached = [
+            pk
+            for pk in self.pks
+            if versioned_cache.get(row_key(ProductCategory, pk)[1]) is not None
+        ]
+        assert cached == self.pks[10:20]
+
+    def test_warm_model(self):
+        """Test warming a model caches every row and reports the count."""
+        result = CacheWarmer().warm_model(
+            ProductCategory, chunk_size=10, queryset=self.queryset
+        )
+
+        assert result["rows"] == 25
+        namespace, key = row_key(ProductCategory, self.pks[0])
+        assert VersionedCache(namespace).get(key).pk == self.pks[0]
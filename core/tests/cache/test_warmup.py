@@ -0,0 +1,144 @@
+import json
+
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from api import healthcheck
+from core.cache import warmup
+from core.cache.settings import CACHE_WARMUP, cache_key_prefix
+from core.cache.warmup import (
+    DONE_KEY,
+    LOCK_KEY,
+    STATUS_DONE,
+    STATUS_FAILED,
+    STATUS_SKIPPED,
+    STATUS_TIMED_OUT,
+    WarmupState,
+    get_warmup_status,
+    is_warm,
+    run_warmup,
+)
+
+
+class TestWarmup:
+    """Test the warmup run and the readiness gate in front of it."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_state(self, monkeypatch):
+        """Give every test its own warmup state and recorded steps."""
+        monkeypatch.setattr(warmup, "_state", WarmupState())
+        monkeypatch.setattr(warmup.connections, "close_all", lambda: None)
+        monkeypatch.setattr(warmup, "close_old_connections", lambda: None)
+        monkeypatch.setitem(CACHE_WARMUP, "TIMEOUT", 120)
+        monkeypatch.setitem(CACHE_WARMUP, "POLL_INTERVAL", 0)
+        self.calls = []
+        self.steps = [
+            ("first", lambda: self.calls.append("first")),
+            ("second", lambda: self.calls.append("second")),
+        ]
+        monkeypatch.setattr(warmup, "_steps", lambda: self.steps)
+
+    def test_not_started_is_warm(self):
+        """Test a process that never started a warmup counts as warm."""
+        assert is_warm()
+
+    def test_run_warmup(self):
+        """Test the steps run in order and leave a done marker behind."""
+        run_warmup()
+
+        assert self.calls == ["first", "second"]
+        status = get_warmup_status()
+        assert status["status"] == STATUS_DONE
+        assert status["ready"]
+        assert status["progress"] == "2/2"
+        assert cache.get(cache_key_prefix(DONE_KEY))
+        assert cache.get(cache_key_prefix(LOCK_KEY)) is None
+
+    def test_not_warm_while_running(self):
+        """Test the worker is not warm while its steps are still running."""
+        seen = []
+        self.steps = [("probe", lambda: seen.append(is_warm()))]
+
+        run_warmup()
+
+        assert seen == [False]
+        assert is_warm()
+
+    def test_warm_after_timeout(self, monkeypatch):
+        """Test a warmup running past the timeout no longer holds traffic back."""
+        seen = []
+        monkeypatch.setitem(CACHE_WARMUP, "TIMEOUT", 0)
+        self.steps = [("probe", lambda: seen.append(is_warm()))]
+
+        run_warmup()
+
+        assert seen == [True]
+        assert get_warmup_status()["status"] == STATUS_TIMED_OUT
+
+    def test_failed_step(self):
+        """Test a failing step is reported and the others still run."""
+
+        def fail():
+            raise RuntimeError("boom")
+
+        self.steps.insert(0, ("broken", fail))
+
+        run_warmup()
+
+        assert self.calls == ["first", "second"]
+        steps = get_warmup_status()["steps"]
+        assert steps["broken"]["status"] == STATUS_FAILED
+        assert steps["broken"]["error"] == "boom"
+        assert steps["first"]["status"] == STATUS_DONE
+
+    def test_skipped_when_already_warmed(self):
+        """Test a worker booting after a finished warmup skips its own."""
+        cache.set(cache_key_prefix(DONE_KEY), True)
+
+        run_warmup()
+
+        assert self.calls == []
+        assert get_warmup_status()["status"] == STATUS_SKIPPED
+
+    def test_waits_for_other_worker(self, monkeypatch):
+        """Test only the lock holder warms and the others wait for its marker."""
+        cache.add(cache_key_prefix(LOCK_KEY), True)
+        monkeypatch.setattr(
+            warmup.time,
+            "sleep",
+            lambda _: cache.set(cache_key_prefix(DONE_KEY), True),
+        )
+
+        run_warmup()
+
+        assert self.calls == []
+        assert get_warmup_status()["status"] == STATUS_SKIPPED
+
+
+@pytest.mark.django_db
+class TestReadinessCheck:
+    """Test the readiness probe keeps cold workers out of rotation."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.request = RequestFactory().get("/ready/")
+
+    def test_not_ready_while_warming(self, monkeypatch):
+        """Test the probe answers 503 with the warmup progress."""
+        monkeypatch.setattr(healthcheck, "is_warm", lambda: False)
+
+        response = healthcheck.readiness_check(self.request)
+
+        assert response.status_code == 503
+        body = json.loads(response.content)
+        assert body["status"] == "not_ready"
+        assert "warmup" in body
+
+    def test_ready_when_warm(self, monkeypatch):
+        """Test the probe answers 200 once the cache is warm."""
+        monkeypatch.setattr(healthcheck, "is_warm", lambda: True)
+
+        response = healthcheck.readiness_check(self.request)
+
+        assert response.status_code == 200
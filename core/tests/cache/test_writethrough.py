@@ -0,0 +1,153 @@
+import uuid
+
+import pytest
+
+from core import tasks
+from core.cache import writethrough
+from core.cache.invalidation import row_key, schedule_refresh
+from core.cache.preload import CachePreloader
+from core.cache.settings import CACHE_WRITE_THROUGH
+from core.cache.stampede import get_or_compute
+from core.cache.versioning import VersionedCache
+from core.cache.writethrough import refresh_cache_entries, refresh_products
+from core.tests.factories import UserFactory
+from products.models import Product
+from products.tests.factories import ProductCategoryFactory, ProductFactory
+
+
+@pytest.mark.django_db
+class TestRefreshProducts:
+    """Test recomputing product entries after a committed change."""
+
+    def setup_method(self):
+        """Set up test data."""
+        suffix = uuid.uuid4().hex[:8]
+        user = UserFactory()
+        category = ProductCategoryFactory(
+            slug=f"write-through-{suffix}", created_by=user
+        )
+        self.active = ProductFactory(
+            slug=f"write-through-{suffix}-active",
+            category=category,
+            is_active=True,
+            created_by=user,
+        )
+        self.inactive = ProductFactory(
+            slug=f"write-through-{suffix}-inactive",
+            category=category,
+            is_active=False,
+            created_by=user,
+        )
+        self.pks = [str(self.active.pk), str(self.inactive.pk)]
+
+    @pytest.fixture(autouse=True)
+    def replayed(self, monkeypatch):
+        """Record replayed endpoints and whether they were recomputed."""
+        self.replayed = []
+
+        def warm_endpoint(_preloader, path, audience="customer", **_kwargs):
+            get_or_compute("write-through:probe", lambda: "stored", 60)
+            forced = (
+                get_or_compute("write-through:probe", lambda: "recomputed", 60)
+                == "recomputed"
+            )
+            self.replayed.append((path, audience, forced))
+            return True
+
+        monkeypatch.setattr(CachePreloader, "warm_endpoint", warm_endpoint)
+        monkeypatch.setitem(CACHE_WRITE_THROUGH, "AUDIENCES", ["anon", "customer"])
+
+    def cached_row(self, pk):
+        namespace, key = row_key(Product, pk)
+        return VersionedCache(namespace).get(key)
+
+    def test_refresh_products(self):
+        """Test active rows are cached and their details replayed per audience."""
+        refresh_products(self.pks)
+
+        assert self.cached_row(self.active.pk).pk == self.active.pk
+        assert self.cached_row(self.inactive.pk) is None
+        assert sorted(self.replayed) == sorted(
+            (f"products/{pk}", audience, True)
+            for pk in self.pks
+            for audience in ("anon", "customer")
+        )
+
+    def test_refresh_cache_entries(self):
+        """Test every model label is handed to its refresher."""
+        refresh_cache_entries({"products.Product": [str(self.active.pk)]})
+
+        assert self.cached_row(self.active.pk) is not None
+
+    def test_unknown_model(self, caplog):
+        """Test labels without a refresher are skipped with a warning."""
+        refresh_cache_entries({"orders.Order": ["1"]})
+
+        assert "No write-through refresher for orders.Order" in caplog.text
+        assert self.replayed == []
+
+    def test_failing_refresher(self, monkeypatch, caplog):
+        """Test a failing refresher is logged instead of raised."""
+
+        def fail(_pks):
+            raise RuntimeError("boom")
+
+        monkeypatch.setitem(
+            writethrough.WRITE_THROUGH_REFRESHERS, "products.Product", fail
+        )
+
+        refresh_cache_entries({"products.Product": self.pks})
+
+        assert "boom" in caplog.text
+
+
+class TestScheduleRefresh:
+    """Test handing refresh targets to the Celery task."""
+
+    @pytest.fixture(autouse=True)
+    def queued(self, monkeypatch):
+        """Record the queued tasks instead of sending them."""
+        self.queued = []
+        monkeypatch.setattr(
+            tasks.refresh_cache_entries,
+            "apply_async",
+            lambda args, countdown: self.queued.append((args, countdown)),
+        )
+        monkeypatch.setitem(CACHE_WRITE_THROUGH, "ENABLED", True)
+        monkeypatch.setitem(CACHE_WRITE_THROUGH, "COUNTDOWN", 5)
+
+    def test_groups_targets_by_model(self):
+        """Test targets are queued in one task, grouped by model label."""
+        schedule_refresh(
+            {
+                ("products.Product", "2"),
+                ("products.Product", "1"),
+                ("products.ProductCategory", "3"),
+            }
+        )
+
+        assert self.queued == [
+            (
+                (
+                    {
+                        "products.Product": ["1", "2"],
+                        "products.ProductCategory": ["3"],
+                    },
+                ),
+                5,
+            )
+        ]
+
+    def test_disabled(self, monkeypatch):
+        """Test nothing is queued when write-through is disabled."""
+        monkeypatch.setitem(CACHE_WRITE_THROUGH, "ENABLED", False)
+
+        schedule_refresh({("products.Product", "1")})
+
+        assert self.queued == []
+
+    def test_no_targets(self):
+        """Test nothing is queued without targets."""
+        schedule_refresh(set())
+
+        assert self.queued == []
@@ -5,6 +5,7 @@ from decimal import Decimal
 
 from django.db import transaction
 from django.shortcuts import get_object_or_404
+from ninja import Query
 from ninja_extra import (
     api_controller,
     http_delete,
@@ -13,7 +14,9 @@ from ninja_extra import (
     http_put,
 )
 
+from api.config import COUNT_ESTIMATED
 from api.decorators import (
+    admin_endpoint,
     create_endpoint,
     delete_endpoint,
     detail_endpoint,
@@ -22,6 +25,8 @@ from api.decorators import (
     update_endpoint,
 )
 from api.exceptions import ValidationError
+from api.exports import streaming_export_response
+from api.search_filters import OrderSearchFilter
 from orders.models import (
     Order,
     OrderLineItem,
@@ -55,6 +60,8 @@ class OrderController:
             "customer_id": "exact",
         },
         ordering_fields=["created_at", "order_number", "total", "status"],
+        count_strategy=COUNT_ESTIMATED,
+        cursor_ordering=("-created_at", "-id"),
     )
     @search_and_filter(
         search_fields=["order_number", "email", "customer__user__username"],
@@ -68,6 +75,17 @@ class OrderController:
         """List all orders with advanced filtering and optimization."""
         return 200, Order.objects.all()
 
+    @http_get("/export", response={400: dict, 401: dict, 403: dict})
+    @admin_endpoint()
+    def export_orders(
+        self,
+        request,
+        filters: OrderSearchFilter = Query(...),
+        export_format: str = Query("ndjson", alias="format"),
+    ):
+        """Stream the filtered orders as NDJSON or CSV (``?format=csv``)."""
+        return streaming_export_response("orders", filters, export_format)
+
     @http_get("/{order_id}", response={200: OrderSchema, 404: dict})
     @detail_endpoint(
         select_related=[
@@ -316,6 +334,7 @@ class OrderController:
     @list_endpoint(
         select_related=["order", "created_by"],
         ordering_fields=["created_at"],
+        cursor_ordering=("-created_at", "-id"),
     )
     def get_order_history(self, request, order_id: str):
         """Get the history of an order."""
@@ -334,6 +353,8 @@ class OrderController:
             "date_to": "date",
         },
         ordering_fields=["created_at", "order_number", "total"],
+        count_strategy=COUNT_ESTIMATED,
+        cursor_ordering=("-created_at", "-id"),
     )
     @search_and_filter(
         search_fields=["order_number", "email", "customer__user__username"],
@@ -6,6 +6,7 @@ from ninja_extra import api_controller, http_get, http_post
 from ninja_extra.permissions import IsAuthenticated
 
 from api.decorators import handle_exceptions, log_api_call
+from api.pagination import KeysetPagination
 from orders.models import (
     Order,
     OrderHistory,
@@ -20,7 +21,7 @@ class OrderHistoryController:
     @http_get("", response={200: list[OrderHistorySchema]})
     @handle_exceptions
     @log_api_call()
-    @paginate
+    @paginate(KeysetPagination, ordering=("-created_at", "-id"))
     def list_history(self, request, order_id: str):
         """Get paginated list of history entries for an order."""
         order = get_object_or_404(Order, id=order_id)
@@ -1,7 +1,9 @@
 import uuid
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Upper
 
 from core.models import AbstractBaseModel, Address, Customer, CustomerGroup
 
@@ -83,4 +85,12 @@ class Order(AbstractBaseModel):
             models.Index(fields=["status"]),
             models.Index(fields=["payment_status"]),
             models.Index(fields=["created_at"]),
+            # Trigram indexes for partial and fuzzy staff lookups
+            GinIndex(
+                OpClass(Upper("order_number"), name="gin_trgm_ops"),
+                name="order_number_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("email"), name="gin_trgm_ops"), name="order_email_trgm"
+            ),
         ]
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class ProductsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "products"
+
+    def ready(self):
+        from .autocomplete import register_autocomplete_signals
+        from .catalog_snapshot import register_snapshot_signals
+        from .facets import register_facet_signals
+        from .search import register_search_signals
+
+        register_search_signals()
+        register_autocomplete_signals()
+        register_facet_signals()
+        register_snapshot_signals()
@@ -0,0 +1,407 @@
+"""In-memory typeahead index of product names, SKUs and category names.
+
+Every worker holds an ``AutocompleteIndex``: a sorted array of
+``(normalized key, entry id)`` pairs searched with ``bisect``, so a lookup is
+a binary search plus a scan of the matching range, without a database query.
+Names are indexed from the start of every word, so "blue sh" suggests "Navy
+Blue Shirt". Suggestions are ranked by popularity: units sold for products
+and their SKUs, and the units sold of their products for categories. The top
+suggestions of one and two character prefixes are precomputed, since those
+match the largest ranges.
+
+The index is an ``AUTOCOMPLETE_INDEX`` local index (see products.local_index):
+built in a background thread of each web worker and rebuilt every
+``REFRESH_INTERVAL`` seconds, which picks up popularity changes. Saving or
+deleting a product, variant or category re-indexes it in the process that
+made the change once the transaction commits, and in the other workers when
+they replay the change.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from django.conf import settings
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+
+from .local_index import LocalIndex
+from .models import Product, ProductCategory, ProductVariant
+
+PRODUCT_AUTOCOMPLETE = {
+    # Build and refresh the index in a background thread of web workers
+    "ENABLED": True,
+    "LIMIT": 10,
+    "MAX_LIMIT": 50,
+    # Seconds between checks of the shared version
+    "POLL_INTERVAL": 5,
+    # Seconds after which the index is rebuilt anyway
+    "REFRESH_INTERVAL": 600,
+    # Prefixes up to this length have their top suggestions precomputed
+    "PRECOMPUTED_PREFIX_LENGTH": 2,
+    **getattr(settings, "PRODUCT_AUTOCOMPLETE", {}),
+}
+
+SUGGESTION_PRODUCT = "product"
+SUGGESTION_SKU = "sku"
+SUGGESTION_CATEGORY = "category"
+
+
+def normalize(text: str) -> str:
+    """Case-folded text with whitespace collapsed to single spaces."""
+    return " ".join(text.casefold().split())
+
+
+def word_keys(text: str) -> list[str]:
+    """Keys starting at every word of ``text``, so any word matches a prefix."""
+    words = normalize(text).split(" ")
+    return list(dict.fromkeys(" ".join(words[i:]) for i in range(len(words))))
+
+
+class AutocompleteIndex:
+    """Sorted-array prefix index of suggestions, ranked by popularity.
+
+    Entries are identified by ``(type, pk)`` tuples. All methods are
+    thread-safe; the lists are only mutated under the lock.
+    Usage:
+        index = AutocompleteIndex()
+        index.add(("product", "1"), ["navy blue shirt", "blue shirt"], {...}, 12)
+        index.search("blue sh", limit=5)
+    """
+
+    def __init__(self, precomputed_length: int = 2, precomputed_limit: int = 50):
+        self.precomputed_length = precomputed_length
+        self.precomputed_limit = precomputed_limit
+        self._keys: list[tuple[str, tuple]] = []
+        self._suggestions: dict[tuple, dict[str, Any]] = {}
+        self._popularity: dict[tuple, int] = {}
+        self._entry_keys: dict[tuple, list[str]] = {}
+        self._top: dict[str, list[tuple]] = {}
+        self._lock = threading.RLock()
+
+    def load(
+        self, entries: Iterable[tuple[tuple, list[str], dict[str, Any], int]]
+    ) -> None:
+        """Replace the contents with ``(entry id, keys, suggestion, popularity)``."""
+        with self._lock:
+            self._keys = []
+            self._suggestions = {}
+            self._popularity = {}
+            self._entry_keys = {}
+            for entry_id, keys, suggestion, popularity in entries:
+                self._store(entry_id, keys, suggestion, popularity)
+                self._keys.extend((key, entry_id) for key in keys)
+            self._keys.sort()
+            self._top = {}
+            keys = [key for key, _ in self._keys]
+            for prefix in self._precomputed_prefixes(keys):
+                self._refresh_top(prefix)
+
+    def add(
+        self,
+        entry_id: tuple,
+        keys: list[str],
+        suggestion: dict[str, Any],
+        popularity: int | None = None,
+    ) -> None:
+        """Add or replace an entry; ``popularity`` None keeps the current one."""
+        with self._lock:
+            if popularity is None:
+                popularity = self._popularity.get(entry_id, 0)
+            old_keys = self._unlink(entry_id)
+            self._store(entry_id, keys, suggestion, popularity)
+            for key in keys:
+                insort(self._keys, (key, entry_id))
+            self._update_tops(entry_id, old_keys, keys)
+
+    def remove(self, entry_id: tuple) -> None:
+        """Remove an entry if present."""
+        with self._lock:
+            old_keys = self._unlink(entry_id)
+            self._update_tops(entry_id, old_keys, [])
+            self._suggestions.pop(entry_id, None)
+            self._popularity.pop(entry_id, None)
+
+    def popularity(self, entry_id: tuple) -> int:
+        """Popularity of an entry (0 if absent)."""
+        return self._popularity.get(entry_id, 0)
+
+    def search(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        """Most popular suggestions with a key starting with ``query``."""
+        prefix = normalize(query)
+        if not prefix or limit < 1:
+            return []
+        with self._lock:
+            if len(prefix) <= self.precomputed_length and limit <= (
+                self.precomputed_limit
+            ):
+                entry_ids = self._top.get(prefix, [])[:limit]
+            else:
+                entry_ids = self._matches(prefix, limit)
+            return [self._suggestions[entry_id] for entry_id in entry_ids]
+
+    def __contains__(self, entry_id: tuple) -> bool:
+        return entry_id in self._suggestions
+
+    def __len__(self) -> int:
+        return len(self._suggestions)
+
+    def _store(self, entry_id, keys, suggestion, popularity) -> None:
+        self._suggestions[entry_id] = suggestion
+        self._popularity[entry_id] = popularity
+        self._entry_keys[entry_id] = keys
+
+    def _unlink(self, entry_id: tuple) -> list[str]:
+        """Remove the keys of an entry from the array; returns them."""
+        keys = self._entry_keys.pop(entry_id, [])
+        for key in keys:
+            position = bisect_left(self._keys, (key, entry_id))
+            if position < len(self._keys) and self._keys[position] == (key, entry_id):
+                del self._keys[position]
+        return keys
+
+    def _matches(self, prefix: str, limit: int) -> list[tuple]:
+        """Scan the range of keys starting with ``prefix`` for the top entries."""
+        matched = set()
+        position = bisect_left(self._keys, (prefix,))
+        while position < len(self._keys):
+            key, entry_id = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            matched.add(entry_id)
+            position += 1
+        return heapq.nsmallest(limit, matched, key=self._rank)
+
+    def _rank(self, entry_id: tuple) -> tuple:
+        """Sort key: most popular first, then alphabetically."""
+        return (
+            -self._popularity[entry_id],
+            self._suggestions[entry_id]["text"],
+            entry_id,
+        )
+
+    def _precomputed_prefixes(self, keys: list[str]) -> set[str]:
+        return {
+            key[:length]
+            for key in keys
+            for length in range(1, self.precomputed_length + 1)
+            if len(key) >= length
+        }
+
+    def _refresh_top(self, prefix: str) -> None:
+        top = self._matches(prefix, self.precomputed_limit)
+        if top:
+            self._top[prefix] = top
+        else:
+            self._top.pop(prefix, None)
+
+    def _update_tops(
+        self, entry_id: tuple, old_keys: list[str], keys: list[str]
+    ) -> None:
+        """Update the precomputed tops after an entry's keys changed.
+
+        Inserting into a top list is enough unless the entry leaves (or may
+        drop within) a full list, whose successor is only found by a rescan.
+        """
+        new_prefixes = self._precomputed_prefixes(keys)
+        for prefix in self._precomputed_prefixes(old_keys) | new_prefixes:
+            top = self._top.setdefault(prefix, [])
+            if entry_id in top:
+                if len(top) >= self.precomputed_limit:
+                    self._refresh_top(prefix)
+                    continue
+                top.remove(entry_id)
+            if prefix in new_prefixes:
+                insort(top, entry_id, key=self._rank)
+                del top[self.precomputed_limit :]
+            if not top:
+                del self._top[prefix]
+
+
+def _product_entry(pk, name: str, slug: str) -> tuple[tuple, list[str], dict]:
+    suggestion = {"type": SUGGESTION_PRODUCT, "id": str(pk), "text": name, "slug": slug}
+    return (SUGGESTION_PRODUCT, str(pk)), word_keys(name), suggestion
+
+
+def _sku_entry(pk, sku: str, product_id, slug: str) -> tuple[tuple, list[str], dict]:
+    suggestion = {
+        "type": SUGGESTION_SKU,
+        "id": str(product_id),
+        "text": sku,
+        "slug": slug,
+    }
+    return (SUGGESTION_SKU, str(pk)), [normalize(sku)], suggestion
+
+
+def _category_entry(pk, name: str, slug: str) -> tuple[tuple, list[str], dict]:
+    suggestion = {
+        "type": SUGGESTION_CATEGORY,
+        "id": str(pk),
+        "text": name,
+        "slug": slug,
+    }
+    return (SUGGESTION_CATEGORY, str(pk)), word_keys(name), suggestion
+
+
+def build_index() -> AutocompleteIndex:
+    """Build an index of the active products, their SKUs and categories."""
+    entries = []
+    slugs = {}
+    popularity = {}
+    category_popularity: dict[Any, int] = defaultdict(int)
+    products = (
+        Product.objects.filter(is_active=True)
+        .annotate(units_sold=Coalesce(Sum("variants__order_items__quantity"), 0))
+        .values_list("pk", "name", "slug", "category_id", "units_sold")
+    )
+    for pk, name, slug, category_id, units_sold in products.iterator():
+        slugs[pk] = slug
+        popularity[pk] = units_sold
+        category_popularity[category_id] += units_sold
+        entries.append((*_product_entry(pk, name, slug), units_sold))
+
+    variants = ProductVariant.objects.filter(
+        is_active=True, product__is_active=True
+    ).values_list("pk", "sku", "product_id")
+    for pk, sku, product_id in variants.iterator():
+        if product_id in slugs:
+            entry = _sku_entry(pk, sku, product_id, slugs[product_id])
+            entries.append((*entry, popularity[product_id]))
+
+    categories = ProductCategory.objects.filter(is_active=True).values_list(
+        "pk", "name", "slug"
+    )
+    for pk, name, slug in categories.iterator():
+        entries.append((*_category_entry(pk, name, slug), category_popularity[pk]))
+
+    index = AutocompleteIndex(
+        PRODUCT_AUTOCOMPLETE["PRECOMPUTED_PREFIX_LENGTH"],
+        PRODUCT_AUTOCOMPLETE["MAX_LIMIT"],
+    )
+    index.load(entries)
+    return index
+
+
+def get_autocomplete_index() -> AutocompleteIndex:
+    """The autocomplete index of this process."""
+    return AUTOCOMPLETE_INDEX.get()
+
+
+def autocomplete(query: str, limit: int | None = None) -> list[dict[str, Any]]:
+    """Top suggestions for a typed prefix."""
+    limit = min(
+        limit or PRODUCT_AUTOCOMPLETE["LIMIT"], PRODUCT_AUTOCOMPLETE["MAX_LIMIT"]
+    )
+    return get_autocomplete_index().search(query, limit)
+
+
+def _index_product(pk, index: AutocompleteIndex) -> None:
+    product = (
+        Product.objects.filter(pk=pk).values_list("name", "slug", "is_active").first()
+    )
+    variants = ProductVariant.objects.filter(product_id=pk).values_list(
+        "pk", "sku", "is_active"
+    )
+    product_key = (SUGGESTION_PRODUCT, str(pk))
+    if product is None or not product[2]:
+        index.remove(product_key)
+        for variant_pk, _, _ in variants:
+            index.remove((SUGGESTION_SKU, str(variant_pk)))
+        return
+
+    name, slug, _ = product
+    index.add(*_product_entry(pk, name, slug))
+    popularity = index.popularity(product_key)
+    for variant_pk, sku, is_active in variants:
+        if is_active:
+            index.add(*_sku_entry(variant_pk, sku, pk, slug), popularity)
+        else:
+            index.remove((SUGGESTION_SKU, str(variant_pk)))
+
+
+def _index_variant(pk, index: AutocompleteIndex) -> None:
+    variant = (
+        ProductVariant.objects.filter(pk=pk)
+        .values_list("sku", "is_active", "product_id", "product__slug")
+        .first()
+    )
+    if variant is not None:
+        sku, is_active, product_id, slug = variant
+        product_key = (SUGGESTION_PRODUCT, str(product_id))
+        # SKUs of inactive products are not indexed either
+        if is_active and product_key in index:
+            index.add(
+                *_sku_entry(pk, sku, product_id, slug), index.popularity(product_key)
+            )
+            return
+    index.remove((SUGGESTION_SKU, str(pk)))
+
+
+def _index_category(pk, index: AutocompleteIndex) -> None:
+    category = (
+        ProductCategory.objects.filter(pk=pk)
+        .values_list("name", "slug", "is_active")
+        .first()
+    )
+    if category is None or not category[2]:
+        index.remove((SUGGESTION_CATEGORY, str(pk)))
+        return
+    name, slug, _ = category
+    index.add(*_category_entry(pk, name, slug))
+
+
+# Products first, so their SKUs see whether the product is indexed
+_INDEXERS = {
+    SUGGESTION_PRODUCT: _index_product,
+    SUGGESTION_CATEGORY: _index_category,
+    SUGGESTION_SKU: _index_variant,
+}
+
+
+def apply_changes(index: AutocompleteIndex, changes: set) -> None:
+    """Re-index the ``(kind, pk)`` suggestions changed in a transaction."""
+    kinds = list(_INDEXERS)
+    for kind, pk in sorted(changes, key=lambda change: kinds.index(change[0])):
+        _INDEXERS[kind](pk, index)
+
+
+AUTOCOMPLETE_INDEX = LocalIndex(
+    "autocomplete",
+    build_index,
+    apply_changes,
+    enabled=PRODUCT_AUTOCOMPLETE["ENABLED"],
+    poll_interval=PRODUCT_AUTOCOMPLETE["POLL_INTERVAL"],
+    refresh_interval=PRODUCT_AUTOCOMPLETE["REFRESH_INTERVAL"],
+)
+
+
+def _product_changed(sender, instance, using=None, **kwargs):
+    AUTOCOMPLETE_INDEX.schedule([(SUGGESTION_PRODUCT, instance.pk)], using)
+
+
+def _variant_changed(sender, instance, using=None, **kwargs):
+    AUTOCOMPLETE_INDEX.schedule([(SUGGESTION_SKU, instance.pk)], using)
+
+
+def _category_changed(sender, instance, using=None, **kwargs):
+    AUTOCOMPLETE_INDEX.schedule([(SUGGESTION_CATEGORY, instance.pk)], using)
+
+
+def register_autocomplete_signals() -> None:
+    """Keep the autocomplete index in sync with products, variants and categories."""
+    for model, handler in (
+        (Product, _product_changed),
+        (ProductVariant, _variant_changed),
+        (ProductCategory, _category_changed),
+    ):
+        name = model._meta.model_name
+        post_save.connect(
+            handler, sender=model, dispatch_uid=f"autocomplete_{name}_save"
+        )
+        post_delete.connect(
+            handler, sender=model, dispatch_uid=f"autocomplete_{name}_delete"
+        )
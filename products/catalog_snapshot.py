@@ -0,0 +1,434 @@
+"""In-memory columnar snapshot of the active catalog for product listings.
+
+Price-range, stock, rating and featured filters and numeric orderings of the
+product list resolve to very differently shaped queries (range scans,
+aggregates over variants and reviews, sorts of the whole table). The snapshot
+keeps one NumPy array per column of the active products instead:
+
+    id, price, min variant price, quantity, category, created_at, rating,
+    featured
+
+so a listing is a handful of vectorized comparisons and one ``lexsort``,
+and only the requested page is loaded from the database.
+
+``snapshot_results()`` answers a listing when every parameter it carries is
+one the snapshot knows (see ``SNAPSHOT_PARAMS``); anything else, e.g. a text
+search or a status filter, returns None and the caller queries the database,
+where ``filter_product_list()`` applies the same filters.
+
+Prices are stored in cents as int64, timestamps as int64 microseconds and
+missing ratings as NaN. The snapshot is a ``CATALOG_SNAPSHOT`` local index
+(see products.local_index): rebuilt in the background of each worker and
+patched when products, their variants or reviews change.
+"""
+
+import threading
+from collections.abc import Iterable, Mapping
+from decimal import Decimal, InvalidOperation
+from uuid import UUID
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Avg, Min, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+
+from .local_index import LocalIndex
+from .models import Product, ProductReview, ProductVariant
+
+PRODUCT_SNAPSHOT = {
+    # Serve product listings from the in-memory snapshot
+    "ENABLED": True,
+    # Seconds between checks of the shared version
+    "POLL_INTERVAL": 5,
+    # Seconds after which the snapshot is rebuilt anyway
+    "REFRESH_INTERVAL": 600,
+    **getattr(settings, "PRODUCT_SNAPSHOT", {}),
+}
+
+# Query parameters a snapshot listing understands; others go to the database
+SNAPSHOT_PARAMS = {
+    "category_id",
+    "featured",
+    "is_active",
+    "in_stock",
+    "price_min",
+    "price_max",
+    "rating_min",
+    "ordering",
+    "page",
+    "page_size",
+}
+
+# Orderings by snapshot column
+SNAPSHOT_ORDERINGS = {
+    "price": "price",
+    "min_price": "min_price",
+    "quantity": "quantity",
+    "created_at": "created_at",
+    "rating": "rating",
+    "featured": "featured",
+}
+
+# Columns filled from a row, after the id
+ROW_COLUMNS = (
+    "price",
+    "min_price",
+    "quantity",
+    "category",
+    "created_at",
+    "rating",
+    "featured",
+)
+
+TRUE_VALUES = ("true", "1", "yes")
+FALSE_VALUES = ("false", "0", "no")
+
+
+class CatalogSnapshot:
+    """Columns of the active products, patched and queried in memory.
+
+    Columns are replaced as a whole on every patch, so a query works on one
+    consistent set of arrays without locking. Patched out products stay in
+    the arrays, masked by ``alive``, until the next rebuild.
+    Usage:
+        snapshot = build_catalog_snapshot()
+        ids = snapshot.query({"price_max": "50", "ordering": "-rating"})
+        ids.count(), ids[:20]
+    """
+
+    def __init__(self, rows: Iterable[tuple] = ()):
+        self._lock = threading.Lock()
+        self._categories: dict[UUID, int] = {}
+        self._columns = self._to_columns(list(rows))
+        self._positions = {pk: i for i, pk in enumerate(self._columns["id"])}
+
+    def patch(self, rows: list[tuple], removed: Iterable) -> None:
+        """Replace the rows of changed products and drop removed ones."""
+        with self._lock:
+            columns = {name: array.copy() for name, array in self._columns.items()}
+            for pk in removed:
+                if pk in self._positions:
+                    columns["alive"][self._positions[pk]] = False
+
+            added = []
+            for row in rows:
+                position = self._positions.get(row[0])
+                if position is None:
+                    added.append(row)
+                    continue
+                for name, value in zip(ROW_COLUMNS, self._row_values(row), strict=True):
+                    columns[name][position] = value
+                columns["alive"][position] = True
+            if added:
+                size = len(columns["id"])
+                for offset, row in enumerate(added):
+                    self._positions[row[0]] = size + offset
+                new = self._to_columns(added)
+                columns = {
+                    name: np.concatenate([array, new[name]])
+                    for name, array in columns.items()
+                }
+            self._columns = columns
+
+    def query(self, params: Mapping[str, str]) -> "SnapshotIds":
+        """Ids of the products matching ``params``, in the requested order."""
+        columns = self._columns
+        mask = columns["alive"].copy()
+
+        if category_id := params.get("category_id"):
+            category = self._categories.get(UUID(category_id), -1)
+            mask &= columns["category"] == category
+        if (featured := parse_bool(params.get("featured"))) is not None:
+            mask &= columns["featured"] == featured
+        if parse_bool(params.get("is_active")) is False:
+            mask[:] = False  # Only active products are listed
+        if (in_stock := parse_bool(params.get("in_stock"))) is not None:
+            mask &= (columns["quantity"] > 0) == in_stock
+        if (price_min := parse_cents(params.get("price_min"))) is not None:
+            mask &= columns["price"] >= price_min
+        if (price_max := parse_cents(params.get("price_max"))) is not None:
+            mask &= columns["price"] <= price_max
+        if (rating_min := parse_float(params.get("rating_min"))) is not None:
+            # NaN (no reviews) compares False
+            mask &= columns["rating"] >= rating_min
+
+        rows = np.flatnonzero(mask)
+        # lexsort sorts by the last key first; ties go to the newest product
+        keys = [-columns["created_at"][rows]]
+        for field in reversed(parse_ordering(params.get("ordering"))):
+            keys.append(self._sort_key(columns, field, rows))
+        return SnapshotIds(columns["id"][rows[np.lexsort(keys)]])
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._columns["alive"]))
+
+    def _sort_key(self, columns: dict, field: str, rows: np.ndarray) -> np.ndarray:
+        descending = field.startswith("-")
+        values = columns[SNAPSHOT_ORDERINGS[field.lstrip("-")]][rows]
+        if values.dtype == np.bool_:
+            values = values.astype(np.int8)
+        if not descending:
+            return values
+        values = -values
+        if values.dtype.kind == "f":
+            # Missing ratings sort last ascending and first descending, as
+            # NULLs do in PostgreSQL
+            values[np.isnan(values)] = -np.inf
+        return values
+
+    def _row_values(self, row: tuple) -> tuple:
+        _, price, min_price, quantity, category_id, created_at, rating, featured = row
+        category = self._categories.setdefault(category_id, len(self._categories))
+        return (
+            to_cents(price),
+            to_cents(min_price if min_price is not None else price),
+            quantity,
+            category,
+            int(created_at.timestamp() * 1_000_000),
+            float(rating) if rating is not None else np.nan,
+            featured,
+        )
+
+    def _to_columns(self, rows: list[tuple]) -> dict[str, np.ndarray]:
+        values = [self._row_values(row) for row in rows]
+        price, min_price, quantity, category, created_at, rating, featured = (
+            zip(*values, strict=True) if values else ((),) * 7
+        )
+        return {
+            "id": np.array([row[0] for row in rows], dtype=object),
+            "price": np.array(price, dtype=np.int64),
+            "min_price": np.array(min_price, dtype=np.int64),
+            "quantity": np.array(quantity, dtype=np.int64),
+            "category": np.array(category, dtype=np.int32),
+            "created_at": np.array(created_at, dtype=np.int64),
+            "rating": np.array(rating, dtype=np.float64),
+            "featured": np.array(featured, dtype=np.bool_),
+            "alive": np.ones(len(rows), dtype=np.bool_),
+        }
+
+
+class SnapshotIds:
+    """Ordered product ids of a snapshot query, hydrated a slice at a time.
+
+    Sliceable with a ``count()``, so Django's paginator (and
+    ``api.utils.paginate_queryset``) pages it like a queryset; slicing loads
+    just those products from ``queryset``.
+    Usage:
+        results = snapshot.query(request.GET).hydrate(Product.objects.all())
+        paginate_queryset(results, page=2, page_size=20)
+    """
+
+    def __init__(self, ids: np.ndarray, queryset: QuerySet | None = None):
+        self.ids = ids
+        self.queryset = queryset
+
+    def hydrate(self, queryset: QuerySet) -> "SnapshotIds":
+        """The same ids, sliced into instances of ``queryset``."""
+        return SnapshotIds(self.ids, queryset)
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key : key + 1][0]
+        ids = self.ids[key].tolist()
+        if self.queryset is None:
+            return ids
+        objects = self.queryset.filter(pk__in=ids).in_bulk()
+        return [objects[pk] for pk in ids if pk in objects]
+
+
+def parse_bool(value: str | None) -> bool | None:
+    """Boolean query parameter, None when absent or not a boolean."""
+    if value:
+        if value.lower() in TRUE_VALUES:
+            return True
+        if value.lower() in FALSE_VALUES:
+            return False
+    return None
+
+
+def parse_cents(value: str | None) -> int | None:
+    """Price query parameter in cents, None when absent or malformed."""
+    try:
+        return to_cents(Decimal(value)) if value else None
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def parse_float(value: str | None) -> float | None:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def parse_ordering(value: str | None) -> list[str]:
+    """Requested orderings the snapshot supports, ``-`` prefixed if descending."""
+    return [
+        field
+        for field in (part.strip() for part in (value or "").split(","))
+        if field.lstrip("-") in SNAPSHOT_ORDERINGS
+    ]
+
+
+def to_cents(price: Decimal) -> int:
+    return int((Decimal(price) * 100).to_integral_value())
+
+
+def fetch_rows(pks: Iterable | None = None) -> list[tuple]:
+    """Snapshot rows of the active products (of ``pks`` if given)."""
+    products = Product.objects.filter(is_active=True)
+    if pks is not None:
+        products = products.filter(pk__in=list(pks))
+    return list(
+        annotate_listing_columns(products)
+        .order_by()
+        .values_list(
+            "pk",
+            "price",
+            "min_price",
+            "quantity",
+            "category_id",
+            "created_at",
+            "rating",
+            "featured",
+        )
+        .iterator()
+    )
+
+
+def annotate_listing_columns(queryset: QuerySet) -> QuerySet:
+    """Annotate ``min_price`` and ``rating`` (average review rating)."""
+    variant_prices = (
+        ProductVariant.objects.filter(product=OuterRef("pk"), is_active=True)
+        .order_by()
+        .values("product")
+        .annotate(min_price=Min("price"))
+        .values("min_price")
+    )
+    ratings = (
+        ProductReview.objects.filter(product=OuterRef("pk"))
+        .order_by()
+        .values("product")
+        .annotate(rating=Avg("rating"))
+        .values("rating")
+    )
+    return queryset.annotate(
+        min_price=Coalesce(Subquery(variant_prices), "price"),
+        rating=Subquery(ratings),
+    )
+
+
+def filter_product_list(queryset: QuerySet, params: Mapping[str, str]) -> QuerySet:
+    """Database equivalent of the snapshot's stock, price and rating filters.
+
+    Category, featured and active filters and the ordering are applied by
+    the list endpoint decorators; ``min_price`` and ``rating`` are annotated
+    for them when filtered or ordered by.
+    """
+    ordering = {field.lstrip("-") for field in parse_ordering(params.get("ordering"))}
+    rating_min = parse_float(params.get("rating_min"))
+    if rating_min is not None or ordering & {"min_price", "rating"}:
+        queryset = annotate_listing_columns(queryset)
+
+    if (in_stock := parse_bool(params.get("in_stock"))) is not None:
+        in_stock_q = Q(quantity__gt=0)
+        queryset = queryset.filter(in_stock_q if in_stock else ~in_stock_q)
+    if (price_min := parse_cents(params.get("price_min"))) is not None:
+        queryset = queryset.filter(price__gte=Decimal(price_min) / 100)
+    if (price_max := parse_cents(params.get("price_max"))) is not None:
+        queryset = queryset.filter(price__lte=Decimal(price_max) / 100)
+    if rating_min is not None:
+        queryset = queryset.filter(rating__gte=rating_min)
+    return queryset
+
+
+def snapshot_results(
+    params: Mapping[str, str], queryset: QuerySet
+) -> SnapshotIds | None:
+    """Listing resolved on the snapshot, or None if it needs the database.
+
+    Args:
+        params: Request query parameters
+        queryset: Products to hydrate the requested page from
+    """
+    if not PRODUCT_SNAPSHOT["ENABLED"]:
+        return None
+    if any(value and name not in SNAPSHOT_PARAMS for name, value in params.items()):
+        return None
+    ordering = params.get("ordering", "").split(",")
+    if any(
+        field.strip().lstrip("-") not in SNAPSHOT_ORDERINGS
+        for field in ordering
+        if field.strip()
+    ):
+        return None  # Ordered by a column the snapshot lacks (e.g. name)
+    category_id = params.get("category_id")
+    if category_id:
+        try:
+            UUID(category_id)
+        except ValueError:
+            return None  # Let the database report it
+    return CATALOG_SNAPSHOT.get().query(params).hydrate(queryset)
+
+
+def build_catalog_snapshot() -> CatalogSnapshot:
+    """Build the snapshot of all active products."""
+    return CatalogSnapshot(fetch_rows())
+
+
+def patch_catalog_snapshot(snapshot: CatalogSnapshot, pks: set) -> None:
+    """Reload the rows of ``pks``; inactive or deleted products drop out."""
+    rows = fetch_rows(pks)
+    present = {row[0] for row in rows}
+    snapshot.patch(rows, removed=pks - present)
+
+
+CATALOG_SNAPSHOT = LocalIndex(
+    "catalog_snapshot",
+    build_catalog_snapshot,
+    update=patch_catalog_snapshot,
+    enabled=PRODUCT_SNAPSHOT["ENABLED"],
+    poll_interval=PRODUCT_SNAPSHOT["POLL_INTERVAL"],
+    refresh_interval=PRODUCT_SNAPSHOT["REFRESH_INTERVAL"],
+)
+
+
+def snapshot_version() -> str:
+    """Version of the snapshot this process serves listings from.
+
+    Part of the list endpoint's cache key and ETag: a worker that has not
+    caught up with a write yet must not cache its page as the current one.
+    """
+    return CATALOG_SNAPSHOT.version or ""
+
+
+def _product_changed(sender, instance, using=None, **kwargs):
+    CATALOG_SNAPSHOT.schedule([instance.pk], using)
+
+
+def _child_changed(sender, instance, using=None, **kwargs):
+    # Variants change the minimum price, reviews the rating
+    CATALOG_SNAPSHOT.schedule([instance.product_id], using)
+
+
+def register_snapshot_signals() -> None:
+    """Patch the snapshot when products, variants or reviews change."""
+    for signal, action in ((post_save, "save"), (post_delete, "delete")):
+        signal.connect(
+            _product_changed,
+            sender=Product,
+            dispatch_uid=f"snapshot_product_{action}",
+        )
+        for model in (ProductVariant, ProductReview):
+            signal.connect(
+                _child_changed,
+                sender=model,
+                dispatch_uid=f"snapshot_{model._meta.model_name}_{action}",
+            )
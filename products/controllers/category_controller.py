@@ -7,8 +7,8 @@ from ninja.pagination import paginate
 from ninja_extra import api_controller, http_delete, http_get, http_post, http_put
 from ninja_extra.permissions import IsAuthenticated
 
-from api.decorators import handle_exceptions, log_api_call
-from products.models import ProductCategory
+from api.decorators import conditional_get, handle_exceptions, log_api_call
+from products.models import Product, ProductCategory
 from products.schemas import (
     CategoryCreateSchema,
     CategorySchema,
@@ -25,6 +25,7 @@ class CategoryController:
     @http_get("", response={200: list[CategorySchema]})
     @handle_exceptions
     @log_api_call()
+    @conditional_get(ProductCategory, Product)
     @paginate
     def list_categories(self, request):
         """Get paginated list of product categories."""
@@ -36,6 +37,7 @@ class CategoryController:
     @http_get("/{id}", response={200: CategorySchema})
     @handle_exceptions
     @log_api_call()
+    @conditional_get(ProductCategory, Product)
     def get_category(self, request, id: UUID):
         """Get category by ID."""
         category = get_object_or_404(
@@ -77,6 +79,7 @@ class CategoryController:
     @http_get("/tree", response={200: list[CategorySchema]})
     @handle_exceptions
     @log_api_call()
+    @conditional_get(ProductCategory, Product)
     def get_category_tree(self, request):
         """Get category tree (root categories with children)."""
         categories = ProductCategory.objects.filter(parent=None).prefetch_related(
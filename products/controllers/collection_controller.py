@@ -7,7 +7,7 @@ from ninja.pagination import paginate
 from ninja_extra import api_controller, http_delete, http_get, http_post, http_put
 from ninja_extra.permissions import IsAuthenticated
 
-from api.decorators import handle_exceptions, log_api_call
+from api.decorators import conditional_get, handle_exceptions, log_api_call
 from products.models import Product, ProductCollection
 from products.schemas import (
     CollectionCreateSchema,
@@ -25,6 +25,7 @@ class CollectionController:
     @http_get("", response={200: list[CollectionSchema]})
     @handle_exceptions
     @log_api_call()
+    @conditional_get(ProductCollection, Product)
     @paginate
     def list_collections(self, request):
         """Get paginated list of collections."""
@@ -36,6 +37,7 @@ class CollectionController:
     @http_get("/{id}", response={200: CollectionSchema})
     @handle_exceptions
     @log_api_call()
+    @conditional_get(ProductCollection, Product)
     def get_collection(self, request, id: UUID):
         """Get collection by ID."""
         collection = get_object_or_404(
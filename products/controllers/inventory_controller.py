@@ -9,6 +9,7 @@ from ninja_extra.permissions import IsAuthenticated
 
 from api.decorators import handle_exceptions, log_api_call
 from api.exceptions import BadRequestError
+from api.pagination import KeysetPagination
 
 from ..models import InventoryAction, Product, ProductInventoryHistory, ProductVariant
 from ..schemas import (
@@ -25,7 +26,7 @@ class InventoryController:
     @http_get("/{product_id}/history", response={200: list[InventoryHistorySchema]})
     @handle_exceptions
     @log_api_call()
-    @paginate
+    @paginate(KeysetPagination, ordering=("-created_at", "-id"))
     def get_inventory_history(self, request, product_id: UUID):
         """Get inventory history for a product."""
         history = ProductInventoryHistory.objects.filter(
@@ -39,7 +40,7 @@ class InventoryController:
     )
     @handle_exceptions
     @log_api_call()
-    @paginate
+    @paginate(KeysetPagination, ordering=("-created_at", "-id"))
     def get_variant_inventory_history(
         self, request, product_id: UUID, variant_id: UUID
     ):
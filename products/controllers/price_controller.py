@@ -8,6 +8,7 @@ from ninja_extra import api_controller, http_get, http_post
 from ninja_extra.permissions import IsAuthenticated
 
 from api.decorators import handle_exceptions, log_api_call
+from api.pagination import KeysetPagination
 
 from ..models import PriceAction, Product, ProductPriceHistory, ProductVariant
 from ..schemas.price import (
@@ -24,7 +25,7 @@ class PriceController:
     @http_get("/{product_id}/history", response={200: list[PriceHistorySchema]})
     @handle_exceptions
     @log_api_call()
-    @paginate
+    @paginate(KeysetPagination, ordering=("-created_at", "-id"))
     def get_price_history(self, request, product_id: UUID):
         """Get price history for a product."""
         history = ProductPriceHistory.objects.filter(product_id=product_id).order_by(
@@ -38,7 +39,7 @@ class PriceController:
     )
     @handle_exceptions
     @log_api_call()
-    @paginate
+    @paginate(KeysetPagination, ordering=("-created_at", "-id"))
     def get_variant_price_history(self, request, product_id: UUID, variant_id: UUID):
         """Get price history for a product variant."""
         history = ProductPriceHistory.objects.filter(
@@ -5,8 +5,10 @@ from uuid import UUID
 
 from django.db import models, transaction
 from django.shortcuts import get_object_or_404
+from ninja import Query
 from ninja_extra import api_controller, http_delete, http_get, http_post, http_put
 
+from api.config import DEFAULT_PAGE_SIZE
 from api.decorators import (
     admin_endpoint,
     create_endpoint,
@@ -16,14 +18,32 @@ from api.decorators import (
     search_and_filter,
     update_endpoint,
 )
+from api.exports import streaming_export_response
+from api.search_filters import ProductSearchFilter
+from api.utils import paginate_queryset
+from products.autocomplete import PRODUCT_AUTOCOMPLETE, autocomplete
+from products.catalog_snapshot import (
+    filter_product_list,
+    snapshot_results,
+    snapshot_version,
+)
+from products.facets import FacetResults, facet_selection, get_facet_index
 from products.models import (
     Product,
+    ProductCollection,
+    ProductImage,
+    ProductReview,
+    ProductTag,
     ProductVariant,
+    ProductVariantOption,
 )
 from products.schemas import (
+    FacetFilterSchema,
     ProductCreateSchema,
+    ProductFacetsSchema,
     ProductListSchema,
     ProductSchema,
+    ProductSuggestionSchema,
     ProductUpdateSchema,
     ProductVariantCreateSchema,
     ProductVariantSchema,
@@ -32,6 +52,28 @@ from products.schemas import (
 
 logger = logging.getLogger(__name__)
 
+# Models rendered into product responses; their cache versions drive ETags
+PRODUCT_ETAG_MODELS = [
+    Product,
+    ProductVariant,
+    ProductVariantOption,
+    ProductImage,
+    ProductReview,
+    ProductTag,
+    ProductCollection,
+]
+
+# Relations loaded with listed products
+PRODUCT_LIST_SELECT_RELATED = ["category", "created_by", "updated_by"]
+PRODUCT_LIST_PREFETCH_RELATED = [
+    "variants",
+    "tags",
+    "collections",
+    "images",
+    "attributes",
+    "reviews",
+]
+
 
 @api_controller("/products", tags=["Products"])
 class ProductController:
@@ -40,15 +82,25 @@ class ProductController:
     @http_get("", response={200: list[ProductListSchema], 400: dict})
     @list_endpoint(
         cache_timeout=300,
-        select_related=["category", "created_by", "updated_by"],
-        prefetch_related=[
-            "variants",
-            "tags",
-            "collections",
-            "images",
-            "attributes",
-            "reviews",
+        etag_models=PRODUCT_ETAG_MODELS,
+        index_versions=[snapshot_version],
+        cache_params=[
+            "search",
+            "category_id",
+            "status",
+            "is_active",
+            "featured",
+            "type",
+            "in_stock",
+            "price_min",
+            "price_max",
+            "rating_min",
+            "ordering",
+            "page",
+            "page_size",
         ],
+        select_related=PRODUCT_LIST_SELECT_RELATED,
+        prefetch_related=PRODUCT_LIST_PREFETCH_RELATED,
         search_fields=["name", "description", "slug"],
         filter_fields={
             "category_id": "exact",
@@ -75,15 +127,102 @@ class ProductController:
             "featured": "boolean",
             "type": "exact",
         },
-        ordering_fields=["name", "price", "created_at", "featured"],
+        ordering_fields=[
+            "name",
+            "price",
+            "created_at",
+            "featured",
+            "quantity",
+            "min_price",
+            "rating",
+        ],
     )
     def list_products(self, request):
-        """Get all products with advanced filtering and optimization."""
-        return 200, Product.objects.filter(is_active=True)
+        """Get all products with advanced filtering and optimization.
+
+        Listings filtered by category, price range, stock, rating or featured
+        flag and ordered by numeric columns are resolved on the in-memory
+        catalog snapshot (``products.catalog_snapshot``), loading only the
+        requested page; other listings query the database.
+        """
+        queryset = Product.objects.filter(is_active=True)
+        results = snapshot_results(
+            request.GET,
+            queryset.select_related(*PRODUCT_LIST_SELECT_RELATED).prefetch_related(
+                *PRODUCT_LIST_PREFETCH_RELATED
+            ),
+        )
+        if results is None:
+            return 200, filter_product_list(queryset, request.GET)
+
+        page = int(request.GET.get("page", 1))
+        page_size = int(request.GET.get("page_size", DEFAULT_PAGE_SIZE))
+        return 200, paginate_queryset(results, page, page_size)
+
+    @http_get("/export", response={400: dict, 401: dict, 403: dict})
+    @admin_endpoint()
+    def export_products(
+        self,
+        request,
+        filters: ProductSearchFilter = Query(...),
+        export_format: str = Query("ndjson", alias="format"),
+    ):
+        """Stream the filtered products as NDJSON or CSV (``?format=csv``)."""
+        return streaming_export_response("products", filters, export_format)
+
+    @http_get("/autocomplete", response={200: list[ProductSuggestionSchema]})
+    def autocomplete_products(
+        self,
+        request,
+        q: str = Query(..., min_length=1, max_length=100),
+        limit: int = Query(
+            PRODUCT_AUTOCOMPLETE["LIMIT"], ge=1, le=PRODUCT_AUTOCOMPLETE["MAX_LIMIT"]
+        ),
+    ):
+        """Typeahead suggestions for the storefront search box.
+
+        Served from the in-memory index of ``products.autocomplete`` without
+        a database query, so it skips the list endpoint decorators.
+        """
+        return 200, autocomplete(q, limit)
+
+    @http_get("/facets", response={200: ProductFacetsSchema})
+    def product_facets(self, request, filters: FacetFilterSchema = Query(...)):
+        """Category, tag, collection and attribute counts for faceted browsing.
+
+        Computed on the in-memory bitmaps of ``products.facets``; each facet
+        is counted under the selection of the other facets.
+        """
+        index = get_facet_index()
+        selection = facet_selection(**filters.dict())
+        return 200, {
+            "count": index.count(selection),
+            "facets": index.counts(selection),
+        }
+
+    @http_get("/browse", response={200: list[ProductListSchema], 400: dict})
+    @list_endpoint(cache_timeout=None)
+    def browse_products(self, request, filters: FacetFilterSchema = Query(...)):
+        """Active products matching a facet selection, paginated.
+
+        The selection and its count are resolved on the facet bitmaps; the
+        database only loads the products of the requested page.
+        """
+        index = get_facet_index()
+        selection = facet_selection(**filters.dict())
+        results = FacetResults(
+            index,
+            index.select(selection),
+            Product.objects.select_related("category").prefetch_related("images"),
+        )
+        page = int(request.GET.get("page", 1))
+        page_size = int(request.GET.get("page_size", DEFAULT_PAGE_SIZE))
+        return 200, paginate_queryset(results, page, page_size)
 
     @http_get("/{product_id}", response={200: ProductSchema, 400: dict, 404: dict})
     @detail_endpoint(
         cache_timeout=600,
+        etag_models=PRODUCT_ETAG_MODELS,
         select_related=["category", "created_by", "updated_by"],
         prefetch_related=[
             "variants__options__option",
@@ -142,6 +281,7 @@ class ProductController:
     @http_get("/{product_id}/variants", response={200: list[ProductVariantSchema]})
     @list_endpoint(
         cache_timeout=300,
+        etag_models=PRODUCT_ETAG_MODELS,
         select_related=["product"],
         prefetch_related=["options__option", "options__value"],
         filter_fields={"is_active": "boolean"},
@@ -217,6 +357,7 @@ class ProductController:
     @http_get("/search", response={200: list[ProductListSchema]})
     @list_endpoint(
         cache_timeout=180,
+        etag_models=PRODUCT_ETAG_MODELS,
         select_related=["category"],
         prefetch_related=["variants", "tags", "images"],
         search_fields=["name", "description", "slug", "category__name"],
@@ -245,6 +386,9 @@ class ProductController:
     @http_get("/featured", response={200: list[ProductListSchema]})
     @list_endpoint(
         cache_timeout=600,
+        etag_models=PRODUCT_ETAG_MODELS,
+        stale_while_revalidate=True,
+        cache_params=["page", "page_size"],
         select_related=["category"],
         prefetch_related=["variants", "images", "tags"],
         ordering_fields=["created_at", "name", "price"],
@@ -255,9 +399,15 @@ class ProductController:
             is_active=True, featured=True, status="published"
         ).order_by("-created_at")
 
-    @http_get("/categories/{category_id}", response={200: list[ProductListSchema]})
+    @http_get(
+        "/categories/{category_id}/products",
+        response={200: list[ProductListSchema]},
+    )
     @list_endpoint(
         cache_timeout=300,
+        etag_models=PRODUCT_ETAG_MODELS,
+        stale_while_revalidate=True,
+        cache_params=["status", "featured", "ordering", "page", "page_size"],
         select_related=["category"],
         prefetch_related=["variants", "images"],
         filter_fields={
@@ -282,6 +432,7 @@ class ProductController:
     @http_get("/low-stock", response={200: list[ProductListSchema]})
     @admin_endpoint(
         cache_timeout=60,
+        etag_models=PRODUCT_ETAG_MODELS,
         select_related=["category"],
         prefetch_related=["variants"],
         ordering_fields=["quantity", "name"],
@@ -9,6 +9,7 @@ from ninja_extra.permissions import IsAuthenticated
 
 from api.decorators import handle_exceptions, log_api_call
 from api.exceptions import BadRequestError, PermissionDeniedError
+from api.pagination import KeysetPagination
 from products.models import Product, ProductReview
 from products.schemas import (
     ProductReviewCreateSchema,
@@ -26,7 +27,7 @@ class ReviewController:
     @http_get("", response={200: list[ProductReviewSchema]})
     @handle_exceptions
     @log_api_call()
-    @paginate
+    @paginate(KeysetPagination, ordering=("-created_at", "-id"))
     def list_reviews(self, request):
         """Get paginated list of product reviews."""
         reviews = ProductReview.objects.select_related("product", "user").order_by(
@@ -48,7 +49,7 @@ class ReviewController:
     @http_get("/products/{product_id}", response={200: list[ProductReviewSchema]})
     @handle_exceptions
     @log_api_call()
-    @paginate
+    @paginate(KeysetPagination, ordering=("-created_at", "-id"))
     def get_product_reviews(self, request, product_id: str):
         """Get all reviews for a specific product."""
         reviews = (
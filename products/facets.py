@@ -0,0 +1,526 @@
+"""In-memory bitmap index of product facets.
+
+Every product gets a position (products of a category are numbered together),
+and every category, tag, collection and filterable attribute value keeps a
+``Bitmap`` of the positions of its products. Faceted browsing then resolves
+in memory: values of one facet are OR-ed, facets are AND-ed, and the count of
+every value under the other selected facets is an intersection popcount, with
+no joins and no ``Count(distinct)``. Only the ids of the page being shown go
+to the ORM (see ``FacetResults``).
+
+Facet names are "category" (slugs), "tag" (names), "collection" (slugs of
+active collections) and "attribute:<code>" (values of filterable attributes).
+
+The index is a ``FACET_INDEX`` local index (see products.local_index): built
+in a background thread of each web worker. Changes to products, their tags,
+collections, attribute assignments and to tags, collections, attributes,
+attribute values and categories themselves update the affected products once
+the transaction commits, here and in the other workers.
+"""
+
+import threading
+from collections.abc import Iterable
+from typing import Any
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from .local_index import LocalIndex
+from .models import (
+    Product,
+    ProductAttribute,
+    ProductAttributeAssignment,
+    ProductAttributeValue,
+    ProductCategory,
+    ProductCollection,
+    ProductTag,
+)
+
+PRODUCT_FACETS = {
+    # Serve facet filters and counts from the in-memory index
+    "ENABLED": True,
+    # Seconds between checks of the shared version
+    "POLL_INTERVAL": 5,
+    # Seconds after which the index is rebuilt anyway
+    "REFRESH_INTERVAL": 600,
+    # Most product ids a filter sends to the database as ``pk IN (...)``;
+    # broader tag filters join the tags table instead
+    "MAX_FILTER_IDS": 1000,
+    **getattr(settings, "PRODUCT_FACETS", {}),
+}
+
+FACET_CATEGORY = "category"
+FACET_TAG = "tag"
+FACET_COLLECTION = "collection"
+ATTRIBUTE_FACET_PREFIX = "attribute:"
+
+CHUNK_BITS = 4096
+
+
+class Bitmap:
+    """Compressed set of non-negative ints (product positions).
+
+    Roaring-style: positions are split into 4096-bit chunks and only the
+    non-empty chunks are stored, each as a Python int. A value shared by a
+    handful of products costs a few small ints, while set operations on dense
+    sets still run a machine word at a time.
+    Usage:
+        sale = Bitmap.from_positions([1, 5, 9000])
+        shirts = Bitmap.from_positions([5, 9000, 12000])
+        list(sale & shirts)  # [5, 9000]
+        sale.intersection_count(shirts)  # 2
+    """
+
+    __slots__ = ("chunks",)
+
+    def __init__(self, chunks: dict[int, int] | None = None):
+        self.chunks = chunks if chunks is not None else {}
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[int]) -> "Bitmap":
+        bitmap = cls()
+        for position in positions:
+            bitmap.add(position)
+        return bitmap
+
+    def add(self, position: int) -> None:
+        key, bit = divmod(position, CHUNK_BITS)
+        self.chunks[key] = self.chunks.get(key, 0) | (1 << bit)
+
+    def discard(self, position: int) -> None:
+        key, bit = divmod(position, CHUNK_BITS)
+        chunk = self.chunks.get(key, 0) & ~(1 << bit)
+        if chunk:
+            self.chunks[key] = chunk
+        else:
+            self.chunks.pop(key, None)
+
+    def copy(self) -> "Bitmap":
+        return Bitmap(dict(self.chunks))
+
+    def intersection_count(self, other: "Bitmap") -> int:
+        """``len(self & other)`` without building the intersection."""
+        small, large = sorted((self.chunks, other.chunks), key=len)
+        return sum(
+            (chunk & large[key]).bit_count()
+            for key, chunk in small.items()
+            if key in large
+        )
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        small, large = sorted((self.chunks, other.chunks), key=len)
+        chunks = {}
+        for key, chunk in small.items():
+            both = chunk & large.get(key, 0)
+            if both:
+                chunks[key] = both
+        return Bitmap(chunks)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        chunks = dict(self.chunks)
+        for key, chunk in other.chunks.items():
+            chunks[key] = chunks.get(key, 0) | chunk
+        return Bitmap(chunks)
+
+    def __contains__(self, position: int) -> bool:
+        key, bit = divmod(position, CHUNK_BITS)
+        return bool(self.chunks.get(key, 0) >> bit & 1)
+
+    def __iter__(self):
+        """Positions in ascending order."""
+        for key in sorted(self.chunks):
+            offset = key * CHUNK_BITS
+            bits = bin(self.chunks[key])[:1:-1]  # Least significant bit first
+            position = bits.find("1")
+            while position != -1:
+                yield offset + position
+                position = bits.find("1", position + 1)
+
+    def slice(self, offset: int = 0, limit: int | None = None) -> list[int]:
+        """Up to ``limit`` positions from the ``offset``-th one, ascending.
+
+        Chunks before ``offset`` are skipped by their popcount.
+        """
+        positions = []
+        for key in sorted(self.chunks):
+            if limit is not None and len(positions) >= limit:
+                break
+            chunk = self.chunks[key]
+            count = chunk.bit_count()
+            if offset >= count:
+                offset -= count
+                continue
+            for position in Bitmap({key: chunk}):
+                if offset:
+                    offset -= 1
+                elif limit is None or len(positions) < limit:
+                    positions.append(position)
+        return positions
+
+    def __len__(self) -> int:
+        return sum(chunk.bit_count() for chunk in self.chunks.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.chunks)
+
+
+def union(bitmaps: Iterable[Bitmap]) -> Bitmap:
+    """Bitmap of the positions in any of ``bitmaps``."""
+    result = Bitmap()
+    for bitmap in bitmaps:
+        result = result | bitmap
+    return result
+
+
+class FacetIndex:
+    """Facet value -> product bitmap index.
+
+    A selection maps facet names to values, e.g.
+    ``{"tag": ["sale", "new"], "attribute:color": ["red"]}``: products match
+    if they have any of the values of every selected facet. Inactive products
+    are indexed too (searches may ask for them) but excluded by default.
+    Usage:
+        index = FacetIndex()
+        index.set_product(pk, True, [("category", "shirts"), ("tag", "sale")])
+        index.counts({"tag": ["sale"]})
+        index.product_ids(index.select({"tag": ["sale"]}))
+    """
+
+    def __init__(self):
+        self._positions: dict[Any, int] = {}
+        self._pks: list[Any] = []
+        self._products = Bitmap()
+        self._active = Bitmap()
+        self._facets: dict[str, dict[str, Bitmap]] = {}
+        self._memberships: dict[int, list[tuple[str, str]]] = {}
+        self._lock = threading.RLock()
+
+    def set_product(
+        self, pk, is_active: bool, memberships: list[tuple[str, str]]
+    ) -> None:
+        """Add or replace a product with its ``(facet, value)`` memberships."""
+        with self._lock:
+            position = self._positions.get(pk)
+            if position is None:
+                position = len(self._pks)
+                self._positions[pk] = position
+                self._pks.append(pk)
+            else:
+                self._unlink(position)
+            self._products.add(position)
+            if is_active:
+                self._active.add(position)
+            for facet, value in memberships:
+                self._facets.setdefault(facet, {}).setdefault(value, Bitmap()).add(
+                    position
+                )
+            self._memberships[position] = memberships
+
+    def remove_product(self, pk) -> None:
+        """Remove a product; its position is not reused until a rebuild."""
+        with self._lock:
+            position = self._positions.pop(pk, None)
+            if position is not None:
+                self._unlink(position)
+                self._pks[position] = None
+
+    def select(
+        self, selection: dict[str, Iterable[str]], active_only: bool = True
+    ) -> Bitmap:
+        """Products having any of the selected values of every facet."""
+        with self._lock:
+            result = self._active if active_only else self._products
+            for facet, values in selection.items():
+                if selected := list(values):
+                    result = result & self._values_bitmap(facet, selected)
+            return result.copy()
+
+    def select_containing(
+        self, facet: str, terms: Iterable[str], active_only: bool = False
+    ) -> Bitmap:
+        """Products having, for every term, a value containing it (any case)."""
+        with self._lock:
+            result = self._active if active_only else self._products
+            values = self._facets.get(facet, {})
+            for needle in (term.casefold() for term in terms):
+                result = result & union(
+                    bitmap
+                    for value, bitmap in values.items()
+                    if needle in value.casefold()
+                )
+            return result.copy()
+
+    def count(self, selection: dict[str, Iterable[str]]) -> int:
+        """Number of active products matching ``selection``."""
+        return len(self.select(selection))
+
+    def counts(
+        self,
+        selection: dict[str, Iterable[str]],
+        facets: Iterable[str] | None = None,
+    ) -> dict[str, dict[str, int]]:
+        """Matching products per value of each facet, most frequent first.
+
+        A facet's counts apply the selection of the other facets only, so
+        selecting one value still shows how many products each alternative
+        value would match.
+        """
+        with self._lock:
+            names = list(facets) if facets is not None else sorted(self._facets)
+            result = {}
+            for name in names:
+                others = {
+                    facet: values
+                    for facet, values in selection.items()
+                    if facet != name
+                }
+                base = self.select(others)
+                counts = {
+                    value: base.intersection_count(bitmap)
+                    for value, bitmap in self._facets.get(name, {}).items()
+                }
+                result[name] = dict(
+                    sorted(
+                        ((value, count) for value, count in counts.items() if count),
+                        key=lambda item: (-item[1], item[0]),
+                    )
+                )
+            return result
+
+    def product_ids(
+        self, bitmap: Bitmap, offset: int = 0, limit: int | None = None
+    ) -> list:
+        """Primary keys of the products in ``bitmap``, in position order."""
+        with self._lock:
+            return [self._pks[position] for position in bitmap.slice(offset, limit)]
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _values_bitmap(self, facet: str, values: list[str]) -> Bitmap:
+        facet_values = self._facets.get(facet, {})
+        return union(facet_values[value] for value in values if value in facet_values)
+
+    def _unlink(self, position: int) -> None:
+        self._products.discard(position)
+        self._active.discard(position)
+        for facet, value in self._memberships.pop(position, []):
+            bitmap = self._facets[facet][value]
+            bitmap.discard(position)
+            if not bitmap:
+                del self._facets[facet][value]
+                if not self._facets[facet]:
+                    del self._facets[facet]
+
+
+def fetch_products(
+    pks: Iterable | None = None,
+) -> dict[Any, tuple[bool, list[tuple[str, str]]]]:
+    """Activity and facet memberships of ``pks`` (all products if None).
+
+    Products are returned grouped by category, which keeps the positions of
+    a category (and of the values that follow categories) close together.
+    """
+    products = Product.objects.all()
+    scope = {}
+    if pks is not None:
+        pks = list(pks)
+        products = products.filter(pk__in=pks)
+        scope = {"product_id__in": pks}
+
+    entries: dict[Any, tuple[bool, list[tuple[str, str]]]] = {}
+    for pk, is_active, category in products.order_by(
+        "category_id", "pk"
+    ).values_list("pk", "is_active", "category__slug"):
+        entries[pk] = (is_active, [(FACET_CATEGORY, category)] if category else [])
+
+    tags = ProductTag.products.through.objects.filter(**scope).values_list(
+        "product_id", "producttag__name"
+    )
+    for product_id, name in tags.iterator():
+        if product_id in entries:
+            entries[product_id][1].append((FACET_TAG, name))
+
+    collections = ProductCollection.products.through.objects.filter(
+        productcollection__is_active=True, **scope
+    ).values_list("product_id", "productcollection__slug")
+    for product_id, slug in collections.iterator():
+        if product_id in entries:
+            entries[product_id][1].append((FACET_COLLECTION, slug))
+
+    attributes = ProductAttributeAssignment.objects.filter(
+        attribute__is_filterable=True, **scope
+    ).values_list("product_id", "attribute__code", "value__value")
+    for product_id, code, value in attributes.iterator():
+        if product_id in entries:
+            entries[product_id][1].append((f"{ATTRIBUTE_FACET_PREFIX}{code}", value))
+    return entries
+
+
+def build_facet_index() -> FacetIndex:
+    """Build the facet index of all products."""
+    index = FacetIndex()
+    for pk, (is_active, memberships) in fetch_products().items():
+        index.set_product(pk, is_active, memberships)
+    return index
+
+
+def reindex_products(index: FacetIndex, pks: set) -> None:
+    """Reload the memberships of ``pks``, removing products that are gone."""
+    entries = fetch_products(pks)
+    for pk in pks:
+        if pk in entries:
+            index.set_product(pk, *entries[pk])
+        else:
+            index.remove_product(pk)
+
+
+FACET_INDEX = LocalIndex(
+    "facets",
+    build_facet_index,
+    update=reindex_products,
+    enabled=PRODUCT_FACETS["ENABLED"],
+    poll_interval=PRODUCT_FACETS["POLL_INTERVAL"],
+    refresh_interval=PRODUCT_FACETS["REFRESH_INTERVAL"],
+)
+
+
+def get_facet_index() -> FacetIndex:
+    """The facet index of this process."""
+    return FACET_INDEX.get()
+
+
+def facet_selection(
+    category: list[str] | None = None,
+    tag: list[str] | None = None,
+    collection: list[str] | None = None,
+    attribute: list[str] | None = None,
+) -> dict[str, list[str]]:
+    """Selection from request values; attributes are given as "code:value"."""
+    selection = {
+        FACET_CATEGORY: category or [],
+        FACET_TAG: tag or [],
+        FACET_COLLECTION: collection or [],
+    }
+    for item in attribute or []:
+        code, _, value = item.partition(":")
+        selection.setdefault(f"{ATTRIBUTE_FACET_PREFIX}{code}", []).append(value)
+    return {facet: values for facet, values in selection.items() if values}
+
+
+class FacetResults:
+    """Products of a bitmap, loaded from the database a slice at a time.
+
+    Sliceable with a ``count()``, so Django's paginator (and
+    ``api.utils.paginate_queryset``) pages it like a queryset while only the
+    primary keys of the requested page are sent to the database.
+    Usage:
+        index = get_facet_index()
+        results = FacetResults(index, index.select(selection), Product.objects)
+        paginate_queryset(results, page=2, page_size=20)
+    """
+
+    def __init__(self, index: FacetIndex, bitmap: Bitmap, queryset: QuerySet):
+        self.index = index
+        self.bitmap = bitmap
+        self.queryset = queryset
+        self._count = len(bitmap)
+
+    def count(self) -> int:
+        return self._count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key : key + 1][0]
+        start, stop, _ = key.indices(self._count)
+        pks = self.index.product_ids(self.bitmap, start, max(stop - start, 0))
+        objects = self.queryset.filter(pk__in=pks).in_bulk()
+        return [objects[pk] for pk in pks if pk in objects]
+
+
+def _products_changed(sender, instance, using=None, **kwargs):
+    FACET_INDEX.schedule([instance.pk], using)
+
+
+def _assignment_changed(sender, instance, using=None, **kwargs):
+    FACET_INDEX.schedule([instance.product_id], using)
+
+
+def _group_saved(sender, instance, created, using=None, **kwargs):
+    # Renamed or (de)activated tag, collection or category
+    if created:
+        return  # Nothing refers to it yet
+    FACET_INDEX.schedule(_group_products(instance), using)
+
+
+def _group_deleting(sender, instance, using=None, **kwargs):
+    # The links are gone after the delete, so collect the products first
+    FACET_INDEX.schedule(_group_products(instance), using)
+
+
+def _group_products(instance) -> Iterable:
+    if isinstance(instance, ProductCategory):
+        return Product.objects.filter(category=instance).values_list("pk", flat=True)
+    if isinstance(instance, ProductAttribute):
+        assignments = ProductAttributeAssignment.objects.filter(attribute=instance)
+    elif isinstance(instance, ProductAttributeValue):
+        assignments = ProductAttributeAssignment.objects.filter(value=instance)
+    else:
+        return instance.products.values_list("pk", flat=True)
+    return assignments.values_list("product_id", flat=True)
+
+
+def _members_changed(sender, instance, action, pk_set=None, using=None, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if isinstance(instance, Product):
+        pks = [instance.pk]
+    elif action == "pre_clear":
+        pks = instance.products.values_list("pk", flat=True)
+    else:
+        pks = pk_set or []
+    FACET_INDEX.schedule(pks, using)
+
+
+def register_facet_signals() -> None:
+    """Keep the facet index in sync with products and their facet values."""
+    post_save.connect(
+        _products_changed, sender=Product, dispatch_uid="facets_product_save"
+    )
+    post_delete.connect(
+        _products_changed, sender=Product, dispatch_uid="facets_product_delete"
+    )
+    post_save.connect(
+        _assignment_changed,
+        sender=ProductAttributeAssignment,
+        dispatch_uid="facets_assignment_save",
+    )
+    post_delete.connect(
+        _assignment_changed,
+        sender=ProductAttributeAssignment,
+        dispatch_uid="facets_assignment_delete",
+    )
+    for model in (
+        ProductTag,
+        ProductCollection,
+        ProductCategory,
+        ProductAttribute,
+        ProductAttributeValue,
+    ):
+        name = model._meta.model_name
+        post_save.connect(
+            _group_saved, sender=model, dispatch_uid=f"facets_{name}_save"
+        )
+        pre_delete.connect(
+            _group_deleting, sender=model, dispatch_uid=f"facets_{name}_delete"
+        )
+    for model in (ProductTag, ProductCollection):
+        m2m_changed.connect(
+            _members_changed,
+            sender=model.products.through,
+            dispatch_uid=f"facets_{model._meta.model_name}_m2m",
+        )
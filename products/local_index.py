@@ -0,0 +1,255 @@
+"""Per-process in-memory catalog indexes kept current across workers.
+
+A ``LocalIndex`` holds one index object per process (the autocomplete prefix
+index, the facet bitmaps, ...), built from the database by its ``build``
+callable and patched by its ``update`` callable. Changes reach it in two ways:
+
+* ``schedule(pks)`` batches the products changed in a transaction and
+  ``apply(pks)`` runs ``update(index, pks)`` on the index of this process
+  once it commits. It also appends the pks to a change log in the shared
+  cache, numbered by a sequence, and bumps the shared cache version of the
+  index;
+* a background thread (``start()``) compares that version with the one the
+  index is at every ``poll_interval`` seconds. When another worker changed
+  something it replays the logged pks it has not seen through ``update``.
+  It rebuilds the index only when the log has a gap (entries expired, the
+  cache was flushed, too many changes) and every ``refresh_interval``
+  seconds regardless.
+
+Versions are read through the L1 cache, so polling costs no Redis round trip
+until a version is bumped. Log entries live for ``refresh_interval``, after
+which a lagging worker rebuilds anyway. Indexes register themselves in
+``LOCAL_INDEXES`` and ``start_local_indexes()`` is called when a web worker
+boots; a process that never starts the threads (e.g. a management command)
+builds an index on first use.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from functools import partial
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+
+from core.cache.versioning import CacheVersion
+
+logger = logging.getLogger(__name__)
+
+LOCAL_INDEXES: dict[str, "LocalIndex"] = {}
+
+# Catching up on more logged changes than this rebuilds the index instead
+MAX_REPLAYED_CHANGES = 500
+
+
+class LocalIndex:
+    """In-memory index of one process, patched when other workers change it.
+
+    Usage:
+        facets = LocalIndex("facets", build_facet_index, reindex_products)
+        facets.get().count({"tag": ["sale"]})
+        facets.schedule([product.pk])  # Updated once the transaction commits
+    """
+
+    def __init__(
+        self,
+        name: str,
+        build: Callable[[], Any],
+        update: Callable[[Any, set], None],
+        *,
+        enabled: bool = True,
+        poll_interval: float = 5,
+        refresh_interval: float = 600,
+    ):
+        """Initialize and register a local index.
+
+        Args:
+            name: Name of the index, also its cache version namespace
+            build: Returns a new index built from the database
+            update: Applies changes of the given product pks to an index,
+                here and when replaying the change log of other workers
+            enabled: Whether ``start()`` runs the refresh thread
+            poll_interval: Seconds between checks of the shared version
+            refresh_interval: Seconds after which the index is rebuilt anyway
+        """
+        self.name = name
+        self.build = build
+        self.update = update
+        self.enabled = enabled
+        self.poll_interval = poll_interval
+        self.refresh_interval = refresh_interval
+        self._index: Any = None
+        self._version: str | None = None
+        self._sequence: int | None = None
+        self._built_at: float | None = None
+        self._build_lock = threading.Lock()
+        self._state = threading.local()
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+        LOCAL_INDEXES[name] = self
+
+    def get(self) -> Any:
+        """The index of this process, built now if the thread has not yet."""
+        if self._index is None:
+            with self._build_lock:
+                if self._index is None:
+                    self.rebuild()
+        return self._index
+
+    @property
+    def version(self) -> str | None:
+        """Shared cache version the index of this process is at."""
+        return self._version
+
+    @property
+    def sequence_key(self) -> str:
+        """Cache key holding the number of the last logged change."""
+        return f"{settings.CACHE_KEY_PREFIX}:index:{self.name}:sequence"
+
+    def change_key(self, sequence: int) -> str:
+        """Cache key holding the pks of logged change ``sequence``."""
+        return f"{settings.CACHE_KEY_PREFIX}:index:{self.name}:change:{sequence}"
+
+    def rebuild(self) -> Any:
+        """Build a new index and swap it in."""
+        started = time.time()
+        # Read first, so changes committed during the build are replayed after
+        version = CacheVersion(self.name).get()
+        sequence = cache.get(self.sequence_key, 0)
+        index = self.build()
+        self._index, self._version, self._built_at = index, version, time.time()
+        self._sequence = sequence
+        logger.info(f"Built the {self.name} index in {self._built_at - started:.2f}s")
+        return index
+
+    def is_stale(self) -> bool:
+        """Whether the index is missing, changed elsewhere or due a refresh."""
+        if self._index is None:
+            return True
+        if time.time() - self._built_at >= self.refresh_interval:
+            return True
+        return self._version != CacheVersion(self.name).get()
+
+    def refresh(self) -> None:
+        """Bring a stale index up to date, replaying logged changes if possible."""
+        if not self.is_stale():
+            return
+        if (
+            self._index is not None
+            and time.time() - self._built_at < self.refresh_interval
+            and self.catch_up()
+        ):
+            return
+        self.rebuild()
+
+    def catch_up(self) -> bool:
+        """Replay the changes other workers logged since this index's sequence.
+
+        Returns False, leaving the index as it is, when the log cannot bring
+        it up to date and it has to be rebuilt instead.
+        """
+        version = CacheVersion(self.name).get()
+        sequence = cache.get(self.sequence_key)
+        if sequence is None or self._sequence is None or sequence < self._sequence:
+            return False  # The log was flushed or reset
+        if sequence - self._sequence > MAX_REPLAYED_CHANGES:
+            return False
+
+        keys = [self.change_key(n) for n in range(self._sequence + 1, sequence + 1)]
+        changes = cache.get_many(keys) if keys else {}
+        if len(changes) != len(keys):
+            # Expired, or logged by a worker that has not written it yet
+            return False
+
+        pks = set().union(*changes.values())
+        if pks:
+            self.update(self._index, pks)
+        self._version, self._sequence = version, sequence
+        logger.debug(f"Replayed {len(keys)} changes on the {self.name} index")
+        return True
+
+    def apply(self, pks: set) -> None:
+        """Apply changes of ``pks`` to this process's index and log them."""
+        index = self._index
+        if index is not None:
+            self.update(index, pks)
+        sequence = self._log(pks)
+        version = CacheVersion(self.name).increment()
+        if (
+            index is not None
+            and index is self._index
+            and sequence is not None
+            and self._sequence is not None
+            and sequence == self._sequence + 1
+        ):
+            # No other worker logged a change in between; nothing to replay
+            self._version, self._sequence = version, sequence
+
+    def _log(self, pks: set) -> int | None:
+        """Append ``pks`` to the shared change log, returning its number."""
+        try:
+            cache.add(self.sequence_key, 0, timeout=None)
+            sequence = cache.incr(self.sequence_key)
+            cache.set(self.change_key(sequence), pks, self.refresh_interval)
+        except Exception as e:
+            # Without the entry other workers find a gap and rebuild
+            logger.error(f"Logging a change of the {self.name} index failed: {e}")
+            return None
+        return sequence
+
+    def schedule(self, pks: Iterable, using: str | None = None) -> None:
+        """Update the index for ``pks`` now, or once when the transaction commits."""
+        pks = {pk for pk in pks if pk is not None}
+        if not pks:
+            return
+
+        connection = transaction.get_connection(using)
+        pending = self._pending().setdefault(connection.alias, set())
+        pending.update(pks)
+        if connection.in_atomic_block:
+            transaction.on_commit(
+                partial(self.flush, connection.alias), using=connection.alias
+            )
+            return
+        self.flush(connection.alias)
+
+    def flush(self, alias: str) -> None:
+        """Apply the changes scheduled in a committed transaction."""
+        pks = self._pending().pop(alias, None)
+        if pks:
+            self.apply(pks)
+
+    def start(self) -> None:
+        """Start the refresh thread (once per process)."""
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name=f"{self.name}-index-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _pending(self) -> dict[str, set]:
+        if not hasattr(self._state, "pending"):
+            self._state.pending = {}
+        return self._state.pending
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                close_old_connections()
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Refreshing the {self.name} index failed: {e}")
+            self._stopped.wait(self.poll_interval)
+
+
+def start_local_indexes() -> None:
+    """Start the refresh threads of all registered indexes."""
+    for index in LOCAL_INDEXES.values():
+        index.start()
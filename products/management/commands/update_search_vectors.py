@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from products.search import is_full_text_available, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search vectors of all products"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, help="Products updated per UPDATE statement"
+        )
+
+    def handle(self, *args, **options):
+        if not is_full_text_available():
+            self.stdout.write(
+                self.style.WARNING("Search vectors need PostgreSQL, nothing to do")
+            )
+            return
+
+        updated = update_search_vectors(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated the search vectors of {updated} products")
+        )
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:40
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The indexes are built without locking writes to the (large) tables
+    atomic = False
+
+    dependencies = [
+        ("products", "0002_product_search_vector"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="productvariant",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("sku"), name="gin_trgm_ops"
+                ),
+                name="variant_sku_trgm",
+            ),
+        ),
+    ]
@@ -1,5 +1,7 @@
 import uuid
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 from core.models import AbstractBaseModel
@@ -82,6 +84,8 @@ class Product(AbstractBaseModel):
     seo_description = models.TextField(null=True, blank=True)
     seo_keywords = models.TextField(null=True, blank=True)
     meta_data = models.JSONField(default=dict, blank=True)
+    # Weighted name/SKU/tags/description vector, maintained by products.search
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = "Product"
@@ -113,6 +117,7 @@ class Product(AbstractBaseModel):
             models.Index(fields=["created_at", "status"]),
             # Search optimization indexes
             models.Index(fields=["name", "status"]),
+            GinIndex(fields=["search_vector"], name="product_search_vector_gin"),
         ]
 
     def __str__(self):
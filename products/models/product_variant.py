@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from core.models import AbstractBaseModel
 
@@ -79,4 +81,9 @@ class ProductVariant(AbstractBaseModel):
             # Date-based indexes
             models.Index(fields=["created_at"]),
             models.Index(fields=["updated_at"]),
+            # Trigram index for partial and fuzzy SKU lookups (icontains
+            # compares UPPER(sku), so the expression is indexed)
+            GinIndex(
+                OpClass(Upper("sku"), name="gin_trgm_ops"), name="variant_sku_trgm"
+            ),
         ]
@@ -41,9 +41,12 @@ from .product_option_schema import (
     ProductVariantUpdateSchema,
 )
 from .product_schema import (
+    FacetFilterSchema,
     ProductCreateSchema,
+    ProductFacetsSchema,
     ProductListSchema,
     ProductSchema,
+    ProductSuggestionSchema,
     ProductUpdateSchema,
 )
 from .review_schema import (
@@ -98,6 +101,9 @@ __all__ = [
     "ProductSchema",
     "ProductCreateSchema",
     "ProductListSchema",
+    "ProductSuggestionSchema",
+    "FacetFilterSchema",
+    "ProductFacetsSchema",
     "ProductUpdateSchema",
     # Product option schemas
     "ProductOptionSchema",
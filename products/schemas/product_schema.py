@@ -5,10 +5,10 @@ from uuid import UUID
 from ninja import Schema
 from pydantic import Field, validator
 
-from .collection import CollectionSchema
-from .product_option import ProductImageSchema, ProductVariantSchema
-from .review import ReviewSchema
-from .tag import TagSchema
+from .collection_schema import CollectionSchema
+from .product_option_schema import ProductImageSchema, ProductVariantSchema
+from .review_schema import ReviewSchema
+from .tag_schema import TagSchema
 
 
 class ProductSchema(Schema):
@@ -130,3 +130,32 @@ class ProductUpdateSchema(Schema):
     height: Decimal | None = None
     digital_file: str | None = None
     download_limit: int | None = None
+
+
+class ProductSuggestionSchema(Schema):
+    type: str = Field(description="product, sku or category")
+    id: UUID = Field(description="Product id (also for SKUs) or category id")
+    text: str
+    slug: str
+
+
+class FacetFilterSchema(Schema):
+    category: list[str] = Field([], description="Category slugs")
+    tag: list[str] = Field([], description="Tag names")
+    collection: list[str] = Field([], description="Collection slugs")
+    attribute: list[str] = Field(
+        [], description='Filterable attribute values as "code:value"'
+    )
+
+    @validator("attribute", each_item=True)
+    def attribute_must_have_code(cls, v):
+        if ":" not in v:
+            raise ValueError('attribute must be given as "code:value"')
+        return v
+
+
+class ProductFacetsSchema(Schema):
+    count: int = Field(description="Active products matching the selection")
+    facets: dict[str, dict[str, int]] = Field(
+        description="Matching products per value, under the other facets' filters"
+    )
@@ -0,0 +1,211 @@
+"""Full-text search vectors of products.
+
+``Product.search_vector`` holds a weighted ``tsvector`` of the product's
+name (A), variant SKUs (B), tag names (C) and description (D) and is
+covered by a GIN index, so ``FullTextSearchEngine`` (api/search_filters.py)
+answers searches with an index scan ranked by ``SearchRank``.
+
+The vectors are maintained incrementally: saving a product, saving or
+deleting one of its variants, renaming a tag or changing a product's tags
+refreshes the vectors of the affected products once, when the transaction
+commits. ``update_search_vectors()`` without arguments (or the
+``update_search_vectors`` management command) rebuilds all of them in
+batches, e.g. after the column is added or the configuration changes.
+
+Vectors only exist on PostgreSQL; elsewhere these functions do nothing and
+product search keeps using the ``icontains`` based ``AdvancedSearchEngine``.
+"""
+
+import logging
+import threading
+from collections.abc import Iterable
+from functools import partial
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import connections, router, transaction
+from django.db.models import OuterRef, Subquery, TextField
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from .models import Product, ProductTag, ProductVariant
+
+logger = logging.getLogger(__name__)
+
+SEARCH_BACKEND_BASIC = "basic"
+SEARCH_BACKEND_FULL_TEXT = "fulltext"
+
+PRODUCT_SEARCH = {
+    # "basic" (icontains across fields) or "fulltext" (search_vector)
+    "BACKEND": SEARCH_BACKEND_BASIC,
+    # PostgreSQL text search configuration used for vectors and queries
+    "CONFIG": "english",
+    # Products whose vectors are rebuilt per UPDATE
+    "BATCH_SIZE": 500,
+    **getattr(settings, "PRODUCT_SEARCH", {}),
+}
+
+_state = threading.local()
+
+
+def is_full_text_available() -> bool:
+    """Whether products are stored in PostgreSQL, which has the vectors."""
+    alias = router.db_for_write(Product)
+    return connections[alias].vendor == "postgresql"
+
+
+def product_search_vector() -> SearchVector:
+    """Weighted vector expression of a product, for ``update()``.
+
+    SKUs and tag names are aggregated in correlated subqueries rather than
+    joins, so a product with many variants and tags is not multiplied.
+    """
+    config = PRODUCT_SEARCH["CONFIG"]
+    skus = (
+        ProductVariant.objects.filter(product=OuterRef("pk"))
+        .order_by()
+        .values("product")
+        .annotate(skus=StringAgg("sku", " "))
+        .values("skus")
+    )
+    tag_names = (
+        ProductTag.objects.filter(products=OuterRef("pk"))
+        .order_by()
+        .values("products")
+        .annotate(names=StringAgg("name", " "))
+        .values("names")
+    )
+    return (
+        SearchVector("name", weight="A", config=config)
+        + SearchVector(
+            Subquery(skus, output_field=TextField()), weight="B", config=config
+        )
+        + SearchVector(
+            Subquery(tag_names, output_field=TextField()), weight="C", config=config
+        )
+        + SearchVector("description", weight="D", config=config)
+    )
+
+
+def update_search_vectors(
+    pks: Iterable | None = None, batch_size: int | None = None
+) -> int:
+    """Recompute the search vectors of ``pks`` (all products if None).
+
+    Returns:
+        Number of products updated
+    """
+    if not is_full_text_available():
+        return 0
+
+    batch_size = batch_size or PRODUCT_SEARCH["BATCH_SIZE"]
+    if pks is None:
+        pks = Product.objects.order_by("pk").values_list("pk", flat=True).iterator()
+
+    updated = 0
+    batch: list = []
+    for pk in pks:
+        batch.append(pk)
+        if len(batch) >= batch_size:
+            updated += _update_batch(batch)
+            batch = []
+    if batch:
+        updated += _update_batch(batch)
+    logger.debug(f"Updated the search vectors of {updated} products")
+    return updated
+
+
+def _update_batch(pks: list) -> int:
+    return Product.objects.filter(pk__in=pks).update(
+        search_vector=product_search_vector()
+    )
+
+
+def _pending() -> dict[str, set]:
+    if not hasattr(_state, "pending"):
+        _state.pending = {}
+    return _state.pending
+
+
+def flush_pending(alias: str) -> int:
+    """Update the vectors of the products changed in a committed transaction."""
+    pks = _pending().pop(alias, None)
+    if not pks:
+        return 0
+    return update_search_vectors(pks)
+
+
+def schedule_search_update(pks: Iterable, using: str | None = None) -> None:
+    """Refresh the vectors of ``pks`` now, or once when the transaction commits."""
+    pks = {pk for pk in pks if pk is not None}
+    if not pks or not is_full_text_available():
+        return
+
+    connection = transaction.get_connection(using)
+    pending = _pending().setdefault(connection.alias, set())
+    pending.update(pks)
+    if connection.in_atomic_block:
+        transaction.on_commit(
+            partial(flush_pending, connection.alias), using=connection.alias
+        )
+        return
+    flush_pending(connection.alias)
+
+
+def _product_saved(sender, instance, using=None, **kwargs):
+    schedule_search_update([instance.pk], using)
+
+
+def _variant_changed(sender, instance, using=None, **kwargs):
+    schedule_search_update([instance.product_id], using)
+
+
+def _tag_saved(sender, instance, created, using=None, **kwargs):
+    if created:
+        return  # A new tag has no products yet
+    schedule_search_update(instance.products.values_list("pk", flat=True), using)
+
+
+def _tag_deleting(sender, instance, using=None, **kwargs):
+    # The links are gone after the delete, so collect the products first
+    schedule_search_update(instance.products.values_list("pk", flat=True), using)
+
+
+def _tags_changed(sender, instance, action, pk_set=None, using=None, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if isinstance(instance, Product):
+        pks = [instance.pk]
+    elif action == "pre_clear":
+        pks = instance.products.values_list("pk", flat=True)
+    else:
+        pks = pk_set or []
+    schedule_search_update(pks, using)
+
+
+def register_search_signals() -> None:
+    """Keep product search vectors in sync with products, variants and tags."""
+    post_save.connect(
+        _product_saved, sender=Product, dispatch_uid="search_vector_product_save"
+    )
+    post_save.connect(
+        _variant_changed,
+        sender=ProductVariant,
+        dispatch_uid="search_vector_variant_save",
+    )
+    post_delete.connect(
+        _variant_changed,
+        sender=ProductVariant,
+        dispatch_uid="search_vector_variant_delete",
+    )
+    post_save.connect(
+        _tag_saved, sender=ProductTag, dispatch_uid="search_vector_tag_save"
+    )
+    pre_delete.connect(
+        _tag_deleting, sender=ProductTag, dispatch_uid="search_vector_tag_delete"
+    )
+    m2m_changed.connect(
+        _tags_changed,
+        sender=ProductTag.products.through,
+        dispatch_uid="search_vector_tags_m2m",
+    )
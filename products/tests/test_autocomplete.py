@@ -0,0 +1,117 @@
+import random
+
+from products.autocomplete import AutocompleteIndex, normalize, word_keys
+
+
+def _entry(pk: int, name: str, popularity: int):
+    suggestion = {"type": "product", "id": str(pk), "text": name}
+    return ("product", str(pk)), word_keys(name), suggestion, popularity
+
+
+class TestKeys:
+    """Test normalization of indexed text."""
+
+    def test_normalize(self):
+        """Test case folding and whitespace collapsing."""
+        assert normalize("  Navy\tBLUE  Shirt ") == "navy blue shirt"
+
+    def test_word_keys(self):
+        """Test a key starts at every word, without duplicates."""
+        assert word_keys("Navy Blue Shirt") == [
+            "navy blue shirt",
+            "blue shirt",
+            "shirt",
+        ]
+        assert word_keys("tee tee") == ["tee tee", "tee"]
+
+
+class TestAutocompleteIndex:
+    """Test prefix search and precomputed top lists."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.index = AutocompleteIndex(precomputed_length=2, precomputed_limit=3)
+        self.index.load(
+            [
+                _entry(1, "Navy Blue Shirt", 5),
+                _entry(2, "Blue Jeans", 9),
+                _entry(3, "Black Shoes", 1),
+                _entry(4, "Blazer", 5),
+            ]
+        )
+
+    def texts(self, query, limit=10):
+        return [suggestion["text"] for suggestion in self.index.search(query, limit)]
+
+    def test_search_any_word(self):
+        """Test a prefix matches from the start of any word."""
+        assert self.texts("blue sh") == ["Navy Blue Shirt"]
+        assert self.texts("SHI") == ["Navy Blue Shirt"]
+
+    def test_ranked_by_popularity_then_text(self):
+        """Test suggestions are ranked by popularity, then alphabetically."""
+        assert self.texts("bl", limit=3) == ["Blue Jeans", "Blazer", "Navy Blue Shirt"]
+        assert self.texts("bla") == ["Blazer", "Black Shoes"]
+
+    def test_limit(self):
+        """Test the limit applies to precomputed and scanned prefixes."""
+        assert self.texts("b", limit=1) == ["Blue Jeans"]
+        assert self.texts("b", limit=10) == [
+            "Blue Jeans",
+            "Blazer",
+            "Navy Blue Shirt",
+            "Black Shoes",
+        ]
+        assert self.texts("x") == []
+        assert self.texts("  ") == []
+
+    def test_add_keeps_popularity(self):
+        """Test renaming an entry keeps its popularity unless one is given."""
+        entry_id, keys, suggestion, _ = _entry(3, "Blue Shoes", 0)
+        self.index.add(entry_id, keys, suggestion)
+
+        assert self.index.popularity(entry_id) == 1
+        assert self.texts("black") == []
+        assert self.texts("blue s") == ["Navy Blue Shirt", "Blue Shoes"]
+
+    def test_remove(self):
+        """Test a removed entry disappears from precomputed and scanned prefixes."""
+        self.index.remove(("product", "2"))
+
+        assert ("product", "2") not in self.index
+        assert len(self.index) == 3
+        assert self.texts("bl") == ["Blazer", "Navy Blue Shirt", "Black Shoes"]
+        assert self.texts("blue") == ["Navy Blue Shirt"]
+
+    def test_incremental_updates_match_fresh_load(self):
+        """Test top lists maintained by add/remove match a rebuilt index."""
+        rng = random.Random(23)
+        words = ["ab", "abc", "ba", "bad", "cab", "a", "b"]
+        entries = {}
+
+        def random_name():
+            return " ".join(rng.choices(words, k=rng.randint(1, 3)))
+
+        for pk in range(30):
+            entries[pk] = _entry(pk, random_name(), rng.randint(0, 5))
+        index = AutocompleteIndex(precomputed_length=2, precomputed_limit=3)
+        index.load(entries.values())
+
+        for _ in range(500):
+            pk = rng.randrange(40)
+            if pk in entries and rng.random() < 0.3:
+                del entries[pk]
+                index.remove(("product", str(pk)))
+            else:
+                entries[pk] = _entry(pk, random_name(), rng.randint(0, 5))
+                index.add(*entries[pk])
+
+        fresh = AutocompleteIndex(precomputed_length=2, precomputed_limit=3)
+        fresh.load(entries.values())
+        # One and two characters use the top lists, longer prefixes a scan
+        prefixes = {a + b for a in "abcd" for b in "abcd"} | set("abcd")
+        prefixes |= {"abc", "ab a", "bad", "cab b"}
+        for prefix in prefixes:
+            for limit in (1, 3, 5):
+                assert index.search(prefix, limit) == fresh.search(prefix, limit)
+        assert len(index) == len(fresh)
@@ -0,0 +1,186 @@
+import random
+from decimal import Decimal
+
+import pytest
+from django.db.models import F
+
+from core.cache.versioning import CacheVersion
+from core.tests.factories import UserFactory
+from products.catalog_snapshot import (
+    CATALOG_SNAPSHOT,
+    CatalogSnapshot,
+    fetch_rows,
+    filter_product_list,
+    parse_bool,
+    parse_ordering,
+    patch_catalog_snapshot,
+    snapshot_results,
+    snapshot_version,
+)
+from products.models import Product, ProductReview
+from products.tests.factories import (
+    ProductCategoryFactory,
+    ProductFactory,
+    ProductVariantFactory,
+)
+
+PRICES = [Decimal("5.00"), Decimal("19.99"), Decimal("20.00"), Decimal("49.50")]
+
+
+@pytest.mark.django_db
+class TestCatalogSnapshot:
+    """Test snapshot listings against the equivalent database queries."""
+
+    def setup_method(self):
+        """Set up test data."""
+        rng = random.Random(25)
+        self.user = UserFactory()
+        reviewers = [UserFactory() for _ in range(3)]
+        self.categories = [
+            ProductCategoryFactory(slug=f"snapshot-category-{n}", created_by=self.user)
+            for n in range(2)
+        ]
+        for number in range(30):
+            product = ProductFactory(
+                slug=f"snapshot-product-{number}",
+                category=rng.choice(self.categories),
+                price=rng.choice(PRICES),
+                quantity=rng.choice([0, 0, 3, 10]),
+                featured=rng.random() < 0.3,
+                is_active=rng.random() < 0.85,
+                created_by=self.user,
+            )
+            for variant in range(rng.randint(0, 2)):
+                ProductVariantFactory(
+                    product=product,
+                    sku=f"SNAP-{number}-{variant}",
+                    price=rng.choice(PRICES),
+                    is_active=rng.random() < 0.8,
+                    created_by=self.user,
+                )
+            for reviewer in rng.sample(reviewers, rng.randint(0, 3)):
+                ProductReview.objects.create(
+                    product=product,
+                    user=reviewer,
+                    rating=rng.randint(1, 5),
+                    title="Review",
+                    comment="Review",
+                    created_by=reviewer,
+                )
+        self.snapshot = CatalogSnapshot(fetch_rows())
+
+    def database_ids(self, params):
+        """The list endpoint's database path for ``params``."""
+        queryset = Product.objects.filter(is_active=True)
+        if category_id := params.get("category_id"):
+            queryset = queryset.filter(category_id=category_id)
+        if (featured := parse_bool(params.get("featured"))) is not None:
+            queryset = queryset.filter(featured=featured)
+        if parse_bool(params.get("is_active")) is False:
+            queryset = queryset.none()
+        queryset = filter_product_list(queryset, params)
+
+        ordering = []
+        for field in parse_ordering(params.get("ordering")):
+            name = field.lstrip("-")
+            if field.startswith("-"):
+                ordering.append(F(name).desc(nulls_first=True))
+            else:
+                ordering.append(F(name).asc(nulls_last=True))
+        queryset = queryset.order_by(*ordering, "-created_at")
+        return list(queryset.values_list("pk", flat=True))
+
+    def snapshot_ids(self, params):
+        return self.snapshot.query(params)[:]
+
+    def params(self):
+        category_id = str(self.categories[0].pk)
+        return [
+            {},
+            {"category_id": category_id},
+            {"featured": "true"},
+            {"featured": "0", "in_stock": "yes"},
+            {"in_stock": "false"},
+            {"is_active": "false"},
+            {"price_min": "19.99"},
+            {"price_min": "10", "price_max": "20"},
+            {"price_max": "abc"},
+            {"rating_min": "3"},
+            {"rating_min": "3.5", "category_id": category_id},
+            {"ordering": "price"},
+            {"ordering": "-price,quantity"},
+            {"ordering": "min_price"},
+            {"ordering": "-min_price,-featured"},
+            {"ordering": "rating"},
+            {"ordering": "-rating"},
+            {"ordering": "created_at"},
+            {"ordering": "featured,-quantity", "price_max": "25"},
+        ]
+
+    def test_query_matches_database(self):
+        """Test every supported filter and ordering matches the database."""
+        for params in self.params():
+            assert self.snapshot_ids(params) == self.database_ids(params), params
+
+    def test_patch_matches_database(self):
+        """Test a patched snapshot matches the database after changes."""
+        products = list(Product.objects.order_by("slug")[:6])
+        pks = {product.pk for product in products}
+        Product.objects.filter(pk=products[0].pk).update(price=Decimal("1.00"))
+        Product.objects.filter(pk=products[1].pk).update(is_active=False)
+        Product.objects.filter(pk=products[2].pk).update(is_active=True, quantity=0)
+        ProductVariantFactory(
+            product=products[3],
+            sku="SNAP-NEW",
+            price=Decimal("0.50"),
+            is_active=True,
+            created_by=self.user,
+        )
+        products[4].delete()
+        new = ProductFactory(
+            slug="snapshot-product-new",
+            category=self.categories[1],
+            price=Decimal("7.00"),
+            created_by=self.user,
+        )
+
+        patch_catalog_snapshot(self.snapshot, pks | {new.pk})
+
+        assert len(self.snapshot) == Product.objects.filter(is_active=True).count()
+        for params in self.params():
+            assert self.snapshot_ids(params) == self.database_ids(params), params
+
+    def test_snapshot_version_lags_until_refresh(self):
+        """Test a worker keeps its snapshot version until it catches up."""
+        CATALOG_SNAPSHOT.rebuild()
+        version = snapshot_version()
+        assert version == CacheVersion("catalog_snapshot").get()
+
+        # Another worker's write
+        CacheVersion("catalog_snapshot").increment()
+
+        assert snapshot_version() == version
+        CATALOG_SNAPSHOT.refresh()
+        assert snapshot_version() == CacheVersion("catalog_snapshot").get()
+        assert snapshot_version() != version
+
+    def test_hydrate(self):
+        """Test slices of hydrated results are products in snapshot order."""
+        ids = self.snapshot.query({"ordering": "-price"})
+        page = ids.hydrate(Product.objects.all())[2:5]
+
+        assert [product.pk for product in page] == ids[2:5]
+        assert ids.count() == len(ids[:])
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"search": "shirt"},
+            {"ordering": "name"},
+            {"ordering": "-price,name"},
+            {"category_id": "not-a-uuid"},
+        ],
+    )
+    def test_unsupported_params_use_database(self, params):
+        """Test listings the snapshot cannot answer fall back to the database."""
+        assert snapshot_results(params, Product.objects.all()) is None
@@ -0,0 +1,137 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import pagination
+from api.config.constants import (
+    COUNT_CACHED,
+    COUNT_ESTIMATED,
+    COUNT_EXACT,
+    ESTIMATED_COUNT_THRESHOLD,
+)
+from api.pagination import AdvancedPaginator, CountingPaginator, planner_row_estimate
+from core.tests.factories import UserFactory
+from products.models import Product
+from products.tests.factories import ProductCategoryFactory, ProductFactory
+
+
+def _count(queryset, strategy):
+    paginator = CountingPaginator(queryset, 10, count_strategy=strategy)
+    with CaptureQueriesContext(connection) as queries:
+        count = paginator.count
+    return count, len(queries), paginator.count_is_approximate
+
+
+@pytest.mark.django_db
+class TestCountingPaginator:
+    """Test the exact, cached and estimated count strategies."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.user = UserFactory()
+        self.category = ProductCategoryFactory(
+            slug="counting-category", created_by=self.user
+        )
+        for index in range(12):
+            ProductFactory(
+                slug=f"counting-product-{index}",
+                price=Decimal("10.00") if index % 2 else Decimal("20.00"),
+                category=self.category,
+                created_by=self.user,
+            )
+        self.queryset = Product.objects.filter(category=self.category)
+
+    def test_unknown_strategy(self):
+        """Test an unknown count strategy is rejected."""
+        with pytest.raises(ValueError, match="Unknown count strategy"):
+            CountingPaginator(self.queryset, 10, count_strategy="guess")
+
+    def test_exact(self):
+        """Test the exact strategy counts with a query every time."""
+        assert _count(self.queryset, COUNT_EXACT) == (12, 1, False)
+        assert _count(self.queryset, COUNT_EXACT) == (12, 1, False)
+
+    def test_cached(self):
+        """Test the cached strategy counts once per query."""
+        assert _count(self.queryset, COUNT_CACHED) == (12, 1, False)
+        assert _count(self.queryset, COUNT_CACHED) == (12, 0, False)
+
+        cheap = self.queryset.filter(price=Decimal("10.00"))
+        assert _count(cheap, COUNT_CACHED) == (6, 1, False)
+
+    def test_cached_count_is_invalidated_by_writes(
+        self, django_capture_on_commit_callbacks
+    ):
+        """Test a write to the model drops the memoized counts."""
+        _count(self.queryset, COUNT_CACHED)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ProductFactory(
+                slug="counting-product-new",
+                category=self.category,
+                created_by=self.user,
+            )
+
+        assert _count(self.queryset, COUNT_CACHED) == (13, 1, False)
+
+    def test_estimated_without_postgres(self):
+        """Test the estimated strategy counts exactly on other databases."""
+        if connection.vendor == "postgresql":
+            pytest.skip("Needs a database without planner estimates")
+
+        assert planner_row_estimate(self.queryset) is None
+        assert _count(self.queryset, COUNT_ESTIMATED) == (12, 1, False)
+
+    def test_estimated(self, monkeypatch):
+        """Test a large planner estimate is used as an approximate total."""
+        monkeypatch.setattr(
+            pagination,
+            "planner_row_estimate",
+            lambda _: ESTIMATED_COUNT_THRESHOLD * 3,
+        )
+
+        count, _, approximate = _count(self.queryset, COUNT_ESTIMATED)
+
+        assert count == ESTIMATED_COUNT_THRESHOLD * 3
+        assert approximate
+
+    def test_small_estimate_is_counted(self, monkeypatch):
+        """Test estimates below the threshold are replaced by an exact count."""
+        monkeypatch.setattr(pagination, "planner_row_estimate", lambda _: 40)
+
+        assert _count(self.queryset, COUNT_ESTIMATED)[::2] == (12, False)
+
+    def test_failing_estimate_is_counted(self, monkeypatch):
+        """Test a failing EXPLAIN falls back to an exact count."""
+
+        def fail(_queryset):
+            raise RuntimeError("no planner")
+
+        monkeypatch.setattr(pagination, "planner_row_estimate", fail)
+
+        assert _count(self.queryset, COUNT_ESTIMATED)[::2] == (12, False)
+
+    def test_lists_are_counted(self):
+        """Test strategies other than exact are ignored for plain lists."""
+        assert (
+            CountingPaginator(list(range(7)), 3, count_strategy=COUNT_CACHED).count == 7
+        )
+
+    def test_advanced_paginator_meta(self, monkeypatch):
+        """Test the page metadata reports an approximate total."""
+        monkeypatch.setattr(
+            pagination,
+            "planner_row_estimate",
+            lambda _: ESTIMATED_COUNT_THRESHOLD,
+        )
+
+        page = AdvancedPaginator(
+            self.queryset.order_by("pk"), per_page=5, count_strategy=COUNT_ESTIMATED
+        ).get_page(2)
+
+        assert len(page["items"]) == 5
+        assert page["meta"].total_items == ESTIMATED_COUNT_THRESHOLD
+        assert page["meta"].total_pages == ESTIMATED_COUNT_THRESHOLD // 5
+        assert page["meta"].total_is_approximate
@@ -0,0 +1,151 @@
+from decimal import Decimal
+
+import pytest
+
+from api import pagination
+from api.exceptions import ValidationError
+from api.pagination import CursorPaginator
+from core.tests.factories import UserFactory
+from products.models import Product
+from products.tests.factories import ProductCategoryFactory, ProductFactory
+
+ORDERINGS = [
+    ("-price",),
+    ("price", "name"),
+    ("-price", "name"),
+    ("name", "-price", "pk"),
+]
+
+
+@pytest.mark.django_db
+class TestCursorPaginator:
+    """Test keyset pagination over products."""
+
+    def setup_method(self):
+        """Set up test data."""
+        user = UserFactory()
+        category = ProductCategoryFactory(slug="cursor-category", created_by=user)
+        prices = [Decimal("10.00"), Decimal("19.99"), Decimal("5.50")]
+        for index in range(23):
+            ProductFactory(
+                name=f"product-{index % 5}",
+                slug=f"cursor-product-{index}",
+                price=prices[index % len(prices)],
+                category=category,
+                created_by=user,
+            )
+
+    @pytest.fixture(params=["row values", "q chain"])
+    def row_values(self, request, monkeypatch):
+        """Run with and without row-value comparisons."""
+        if request.param == "q chain":
+            monkeypatch.setattr(pagination, "Tuple", None)
+
+    def expected(self, paginator):
+        return list(Product.objects.order_by(*paginator.ordering))
+
+    def walk(self, paginator, cursor=None, *, backwards=False, reverse=False):
+        items, pages = [], 0
+        while True:
+            page = paginator.get_page(cursor, reverse=reverse)
+            pages += 1
+            items = page["items"] + items if backwards else items + page["items"]
+            meta = page["meta"]
+            cursor = meta.previous_cursor if backwards else meta.next_cursor
+            if cursor is None:
+                return items, pages, page
+
+    @pytest.mark.parametrize("ordering", ORDERINGS)
+    @pytest.mark.usefixtures("row_values")
+    def test_forward(self, ordering):
+        """Test following next cursors visits every row once, in order."""
+        paginator = CursorPaginator(Product.objects.all(), limit=5, ordering=ordering)
+
+        items, pages, last = self.walk(paginator)
+
+        assert items == self.expected(paginator)
+        assert pages == 5
+        assert not last["meta"].has_next
+        assert last["meta"].has_previous
+
+    @pytest.mark.parametrize("ordering", ORDERINGS)
+    @pytest.mark.usefixtures("row_values")
+    def test_backward(self, ordering):
+        """Test following previous cursors from the last page walks back."""
+        paginator = CursorPaginator(Product.objects.all(), limit=5, ordering=ordering)
+        expected = self.expected(paginator)
+        _, _, last = self.walk(paginator)
+
+        cursor = last["meta"].previous_cursor
+        items, pages, first = self.walk(paginator, cursor, backwards=True)
+
+        assert items + last["items"] == expected
+        assert pages == 4
+        assert first["items"] == expected[:5]
+        assert not first["meta"].has_previous
+        assert first["meta"].has_next
+
+    def test_back_and_forth(self):
+        """Test going back one page returns the same rows as before."""
+        paginator = CursorPaginator(
+            Product.objects.all(), limit=5, ordering=("-price", "name")
+        )
+        first = paginator.get_page()
+        second = paginator.get_page(first["meta"].next_cursor)
+
+        back = paginator.get_page(second["meta"].previous_cursor)
+
+        assert back["items"] == first["items"]
+        assert not back["meta"].has_previous
+        assert back["meta"].has_next
+
+    def test_reverse(self):
+        """Test reverse pagination walks the ordering backwards."""
+        paginator = CursorPaginator(
+            Product.objects.all(), limit=5, ordering=("-price", "name")
+        )
+
+        items, _, _ = self.walk(paginator, reverse=True)
+
+        assert items == self.expected(paginator)[::-1]
+
+    def test_tiebreaker_appended(self):
+        """Test the primary key is appended in the direction of the last field."""
+        queryset = Product.objects.all()
+
+        assert CursorPaginator(queryset, ordering=("-price",)).ordering == (
+            "-price",
+            "-pk",
+        )
+        assert CursorPaginator(queryset, ordering=("name", "-id")).ordering == (
+            "name",
+            "-id",
+        )
+
+    def test_tampered_cursor(self):
+        """Test edited cursors are rejected."""
+        paginator = CursorPaginator(Product.objects.all(), limit=5)
+        cursor = paginator.get_page()["meta"].next_cursor
+        payload, signature = cursor.rsplit(":", 1)
+        tampered = f"{payload[:-1]}{'A' if payload[-1] != 'A' else 'B'}:{signature}"
+
+        with pytest.raises(ValidationError):
+            paginator.get_page(tampered)
+        with pytest.raises(ValidationError):
+            paginator.get_page("not-a-cursor")
+
+    def test_cursor_for_other_ordering(self):
+        """Test a cursor only works with the ordering it was issued for."""
+        queryset = Product.objects.all()
+        cursor = (
+            CursorPaginator(queryset, limit=5, ordering=("-price",))
+            .get_page()["meta"]
+            .next_cursor
+        )
+
+        with pytest.raises(ValidationError):
+            CursorPaginator(queryset, limit=5, ordering=("price",)).get_page(cursor)
+        with pytest.raises(ValidationError):
+            CursorPaginator(queryset, limit=5, ordering=("-price",)).get_page(
+                cursor, reverse=True
+            )
@@ -0,0 +1,101 @@
+import csv
+import io
+from decimal import Decimal
+
+import orjson
+import pytest
+
+from api.exceptions import ValidationError
+from api.exports import (
+    CONTENT_TYPES,
+    EXPORTS,
+    FORMAT_CSV,
+    FORMAT_NDJSON,
+    iter_export,
+    streaming_export_response,
+)
+from api.search_filters import ProductSearchFilter
+from core.tests.factories import UserFactory
+from products.tests.factories import ProductCategoryFactory, ProductFactory
+
+
+@pytest.mark.django_db
+class TestProductExport:
+    """Test streaming product exports."""
+
+    def setup_method(self):
+        """Set up test data."""
+        user = UserFactory()
+        self.category = ProductCategoryFactory(slug="export-category", created_by=user)
+        other = ProductCategoryFactory(slug="export-other", created_by=user)
+        self.products = [
+            ProductFactory(
+                name=f"export-{index}",
+                slug=f"export-product-{index}",
+                category=self.category if index < 5 else other,
+                price=Decimal("12.50"),
+                is_active=index != 0,
+                created_by=user,
+            )
+            for index in range(7)
+        ]
+        self.columns = list(EXPORTS["products"].columns)
+
+    def test_ndjson(self):
+        """Test every row is one JSON object with the export columns."""
+        lines = b"".join(iter_export("products", chunk_size=2)).splitlines()
+
+        rows = [orjson.loads(line) for line in lines]
+        assert len(rows) == 7
+        assert list(rows[0]) == self.columns
+        assert [row["slug"] for row in rows] == [
+            product.slug for product in sorted(self.products, key=lambda p: p.pk)
+        ]
+        assert rows[0]["price"] == "12.50"
+        assert rows[0]["category"] == "export-category"
+
+    def test_csv(self):
+        """Test the CSV export starts with a header line."""
+        text = "".join(iter_export("products", export_format=FORMAT_CSV))
+
+        rows = list(csv.reader(io.StringIO(text)))
+        assert rows[0] == self.columns
+        assert len(rows) == 8
+        assert {row[self.columns.index("price")] for row in rows[1:]} == {"12.50"}
+
+    def test_filters(self):
+        """Test exports apply the search filters but not limit or offset."""
+        filters = ProductSearchFilter(
+            category="export-category", is_active=True, limit=1, offset=2
+        )
+
+        lines = list(iter_export("products", filters))
+
+        slugs = {orjson.loads(line)["slug"] for line in lines}
+        assert slugs == {f"export-product-{index}" for index in range(1, 5)}
+
+    def test_unsupported_filter(self):
+        """Test a filter on a missing field is rejected before streaming."""
+        with pytest.raises(ValidationError, match="Unsupported export filter"):
+            iter_export("products", ProductSearchFilter(is_featured=True))
+
+    @pytest.mark.parametrize(
+        ("name", "export_format"),
+        [("invoices", FORMAT_NDJSON), ("products", "xlsx")],
+    )
+    def test_unknown_export_or_format(self, name, export_format):
+        """Test unknown exports and formats are rejected."""
+        with pytest.raises(ValidationError):
+            iter_export(name, export_format=export_format)
+
+    def test_streaming_response(self):
+        """Test the response streams an attachment of the requested format."""
+        response = streaming_export_response("products", export_format=FORMAT_CSV)
+
+        assert response.streaming
+        assert response["Content-Type"] == CONTENT_TYPES[FORMAT_CSV]
+        assert response["Content-Disposition"].startswith(
+            'attachment; filename="products-'
+        )
+        assert response["Content-Disposition"].endswith('.csv"')
+        assert len(b"".join(response.streaming_content).splitlines()) == 8
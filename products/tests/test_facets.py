@@ -0,0 +1,216 @@
+import random
+
+import pytest
+from django.core.paginator import Paginator
+
+from core.tests.factories import UserFactory
+from products.facets import Bitmap, FacetIndex, FacetResults, union
+from products.models import Product
+from products.tests.factories import ProductCategoryFactory, ProductFactory
+
+
+def _positions(rng: random.Random, count: int) -> set[int]:
+    # Spread over several chunks, with dense runs inside some of them
+    return {
+        rng.choice([rng.randrange(50_000), rng.randrange(4090, 4110)])
+        for _ in range(count)
+    }
+
+
+class TestBitmap:
+    """Test bitmap set operations against Python sets."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.rng = random.Random(24)
+
+    def test_set_operations(self):
+        """Test &, |, intersection counts, membership and iteration."""
+        for _ in range(50):
+            left = _positions(self.rng, self.rng.randint(0, 300))
+            right = _positions(self.rng, self.rng.randint(0, 300))
+            a, b = Bitmap.from_positions(left), Bitmap.from_positions(right)
+
+            assert list(a) == sorted(left)
+            assert len(a) == len(left)
+            assert bool(a) == bool(left)
+            assert list(a & b) == sorted(left & right)
+            assert list(a | b) == sorted(left | right)
+            assert a.intersection_count(b) == len(left & right)
+            assert all(position in a for position in left)
+            assert all((position in a) == (position in left) for position in right)
+
+    def test_discard(self):
+        """Test discarding positions drops emptied chunks."""
+        bitmap = Bitmap.from_positions([1, 4096, 4097])
+
+        bitmap.discard(4096)
+        bitmap.discard(4097)
+        bitmap.discard(99_999)
+
+        assert list(bitmap) == [1]
+        assert bitmap.chunks == {0: 2}
+
+    def test_copy_is_independent(self):
+        """Test a copy does not share chunks with the original."""
+        bitmap = Bitmap.from_positions([1])
+        copy = bitmap.copy()
+        copy.add(2)
+
+        assert list(bitmap) == [1]
+
+    def test_slice(self):
+        """Test slices match slicing the sorted positions."""
+        positions = sorted(_positions(self.rng, 500))
+        bitmap = Bitmap.from_positions(positions)
+
+        for offset in (0, 1, 7, 100, len(positions) - 1, len(positions), 10_000):
+            for limit in (None, 0, 1, 20, 1000):
+                end = None if limit is None else offset + limit
+                assert bitmap.slice(offset, limit) == positions[offset:end]
+
+    def test_union(self):
+        """Test the union of several bitmaps."""
+        bitmaps = [Bitmap.from_positions([n, n * 5000]) for n in range(1, 4)]
+
+        assert list(union(bitmaps)) == [1, 2, 3, 5000, 10000, 15000]
+        assert not union([])
+
+
+class TestFacetIndex:
+    """Test facet selections and counts against a brute-force computation."""
+
+    def setup_method(self):
+        """Set up test data."""
+        self.rng = random.Random(42)
+        self.index = FacetIndex()
+        self.products = {}
+        for pk in range(300):
+            self.set_product(pk)
+
+    def set_product(self, pk):
+        memberships = [("category", self.rng.choice(["shirts", "shoes", "hats"]))]
+        memberships += [
+            ("tag", tag) for tag in ("sale", "new", "eco") if self.rng.random() < 0.3
+        ]
+        if self.rng.random() < 0.5:
+            memberships.append(("attribute:color", self.rng.choice(["red", "blue"])))
+        is_active = self.rng.random() < 0.9
+        self.products[pk] = (is_active, set(memberships))
+        self.index.set_product(pk, is_active, memberships)
+
+    def matching(self, selection, skip=None):
+        return [
+            pk
+            for pk, (is_active, memberships) in self.products.items()
+            if is_active
+            and all(
+                any((facet, value) in memberships for value in values)
+                for facet, values in selection.items()
+                if facet != skip and values
+            )
+        ]
+
+    def expected_counts(self, selection):
+        facets = {
+            facet
+            for _, memberships in self.products.values()
+            for facet, _ in memberships
+        }
+        result = {}
+        for facet in sorted(facets):
+            counts = {}
+            for pk in self.matching(selection, skip=facet):
+                for name, value in self.products[pk][1]:
+                    if name == facet:
+                        counts[value] = counts.get(value, 0) + 1
+            result[facet] = dict(
+                sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+            )
+        return result
+
+    def check(self, selection):
+        expected = self.matching(selection)
+        bitmap = self.index.select(selection)
+
+        assert sorted(self.index.product_ids(bitmap)) == sorted(expected)
+        assert self.index.count(selection) == len(expected)
+        assert self.index.counts(selection) == self.expected_counts(selection)
+
+    @pytest.mark.parametrize(
+        "selection",
+        [
+            {},
+            {"tag": ["sale"]},
+            {"tag": ["sale", "new"]},
+            {"tag": ["sale"], "category": ["shoes"]},
+            {"category": ["hats", "shirts"], "attribute:color": ["red"]},
+            {"tag": ["missing"]},
+        ],
+    )
+    def test_counts(self, selection):
+        """Test matches and per-value counts of a selection."""
+        self.check(selection)
+
+    def test_counts_after_updates(self):
+        """Test counts stay exact after products change or are removed."""
+        for _ in range(200):
+            pk = self.rng.randrange(350)
+            if pk in self.products and self.rng.random() < 0.3:
+                del self.products[pk]
+                self.index.remove_product(pk)
+            else:
+                self.set_product(pk)
+
+        self.check({"tag": ["sale", "eco"], "category": ["shoes"]})
+        assert len(self.index) == len(self.products)
+
+    def test_inactive_products(self):
+        """Test inactive products are only selected on request."""
+        inactive = [pk for pk, (is_active, _) in self.products.items() if not is_active]
+        bitmap = self.index.select({}, active_only=False)
+
+        assert sorted(self.index.product_ids(bitmap)) == sorted(self.products)
+        assert not set(inactive) & set(self.index.product_ids(self.index.select({})))
+
+    def test_select_containing(self):
+        """Test every term must be contained in one of the values."""
+        expected = [
+            pk
+            for pk, (_, memberships) in self.products.items()
+            if ("tag", "sale") in memberships and ("tag", "new") in memberships
+        ]
+        bitmap = self.index.select_containing("tag", ["SAL", "ne"])
+
+        assert sorted(self.index.product_ids(bitmap)) == sorted(expected)
+
+
+@pytest.mark.django_db
+class TestFacetResults:
+    """Test paging products of a bitmap."""
+
+    def setup_method(self):
+        """Set up test data."""
+        user = UserFactory()
+        category = ProductCategoryFactory(slug="facet-category", created_by=user)
+        self.index = FacetIndex()
+        for number in range(12):
+            product = ProductFactory(
+                slug=f"facet-product-{number}", category=category, created_by=user
+            )
+            tags = [("tag", "sale")] if number % 3 else []
+            self.index.set_product(product.pk, True, tags)
+
+    def test_pages(self):
+        """Test pages load the products of the bitmap in position order."""
+        bitmap = self.index.select({"tag": ["sale"]})
+        results = FacetResults(self.index, bitmap, Product.objects.all())
+        paginator = Paginator(results, 3)
+
+        assert paginator.count == 8
+        pages = [list(paginator.page(number)) for number in paginator.page_range]
+        assert [len(page) for page in pages] == [3, 3, 2]
+        assert [product.pk for page in pages for product in page] == (
+            self.index.product_ids(bitmap)
+        )
+        assert results[1] == pages[0][1]
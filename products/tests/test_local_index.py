@@ -0,0 +1,150 @@
+import uuid
+
+import pytest
+from django.core.cache import cache
+
+from core.cache.local import get_local_cache
+from products.local_index import LOCAL_INDEXES, MAX_REPLAYED_CHANGES, LocalIndex
+
+
+class Worker:
+    """A local index of one simulated worker over a shared "database" dict."""
+
+    def __init__(self, name, rows, **kwargs):
+        self.rows = rows
+        self.builds = 0
+        self.updates = []
+        self.index = LocalIndex(name, self.build, self.update, **kwargs)
+
+    def build(self):
+        self.builds += 1
+        return dict(self.rows)
+
+    def update(self, index, pks):
+        self.updates.append(set(pks))
+        for pk in pks:
+            if pk in self.rows:
+                index[pk] = self.rows[pk]
+            else:
+                index.pop(pk, None)
+
+
+class TestLocalIndex:
+    """Test workers replaying each other's changes instead of rebuilding."""
+
+    def setup_method(self):
+        """Set up test data."""
+        cache.clear()
+        local_cache = get_local_cache()
+        if local_cache is not None:
+            local_cache.clear()
+        self.name = f"test-index-{uuid.uuid4().hex[:8]}"
+        self.rows = {1: "one", 2: "two"}
+        self.first = Worker(self.name, self.rows)
+        self.second = Worker(self.name, self.rows)
+        self.first.index.get()
+        self.second.index.get()
+
+    def teardown_method(self):
+        LOCAL_INDEXES.pop(self.name, None)
+
+    def test_replays_changes_of_other_workers(self):
+        """Test a change made by one worker is patched into the others."""
+        self.rows[1] = "uno"
+        del self.rows[2]
+        self.first.index.apply({1, 2})
+
+        assert not self.first.index.is_stale()
+        assert self.second.index.is_stale()
+
+        self.second.index.refresh()
+
+        assert self.second.index.get() == {1: "uno"}
+        assert self.second.builds == 1
+        assert self.second.updates == [{1, 2}]
+        assert not self.second.index.is_stale()
+
+    def test_replays_several_changes_at_once(self):
+        """Test changes logged since the last poll are applied in one update."""
+        for pk in (3, 4, 5):
+            self.rows[pk] = str(pk)
+            self.first.index.apply({pk})
+
+        self.second.index.refresh()
+
+        assert self.second.index.get() == self.rows
+        assert self.second.updates == [{3, 4, 5}]
+        assert self.second.builds == 1
+
+    def test_interleaved_changes(self):
+        """Test a worker whose change follows another's still replays that one."""
+        self.rows[3] = "three"
+        self.second.index.apply({3})
+        self.rows[1] = "uno"
+        self.first.index.apply({1})
+
+        assert self.first.index.is_stale()
+        self.first.index.refresh()
+        self.second.index.refresh()
+
+        assert self.first.index.get() == self.rows
+        assert self.second.index.get() == self.rows
+        assert self.first.builds == self.second.builds == 1
+
+    def test_rebuilds_on_gap(self):
+        """Test a missing log entry rebuilds the index."""
+        self.rows[3] = "three"
+        self.first.index.apply({3})
+        cache.delete(
+            self.first.index.change_key(cache.get(self.first.index.sequence_key))
+        )
+
+        self.second.index.refresh()
+
+        assert self.second.index.get() == self.rows
+        assert self.second.builds == 2
+        assert self.second.updates == []
+
+    def test_rebuilds_when_log_was_flushed(self):
+        """Test a flushed sequence rebuilds the index."""
+        self.first.index.apply({1})
+        cache.delete(self.first.index.sequence_key)
+
+        self.second.index.refresh()
+
+        assert self.second.builds == 2
+
+    def test_rebuilds_after_too_many_changes(self):
+        """Test a worker lagging too far behind rebuilds instead of replaying."""
+        cache.set(self.first.index.sequence_key, MAX_REPLAYED_CHANGES)
+        self.first.index.apply({1})
+
+        self.second.index.refresh()
+
+        assert self.second.builds == 2
+        assert self.second.updates == []
+
+    def test_rebuilds_after_refresh_interval(self):
+        """Test the index is rebuilt every refresh interval regardless."""
+        worker = Worker(f"{self.name}-refresh", self.rows, refresh_interval=0)
+        worker.index.get()
+
+        worker.index.refresh()
+
+        assert worker.builds == 2
+        LOCAL_INDEXES.pop(f"{self.name}-refresh", None)
+
+    @pytest.mark.django_db
+    def test_schedule_applies_once_on_commit(self, django_capture_on_commit_callbacks):
+        """Test pks scheduled in a transaction are applied and logged together."""
+        self.rows[1] = "uno"
+        self.rows[3] = "three"
+        with django_capture_on_commit_callbacks(execute=True):
+            self.first.index.schedule([1, None])
+            self.first.index.schedule([3])
+            assert self.first.updates == []
+
+        assert self.first.updates == [{1, 3}]
+        self.second.index.refresh()
+        assert self.second.index.get() == self.rows
+        assert self.second.updates == [{1, 3}]
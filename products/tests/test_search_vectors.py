@@ -0,0 +1,165 @@
+import pytest
+from django.contrib.postgres.search import SearchQuery
+
+from core.tests.factories import UserFactory
+from products import search
+from products.models import Product, ProductTag
+from products.search import is_full_text_available, update_search_vectors
+from products.tests.factories import (
+    ProductCategoryFactory,
+    ProductFactory,
+    ProductVariantFactory,
+)
+
+
+@pytest.mark.django_db
+class TestSearchVectorSignals:
+    """Test which writes refresh the search vectors of which products."""
+
+    @pytest.fixture(autouse=True)
+    def updates(self, monkeypatch):
+        """Record vector updates instead of running them."""
+        self.updates = []
+        monkeypatch.setattr(search, "is_full_text_available", lambda: True)
+        monkeypatch.setattr(
+            search, "update_search_vectors", lambda pks: self.updates.append(set(pks))
+        )
+
+    def setup_method(self):
+        """Set up test data."""
+        self.user = UserFactory()
+        category = ProductCategoryFactory(slug="vector-category", created_by=self.user)
+        self.products = [
+            ProductFactory(
+                slug=f"vector-product-{index}",
+                category=category,
+                created_by=self.user,
+            )
+            for index in range(3)
+        ]
+        self.tag = ProductTag.objects.create(
+            name="Summer", slug="vector-summer", created_by=self.user
+        )
+        self.tag.products.add(*self.products[:2])
+
+    def changed(self, django_capture_on_commit_callbacks, write):
+        self.updates.clear()
+        with django_capture_on_commit_callbacks(execute=True):
+            write()
+        return self.updates
+
+    def test_product_saved(self, django_capture_on_commit_callbacks):
+        """Test saving a product refreshes its own vector."""
+        product = self.products[2]
+
+        assert self.changed(django_capture_on_commit_callbacks, product.save) == [
+            {product.pk}
+        ]
+
+    def test_variant_saved_and_deleted(self, django_capture_on_commit_callbacks):
+        """Test variant writes refresh the vector of their product."""
+        product = self.products[0]
+        variant = ProductVariantFactory(
+            product=product, sku="VEC-1", created_by=self.user
+        )
+
+        assert self.changed(django_capture_on_commit_callbacks, variant.save) == [
+            {product.pk}
+        ]
+        assert self.changed(django_capture_on_commit_callbacks, variant.delete) == [
+            {product.pk}
+        ]
+
+    def test_tag_renamed(self, django_capture_on_commit_callbacks):
+        """Test renaming a tag refreshes every product carrying it."""
+        self.tag.name = "Winter"
+
+        assert self.changed(django_capture_on_commit_callbacks, self.tag.save) == [
+            {self.products[0].pk, self.products[1].pk}
+        ]
+
+    def test_tag_created(self, django_capture_on_commit_callbacks):
+        """Test a new tag refreshes nothing."""
+
+        def create():
+            ProductTag.objects.create(
+                name="New", slug="vector-new", created_by=self.user
+            )
+
+        assert self.changed(django_capture_on_commit_callbacks, create) == []
+
+    def test_tag_deleted(self, django_capture_on_commit_callbacks):
+        """Test deleting a tag refreshes the products it was linked to."""
+        assert self.changed(django_capture_on_commit_callbacks, self.tag.delete) == [
+            {self.products[0].pk, self.products[1].pk}
+        ]
+
+    @pytest.mark.parametrize(
+        ("write", "expected"),
+        [
+            (lambda test: test.tag.products.add(test.products[2]), [2]),
+            (lambda test: test.tag.products.remove(test.products[0]), [0]),
+            (lambda test: test.tag.products.clear(), [0, 1]),
+            (lambda test: test.products[2].tags.add(test.tag), [2]),
+            (lambda test: test.products[0].tags.clear(), [0]),
+        ],
+    )
+    def test_tags_changed(self, django_capture_on_commit_callbacks, write, expected):
+        """Test linking and unlinking tags refreshes the affected products."""
+        updates = self.changed(django_capture_on_commit_callbacks, lambda: write(self))
+
+        assert updates == [{self.products[index].pk for index in expected}]
+
+    def test_coalesced_per_transaction(self, django_capture_on_commit_callbacks):
+        """Test several writes in one transaction refresh each product once."""
+
+        def write():
+            for product in self.products:
+                product.save()
+            self.products[0].save()
+            self.tag.products.add(self.products[2])
+
+        assert self.changed(django_capture_on_commit_callbacks, write) == [
+            {product.pk for product in self.products}
+        ]
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    not is_full_text_available(), reason="Needs products stored in PostgreSQL"
+)
+class TestSearchVectors:
+    """Test the content of the search vectors on PostgreSQL."""
+
+    def setup_method(self):
+        """Set up test data."""
+        user = UserFactory()
+        category = ProductCategoryFactory(slug="vector-pg-category", created_by=user)
+        self.product = ProductFactory(
+            name="Lantern",
+            description="Bright camping light",
+            slug="vector-pg-lantern",
+            category=category,
+            created_by=user,
+        )
+        ProductVariantFactory(product=self.product, sku="LNT-042", created_by=user)
+        tag = ProductTag.objects.create(
+            name="Outdoor", slug="vector-pg", created_by=user
+        )
+        tag.products.add(self.product)
+
+    def matches(self, term):
+        return Product.objects.filter(
+            pk=self.product.pk, search_vector=SearchQuery(term, config="english")
+        ).exists()
+
+    @pytest.mark.parametrize("term", ["lantern", "LNT-042", "outdoor", "camping"])
+    def test_vector_covers_fields(self, term):
+        """Test name, SKUs, tags and description are all searchable."""
+        update_search_vectors([self.product.pk])
+
+        assert self.matches(term)
+
+    def test_rebuild_all(self):
+        """Test a full rebuild updates every product."""
+        assert update_search_vectors(batch_size=1) == Product.objects.count()
@@ -0,0 +1,116 @@
+import pytest
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.db import connection
+
+from api.search_filters import (
+    SEARCH_MODE_CONTAINS,
+    SEARCH_MODE_TRIGRAM,
+    AdvancedSearchEngine,
+    ProductSearchFilter,
+    get_product_search_engine,
+)
+from core.tests.factories import UserFactory
+from products.models import Product
+from products.tests.factories import (
+    ProductCategoryFactory,
+    ProductFactory,
+    ProductVariantFactory,
+)
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="Needs pg_trgm on PostgreSQL"
+)
+
+SKUS = ["LNT-0420", "LNT-0421", "TNT-9000", "BKP-1234"]
+
+
+def _trigram_conditions(q):
+    for child in q.children:
+        if isinstance(child, TrigramWordSimilar):
+            yield child
+        elif hasattr(child, "children"):
+            yield from _trigram_conditions(child)
+
+
+@pytest.mark.django_db
+class TestTrigramLookups:
+    """Test SKU lookups in the contains and trigram search modes."""
+
+    def setup_method(self):
+        """Set up test data."""
+        user = UserFactory()
+        category = ProductCategoryFactory(slug="trigram-category", created_by=user)
+        self.products = {}
+        for index, sku in enumerate(SKUS):
+            product = ProductFactory(
+                slug=f"trigram-product-{index}", category=category, created_by=user
+            )
+            ProductVariantFactory(product=product, sku=sku, created_by=user)
+            self.products[sku] = product
+        self.queryset = Product.objects.filter(category=category)
+
+    def skus(self, engine, term):
+        queryset = engine.apply_search(self.queryset, ProductSearchFilter(sku=term))
+        return [
+            sku
+            for product in queryset
+            for sku in SKUS
+            if self.products[sku].pk == product.pk
+        ]
+
+    def test_contains_mode(self):
+        """Test the contains mode matches substrings case-insensitively only."""
+        engine = get_product_search_engine(
+            full_text=False, search_mode=SEARCH_MODE_CONTAINS
+        )
+
+        assert not engine.use_trigram
+        assert sorted(self.skus(engine, "lnt-042")) == ["LNT-0420", "LNT-0421"]
+        assert self.skus(engine, "LTN-0420") == []
+
+    def test_text_match_conditions(self):
+        """Test only trigram fields get the similarity condition."""
+        engine = AdvancedSearchEngine(
+            Product, ["name"], SEARCH_MODE_TRIGRAM, ["variants__sku"]
+        )
+        engine.use_trigram = True
+
+        assert list(_trigram_conditions(engine.text_match("variants__sku", "LNT")))
+        assert not list(_trigram_conditions(engine.text_match("name", "LNT")))
+
+    @pytest.mark.skipif(
+        connection.vendor == "postgresql", reason="Needs a database without pg_trgm"
+    )
+    def test_trigram_mode_needs_postgres(self):
+        """Test trigram mode falls back to contains lookups on other databases."""
+        engine = get_product_search_engine(
+            full_text=False, search_mode=SEARCH_MODE_TRIGRAM
+        )
+
+        assert not engine.use_trigram
+        assert sorted(self.skus(engine, "LNT-042")) == ["LNT-0420", "LNT-0421"]
+
+    @postgres_only
+    def test_trigram_mode_matches_typos(self):
+        """Test a mistyped SKU still finds the closest products first."""
+        engine = get_product_search_engine(
+            full_text=False, search_mode=SEARCH_MODE_TRIGRAM
+        )
+
+        assert engine.use_trigram
+        skus = self.skus(engine, "LNT-04210")
+        assert skus[0] == "LNT-0421"
+        assert "BKP-1234" not in skus
+
+    @postgres_only
+    def test_ranked_by_similarity(self):
+        """Test trigram matches are annotated and ordered by similarity."""
+        engine = AdvancedSearchEngine(
+            Product, [], SEARCH_MODE_TRIGRAM, ["variants__sku"]
+        )
+
+        queryset = engine.filter_text(self.queryset, "variants__sku", "LNT-0420")
+
+        similarities = [row.search_similarity for row in queryset]
+        assert similarities == sorted(similarities, reverse=True)
+        assert queryset[0].pk == self.products["LNT-0420"].pk